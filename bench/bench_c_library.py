@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+In-process benchmark: C parsers generated with and without --library
+
+Both variants of a spec parse the shortest valid command line (as
+bench/fuzz_latency.py builds it) in a loop inside one process, so the
+per parse cost isn't hidden by process start up. argv is copied on every
+iteration, as both variants permute it in place. The library variant is
+reentrant and doesn't exit, so it's also run on several threads at once
+to show it scales with the cores available.
+
+Example: bench/bench_c_library.py args0.toml -n 1000000 -t 4
+"""
+
+import argparse
+import copy
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# pylint: disable=wrong-import-position
+from fuzz_latency import base_argv
+
+from gen_argparser.c_argparse_generator import (
+    CArgparseCodeGenerator,
+    c_string,
+)
+from gen_argparser.gen_argparser import parse_cli_spec
+
+DRIVER = """\
+#include "{name}.h"
+#include <pthread.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <time.h>
+
+static const char *const ARGV[] = {{{argv}}};
+#define ARGC ((int)(sizeof(ARGV) / sizeof(ARGV[0])))
+
+static long repeat;
+
+static void *run(void *unused) {{
+    const char *argv[ARGC + 1];
+    char error[1024];
+    Options opts;
+    (void)unused;
+    (void)error;
+    for (long i = 0; i < repeat; i++) {{
+        const char **args = argv;
+        memcpy(argv, ARGV, sizeof(ARGV));
+        argv[ARGC] = NULL;
+        if ({parse} < 0) {{
+            fprintf(stderr, "%s\\n", error);
+            exit(1);
+        }}
+    }}
+    return NULL;
+}}
+
+int main(int argc, char **argv) {{
+    int threads = argc > 2 ? atoi(argv[2]) : 1;
+    pthread_t ids[64];
+    struct timespec start, end;
+    repeat = argc > 1 ? atol(argv[1]) : 100000;
+    clock_gettime(CLOCK_MONOTONIC, &start);
+    for (int i = 0; i < threads; i++) {{
+        pthread_create(&ids[i], NULL, run, NULL);
+    }}
+    for (int i = 0; i < threads; i++) {{
+        pthread_join(ids[i], NULL);
+    }}
+    clock_gettime(CLOCK_MONOTONIC, &end);
+    printf("%.0f\\n", (end.tv_sec - start.tv_sec) * 1e9 + (end.tv_nsec - start.tv_nsec));
+    return 0;
+}}
+"""
+
+# variant -> (parse_options call, extra sources)
+VARIANTS = {
+    "default": ("parse_options(ARGC, &args, &opts)", ["3rdparty/argparse.c"]),
+    "library": (
+        "parse_options(ARGC, &args, &opts, error, sizeof(error))",
+        [],
+    ),
+}
+
+
+def build(variant: str, config: dict, argv: list, cflags: str) -> str:
+    """
+    generate and build the driver of a variant in the current directory,
+    returns its path
+    """
+    parse, sources = VARIANTS[variant]
+    base = variant
+    CArgparseCodeGenerator(config).generate_code(base)
+    driver = base + "-main.c"
+    with open(driver, "w", encoding="utf-8") as f:
+        f.write(
+            DRIVER.format(
+                name=variant,
+                argv=", ".join(c_string(arg) for arg in ["bench"] + argv),
+                parse=parse,
+            )
+        )
+    sources = [os.path.join(ROOT, source) for source in sources]
+    cmd = [os.environ.get("CC", "cc"), *cflags.split()]
+    cmd += ["-I", os.path.join(ROOT, "3rdparty"), base + ".c", driver]
+    cmd += [*sources, "-o", base, "-lpthread", "-lm"]
+    subprocess.run(cmd, check=True)
+    return os.path.abspath(base)
+
+
+def parse_time_ns(binary: str, repeat: int, threads: int) -> float:
+    """wall clock nanoseconds of repeat parses on each of threads"""
+    result = subprocess.run(
+        [binary, str(repeat), str(threads)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(result.stdout.split()[-1])
+
+
+def main():
+    """CLI for the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("spec", type=str, help="input TOML spec")
+    parser.add_argument(
+        "-n", "--repeat", type=int, default=200000, help="parses per thread"
+    )
+    parser.add_argument(
+        "-t", "--threads", type=int, default=4, help="library variant threads"
+    )
+    parser.add_argument("--cflags", default="-O2", help="C optimization flags")
+    args = parser.parse_args()
+
+    if shutil.which(os.environ.get("CC", "cc")) is None:
+        sys.exit("a C compiler is needed (set CC)")
+
+    config = parse_cli_spec(os.path.abspath(args.spec))
+    generator = CArgparseCodeGenerator(config)
+    argv = []
+    if generator.commands:
+        generator = generator.for_command(generator.commands[0])
+        argv = [generator.command.name]
+    argv += base_argv(generator.args)
+    library_config = copy.deepcopy(config)
+    library_config["program"]["library"] = "true"
+
+    work_dir = tempfile.mkdtemp(prefix="climeta-bench-")
+    os.chdir(work_dir)  # the header guards are named after the outputs
+    print(f"argv: {' '.join(argv)}")
+    print(f"{'variant':<9} {'threads':>7} {'ns/parse':>9} {'parses/s':>12}")
+    try:
+        runs = [
+            ("default", build("default", config, argv, args.cflags), 1),
+        ]
+        library = build("library", library_config, argv, args.cflags)
+        runs += [("library", library, 1)]
+        if args.threads > 1:
+            runs += [("library", library, min(args.threads, 64))]
+        for variant, binary, threads in runs:
+            elapsed = parse_time_ns(binary, args.repeat, threads)
+            per_parse = elapsed / args.repeat
+            rate = threads * args.repeat / elapsed * 1e9
+            print(f"{variant:<9} {threads:>7} {per_parse:>9.1f} {rate:>12.0f}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
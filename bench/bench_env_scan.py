@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Time to read the variables bound to options: one scan vs a lookup each
+
+The options of the synthetic spec of bench_profile_order.py are all bound
+to a variable (env_prefix), one in ten being set, in an environment also
+holding unrelated variables. Both ways are timed in a loop inside one
+process:
+
+- c-argparse: scan_environment() of the generated parser (environ walked
+  once, each entry looked up in the sorted names) vs a getenv() per name
+- python:     Environment() of the generated parsers vs a lookup of
+  os.environ per name
+
+Example: bench/bench_env_scan.py -n 120 --unrelated 100
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+# pylint: disable=wrong-import-position
+# (bench_profile_order puts the repository in sys.path)
+from bench_profile_order import synthetic_config
+from gen_argparser.c_argparse_generator import CArgparseCodeGenerator, c_string
+from gen_argparser.environment import Environment
+
+C_DRIVER = """\
+#include "env_c.c"  /* for its static scan_environment */
+#include <time.h>
+
+static const char *const NAMES[] = {{
+{names}
+}};
+#define NAMES_COUNT (sizeof(NAMES) / sizeof(NAMES[0]))
+
+static double elapsed_ns(const struct timespec *start) {{
+    struct timespec end;
+    clock_gettime(CLOCK_MONOTONIC, &end);
+    return (end.tv_sec - start->tv_sec) * 1e9 + (end.tv_nsec - start->tv_nsec);
+}}
+
+int main(int argc, char **argv) {{
+    long repeat = argc > 1 ? atol(argv[1]) : 1000;
+    static const char *values[NAMES_COUNT];
+    struct timespec start;
+    size_t found = 0;
+
+    clock_gettime(CLOCK_MONOTONIC, &start);
+    for (long i = 0; i < repeat; i++) {{
+        scan_environment(NAMES, NAMES_COUNT, values);
+        found += values[i % NAMES_COUNT] != NULL;
+    }}
+    printf("%.0f\\n", elapsed_ns(&start));
+
+    clock_gettime(CLOCK_MONOTONIC, &start);
+    for (long i = 0; i < repeat; i++) {{
+        for (size_t j = 0; j < NAMES_COUNT; j++) {{
+            values[j] = getenv(NAMES[j]);
+        }}
+        found += values[i % NAMES_COUNT] != NULL;
+    }}
+    printf("%.0f\\n", elapsed_ns(&start));
+    return found == 0;
+}}
+"""
+
+
+def bound_config(count: int) -> dict:
+    """the synthetic spec, every option bound to BENCH_<DEST>"""
+    config = synthetic_config(count)
+    config["program"]["env_prefix"] = "BENCH_"
+    return config
+
+
+def bench_environment(generator: CArgparseCodeGenerator, unrelated: int) -> dict:
+    """environment of unrelated variables, and one in ten bound ones set"""
+    environment = dict(os.environ)
+    environment.update({f"UNRELATED_{idx}": "x" * 20 for idx in range(unrelated)})
+    for arg in generator.env_bindings()[::10]:
+        environment[arg.env] = "1" if arg.type_ == "flag" else "v"
+    return environment
+
+
+def c_times_ns(config: dict, environment: dict, repeat: int) -> tuple:
+    """nanoseconds per scan_environment() and per getenv() loop"""
+    generator = CArgparseCodeGenerator(config)
+    generator.generate_code("env_c")
+    names = [f"    {c_string(arg.env)}," for arg in generator.env_bindings()]
+    with open("env_c-main.c", "w", encoding="utf-8") as f:
+        f.write(C_DRIVER.format(names="\n".join(names)))
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    cmd = [os.environ.get("CC", "cc"), "-O2", "-I", os.path.join(root, "3rdparty")]
+    cmd += ["env_c-main.c", os.path.join(root, "3rdparty", "argparse.c")]
+    subprocess.run(cmd + ["-o", "env_c", "-lm"], check=True)
+    result = subprocess.run(
+        ["./env_c", str(repeat)],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=environment,
+    )
+    scan, lookups = (float(ns) / repeat for ns in result.stdout.split())
+    return scan, lookups
+
+
+def python_times_ns(names: frozenset, environment: dict, repeat: int) -> tuple:
+    """nanoseconds per Environment() and per os.environ lookups"""
+    saved = dict(os.environ)
+    os.environ.clear()
+    os.environ.update(environment)
+    try:
+        start = time.perf_counter_ns()
+        for _ in range(repeat):
+            scanned = Environment(names).values
+        scan = (time.perf_counter_ns() - start) / repeat
+
+        start = time.perf_counter_ns()
+        for _ in range(repeat):
+            looked_up = {name: os.environ[name] for name in names if name in os.environ}
+        lookups = (time.perf_counter_ns() - start) / repeat
+    finally:
+        os.environ.clear()
+        os.environ.update(saved)
+    assert scanned == looked_up, "both ways must read the same variables"
+    return scan, lookups
+
+
+def main():
+    """CLI for the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "-n", "--options", type=int, default=120, help="options in the spec"
+    )
+    parser.add_argument(
+        "--unrelated", type=int, default=100, help="other variables set"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=100000, help="C reads per variant"
+    )
+    parser.add_argument(
+        "--python-repeat", type=int, default=5000, help="python reads per variant"
+    )
+    args = parser.parse_args()
+
+    config = bound_config(args.options)
+    generator = CArgparseCodeGenerator(config)
+    environment = bench_environment(generator, args.unrelated)
+    names = frozenset(arg.env for arg in generator.env_bindings())
+
+    work_dir = tempfile.mkdtemp(prefix="climeta-bench-")
+    os.chdir(work_dir)  # the header guards are named after the outputs
+    print(f"{args.options} bound options, {len(environment)} variables set")
+    print(f"{'backend':<11} {'scan ns':>10} {'lookups ns':>10} {'speedup':>8}")
+    try:
+        cc = os.environ.get("CC", "cc")
+        if shutil.which(cc) is None:
+            print(f"{'c-argparse':<11} skipped, {cc} not found")
+        else:
+            scan, lookups = c_times_ns(config, environment, args.repeat)
+            print(
+                f"{'c-argparse':<11} {scan:>10.0f} {lookups:>10.0f} "
+                f"{lookups / scan:>7.2f}x"
+            )
+        scan, lookups = python_times_ns(names, environment, args.python_repeat)
+        print(f"{'python':<11} {scan:>10.0f} {lookups:>10.0f} {lookups / scan:>7.2f}x")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Time to load options from the hand-off encoding vs parsing the command line
+
+A wrapper that parsed its command line can hand the options to a worker
+with encode_options (handoff = "true"), the worker loading them with
+decode_options instead of parsing an equivalent argv again. Both are
+timed in a loop inside one process, on the synthetic spec and command
+lines of bench_profile_order.py:
+
+- c-argparse: parse_options() vs decode_options(), argv and the encoding
+  copied on every iteration (both work in place)
+- python:     parse_argv() of a parser built once vs decode_options()
+
+Example: bench/bench_handoff.py -n 120 --repeat 200000
+"""
+
+import argparse
+import importlib
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# pylint: disable=wrong-import-position
+# (bench_profile_order puts the repository in sys.path)
+from bench_profile_order import sample_argvs, synthetic_config
+from gen_argparser.c_argparse_generator import CArgparseCodeGenerator, c_string
+from gen_argparser.python_generator import PythonCodeGenerator
+
+C_DRIVER = """\
+#include "{name}.h"
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <time.h>
+
+static const char *const ARGVS[][{width}] = {{
+{argvs}
+}};
+#define ARGVS_COUNT (sizeof(ARGVS) / sizeof(ARGVS[0]))
+
+static double elapsed_ns(const struct timespec *start) {{
+    struct timespec end;
+    clock_gettime(CLOCK_MONOTONIC, &end);
+    return (end.tv_sec - start->tv_sec) * 1e9 + (end.tv_nsec - start->tv_nsec);
+}}
+
+int main(int argc, char **argv) {{
+    long repeat = argc > 1 ? atol(argv[1]) : 1000;
+    const char *copy[{width}];
+    static char encoded[ARGVS_COUNT][4096];
+    char buf[4096];
+    struct timespec start;
+    Options opts;
+    int counts[ARGVS_COUNT];
+    for (size_t i = 0; i < ARGVS_COUNT; i++) {{
+        const char **parsed = copy;
+        counts[i] = 0;
+        while (ARGVS[i][counts[i]] != NULL) {{
+            counts[i]++;
+        }}
+        memcpy(copy, ARGVS[i], sizeof(copy));
+        parse_options(counts[i], &parsed, &opts);
+        encode_options(&opts, encoded[i], sizeof(encoded[i]));
+    }}
+
+    clock_gettime(CLOCK_MONOTONIC, &start);
+    for (long i = 0; i < repeat; i++) {{
+        const char **parsed = copy;
+        memcpy(copy, ARGVS[i % ARGVS_COUNT], sizeof(copy));
+        parse_options(counts[i % ARGVS_COUNT], &parsed, &opts);
+    }}
+    printf("%.0f\\n", elapsed_ns(&start));
+
+    clock_gettime(CLOCK_MONOTONIC, &start);
+    for (long i = 0; i < repeat; i++) {{
+        strcpy(buf, encoded[i % ARGVS_COUNT]);
+        if (decode_options(buf, &opts) != 0) {{
+            return 1;
+        }}
+    }}
+    printf("%.0f\\n", elapsed_ns(&start));
+    return 0;
+}}
+"""
+
+
+def c_times_ns(config: dict, argvs: list, repeat: int) -> tuple:
+    """nanoseconds per parse_options() and per decode_options() call"""
+    generator = CArgparseCodeGenerator(config)
+    generator.handoff = True
+    generator.generate_code("handoff_c")
+    width = 2 + max(len(argv) for argv in argvs)
+    rows = [
+        "    {" + ", ".join(c_string(arg) for arg in ["bench"] + argv) + ", NULL},"
+        for argv in argvs
+    ]
+    with open("handoff_c-main.c", "w", encoding="utf-8") as f:
+        f.write(C_DRIVER.format(name="handoff_c", width=width, argvs="\n".join(rows)))
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    cmd = [os.environ.get("CC", "cc"), "-O2", "-I", os.path.join(root, "3rdparty")]
+    cmd += [
+        "handoff_c.c",
+        "handoff_c-main.c",
+        os.path.join(root, "3rdparty", "argparse.c"),
+    ]
+    subprocess.run(cmd + ["-o", "handoff_c", "-lm"], check=True)
+    result = subprocess.run(
+        ["./handoff_c", str(repeat)], capture_output=True, text=True, check=True
+    )
+    parse, decode = (float(ns) / repeat for ns in result.stdout.split())
+    return parse, decode
+
+
+def python_times_ns(config: dict, argvs: list, repeat: int) -> tuple:
+    """nanoseconds per parse_argv() and per decode_options() call"""
+    generator = PythonCodeGenerator(config)
+    generator.handoff = True
+    generator.generate_code("handoff_py")
+    sys.path.insert(0, os.getcwd())
+    module = importlib.import_module("handoff_py")
+    parser = module.build_parser()
+    encoded = [
+        module.encode_options(module.parse_argv(parser, argv)[0]) for argv in argvs
+    ]
+
+    start = time.perf_counter_ns()
+    for i in range(repeat):
+        module.parse_argv(parser, argvs[i % len(argvs)])
+    parse = (time.perf_counter_ns() - start) / repeat
+
+    start = time.perf_counter_ns()
+    for i in range(repeat):
+        module.decode_options(encoded[i % len(encoded)])
+    decode = (time.perf_counter_ns() - start) / repeat
+    return parse, decode
+
+
+def main():
+    """CLI for the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "-n", "--options", type=int, default=120, help="options in the spec"
+    )
+    parser.add_argument(
+        "-s", "--skew", type=float, default=1.2, help="Zipf exponent of use"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=200000, help="C parses per variant"
+    )
+    parser.add_argument(
+        "--python-repeat", type=int, default=5000, help="python parses per variant"
+    )
+    args = parser.parse_args()
+
+    config = synthetic_config(args.options)
+    argvs = sample_argvs(config, args.skew, 256, seed=2)
+
+    work_dir = tempfile.mkdtemp(prefix="climeta-bench-")
+    os.chdir(work_dir)  # the header guards are named after the outputs
+    print(f"{args.options} options, Zipf skew {args.skew}")
+    print(f"{'backend':<11} {'parse ns':>10} {'decode ns':>10} {'speedup':>8}")
+    try:
+        cc = os.environ.get("CC", "cc")
+        if shutil.which(cc) is None:
+            print(f"{'c-argparse':<11} skipped, {cc} not found")
+        else:
+            parse, decode = c_times_ns(config, argvs, args.repeat)
+            print(
+                f"{'c-argparse':<11} {parse:>10.0f} {decode:>10.0f} "
+                f"{parse / decode:>7.2f}x"
+            )
+        parse, decode = python_times_ns(config, argvs, args.python_repeat)
+        print(f"{'python':<11} {parse:>10.0f} {decode:>10.0f} {parse / decode:>7.2f}x")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
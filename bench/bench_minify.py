@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Source-time benchmark: full vs --minify generated bash/JavaScript parsers
+
+Both variants of a spec are generated and loaded many times in a single
+process, so process start up doesn't hide the difference:
+
+- bash:  `source` of the generated file in a loop, timed with EPOCHREALTIME
+- js:    compilation of the module source with node:vm (imports/exports
+         stripped, as vm.Script only takes scripts)
+
+Example: bench/bench_minify.py args0.toml -n 2000
+"""
+
+import argparse
+import copy
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# pylint: disable=wrong-import-position
+from gen_argparser.bash_generator import BashCodeGenerator
+from gen_argparser.gen_argparser import parse_cli_spec
+from gen_argparser.js_cla_generator import JavaScriptCommandLineArgsCodeGenerator
+
+BASH_LOOP = """
+start=${EPOCHREALTIME//[.,]/}
+for ((i = 0; i < $2; i++)); do source "$1"; done
+echo $(( ${EPOCHREALTIME//[.,]/} - start ))
+"""
+
+NODE_LOOP = """
+const fs = require("node:fs");
+const vm = require("node:vm");
+const code = fs.readFileSync(process.argv[1], "utf8")
+  .replace(/^import .*$/gm, "").replace(/^export /gm, "");
+const repeat = Number(process.argv[2]);
+const start = process.hrtime.bigint();
+for (let i = 0; i < repeat; i++) {
+  new vm.Script(code, { filename: `f${i}.js` });
+}
+console.log(Number((process.hrtime.bigint() - start) / 1000n));
+"""
+
+# language -> (generator class, extension, loader command)
+LANGS = {
+    "bash": (BashCodeGenerator, ".sh", ["bash", "-c", BASH_LOOP, "bash"]),
+    "js-cla": (
+        JavaScriptCommandLineArgsCodeGenerator,
+        ".mjs",
+        ["node", "-e", NODE_LOOP],
+    ),
+}
+
+
+def load_time_us(cmd: list, filename: str, repeat: int) -> float:
+    """microseconds per load of filename"""
+    result = subprocess.run(
+        cmd + [filename, str(repeat)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return int(result.stdout.split()[-1]) / repeat
+
+
+def main():
+    """CLI for the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("spec", type=str, help="input TOML spec")
+    parser.add_argument(
+        "-n", "--repeat", type=int, default=1000, help="loads per variant"
+    )
+    args = parser.parse_args()
+
+    config = parse_cli_spec(args.spec)
+    minified_config = copy.deepcopy(config)
+    minified_config["program"]["minify"] = "true"
+
+    work_dir = tempfile.mkdtemp(prefix="climeta-bench-")
+    print(
+        f"{'lang':<8} {'variant':<9} {'bytes':>7} {'us/load':>9} {'saved':>7}"
+    )
+    try:
+        for lang, (generator_class, extension, cmd) in LANGS.items():
+            if shutil.which(cmd[0]) is None:
+                print(f"{lang:<8} skipped, {cmd[0]} not found")
+                continue
+            results = {}
+            for variant, variant_config in [
+                ("full", config),
+                ("minified", minified_config),
+            ]:
+                base = os.path.join(work_dir, variant)
+                generator_class(variant_config).generate_code(base)
+                filename = base + extension
+                results[variant] = (
+                    os.path.getsize(filename),
+                    load_time_us(cmd, filename, args.repeat),
+                )
+            full_time = results["full"][1]
+            for variant, (size, time_us) in results.items():
+                saved = 100 * (full_time - time_us) / full_time
+                print(
+                    f"{lang:<8} {variant:<9} {size:>7} {time_us:>9.1f} "
+                    f"{saved:>6.1f}%"
+                )
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Size and build time: N separate C programs vs one multicall program
+
+The specs given are cycled into N tools (tool0, tool1, ...), then built:
+
+- separate:   one program per tool, as climeta.py -l c-argparse outputs
+              them, each linked with 3rdparty/argparse.c
+- multicall:  one program for all the tools (climeta.py --multicall),
+              one copy of the library mode runtime and a table per tool
+
+Every tool main parses its arguments and dumps them. The bytes on disk
+(stripped) are what the tools take in the page cache once all of them
+ran, the build time is one compiler run per program, as make -j1 would.
+
+Example: bench/bench_multicall.py args0.toml args1.toml args4.toml -n 50
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# pylint: disable=wrong-import-position
+from gen_argparser.c_argparse_generator import CArgparseCodeGenerator
+from gen_argparser.c_multicall_generator import CMulticallCodeGenerator
+from gen_argparser.gen_argparser import parse_cli_spec
+
+SEPARATE_MAIN = """\
+#include "{name}.h"
+
+int main(int argc, const char **argv) {{
+    Options opts;
+    parse_options(argc, &argv, &opts);
+    dump_options(&opts);
+    return 0;
+}}
+"""
+
+TOOL_MAIN = """\
+int {name}_main(int argc, const char **argv) {{
+    {name}_Options opts;
+    {name}_parse_args(argc, &argv, &opts);
+    {name}_dump_options(&opts);
+    return 0;
+}}
+"""
+
+
+def compile_program(sources: list, binary: str, cflags: str) -> float:
+    """build and strip binary from sources, returns the seconds it took"""
+    cmd = [os.environ.get("CC", "cc"), *cflags.split(), "-s"]
+    cmd += ["-I", os.path.join(ROOT, "3rdparty"), *sources, "-o", binary, "-lm"]
+    start = time.perf_counter()
+    subprocess.run(cmd, check=True)
+    return time.perf_counter() - start
+
+
+def build_separate(tools: dict, cflags: str) -> tuple:
+    """(total bytes, build seconds) of a program per tool"""
+    size, seconds = 0, 0.0
+    for name, config in tools.items():
+        CArgparseCodeGenerator(config).generate_code(name)
+        with open(name + "-main.c", "w", encoding="utf-8") as f:
+            f.write(SEPARATE_MAIN.format(name=name))
+        sources = [name + ".c", name + "-main.c"]
+        sources.append(os.path.join(ROOT, "3rdparty", "argparse.c"))
+        seconds += compile_program(sources, name, cflags)
+        size += os.path.getsize(name)
+    return size, seconds
+
+
+def build_multicall(tools: dict, cflags: str) -> tuple:
+    """(bytes, build seconds) of the multicall program of the tools"""
+    CMulticallCodeGenerator(tools, "multicall").generate_code("multicall")
+    with open("multicall-main.c", "w", encoding="utf-8") as f:
+        f.write('#include "multicall.h"\n\n')
+        f.write("\n".join(TOOL_MAIN.format(name=name) for name in tools))
+    seconds = compile_program(
+        ["multicall.c", "multicall-main.c"], "multicall", cflags
+    )
+    return os.path.getsize("multicall"), seconds
+
+
+def main():
+    """CLI for the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("specs", nargs="+", help="input TOML specs")
+    parser.add_argument(
+        "-n", "--tools", type=int, default=20, help="number of tools"
+    )
+    parser.add_argument("--cflags", default="-O2", help="C optimization flags")
+    args = parser.parse_args()
+
+    if shutil.which(os.environ.get("CC", "cc")) is None:
+        sys.exit("a C compiler is needed (set CC)")
+
+    configs = [parse_cli_spec(os.path.abspath(spec)) for spec in args.specs]
+    tools = {
+        f"tool{idx}": configs[idx % len(configs)] for idx in range(args.tools)
+    }
+
+    work_dir = tempfile.mkdtemp(prefix="climeta-bench-")
+    os.chdir(work_dir)  # the header guards are named after the outputs
+    try:
+        results = {
+            "separate": build_separate(tools, args.cflags),
+            "multicall": build_multicall(tools, args.cflags),
+        }
+        print(f"{args.tools} tools, {args.cflags}")
+        print(f"{'variant':<10} {'bytes':>10} {'build s':>8}")
+        for variant, (size, seconds) in results.items():
+            print(f"{variant:<10} {size:>10} {seconds:>8.2f}")
+        separate, multicall = results["separate"], results["multicall"]
+        print(
+            f"multicall: {separate[0] / multicall[0]:.1f}x smaller, "
+            f"{separate[1] / multicall[1]:.1f}x faster to build"
+        )
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
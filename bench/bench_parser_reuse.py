@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+In-process benchmark: rebuilding the parser per call vs a reused Parser
+
+The python and JavaScript modules generated for a spec parse the shortest
+valid command line (as bench/fuzz_latency.py builds it) in a loop:
+
+- rebuild:  a parser built for every parse, as parse_args() does
+- reused:   one Parser object, only parse(argv) per call
+- threads:  (python) one Parser shared by several threads
+
+JavaScript needs the npm packages of setup.sh, so the module is generated
+under the repository, where node finds them; it's skipped otherwise.
+
+Example: bench/bench_parser_reuse.py args4.toml -n 20000 -t 4
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# pylint: disable=wrong-import-position
+from fuzz_latency import base_argv
+
+from gen_argparser.code_generator import CodeGenerator
+from gen_argparser.gen_argparser import parse_cli_spec
+from gen_argparser.js_cla_generator import JavaScriptCommandLineArgsCodeGenerator
+from gen_argparser.python_generator import PythonCodeGenerator
+
+NODE_LOOP = """
+const { Parser } = await import(process.argv[1]);
+const argv = JSON.parse(process.argv[2]);
+const repeat = Number(process.argv[3]);
+function rate(parse) {
+  const start = process.hrtime.bigint();
+  for (let i = 0; i < repeat; i++) {
+    parse();
+  }
+  return repeat / (Number(process.hrtime.bigint() - start) / 1e9);
+}
+const parser = new Parser();
+console.log(rate(() => new Parser().parse(argv)), rate(() => parser.parse(argv)));
+"""
+
+
+def rate(parse, repeat: int) -> float:
+    """parses per second of repeat calls to parse"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        parse()
+    return repeat / (time.perf_counter() - start)
+
+
+def threads_rate(parse, repeat: int, threads: int) -> float:
+    """parses per second of repeat calls to parse on each of threads"""
+    workers = [
+        threading.Thread(target=rate, args=(parse, repeat))
+        for _ in range(threads)
+    ]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return threads * repeat / (time.perf_counter() - start)
+
+
+def python_rates(module, argv: list, repeat: int, threads: int) -> dict:
+    """variant -> parses per second of the generated python module"""
+    parser = module.Parser()
+    # as parse_args(), only the selected command is built
+    build_args = {"commands": argv[:1]} if hasattr(module, "COMMANDS") else {}
+    return {
+        "rebuild": rate(
+            lambda: module.parse_argv(module.build_parser(**build_args), argv),
+            repeat,
+        ),
+        "reused": rate(lambda: parser.parse(argv), repeat),
+        f"{threads} threads": threads_rate(
+            lambda: parser.parse(argv), repeat // threads, threads
+        ),
+    }
+
+
+def js_rates(filename: str, argv: list, repeat: int):
+    """variant -> parses per second of the JavaScript module, or None"""
+    if shutil.which("node") is None:
+        return None
+    result = subprocess.run(
+        [
+            "node",
+            "--input-type=module",
+            "-e",
+            NODE_LOOP,
+            filename,
+            json.dumps(argv),
+            str(repeat),
+        ],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        return None
+    rebuild, reused = result.stdout.split()
+    return {"rebuild": float(rebuild), "reused": float(reused)}
+
+
+def main():
+    """CLI for the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("spec", type=str, help="input TOML spec")
+    parser.add_argument(
+        "-n", "--repeat", type=int, default=10000, help="parses per variant"
+    )
+    parser.add_argument(
+        "-t", "--threads", type=int, default=4, help="python threads"
+    )
+    args = parser.parse_args()
+
+    config = parse_cli_spec(args.spec)
+    generator = CodeGenerator(config)
+    argv = []
+    if generator.commands:
+        generator = generator.for_command(generator.commands[0])
+        argv = [generator.command.name]
+    argv += base_argv(generator.args)
+
+    # under the repository, so node finds its node_modules
+    work_dir = tempfile.mkdtemp(prefix="climeta-bench-", dir=ROOT)
+    try:
+        PythonCodeGenerator(config).generate_code(
+            os.path.join(work_dir, "generated")
+        )
+        JavaScriptCommandLineArgsCodeGenerator(config).generate_code(
+            os.path.join(work_dir, "generated")
+        )
+        sys.path.insert(0, work_dir)
+        import generated  # pylint: disable=import-outside-toplevel
+
+        results = {
+            "python": python_rates(generated, argv, args.repeat, args.threads),
+            "js-cla": js_rates(
+                os.path.join(work_dir, "generated.mjs"), argv, args.repeat
+            ),
+        }
+        print(f"argv: {' '.join(argv)}")
+        print(f"{'lang':<8} {'variant':<10} {'parses/s':>10} {'speedup':>8}")
+        for lang, rates in results.items():
+            if rates is None:
+                print(f"{lang:<8} skipped, node or the npm packages not found")
+                continue
+            for variant, value in rates.items():
+                speedup = value / rates["rebuild"]
+                print(f"{lang:<8} {variant:<10} {value:>10.0f} {speedup:>7.1f}x")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Parse time of parsers generated in spec order vs ordered by a usage profile
+
+A synthetic spec of N options (flags and string options, alternating) is
+used the way real tools tend to be: a few options are given most of the
+time, and they aren't the first ones of the spec (options get appended
+as tools grow). Option i is given with Zipf weight 1 / rank^s, the most
+used being the last one of the spec.
+
+Two samples of command lines are drawn: the profile is counted from the
+first one (as climeta.py stats would report it), the second one is
+parsed in a loop, in a single process per backend, by the parsers
+generated without and with the profile:
+
+- c-argparse: parse_options() of the default mode
+- bash:       get_cli_args, timed with EPOCHREALTIME
+- js-cla:     Parser.parse() (needs node and the npm packages of setup.sh)
+
+Example: bench/bench_profile_order.py -n 120 -s 1.2 --repeat 20000
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# pylint: disable=wrong-import-position
+from gen_argparser.bash_generator import BashCodeGenerator
+from gen_argparser.c_argparse_generator import (
+    CArgparseCodeGenerator,
+    c_string,
+)
+from gen_argparser.js_cla_generator import JavaScriptCommandLineArgsCodeGenerator
+
+C_DRIVER = """\
+#include "{name}.h"
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <time.h>
+
+static const char *const ARGVS[][{width}] = {{
+{argvs}
+}};
+#define ARGVS_COUNT (sizeof(ARGVS) / sizeof(ARGVS[0]))
+
+int main(int argc, char **argv) {{
+    long repeat = argc > 1 ? atol(argv[1]) : 1000;
+    const char *copy[{width}];
+    struct timespec start, end;
+    Options opts;
+    clock_gettime(CLOCK_MONOTONIC, &start);
+    for (long i = 0; i < repeat; i++) {{
+        const char *const *args = ARGVS[i % ARGVS_COUNT];
+        const char **parsed = copy;
+        int count = 0;
+        while (args[count] != NULL) {{
+            count++;
+        }}
+        memcpy(copy, args, sizeof(copy));
+        parse_options(count, &parsed, &opts);
+    }}
+    clock_gettime(CLOCK_MONOTONIC, &end);
+    printf("%.0f\\n", (end.tv_sec - start.tv_sec) * 1e9 + (end.tv_nsec - start.tv_nsec));
+    return 0;
+}}
+"""
+
+BASH_LOOP = """
+source "$1"
+mapfile -t lines < "$2"
+start=${EPOCHREALTIME//[.,]/}
+for ((i = 0; i < $3; i++)); do
+    read -ra args <<< "${lines[i % ${#lines[@]}]}"
+    get_cli_args "${args[@]}"
+done
+echo $(( (${EPOCHREALTIME//[.,]/} - start) * 1000 ))
+"""
+
+NODE_LOOP = """
+const { Parser } = await import(process.argv[1]);
+const fs = await import("node:fs");
+const argvs = JSON.parse(fs.readFileSync(process.argv[2]));
+const repeat = Number(process.argv[3]);
+const parser = new Parser();
+const start = process.hrtime.bigint();
+for (let i = 0; i < repeat; i++) {
+  parser.parse(argvs[i % argvs.length]);
+}
+console.log(Number(process.hrtime.bigint() - start));
+"""
+
+
+def synthetic_config(count: int) -> dict:
+    """spec of count options, flags and string options alternating"""
+    arguments = []
+    for idx in range(count):
+        if idx % 2:
+            arguments.append(
+                {
+                    "name": f"--opt{idx}",
+                    "type": "string",
+                    "default": "x",
+                    "help": f"option {idx}",
+                }
+            )
+        else:
+            arguments.append(
+                {"name": f"--flag{idx}", "type": "flag", "help": f"flag {idx}"}
+            )
+    return {
+        "program": {"name": "bench", "description": "profile order benchmark"},
+        "arguments": arguments,
+    }
+
+
+def sample_argvs(config: dict, skew: float, lines: int, seed: int) -> list:
+    """command lines of 1 to 4 options, the last options given the most"""
+    names = [arg["name"] for arg in reversed(config["arguments"])]
+    weights = [1 / (rank + 1) ** skew for rank in range(len(names))]
+    rng = random.Random(seed)
+    argvs = []
+    for _ in range(lines):
+        argv = []
+        given = rng.choices(names, weights, k=rng.randint(1, 4))
+        for name in dict.fromkeys(given):
+            argv += [name] if name.startswith("--flag") else [name, "v"]
+        argvs.append(argv)
+    return argvs
+
+
+def profile_of(argvs: list) -> dict:
+    """option -> times given in argvs"""
+    profile = {}
+    for argv in argvs:
+        for token in argv:
+            if token.startswith("-"):
+                profile[token] = profile.get(token, 0) + 1
+    return profile
+
+
+def run_ns(cmd: list) -> float:
+    """nanoseconds printed by a timing loop"""
+    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    return float(result.stdout.split()[-1])
+
+
+def c_time_ns(generator, base: str, argvs: list, repeat: int) -> float:
+    """nanoseconds per parse_options() call of the C default mode"""
+    generator.generate_code(base)
+    width = 2 + max(len(argv) for argv in argvs)
+    rows = [
+        "    {" + ", ".join(c_string(arg) for arg in ["bench"] + argv) + ", NULL},"
+        for argv in argvs
+    ]
+    with open(base + "-main.c", "w", encoding="utf-8") as f:
+        f.write(C_DRIVER.format(name=base, width=width, argvs="\n".join(rows)))
+    cmd = [os.environ.get("CC", "cc"), "-O2"]
+    cmd += ["-I", os.path.join(ROOT, "3rdparty"), base + ".c", base + "-main.c"]
+    cmd += [os.path.join(ROOT, "3rdparty", "argparse.c"), "-o", base, "-lm"]
+    subprocess.run(cmd, check=True)
+    return run_ns(["./" + base, str(repeat)]) / repeat
+
+
+def bash_time_ns(generator, base: str, argvs: list, repeat: int) -> float:
+    """nanoseconds per get_cli_args call"""
+    generator.generate_code(base)
+    with open(base + ".argv", "w", encoding="utf-8") as f:
+        f.write("".join(" ".join(argv) + "\n" for argv in argvs))
+    cmd = ["bash", "-c", BASH_LOOP, "bash", base + ".sh", base + ".argv"]
+    return run_ns(cmd + [str(repeat)]) / repeat
+
+
+def js_time_ns(generator, base: str, argvs: list, repeat: int) -> float:
+    """nanoseconds per Parser.parse() call"""
+    generator.generate_code(base)
+    with open(base + ".json", "w", encoding="utf-8") as f:
+        json.dump(argvs, f)
+    module = os.path.abspath(base + ".mjs")
+    cmd = ["node", "--input-type=module", "-e", NODE_LOOP, module]
+    return run_ns(cmd + [base + ".json", str(repeat)]) / repeat
+
+
+# backend -> (generator class, timing function, program needed)
+BACKENDS = {
+    "c-argparse": (CArgparseCodeGenerator, c_time_ns, os.environ.get("CC", "cc")),
+    "bash": (BashCodeGenerator, bash_time_ns, "bash"),
+    "js-cla": (JavaScriptCommandLineArgsCodeGenerator, js_time_ns, "node"),
+}
+
+
+def main():
+    """CLI for the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "-n", "--options", type=int, default=120, help="options in the spec"
+    )
+    parser.add_argument(
+        "-s", "--skew", type=float, default=1.2, help="Zipf exponent of use"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=20000, help="parses per variant"
+    )
+    parser.add_argument(
+        "--bash-repeat", type=int, default=500, help="parses per bash variant"
+    )
+    args = parser.parse_args()
+
+    config = synthetic_config(args.options)
+    profile = profile_of(sample_argvs(config, args.skew, 5000, seed=1))
+    argvs = sample_argvs(config, args.skew, 256, seed=2)
+
+    # under the repository, so node finds its node_modules
+    work_dir = tempfile.mkdtemp(prefix="climeta-bench-", dir=ROOT)
+    os.chdir(work_dir)  # the header guards are named after the outputs
+    print(f"{args.options} options, Zipf skew {args.skew}")
+    print(f"{'backend':<11} {'spec ns':>10} {'profiled ns':>12} {'speedup':>8}")
+    try:
+        for backend, (generator_class, time_ns, program) in BACKENDS.items():
+            if shutil.which(program) is None:
+                print(f"{backend:<11} skipped, {program} not found")
+                continue
+            repeat = args.bash_repeat if backend == "bash" else args.repeat
+            results = []
+            for variant, variant_profile in [("spec", {}), ("profiled", profile)]:
+                generator = generator_class(config)
+                generator.profile = variant_profile
+                base = f"{variant}_{backend.split('-')[0]}"
+                try:
+                    results.append(time_ns(generator, base, argvs, repeat))
+                except subprocess.CalledProcessError:
+                    results = None
+                    break
+            if results is None:
+                print(f"{backend:<11} skipped, failed to run (npm packages?)")
+                continue
+            spec, profiled = results
+            print(
+                f"{backend:<11} {spec:>10.0f} {profiled:>12.0f} "
+                f"{spec / profiled:>7.2f}x"
+            )
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
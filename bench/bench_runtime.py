@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark: generated python parser vs gen_argparser.runtime
+
+Each sample is a fresh python process parsing the same command line:
+
+- generated:     import the PythonCodeGenerator output and call parse_args()
+- runtime-warm:  runtime.parse_args(spec) with the compiled spec cached
+- runtime-cold:  runtime.parse_args(spec) with an empty cache every time
+
+Example: bench/bench_runtime.py args0.toml -- in.txt --output o -i 1
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# pylint: disable=wrong-import-position
+from gen_argparser.gen_argparser import parse_cli_spec
+from gen_argparser.python_generator import PythonCodeGenerator
+
+
+def time_process(cmd: list, env: dict, repeat: int, before=None) -> list:
+    """wall time in ms of each of repeat runs of cmd"""
+    times = []
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        subprocess.run(cmd, env=env, check=True, stdout=subprocess.DEVNULL)
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def main():
+    """CLI for the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("spec", type=str, help="input TOML spec")
+    parser.add_argument(
+        "-n", "--repeat", type=int, default=30, help="runs per variant"
+    )
+    parser.add_argument("argv", nargs="*", help="command line to parse")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="climeta-bench-")
+    cache_dir = os.path.join(work_dir, "cache")
+    spec = os.path.abspath(args.spec)
+    PythonCodeGenerator(parse_cli_spec(spec)).generate_code(
+        os.path.join(work_dir, "generated")
+    )
+
+    env = dict(os.environ, CLIMETA_CACHE_DIR=cache_dir)
+    env["PYTHONPATH"] = os.pathsep.join([work_dir, ROOT])
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    argv_repr = repr(["prog"] + args.argv)
+    prologue = f"import sys; sys.argv = {argv_repr}; "
+    variants = {
+        "generated": prologue + "import generated; generated.parse_args()",
+        "runtime": prologue
+        + f"from gen_argparser import runtime; runtime.parse_args({spec!r})",
+    }
+
+    def clear_cache():
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    try:
+        # warm-up: fill OS caches and the compiled spec cache
+        for code in variants.values():
+            subprocess.run([sys.executable, "-c", code], env=env, check=True)
+
+        results = {
+            "generated": time_process(
+                [sys.executable, "-c", variants["generated"]], env, args.repeat
+            ),
+            "runtime-warm": time_process(
+                [sys.executable, "-c", variants["runtime"]], env, args.repeat
+            ),
+            "runtime-cold": time_process(
+                [sys.executable, "-c", variants["runtime"]],
+                env,
+                args.repeat,
+                before=clear_cache,
+            ),
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    baseline = statistics.median(results["generated"])
+    print(f"{'variant':<14} {'median ms':>10} {'min ms':>8} {'vs generated':>13}")
+    for name, times in results.items():
+        median = statistics.median(times)
+        print(
+            f"{name:<14} {median:>10.2f} {min(times):>8.2f} "
+            f"{median / baseline:>12.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
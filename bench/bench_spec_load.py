@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Load time of a large spec as TOML, JSON and compiled (climeta.py compile)
+
+A synthetic spec of N options (flags, strings with choices, ints, as
+machine generated specs tend to be) is written as TOML, then compiled to
+JSON and to a compiled spec. Each one is loaded with parse_cli_spec, the
+way climeta.py does before generating code: TOML and JSON are parsed,
+resolved and validated, the compiled spec is only unmarshalled.
+
+Example: bench/bench_spec_load.py -n 5000 --repeat 10
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# pylint: disable=wrong-import-position
+from gen_argparser import includes
+from gen_argparser.gen_argparser import compile_cli_spec, parse_cli_spec
+
+
+def synthetic_toml(count: int) -> str:
+    """spec of count options: flags, strings with choices and ints"""
+    lines = [
+        "[program]",
+        'name = "bench"',
+        'description = "spec load benchmark"',
+        "",
+    ]
+    for idx in range(count):
+        lines += ["[[arguments]]", f'name = "--opt{idx}"']
+        if idx % 3 == 0:
+            lines += ['type = "flag"']
+        elif idx % 3 == 1:
+            lines += ['type = "string"', 'default = "a"']
+            lines += ['choices = "a,b,c,d"']
+        else:
+            lines += ['type = "int"', f'default = "{idx}"']
+        lines += [f'help = "option {idx}"', ""]
+    return "\n".join(lines)
+
+
+def load_ms(path: str, repeat: int) -> float:
+    """best time of parse_cli_spec(path), in milliseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        includes._parsed_files.clear()  # pylint: disable=protected-access
+        start = time.perf_counter()
+        parse_cli_spec(path)
+        best = min(best, time.perf_counter() - start)
+    return best * 1e3
+
+
+def main():
+    """CLI for the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "-n", "--options", type=int, default=5000, help="options in the spec"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=10, help="loads per format, best kept"
+    )
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="climeta-bench-")
+    try:
+        toml_path = os.path.join(work_dir, "spec.toml")
+        with open(toml_path, "w", encoding="utf-8") as f:
+            f.write(synthetic_toml(args.options))
+        json_path = os.path.join(work_dir, "spec.json")
+        compiled_path = os.path.join(work_dir, "spec.climeta")
+        compile_cli_spec(toml_path, json_path)
+        compile_cli_spec(toml_path, compiled_path)
+
+        print(f"{args.options} options")
+        print(f"{'format':<9} {'bytes':>9} {'load ms':>9} {'speedup':>8}")
+        toml_ms = None
+        for name, path in [
+            ("toml", toml_path),
+            ("json", json_path),
+            ("compiled", compiled_path),
+        ]:
+            ms = load_ms(path, args.repeat)
+            toml_ms = toml_ms or ms
+            size = os.path.getsize(path)
+            print(f"{name:<9} {size:>9} {ms:>9.1f} {toml_ms / ms:>7.1f}x")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
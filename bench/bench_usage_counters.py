@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Parse time of C parsers generated without and with usage counters
+
+The counters cost one increment per option given (an argparse callback)
+and one more per parse, the line is only formatted and written at exit.
+The per parse overhead is expected to stay well under a microsecond.
+
+The synthetic spec and command lines are the ones of
+bench_profile_order.py: N options, a few of them given most of the time.
+The exit write is measured too, as the time of running the program once
+with and without CLIMETA_USAGE_FILE.
+
+Example: bench/bench_usage_counters.py -n 120 --repeat 200000
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# pylint: disable=wrong-import-position
+# (bench_profile_order puts the repository in sys.path)
+from bench_profile_order import c_time_ns, run_ns, sample_argvs, synthetic_config
+from gen_argparser.c_argparse_generator import CArgparseCodeGenerator
+
+
+def run_s(cmd: list, env: dict, runs: int) -> float:
+    """best wall time of runs executions of cmd, in seconds"""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, env=env, check=True, stdout=subprocess.DEVNULL)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    """CLI for the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "-n", "--options", type=int, default=120, help="options in the spec"
+    )
+    parser.add_argument(
+        "-s", "--skew", type=float, default=1.2, help="Zipf exponent of use"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=200000, help="parses per variant"
+    )
+    parser.add_argument(
+        "--runs", type=int, default=5, help="runs per variant, the best is kept"
+    )
+    args = parser.parse_args()
+
+    cc = os.environ.get("CC", "cc")
+    if shutil.which(cc) is None:
+        sys.exit(f"{cc} not found")
+
+    config = synthetic_config(args.options)
+    argvs = sample_argvs(config, args.skew, 256, seed=2)
+
+    work_dir = tempfile.mkdtemp(prefix="climeta-bench-")
+    os.chdir(work_dir)  # the header guards are named after the outputs
+    print(f"{args.options} options, {args.repeat} parses")
+    try:
+        results = {}
+        for variant, counters in [("plain", False), ("counted", True)]:
+            generator = CArgparseCodeGenerator(config)
+            generator.usage_counters = counters
+            results[variant] = c_time_ns(generator, variant, argvs, args.repeat)
+        # best of alternated runs, the difference is within the noise of one
+        for _ in range(args.runs - 1):
+            for variant, best in results.items():
+                ns = run_ns(["./" + variant, str(args.repeat)]) / args.repeat
+                results[variant] = min(best, ns)
+        plain, counted = results["plain"], results["counted"]
+        print(f"parse ns:    {plain:.0f} -> {counted:.0f} (best of {args.runs})")
+        print(f"overhead ns: {counted - plain:.0f} per parse")
+
+        env = dict(os.environ)
+        env.pop("CLIMETA_USAGE_FILE", None)
+        unwritten = run_s(["./counted", "1"], env, 50)
+        env["CLIMETA_USAGE_FILE"] = os.path.join(work_dir, "usage.txt")
+        written = run_s(["./counted", "1"], env, 50)
+        print(f"exit write:  {(written - unwritten) * 1e6:.0f} us per process")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Edit to regenerated file latency of climeta.py --watch
+
+A climeta.py --watch process is started on a directory holding a spec
+of N options, then the help of one option is edited again and again.
+The latency is the time from the write of the spec to the output
+holding the new help, as seen by polling it every 0.5 ms. Both the
+inotify and the polling watchers are measured (the debounce window of
+30 ms is part of the latency).
+
+Example: bench/bench_watch.py -n 200 --edits 20 -l c-argparse
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+OUTPUT_EXTENSIONS = {
+    "python": ".py",
+    "bash": ".sh",
+    "c-argparse": ".c",
+    "cpp-cxxopts": ".cpp",
+    "js-cla": ".mjs",
+}
+
+
+def spec_text(count: int, edit: int) -> str:
+    """spec of count string options, the help of the first one edited"""
+    lines = ["[program]", 'name = "bench"', 'description = "watch benchmark"']
+    for idx in range(count):
+        help_ = f"edit {edit}" if idx == 0 else f"option {idx}"
+        lines += ["", "[[arguments]]", f'name = "--opt{idx}"']
+        lines += ['type = "string"', 'default = "x"', f'help = "{help_}"']
+    return "\n".join(lines) + "\n"
+
+
+def wait_for(path: str, text: str, timeout: float = 5.0) -> float:
+    """time at which path holds text"""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            with open(path, encoding="utf-8") as f:
+                if text in f.read():
+                    return time.perf_counter()
+        except OSError:
+            pass
+        time.sleep(0.0005)
+    raise TimeoutError(f"{path} not regenerated")
+
+
+def latencies_ms(args, polling: bool) -> list:
+    """edit to regenerated output latencies of a watch process"""
+    work_dir = tempfile.mkdtemp(prefix="climeta-bench-")
+    spec = os.path.join(work_dir, "spec.toml")
+    output = os.path.join(work_dir, "spec" + OUTPUT_EXTENSIONS[args.lang])
+    with open(spec, "w", encoding="utf-8") as f:
+        f.write(spec_text(args.options, 0))
+    cmd = [sys.executable, os.path.join(ROOT, "climeta.py")]
+    cmd += ["--watch", work_dir, "-l", args.lang] + (["--poll"] if polling else [])
+    with subprocess.Popen(cmd, stdout=subprocess.DEVNULL) as process:
+        try:
+            wait_for(output, "edit 0", timeout=30)
+            time.sleep(0.2)  # watching once the first generation is done
+            results = []
+            for edit in range(1, args.edits + 1):
+                text = spec_text(args.options, edit)
+                start = time.perf_counter()
+                with open(spec, "w", encoding="utf-8") as f:
+                    f.write(text)
+                done = wait_for(output, f"edit {edit}")
+                results.append((done - start) * 1e3)
+                time.sleep(0.1)  # out of the debounce window of this edit
+            return results
+        finally:
+            process.terminate()
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main():
+    """CLI for the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "-n", "--options", type=int, default=200, help="options in the spec"
+    )
+    parser.add_argument("--edits", type=int, default=20, help="edits measured")
+    parser.add_argument(
+        "-l",
+        "--lang",
+        default="c-argparse",
+        choices=sorted(OUTPUT_EXTENSIONS),
+        help="language generated",
+    )
+    args = parser.parse_args()
+
+    print(f"{args.options} options, {args.lang}, {args.edits} edits")
+    print(f"{'watcher':<8} {'median ms':>10} {'max ms':>8}")
+    for name, polling in [("inotify", False), ("polling", True)]:
+        results = latencies_ms(args, polling)
+        print(
+            f"{name:<8} {statistics.median(results):>10.1f} "
+            f"{max(results):>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
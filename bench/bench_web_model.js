@@ -0,0 +1,88 @@
+#!/usr/bin/env node
+// Headless benchmark of the web editor model (web_toml/model.js) with many
+// arguments: building the model, exporting every argument (first export,
+// or the old re-serialize-everything behaviour), exporting after editing
+// one argument (incremental), computing the rendered window on scroll, and
+// parsing the exported spec as the import worker does (toml_parser.js).
+//
+// Example: bench/bench_web_model.js 1000
+
+const path = require('node:path');
+const { ArgumentModel, visibleRange } = require(path.join(__dirname, '..', 'web_toml', 'model.js'));
+const { parseSpecTOML } = require(path.join(__dirname, '..', 'web_toml', 'toml_parser.js'));
+
+const count = Number(process.argv[2] || 1000);
+const repeat = Number(process.argv[3] || 200);
+
+function argument(idx) {
+    return {
+        name: `--option-${idx}`, short: '', type: idx % 3 === 0 ? 'int' : 'string',
+        default: `${idx}`, help: `help of option ${idx}`, choices: idx % 10 === 0 ? 'a,b,c' : '',
+    };
+}
+
+// median time in us of repeat runs of fn
+function timeUs(fn) {
+    const times = [];
+    for (let i = 0; i < repeat; i++) {
+        const start = process.hrtime.bigint();
+        fn(i);
+        times.push(Number(process.hrtime.bigint() - start) / 1000);
+    }
+    times.sort((a, b) => a - b);
+    return times[Math.floor(times.length / 2)];
+}
+
+const program = { name: 'bench', description: 'web model benchmark', epilog: '' };
+let model;
+const results = {};
+
+results['build model'] = timeUs(() => {
+    model = new ArgumentModel();
+    for (let idx = 0; idx < count; idx++) {
+        model.add(argument(idx));
+    }
+});
+
+results['full export'] = timeUs(() => {
+    for (const row of model.rows) {
+        row.toml = null;
+        row.invalid = null;
+    }
+    model.toTOML(program);
+});
+
+const ids = model.rows.map(row => row.id);
+results['edit + export'] = timeUs(i => {
+    model.update(ids[(i * 7919) % count], 'help', `edited ${i}`);
+    model.toTOML(program);
+});
+
+results['edit only'] = timeUs(i => {
+    model.update(ids[(i * 7919) % count], 'help', `edited again ${i}`);
+});
+
+const rowHeight = 420;
+results['window on scroll'] = timeUs(i => {
+    visibleRange((i * 997) % (count * rowHeight), 900, rowHeight, count);
+});
+
+const { toml, errors } = model.toTOML(program);
+if (errors.length > 0) {
+    console.error(`unexpected invalid arguments: ${errors.length}`);
+    process.exit(1);
+}
+
+let imported = 0;
+results['import (parse)'] = timeUs(() => {
+    imported = 0;
+    parseSpecTOML(toml, batch => { imported += batch.length; });
+});
+if (imported !== count) {
+    console.error(`imported ${imported} of ${count} arguments`);
+    process.exit(1);
+}
+console.log(`${count} arguments, ${toml.length} bytes of TOML, median of ${repeat} runs`);
+for (const [name, us] of Object.entries(results)) {
+    console.log(`${name.padEnd(18)} ${us.toFixed(1).padStart(10)} us`);
+}
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Adversarial argv latency fuzzer for the generated parsers
+
+Builds the five backends of a spec with the Makefile rules and the
+test/*-main-* drivers, then times each of them on argv shapes that tend
+to expose superlinear behaviour, growing the input size:
+
+- bundled-shorts:    -vvvv... (one short flag repeated in a bundle)
+- long-value:        --opt=xxxx... (a huge string option value)
+- repeated-multiple: --opt v --opt v ... (a 'multiple' option)
+- long-choice:       --opt=<choice>xxxx... (a huge value for a 'choices'
+                     option, rejected after the choices check)
+- dash-tail:         ... -- x x x ... (a deep tail after --)
+
+The shapes a spec can't express (no short flag, no 'multiple' option...)
+are skipped. For specs with [[commands]] the first command is fuzzed.
+
+The time of each run minus the time of the shortest valid command line
+of the spec is the parse cost. Throughput is size / cost, and a backend
+is flagged when the cost grows faster than linearly between the two
+largest sizes (log-log slope above --max-slope).
+
+Example: bench/fuzz_latency.py args0.toml --sizes 100 1000 10000
+"""
+
+import argparse
+import math
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# pylint: disable=wrong-import-position
+from gen_argparser.code_generator import ArgSpec, CodeGenerator
+from gen_argparser.gen_argparser import parse_cli_spec
+
+# the Makefile pattern rules are instantiated for args<STEM>.toml
+STEM = "fuzz"
+
+# backend -> (make target, driver copied from sample0, command line)
+BACKENDS = {
+    "c-argparse": (
+        f"sample{STEM}",
+        "c-argparse-main-sample0.c",
+        [f"./sample{STEM}"],
+    ),
+    "cpp-cxxopts": (
+        f"sample_cpp{STEM}",
+        "cpp-cxxopts-main-sample0.cpp",
+        [f"./sample_cpp{STEM}"],
+    ),
+    "python": (f"sample{STEM}.py", None, [sys.executable, f"sample{STEM}.py"]),
+    "bash": (
+        f"sample{STEM}.sh",
+        "bash-main-sample0.sh",
+        ["bash", f"test/bash-main-sample{STEM}.sh"],
+    ),
+    "js-cla": (
+        f"sample{STEM}.mjs",
+        "js-cla-main-sample0.mjs",
+        ["node", f"test/js-cla-main-sample{STEM}.mjs"],
+    ),
+}
+
+
+def sample_value(arg: ArgSpec) -> str:
+    """a valid value for an argument"""
+    if arg.choices is not None:
+        return arg.choices[0]
+    return {"int": "1", "float": "1.0"}.get(arg.type_, "x")
+
+
+def base_argv(args: list) -> list:
+    """shortest valid command line: the required arguments only"""
+    argv = []
+    for arg in args:
+        if arg.is_positional:
+            argv.append(sample_value(arg))
+        elif not arg.has_default:
+            argv += [arg.name, sample_value(arg)]
+    return argv
+
+
+def without(argv: list, arg: ArgSpec) -> list:
+    """command line with a required option (and its value) removed"""
+    if arg.name not in argv:
+        return argv
+    idx = argv.index(arg.name)
+    return argv[:idx] + argv[idx + 2:]
+
+
+def argv_shapes(args: list) -> dict:
+    """shape name -> function of the size returning the command line"""
+    base = base_argv(args)
+    options = [arg for arg in args if not arg.is_positional]
+    shapes = {}
+
+    flags = [arg for arg in options if arg.type_ == "flag" and arg.short]
+    if flags:
+        letter = flags[0].clean_short
+        shapes["bundled-shorts"] = lambda n: base + ["-" + letter * n]
+
+    strings = [
+        arg
+        for arg in options
+        if arg.type_ == "string" and arg.choices is None and not arg.multiple
+    ]
+    if strings:
+        opt = strings[0]
+        shapes["long-value"] = lambda n: without(base, opt) + [
+            f"{opt.name}={'x' * n}"
+        ]
+
+    multiples = [arg for arg in options if arg.multiple]
+    if multiples:
+        opt = multiples[0]
+        shapes["repeated-multiple"] = (
+            lambda n: base + [opt.name, sample_value(opt)] * n
+        )
+
+    choices = [arg for arg in options if arg.choices is not None]
+    if choices:
+        opt = choices[0]
+        shapes["long-choice"] = lambda n: without(base, opt) + [
+            f"{opt.name}={opt.choices[0]}{'x' * n}"
+        ]
+
+    shapes["dash-tail"] = lambda n: base + ["--"] + ["x"] * n
+    return shapes
+
+
+def error_line(output: str) -> str:
+    """first line of an error output mentioning an error, or the last one"""
+    lines = [line.strip() for line in output.splitlines() if line.strip()]
+    for line in lines:
+        if "error" in line.lower():
+            return line
+    return lines[-1] if lines else ""
+
+
+def build(work_dir: str, spec: str, cflags: str) -> dict:
+    """build every backend it can, returns backend -> reason it failed"""
+    shutil.copy(spec, os.path.join(work_dir, f"args{STEM}.toml"))
+    os.symlink(os.path.join(ROOT, "3rdparty"), os.path.join(work_dir, "3rdparty"))
+    if os.path.isdir(os.path.join(ROOT, "node_modules")):
+        os.symlink(
+            os.path.join(ROOT, "node_modules"),
+            os.path.join(work_dir, "node_modules"),
+        )
+    os.mkdir(os.path.join(work_dir, "test"))
+
+    failed = {}
+    for backend, (target, driver, _cmd) in BACKENDS.items():
+        if driver is not None:
+            with open(os.path.join(ROOT, "test", driver), encoding="utf-8") as f:
+                code = f.read().replace("sample0", f"sample{STEM}")
+            driver_path = os.path.join(
+                work_dir, "test", driver.replace("sample0", f"sample{STEM}")
+            )
+            with open(driver_path, "w", encoding="utf-8") as f:
+                f.write(code)
+            os.chmod(driver_path, 0o755)
+        result = subprocess.run(
+            [
+                "make",
+                "-s",
+                "-f",
+                os.path.join(ROOT, "Makefile"),
+                f"TOOL={os.path.join(ROOT, 'climeta.py')}",
+                f"CFLAGS=-I 3rdparty {cflags}",
+                f"CXXFLAGS=-std=c++11 -I 3rdparty {cflags}",
+                target,
+            ],
+            cwd=work_dir,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        if result.returncode != 0:
+            failed[backend] = "build failed: " + error_line(result.stderr)
+    return failed
+
+
+def time_runs(cmd: list, cwd: str, repeat: int, timeout: float) -> float:
+    """median wall time in ms of repeat runs, inf if one timed out"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            subprocess.run(
+                cmd,
+                cwd=cwd,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=timeout,
+                check=False,
+            )
+        except subprocess.TimeoutExpired:
+            return math.inf
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def growth(sizes: list, costs: list) -> float:
+    """log-log slope of the cost between the two largest sizes"""
+    (size1, cost1), (size2, cost2) = zip(sizes[-2:], costs[-2:])
+    if math.isinf(cost2):
+        return math.inf
+    return math.log(cost2 / cost1) / math.log(size2 / size1)
+
+
+def main():
+    """CLI for the fuzzer"""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("spec", type=str, help="input TOML spec")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[100, 1000, 10000],
+        help="input sizes (tokens or characters), increasing",
+    )
+    parser.add_argument(
+        "-n", "--repeat", type=int, default=5, help="runs per measure"
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=20.0, help="seconds allowed per run"
+    )
+    parser.add_argument(
+        "--max-slope",
+        type=float,
+        default=1.5,
+        help="log-log growth above which a backend is flagged",
+    )
+    parser.add_argument(
+        "--min-cost",
+        type=float,
+        default=5.0,
+        help="ms of parse cost below which growth is noise, not flagged",
+    )
+    parser.add_argument(
+        "-l",
+        "--lang",
+        nargs="+",
+        choices=list(BACKENDS),
+        default=list(BACKENDS),
+        help="backends to fuzz",
+    )
+    parser.add_argument("--cflags", default="-O2", help="C/C++ optimization flags")
+    args = parser.parse_args()
+
+    generator = CodeGenerator(parse_cli_spec(args.spec))
+    prefix = []
+    if generator.commands:
+        generator = generator.for_command(generator.commands[0])
+        prefix = [generator.command.name]
+    shapes = argv_shapes(generator.args)
+    base = prefix + base_argv(generator.args)
+
+    work_dir = tempfile.mkdtemp(prefix="climeta-fuzz-")
+    flagged = []
+    try:
+        failed = build(work_dir, os.path.abspath(args.spec), args.cflags)
+        print(f"{'shape':<18} {'backend':<12} " + " ".join(
+            f"{f'n={size}':>12}" for size in args.sizes
+        ) + f" {'slope':>6}  throughput at n={args.sizes[-1]}")
+        for backend in args.lang:
+            cmd = BACKENDS[backend][2]
+            if backend in failed:
+                print(f"{'-':<18} {backend:<12} skipped, {failed[backend]}")
+                continue
+            check = subprocess.run(
+                cmd + base, cwd=work_dir, capture_output=True, check=False
+            )
+            if check.returncode != 0:
+                reason = error_line(check.stderr.decode())
+                print(f"{'-':<18} {backend:<12} skipped, {base} fails: {reason}")
+                continue
+            baseline = time_runs(cmd + base, work_dir, args.repeat, args.timeout)
+            for shape, make_argv in shapes.items():
+                costs = []
+                for size in args.sizes:
+                    total = time_runs(
+                        cmd + prefix + make_argv(size),
+                        work_dir,
+                        args.repeat,
+                        args.timeout,
+                    )
+                    # never zero, so slopes stay defined for noise level costs
+                    costs.append(max(total - baseline, 0.01))
+                slope = growth(args.sizes, costs)
+                superlinear = slope > args.max_slope and costs[-1] > args.min_cost
+                if superlinear:
+                    flagged.append(f"{backend} {shape}")
+                throughput = args.sizes[-1] / costs[-1]
+                print(
+                    f"{shape:<18} {backend:<12} "
+                    + " ".join(f"{cost:>10.2f}ms" for cost in costs)
+                    + f" {slope:>6.2f}  {throughput:>10.0f}/ms"
+                    + ("  SUPERLINEAR" if superlinear else "")
+                )
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if flagged:
+        print(f"\nsuperlinear growth: {', '.join(flagged)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
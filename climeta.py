@@ -4,24 +4,231 @@ Drive program to generate CLI parser generator code for different
 languages
 
 - the input is in a .toml file, with common format for all languages
+  (or the same in .json, or a spec compiled by climeta.py compile)
 """
 
 import argparse
+import json
 import os
-from gen_argparser import generate_cli_code
+import sys
+from gen_argparser import (
+    SpecValidationError,
+    generate_cli_code,
+    generate_multicall_code,
+)
+
+
+def stats_main(argv: list) -> None:
+    """climeta.py stats: report the usage counters of generated parsers"""
+    # pylint: disable=import-outside-toplevel
+    from gen_argparser.gen_argparser import parse_cli_spec
+    from gen_argparser import usage_stats
+
+    parser = argparse.ArgumentParser(
+        prog="climeta.py stats",
+        description="Aggregate the usage counters appended by parsers "
+        'generated with usage_counters = "true" into per spec reports',
+        epilog="Example: ./climeta.py stats usage.log --spec args0.toml",
+    )
+    parser.add_argument("files", nargs="+", help="usage counters files")
+    parser.add_argument(
+        "--spec",
+        action="append",
+        default=[],
+        help="only report the program of this spec, listing the options "
+        "never used (can be repeated)",
+    )
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument("--json", action="store_true", help="JSON output")
+    output.add_argument(
+        "--profile",
+        action="store_true",
+        help="output the usage profile of the only program, for "
+        "climeta.py --profile",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        stats, skipped = usage_stats.read_usage(args.files)
+        if args.spec:
+            configs = [parse_cli_spec(spec) for spec in args.spec]
+            stats = usage_stats.restrict_to_specs(stats, configs)
+    except OSError as err:
+        sys.exit(f"ERROR: {err}")
+    except SpecValidationError as err:
+        sys.exit(f"ERROR: invalid spec\n{err}")
+    if skipped:
+        print(f"skipped {skipped} malformed lines", file=sys.stderr)
+
+    if args.profile:
+        if len(stats) != 1:
+            parser.error(
+                f"--profile needs the counters of one program, found "
+                f"{len(stats)} (select it with --spec)"
+            )
+        profile = usage_stats.usage_profile(stats, next(iter(stats)))
+        print(json.dumps(profile, indent=2))
+    elif args.json:
+        print(usage_stats.format_json(stats))
+    else:
+        print(usage_stats.format_report(stats), end="")
+
+
+def lint_main(argv: list) -> None:
+    """climeta.py lint: validate specs, predicting their parse costs"""
+    # pylint: disable=import-outside-toplevel
+    from gen_argparser.gen_argparser import parse_cli_spec
+    from gen_argparser.profile import load_profile
+
+    parser = argparse.ArgumentParser(
+        prog="climeta.py lint",
+        description="Validate specs and, with --perf, predict the parse costs "
+        "of the parser each backend generates from them, exiting with 1 if "
+        "any is over the thresholds",
+        epilog="Example: ./climeta.py lint --perf --json args0.toml",
+    )
+    parser.add_argument("inputs", nargs="+", help="specs: TOML, JSON or compiled")
+    parser.add_argument(
+        "--perf",
+        action="store_true",
+        help="report the lookups, choices checks, startup work, forks and "
+        "imports of each backend, and the settings avoiding them",
+    )
+    parser.add_argument(
+        "--json", action="store_true", help="JSON output of the --perf reports"
+    )
+    parser.add_argument(
+        "--library",
+        action="store_true",
+        help="analyse the C/C++ library modes (as climeta.py --library)",
+    )
+    parser.add_argument(
+        "--profile",
+        default="",
+        help="usage profile the dispatch code is ordered by (as climeta.py "
+        "--profile), for the compares expected",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        configs = {spec: parse_cli_spec(spec) for spec in args.inputs}
+        profile = load_profile(args.profile) if args.profile else {}
+    except (OSError, RuntimeError) as err:
+        sys.exit(f"ERROR: {err}")
+    except SpecValidationError as err:
+        sys.exit(f"ERROR: invalid spec\n{err}")
+    if not args.perf:
+        print(f"{len(configs)} valid specs")
+        return
+
+    from gen_argparser import perf_lint
+
+    reports = {
+        spec: perf_lint.analyse_spec(config, args.library, profile)
+        for spec, config in configs.items()
+    }
+    try:
+        if args.json:
+            print(perf_lint.format_json(reports))
+        else:
+            for spec, report in reports.items():
+                print(perf_lint.format_report(spec, report), end="")
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # the reader (head, grep -q) is gone: stop quietly like a filter,
+        # stdout to /dev/null so the flush at exit doesn't fail again
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
+    if any(report["warnings"] for report in reports.values()):
+        sys.exit(1)
+
+
+def compile_main(argv: list) -> None:
+    """climeta.py compile: validate a spec once, for fast loading"""
+    # pylint: disable=import-outside-toplevel
+    from gen_argparser.gen_argparser import compile_cli_spec
+    from gen_argparser.spec_formats import COMPILED_EXTENSION
+
+    parser = argparse.ArgumentParser(
+        prog="climeta.py compile",
+        description="Resolve the includes and groups of a spec and validate "
+        "it, writing it in a form loaded without parsing nor validating again",
+        epilog="Example: ./climeta.py compile args0.toml -o args0.climeta",
+    )
+    parser.add_argument("input", help="Input spec (.toml or .json)")
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="",
+        help=f"Output file, JSON if named *.json (default: input with "
+        f"{COMPILED_EXTENSION} extension)",
+    )
+    args = parser.parse_args(argv)
+
+    output = args.output
+    if not output:
+        output = os.path.splitext(args.input)[0] + COMPILED_EXTENSION
+    try:
+        compile_cli_spec(args.input, output)
+    except OSError as err:
+        sys.exit(f"ERROR: {err}")
+    except SpecValidationError as err:
+        sys.exit(f"ERROR: invalid spec\n{err}")
+
+
+def watch_main(args: argparse.Namespace) -> None:
+    """climeta.py --watch: generate the specs of a directory as they change"""
+    # pylint: disable=import-outside-toplevel
+    from gen_argparser.watch import watch
+
+    output_dir = args.output or args.watch
+
+    def generate(spec_path: str):
+        base_name = os.path.splitext(os.path.basename(spec_path))[0]
+        return generate_cli_code(
+            spec_path,
+            args.lang,
+            os.path.join(output_dir, base_name),
+            trace=args.trace,
+            usage_counters=args.usage_counters,
+            handoff=args.handoff,
+            minify=args.minify,
+            library=args.library,
+            depfile=args.depfile,
+            profile=args.profile,
+            only_changed=True,
+        )
+
+    try:
+        watch(args.watch, generate, polling=args.poll)
+    except OSError as err:
+        sys.exit(f"ERROR: {err}")
 
 
 def main():
     """CLI for CLI parser generator"""
+    if sys.argv[1:2] == ["stats"]:
+        stats_main(sys.argv[2:])
+        return
+    if sys.argv[1:2] == ["compile"]:
+        compile_main(sys.argv[2:])
+        return
+    if sys.argv[1:2] == ["lint"]:
+        lint_main(sys.argv[2:])
+        return
     parser = argparse.ArgumentParser(
         description="The description of the program",
-        epilog="Example: ./climeta.py args1.toml -l bash -o sample1",
+        epilog="Example: ./climeta.py args1.toml -l bash -o sample1 "
+        "(./climeta.py compile -h for compiled specs, ./climeta.py stats -h "
+        "for the usage counters reports, ./climeta.py lint -h for the "
+        "performance advisor)",
     )
 
     parser.add_argument(
         "input",
         type=str,
-        help="Input TOML file",
+        nargs="*",
+        help="Input spec: TOML, JSON or compiled (several with --multicall)",
     )
     parser.add_argument(
         "-o",
@@ -37,15 +244,134 @@ def main():
         type=str,
         help="Language for the generated code",
         required=True,
-        choices=["python", "bash", "c-argparse", "cpp-cxxopts", "js-cla"],
+        choices=[
+            "python",
+            "bash",
+            "c-argparse",
+            "cpp-cxxopts",
+            "js-cla",
+            "bash-completion",
+            "zsh-completion",
+        ],
+    )
+
+    parser.add_argument(
+        "--trace",
+        action="store_true",
+        help="Instrument the generated parser, reporting parse times when "
+        "CLIMETA_TRACE is set (same as trace = \"true\" in [program])",
+    )
+
+    parser.add_argument(
+        "--minify",
+        action="store_true",
+        help="bash/js-cla only: drop comments, indentation and the functions "
+        "not needed to parse (dump_args), reporting the bytes saved",
+    )
+
+    parser.add_argument(
+        "--usage-counters",
+        action="store_true",
+        help="Count the options given to the generated parser, appending "
+        "them at exit to $CLIMETA_USAGE_FILE for climeta.py stats (same as "
+        'usage_counters = "true" in [program]). Not supported with --library '
+        "or --multicall",
+    )
+
+    parser.add_argument(
+        "--handoff",
+        action="store_true",
+        help="Add encode/decode functions of the parsed options, to hand them "
+        "to a program with a parser of the same spec in any language (same "
+        'as handoff = "true" in [program])',
+    )
+
+    parser.add_argument(
+        "--library",
+        action="store_true",
+        help="c-argparse/cpp-cxxopts only: reentrant parse_options that "
+        "returns error codes instead of printing and exiting",
+    )
+
+    parser.add_argument(
+        "--multicall",
+        action="store_true",
+        help="c-argparse only: one program running the tool named by argv[0], "
+        "for each input spec, sharing the library mode parsing runtime",
+    )
+
+    parser.add_argument(
+        "--profile",
+        type=str,
+        default="",
+        help="bash/c-argparse/js-cla only: JSON usage counts (option -> "
+        "times given) ordering the option dispatch code, most used first, "
+        "help unchanged",
+    )
+
+    parser.add_argument(
+        "--watch",
+        metavar="DIR",
+        default="",
+        help="Instead of inputs, generate the specs of DIR, then again the "
+        "ones affected by each change of them or of their includes, until "
+        "interrupted. --output is then the output directory (default DIR)",
+    )
+
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="with --watch: poll the files instead of using inotify",
+    )
+
+    parser.add_argument(
+        "-MD",
+        dest="depfile",
+        action="store_true",
+        help="Also write a make dependency file (first output + .d) listing "
+        "the spec, its includes and the generator modules used",
     )
 
     args, unknown = parser.parse_known_args()
+    if args.watch:
+        if args.input or args.multicall:
+            parser.error("--watch takes no input nor --multicall")
+        watch_main(args)
+        return
+    if not args.input:
+        parser.error("the following arguments are required: input")
+    if args.depfile and not args.output:
+        parser.error("-MD needs an --output")
+    if args.multicall and (args.lang != "c-argparse" or not args.output):
+        parser.error("--multicall needs --lang c-argparse and an --output")
+    if args.multicall and args.usage_counters:
+        parser.error("--usage-counters isn't supported with --multicall")
+    if len(args.input) > 1 and not args.multicall:
+        parser.error("several inputs need --multicall")
     if unknown:
         print(f"Unknown arguments: {unknown}")
 
     base_name, _extension = os.path.splitext(args.output)
-    generate_cli_code(args.input, args.lang, base_name)
+    try:
+        if args.multicall:
+            generate_multicall_code(
+                args.input, base_name, depfile=args.depfile, handoff=args.handoff
+            )
+            return
+        generate_cli_code(
+            args.input[0],
+            args.lang,
+            base_name,
+            trace=args.trace,
+            usage_counters=args.usage_counters,
+            handoff=args.handoff,
+            minify=args.minify,
+            library=args.library,
+            depfile=args.depfile,
+            profile=args.profile,
+        )
+    except SpecValidationError as err:
+        sys.exit(f"ERROR: invalid spec\n{err}")
 
 
 if __name__ == "__main__":
@@ -1,3 +1,30 @@
 """import main entry point code"""
 
-from .gen_argparser import generate_cli_code
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # the names resolved by __getattr__, for static analysis
+    from .gen_argparser import generate_cli_code, generate_multicall_code
+    from .validator import SpecValidationError
+
+__all__ = ["generate_cli_code", "generate_multicall_code", "SpecValidationError"]
+
+
+def __getattr__(name: str):
+    """
+    resolve the entry point lazily so importing a light submodule
+    (e.g. gen_argparser.runtime) doesn't load every generator and tomllib
+    """
+    # pylint: disable=import-outside-toplevel
+    if name == "generate_cli_code":
+        from .gen_argparser import generate_cli_code
+
+        return generate_cli_code
+    if name == "generate_multicall_code":
+        from .gen_argparser import generate_multicall_code
+
+        return generate_multicall_code
+    if name == "SpecValidationError":
+        from .validator import SpecValidationError
+
+        return SpecValidationError
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,6 +2,7 @@
 Code emitter specialized for several Bash constructs
 """
 
+import re
 from typing import Optional
 from .emitter import Emitter
 from .indenter import Indenter
@@ -10,6 +11,10 @@ from .indenter import Indenter
 class BashEmitter(Emitter):
     """implement several common Bash constructs while generating code"""
 
+    COMMENT_RE = re.compile(r"^\s*#(?!!)")
+    TRAILING_COMMENT_RE = re.compile(r"\s+# [^'\"]*$")
+    FUNC_RE = re.compile(r"^(\w+)\(\) \{$")
+
     def cmnt(self, text: str) -> None:
         """emit a single line comment"""
         self.emit("# " + text)
@@ -2,12 +2,15 @@
 Generate CLI parsing code in bash
 """
 
+import os
+
 from .code_generator import (
     ArgSpec,
     CodeGenerator,
     double_quote,
 )
 from .bash_emitter import BashEmitter
+from .indenter import Indenter
 
 
 def formatted_init_default(arg: ArgSpec) -> str:
@@ -40,14 +43,74 @@ def help_default(arg: ArgSpec) -> str:
     return "default " + format_one(arg.default)
 
 
+def single_quote_bash(text: str) -> str:
+    """text single quoted for bash, so taken literally"""
+    return "'" + text.replace("'", "'\\''") + "'"
+
+
 class BashCodeGenerator(CodeGenerator):
     """Generates Bash code for CLI parsing."""
 
+    def has_choices_files(self) -> bool:
+        """whether any argument (of any command) has a choices_file"""
+        args = self.args + [arg for cmd in self.commands for arg in cmd.args]
+        return any(arg.choices_file for arg in args)
+
+    def _generate_nearest_choice(self, c: BashEmitter) -> None:
+        """suggestion for an invalid value of a choices_file argument"""
+        c.cmnt("' (did you mean ...?)' for the key of the associative array")
+        c.cmnt("named $1 sharing the longest prefix (over half) with $2")
+        with c.func("nearest_choice"):
+            c.emit("local -n choices_ref=$1")
+            c.emit('local choice nearest="" len best=$(( ${#2} / 2 + 1 ))')
+            with c.for_loop("choice", '"${!choices_ref[@]}"'):
+                c.emit("len=0")
+                with Indenter(
+                    c,
+                    'while [[ $len -lt ${#choice} && '
+                    '"${choice:len:1}" == "${2:len:1}" ]]; do',
+                    "done",
+                ):
+                    c.emit("len=$((len + 1))")
+                c.cmnt("the array is unordered, ties go to the smallest choice")
+                with Indenter(
+                    c,
+                    "if (( len > best )) || [[ $len -eq $best && "
+                    '( -z "$nearest" || "$choice" < "$nearest" ) ]]; then',
+                    "fi",
+                ):
+                    c.emit('nearest="$choice"')
+                    c.emit("best=$len")
+            with c.if_then('-n "$nearest"'):
+                c.emit("echo \" (did you mean '$nearest'?)\"")
+
+    def _generate_choices_arrays(self, c: BashEmitter) -> None:
+        """associative arrays of the choices_file values, for hashed tests"""
+        for arg in self.args:
+            if not arg.choices_file:
+                continue
+            filename = os.path.basename(arg.choices_file)
+            c.cmnt(f"{arg.name} choices from {filename}")
+            c.emit(f"declare -gA {self.scoped(arg.dest + '_choices')}=(")
+            with Indenter(c):
+                line = ""
+                for choice in arg.choices:
+                    item = f"[{single_quote_bash(choice)}]=1"
+                    if line and len(line) + len(item) > 70:
+                        c.emit(line)
+                        line = ""
+                    line += (" " if line else "") + item
+                c.emit(line)
+            c.emit(")")
+
     def _generate_usage(self, c: BashEmitter) -> None:
         """generate the usage() function"""
         c.cmnt("Usage function")
-        with c.func("usage"):
-            c.echo("Usage: $0 [options]")
+        with c.func(self.scoped("usage")):
+            if self.command is not None:
+                c.echo(f"Usage: $0 {self.command.name} [options]")
+            else:
+                c.echo("Usage: $0 [options]")
             c.echo("")
             c.echo(self.description)
             c.echo("")
@@ -86,16 +149,16 @@ class BashCodeGenerator(CodeGenerator):
     def _generate_arg_checker(self, c: BashEmitter) -> None:
         """To check if a valid argument follows"""
         c.cmnt("check if a valid argument follows")
-        with c.func("check_valid_arg"):
+        with c.func(self.scoped("check_valid_arg")):
             with c.case("$2"):
                 with c.case_pattern("-*|''"):
                     c.error("$1 requires a value.")
-                    c.emit("usage 1")
+                    c.emit(self.scoped("usage") + " 1")
 
     def _generate_dump_args(self, c: BashEmitter) -> None:
         """dump_args function"""
         c.cmnt("Dump argument values for debug")
-        with c.func("dump_args"):
+        with c.func(self.scoped("dump_args")):
             c.echo("Parsed arguments:")
             for arg in self.args:
                 if arg.multiple:
@@ -112,13 +175,26 @@ class BashCodeGenerator(CodeGenerator):
         """Validate arguments"""
         c.cmnt("Validate arguments")
         first = True
-        with c.func("validate_args"):
+        with c.func(self.scoped("validate_args")):
             for arg in self.args:
                 if arg.is_required:
                     with c.if_then(f'-z "${arg.dest}"'):
                         c.error(f"{arg.name} is required")
-                        c.emit("usage 1")
-                if arg.choices is not None:
+                        c.emit(self.scoped("usage") + " 1")
+                if arg.choices_file:
+                    choices = self.scoped(arg.dest + "_choices")
+                    with Indenter(
+                        c,
+                        f'if [[ -z "${arg.dest}" || '
+                        f'-z "${{{choices}[${arg.dest}]+x}}" ]]; then',
+                        "fi",
+                    ):
+                        c.error(
+                            f"{arg.name}: invalid choice '${arg.dest}'"
+                            f'$(nearest_choice {choices} "${arg.dest}")'
+                        )
+                        c.emit(self.scoped("usage") + " 1")
+                elif arg.choices is not None:
                     if first:
                         c.emit("local match")
                         first = False
@@ -129,20 +205,91 @@ class BashCodeGenerator(CodeGenerator):
                         c.error(
                             f"{arg.name} must be one of: {choices_str} (got '${arg.dest}')"
                         )
-                        c.emit("usage 1")
+                        c.emit(self.scoped("usage") + " 1")
+            if not any(arg.is_required or arg.choices for arg in self.args):
+                c.emit(":  # nothing to validate")
 
     def _generate_get_cli(self, c: BashEmitter) -> None:
         """Main entry point function"""
         c.cmnt("Main entry point, parse CLI")
-        with c.func("get_cli_args"):
+        with c.func(self.scoped("get_cli_args")):
             # set defaults
             c.cmnt("set defaults")
             for arg in self.args:
-                if not arg.is_required:
+                if arg.env and arg.type_ == "flag":
+                    default_value = formatted_init_default(arg)
+                    c.emit(
+                        f"env_flag {arg.dest} {arg.env} {default_value} || "
+                        + self.scoped("usage")
+                        + " 1"
+                    )
+                elif arg.env:
+                    # the variable, when set, takes the place of the default
+                    default_value = ""
+                    if not arg.is_required:
+                        default_value = formatted_init_default(arg)[1:-1]
+                    c.emit(f'{arg.dest}="${{{arg.env}-{default_value}}}"')
+                elif not arg.is_required:
                     default_value = formatted_init_default(arg)
                     c.emit(f"{arg.dest}={default_value}")
-            c.emit('parse_args "$@"')
-            c.emit("validate_args")
+            if self.usage_counters:
+                counts = " ".join("0" for _ in self.counted_options())
+                c.emit(f"local -a usage_counts=({counts})")
+            if self.trace:
+                self._generate_traced_parse(c)
+            c.emit(self.scoped("parse_args") + ' "$@"')
+            c.emit(self.scoped("validate_args"))
+            if self.usage_counters:
+                self._generate_write_usage_call(c)
+
+    def _generate_traced_parse(self, c: BashEmitter) -> None:
+        """parse and validate timed, when CLIMETA_TRACE is set"""
+        # EPOCHREALTIME (bash 5+) doesn't fork, its decimal point depends
+        # on the locale
+        now = "${EPOCHREALTIME//[.,]/}"
+        with c.if_then('-n "$CLIMETA_TRACE"'):
+            c.emit("local trace_start trace_parsed trace_done")
+            c.emit(f'trace_start="{now}"')
+            c.emit(self.scoped("parse_args") + ' "$@"')
+            c.emit(f'trace_parsed="{now}"')
+            c.emit(self.scoped("validate_args"))
+            c.emit(f'trace_done="{now}"')
+            command = ""
+            if self.command is not None:
+                command = f"command={self.command.name} "
+            c.emit(
+                f'trace_line "{command}tokens=$# '
+                "parse_us=$(( ${trace_parsed:-0} - ${trace_start:-0} )) "
+                "validate_us=$(( ${trace_done:-0} - ${trace_parsed:-0} )) "
+                'total_us=$(( ${trace_done:-0} - ${trace_start:-0} ))"'
+            )
+            if self.usage_counters:
+                self._generate_write_usage_call(c)
+            c.emit("return")
+
+    def _generate_trace_line(self, c: BashEmitter) -> None:
+        """helper writing the CLIMETA_TRACE line"""
+        c.cmnt("CLIMETA_TRACE line to stderr (1/stderr) or appended to a file")
+        with c.func("trace_line"):
+            with c.case("$CLIMETA_TRACE"):
+                with c.case_pattern("1|stderr"):
+                    c.emit(f'echo "{self.trace_prefix()} $1" >&2')
+                with c.case_pattern("*"):
+                    c.emit(f'echo "{self.trace_prefix()} $1" >> "$CLIMETA_TRACE"')
+
+    def _generate_env_flag(self, c: BashEmitter) -> None:
+        """helper setting a flag from the variable it is bound to"""
+        c.cmnt("set flag $1 to 1 or 0 from the variable named $2, to $3 if unset")
+        with c.func("env_flag"):
+            c.emit('local value="${!2-$3}"')
+            with c.case("${value,,}"):
+                with c.case_pattern("1|true|yes|on"):
+                    c.emit('printf -v "$1" 1')
+                with c.case_pattern("0|false|no|off|''"):
+                    c.emit('printf -v "$1" 0')
+                with c.case_pattern("*"):
+                    c.error("$2: invalid flag value '$value'")
+                    c.emit("return 1")
 
     def _generate_getopts_emulation(self, c: BashEmitter) -> None:
         """this portion performs similar functionality to getopt/getopts"""
@@ -150,8 +297,12 @@ class BashCodeGenerator(CodeGenerator):
         c.cmnt("for more unified processing later on")
         c.emit("local i ch arg")
         c.emit("local -a new_args")
+        if self.allow_abbrev:
+            c.emit("local expand_abbrev=1")
 
         with c.for_loop("arg", '"$@"'):
+            if self.allow_abbrev:
+                self._generate_abbrev_expansion(c)
             with c.case("$arg"):
                 with c.case_pattern("--*=*", "# convert --aa=xx into --aa xx"):
                     c.emit("right=${arg#*=}  # remove up to first =")
@@ -181,12 +332,31 @@ class BashCodeGenerator(CodeGenerator):
         c.emit('remaining_args=""')
         c.emit("local positional_idx=0")
 
+    def _generate_abbrev_expansion(self, c: BashEmitter) -> None:
+        """replace unique long option prefixes, from precomputed patterns"""
+        unique, ambiguous = self.abbreviations()
+        prefixes = {}
+        for prefix, name in unique.items():
+            prefixes.setdefault(name, []).append(prefix)
+
+        with c.if_then('"$expand_abbrev" -eq 1'):
+            with c.case("${arg%%=*}"):
+                with c.case_pattern("--"):
+                    c.emit("expand_abbrev=0")
+                for name, name_prefixes in prefixes.items():
+                    with c.case_pattern("|".join(name_prefixes)):
+                        c.emit(f'arg="{name}${{arg#"${{arg%%=*}}"}}"')
+                for prefix, message in ambiguous.items():
+                    with c.case_pattern(prefix):
+                        c.error(message)
+                        c.emit(self.scoped("usage") + " 1")
+
     def _generate_parsing_loop(self, c: BashEmitter) -> None:
         """generate main processing argument loop"""
         with c.while_loop('"$#" -gt 0'):
             with c.case("$1"):
-                # process -- and - options
-                for arg in self.args:
+                # process -- and - options, most used first if profiled
+                for arg in self.dispatch_order(self.args):
                     if not arg.is_positional:  # non-positional arguments
                         pattern = (
                             f"{arg.name}|{arg.short}"
@@ -197,24 +367,26 @@ class BashCodeGenerator(CodeGenerator):
                             val = 0 if arg.default else 1
                             with c.case_pattern(pattern):  # handle flags
                                 c.emit(f'{arg.dest}="{val}"')
+                                self._generate_count_usage(c, arg)
                         else:
                             # Handle options that require a value
                             with c.case_pattern(
                                 pattern, post="shift"
                             ):  # handle flags
-                                c.emit('check_valid_arg "$1" "$2"')
+                                c.emit(self.scoped("check_valid_arg") + ' "$1" "$2"')
                                 c.emit(f'{arg.dest}="$2"')
+                                self._generate_count_usage(c, arg)
 
                 # boiler plate to handle help, -- and unkown options
                 with c.case_pattern("--help|-h"):
-                    c.emit("usage 0")
+                    c.emit(self.scoped("usage") + " 0")
                 with c.case_pattern("--"):
                     c.emit("shift")
                     c.emit('remaining_args="$*"')
                     c.emit("break")
                 with c.case_pattern("-*"):
                     c.error("Unknown option: $1")
-                    c.emit("usage 1")
+                    c.emit(self.scoped("usage") + " 1")
 
                 # handle positional arguments
                 pos_idx = 0
@@ -231,22 +403,186 @@ class BashCodeGenerator(CodeGenerator):
                     if pos_idx > 0:  # if there was any positional
                         with c.else_():
                             c.error("Unexpected positional argument: $1")
-                            c.emit("usage 1")
+                            c.emit(self.scoped("usage") + " 1")
                         c.emit("positional_idx=$(( positional_idx + 1 ))")
                     else:  # there was no positional expected
                         c.error("Unexpected positional argument: $1")
-                        c.emit("usage 1")
+                        c.emit(self.scoped("usage") + " 1")
             c.emit("shift")
 
-    def generate_code(self, filename_base: str) -> None:
-        c = BashEmitter()
+    def _generate_count_usage(self, c: BashEmitter, arg: ArgSpec) -> None:
+        """one more use of an option, counted in get_cli_args"""
+        if self.usage_counters:
+            index = self.counted_options().index(arg)
+            c.emit(f"(( ++usage_counts[{index}] ))")
+
+    def _generate_write_usage_call(self, c: BashEmitter) -> None:
+        """usage line of the parse: the name and count of each option"""
+        args = [f'"{self.usage_prefix()}"'] + [
+            f'{arg.name} "${{usage_counts[{index}]}}"'
+            for index, arg in enumerate(self.counted_options())
+        ]
+        c.emit("write_usage " + args[0] + (" \\" if len(args) > 1 else ""))
+        with Indenter(c):
+            for idx, arg in enumerate(args[1:], 2):
+                c.emit(arg + (" \\" if idx < len(args) else ""))
+
+    def _generate_write_usage(self, c: BashEmitter) -> None:
+        """
+        helper appending the usage line of a parse. A sourced script has
+        no exit hook of its own (the EXIT trap belongs to the caller), so
+        each parse appends its line, a single write
+        """
+        c.cmnt("usage line appended to CLIMETA_USAGE_FILE: prefix, name count...")
+        with c.func("write_usage"):
+            path = f"${{CLIMETA_USAGE_FILE-{self.usage_file}}}"
+            c.emit(f'local path="{path}" line="$1 runs=1"')
+            c.emit("shift")
+            with c.while_loop('"$#" -gt 0'):
+                c.emit('[ "$2" -eq 0 ] || line+=" $1=$2"')
+                c.emit("shift 2")
+            c.emit('[ -z "$path" ] || { printf \'%s\\n\' "$line" >> "$path"; } 2>/dev/null')
+
+    def _generate_handoff_helpers(self, c: BashEmitter) -> None:
+        """
+        fields of the hand-off encoding (see CodeGenerator.handoff_header),
+        appended to or taken from the 'encoded' and 'data' locals of the
+        callers. LC_ALL=C so that lengths and offsets count bytes
+        """
+        c.cmnt("hand-off field of $1 appended to $encoded: <bytes>:<value>")
+        with c.func("handoff_put"):
+            c.emit("local LC_ALL=C")
+            c.emit('encoded+="${#1}:$1"')
+
+        c.cmnt("multiple value of $1 (space separated) appended to $encoded")
+        with c.func("handoff_put_items"):
+            c.emit("local -a items")
+            c.emit("local item")
+            c.emit('read -ra items <<< "$1"')
+            c.emit('encoded+="${#items[@]}*"')
+            with c.for_loop("item", '"${items[@]}"'):
+                c.emit('handoff_put "$item"')
+
+        c.cmnt("next hand-off field of $data into $field, 1 if malformed")
+        with c.func("handoff_take"):
+            c.emit("local LC_ALL=C size skip")
+            with Indenter(c, 'if [[ "$data" == "~"* ]]; then', "fi"):
+                c.emit('field=""')
+                c.emit("data=${data:1}")
+                c.emit("return 0")
+            c.emit("size=${data%%:*}")
+            with Indenter(
+                c,
+                'if [[ -z "$size" || "$size" == *[!0-9]* || "$size" == "$data" ]];'
+                " then",
+                "fi",
+            ):
+                c.emit("return 1")
+            c.emit("skip=$(( ${#size} + 1 ))")
+            c.emit("size=$(( 10#$size ))")
+            with c.if_then("$(( ${#data} - skip )) -lt $size"):
+                c.emit("return 1")
+            c.emit("field=${data:skip:size}")
+            c.emit("data=${data:skip+size}")
+
+        c.cmnt("next multiple hand-off value of $data into $field, space separated")
+        with c.func("handoff_take_items"):
+            c.emit('local count=${data%%"*"*} items=""')
+            with Indenter(c, 'if [[ "$data" == "~"* ]]; then', "fi"):
+                c.emit("handoff_take")
+                c.emit("return")
+            with Indenter(
+                c,
+                'if [[ -z "$count" || "$count" == *[!0-9]* || "$count" == "$data" ]];'
+                " then",
+                "fi",
+            ):
+                c.emit("return 1")
+            c.emit("data=${data:${#count}+1}")
+            with Indenter(
+                c, "for (( count = 10#$count; count > 0; count-- )); do", "done"
+            ):
+                c.emit("handoff_take || return 1")
+                c.emit('items+="${items:+ }$field"')
+            c.emit('field="$items"')
+
+        header = self.handoff_header()
+        c.cmnt("$data past its header, 1 (and an error) if not one of the spec")
+        with c.func("handoff_check"):
+            with Indenter(c, f'if [[ "$data" != "{header}"* ]]; then', "fi"):
+                c.error("not a hand-off encoding of this spec")
+                c.emit("return 1")
+            c.emit(f"data=${{data:{len(header)}}}")
+
+    def _generate_handoff(self, c: BashEmitter) -> None:
+        """hand-off encoding and decoding of the (sub)command arguments"""
+        c.cmnt("the arguments as hand-off fields, appended to $encoded")
+        with c.func(self.scoped("encode_fields")):
+            for arg in self.args:
+                put = "handoff_put_items" if arg.multiple else "handoff_put"
+                c.emit(f'{put} "${arg.dest}"')
+            if not self.args:
+                c.emit(":  # no arguments")
 
+        c.cmnt("the arguments from the hand-off fields of $data, 1 if malformed")
+        with c.func(self.scoped("decode_fields")):
+            for arg in self.args:
+                take = "handoff_take_items" if arg.multiple else "handoff_take"
+                c.emit(f"{take} || return 1")
+                c.emit(f'{arg.dest}="$field"')
+            if not self.args:
+                c.emit(":  # no arguments")
+
+    def _generate_handoff_entry_points(self, c: BashEmitter) -> None:
+        """encode_args/decode_args of the program"""
+        c.cmnt("parsed arguments as a hand-off string, stored in the variable")
+        c.cmnt("named $1 (printed if none), for decode_options of any backend")
+        with c.func("encode_args"):
+            c.emit(f'local encoded="{self.handoff_header()}"')
+            if self.commands:
+                c.emit('handoff_put "$command"')
+                with c.case("$command"):
+                    for command in self.commands:
+                        scoped = self.for_command(command).scoped
+                        with c.case_pattern(command.name):
+                            c.emit(scoped("encode_fields"))
+            else:
+                c.emit("encode_fields")
+            with c.if_then_else('-n "$1"'):
+                c.emit('printf -v "$1" \'%s\' "$encoded"')
+            with c.else_():
+                c.emit('printf \'%s\\n\' "$encoded"')
+
+        c.cmnt("arguments of a hand-off string ($1), as get_cli_args would set")
+        c.cmnt("them but without parsing nor validating them again")
+        with c.func("decode_args"):
+            c.emit('local data="$1" field')
+            c.emit("handoff_check || return 1")
+            if self.commands:
+                c.emit("handoff_take || return 1")
+                with c.case("$field"):
+                    for command in self.commands:
+                        scoped = self.for_command(command).scoped
+                        with c.case_pattern(command.name):
+                            c.emit(f'command="{command.name}"')
+                            c.emit(scoped("decode_fields") + " || data=x")
+                    with c.case_pattern("*"):
+                        c.emit("data=x")
+            else:
+                c.emit("decode_fields || data=x")
+            with c.if_then('-n "$data"'):
+                c.error("malformed hand-off encoding")
+                c.emit("return 1")
+
+    def _generate_parser(self, c: BashEmitter) -> None:
+        """all the functions parsing the arguments of a (sub)command"""
+        self._generate_choices_arrays(c)
         self._generate_usage(c)
         self._generate_arg_checker(c)
 
         # Main argument parsing function
         c.cmnt("Argument parsing function")
-        with c.func("parse_args"):
+        with c.func(self.scoped("parse_args")):
             # this portion performs similar functionality to getopt/getopts
             # in the sense that it splits collapsed options and replaces =
             # in --arg=value into --arg value to simplify later processing
@@ -260,12 +596,91 @@ class BashCodeGenerator(CodeGenerator):
         # dump_args function
         self._generate_dump_args(c)
 
+        if self.handoff:
+            self._generate_handoff(c)
+
         # Main function
         self._generate_get_cli(c)
 
+    def _generate_commands_usage(self, c: BashEmitter) -> None:
+        """top level usage() listing the commands"""
+        c.cmnt("Usage function")
+        with c.func("usage"):
+            c.echo("Usage: $0 COMMAND [options]")
+            c.echo("")
+            c.echo(self.description)
+            c.echo("")
+            c.echo("commands:")
+            left_size = 1 + max(len(cmd.name) for cmd in self.commands)
+            for command in self.commands:
+                padding = " " * (left_size - len(command.name))
+                c.echo_literal(f"  {command.name}{padding}: {command.help_}")
+            if self.epilog:
+                c.echo("")
+                c.echo(self.epilog)
+            c.emit('exit "$1"')
+
+    def _generate_commands_dispatch(self, c: BashEmitter) -> None:
+        """
+        get_cli_args/dump_args jumping to the functions of the selected
+        command, so only its options get processed
+        """
+        c.cmnt("Main entry point, dispatch on command name")
+        with c.func("get_cli_args"):
+            with c.case("$1"):
+                for command in self.commands:
+                    scoped = self.for_command(command).scoped
+                    with c.case_pattern(command.name):
+                        c.emit(f'command="{command.name}"')
+                        c.emit("shift")
+                        c.emit(scoped("get_cli_args") + ' "$@"')
+                with c.case_pattern("--help|-h"):
+                    c.emit("usage 0")
+                with c.case_pattern("*"):
+                    c.error("Unknown command: $1")
+                    c.emit("usage 1")
+
+        c.cmnt("Dump argument values for debug")
+        with c.func("dump_args"):
+            c.echo("command: $command")
+            with c.case("$command"):
+                for command in self.commands:
+                    scoped = self.for_command(command).scoped
+                    with c.case_pattern(command.name):
+                        c.emit(scoped("dump_args"))
+
+    def generate_code(self, filename_base: str) -> None:
+        c = BashEmitter()
+
+        if self.trace:
+            self._generate_trace_line(c)
+        if self.has_choices_files():
+            self._generate_nearest_choice(c)
+        if self.usage_counters:
+            self._generate_write_usage(c)
+        if self.handoff:
+            self._generate_handoff_helpers(c)
+        args = self.args + [arg for cmd in self.commands for arg in cmd.args]
+        if any(arg.env and arg.type_ == "flag" for arg in args):
+            self._generate_env_flag(c)
+
+        if self.commands:
+            for command in self.commands:
+                self.for_command(command)._generate_parser(c)
+            self._generate_commands_usage(c)
+            self._generate_commands_dispatch(c)
+        else:
+            self._generate_parser(c)
+        if self.handoff:
+            self._generate_handoff_entry_points(c)
+
         # Example: call get_cli_args function
         c.cmnt("Example of use:")
         c.cmnt('get_cli_args "$@"')
         c.cmnt("dump_args")
 
-        self.to_file(str(c), filename_base + ".sh")
+        roots = ["get_cli_args"]
+        if self.handoff:
+            roots += ["encode_args", "decode_args"]
+        filename = filename_base + ".sh"
+        self.to_file(self.minified_code(c, roots, filename), filename)
@@ -2,6 +2,9 @@
 Generate CLI parsing code in C using c_argparse library dependency
 """
 
+import os
+from typing import List
+
 from .code_generator import (
     ArgSpec,
     CodeGenerator,
@@ -10,6 +13,8 @@ from .code_generator import (
     single_quote_list,
 )
 from .c_emitter import CEmitter
+from .choices import FNV_OFFSET, FNV_PRIME, MIX_PRIME_1, MIX_PRIME_2, perfect_hash
+from .emitter import Emitter
 from .indenter import Indenter
 
 
@@ -83,6 +88,136 @@ def get_help_suffix(arg: ArgSpec) -> str:
     return f"(default {default})"
 
 
+# library mode status codes, negative parse_options results
+LIBRARY_STATUS = [
+    ("CLIMETA_HELP", "-h/--help given, the error buffer holds the usage"),
+    ("CLIMETA_UNKNOWN_OPTION", None),
+    ("CLIMETA_MISSING_VALUE", None),
+    ("CLIMETA_INVALID_VALUE", None),
+    ("CLIMETA_MISSING_ARGUMENT", "a positional or required option"),
+    ("CLIMETA_INVALID_CHOICE", None),
+    ("CLIMETA_AMBIGUOUS_OPTION", None),
+    ("CLIMETA_UNKNOWN_COMMAND", None),
+    ("CLIMETA_PARSE_ERROR", "any other error (C++)"),
+]
+
+# library mode OptionSpec type tags
+LIBRARY_TYPES = {"flag": "b", "string": "s", "int": "i", "float": "f"}
+
+
+def c_string(text: str) -> str:
+    """C string literal for text"""
+    escaped = text.replace("\\", "\\\\").replace('"', '\\"')
+    return '"' + escaped.replace("\n", "\\n") + '"'
+
+
+def emit_wrapped(c: Emitter, items: List[str]) -> None:
+    """comma separated items, indented and as many per line as fit"""
+    with Indenter(c):
+        line = ""
+        for item in items:
+            item += ","
+            if line and len(line) + len(item) > 70:
+                c.emit(line)
+                line = ""
+            line += (" " if line else "") + item
+        c.emit(line)
+
+
+def emit_usage_writer(
+    c: Emitter, generators: List[CodeGenerator], usage_file: str
+) -> None:
+    """
+    counters of the options of each (sub)command generator, and
+    count_run(), registering at the first parse their write at exit as
+    one line per (sub)command parsed, in a single O_APPEND write (C and C++)
+    """
+    # "<prefix> runs=N --name=N ...\n" of every (sub)command, and '\0'
+    line_size = 1
+    for generator in generators:
+        options = generator.counted_options()
+        line_size += len(generator.usage_prefix()) + len(" runs=") + 11
+        line_size += sum(len(arg.name) + 12 for arg in options)
+
+        size = max(1, len(options))
+        c.emit(f"static unsigned {generator.scoped('usage_runs')};")
+        c.emit(f"static unsigned {generator.scoped('usage_counts')}[{size}];")
+        names = double_quote_list(arg.name for arg in options) or "NULL"
+        c.emit(
+            "static const char *const "
+            f"{generator.scoped('usage_names')}[] = {{{names}}};"
+        )
+    c.new_line()
+
+    c.cmnt("usage line of a (sub)command written to line, if it was parsed")
+    with c.static_func(
+        "usage_line",
+        [
+            "char *line",
+            "const char *prefix",
+            "unsigned runs",
+            "const char *const *names",
+            "const unsigned *counts",
+            "size_t count",
+        ],
+        ret="size_t",
+    ):
+        with c.if_then("runs == 0"):
+            c.emit("return 0;")
+        c.emit('size_t len = sprintf(line, "%s runs=%u", prefix, runs);')
+        with Indenter(c, "for (size_t i = 0; i < count; i++) {", "}"):
+            with c.if_then("counts[i] != 0"):
+                c.emit('len += sprintf(line + len, " %s=%u", names[i], counts[i]);')
+        c.emit("line[len++] = '\\n';")
+        c.emit("return len;")
+
+    c.cmnt("all the lines in one O_APPEND write: no lock, no interleaving")
+    with c.static_func("write_usage", ["void"]):
+        c.emit(f"static char line[{line_size}];")
+        c.emit('const char *path = getenv("CLIMETA_USAGE_FILE");')
+        c.emit("size_t len = 0;")
+        with c.if_then("path == NULL"):
+            c.emit(f"path = {double_quote(usage_file)};")
+        for generator in generators:
+            options = generator.counted_options()
+            with Indenter(c, "len += usage_line(", ");"):
+                c.emit(f'line + len, "{generator.usage_prefix()}",')
+                c.emit(
+                    f"{generator.scoped('usage_runs')}, "
+                    f"{generator.scoped('usage_names')}, "
+                    f"{generator.scoped('usage_counts')}, {len(options)}"
+                )
+        with c.if_then("*path == '\\0' || len == 0"):
+            c.emit("return;")
+        c.emit("int fd = open(path, O_WRONLY | O_APPEND | O_CREAT, 0644);")
+        with c.if_then("fd < 0"):
+            c.emit("return;")
+        with c.if_then("write(fd, line, len) < 0"):
+            c.cmnt("best effort, the counters are lost")
+        c.emit("close(fd);")
+
+    c.cmnt("a successful parse, the counters are written at exit")
+    with c.static_func("count_run", ["unsigned *runs"]):
+        c.emit("static int registered = 0;")
+        with c.if_then("!registered"):
+            c.emit("registered = 1;")
+            c.emit("atexit(write_usage);")
+        c.emit("++*runs;")
+
+
+def emit_status_codes(c: Emitter) -> None:
+    """library mode status codes, guarded as every header defines them"""
+    c.new_line()
+    c.emit("#ifndef CLIMETA_STATUS_CODES")
+    c.emit("#define CLIMETA_STATUS_CODES")
+    c.emit("// negative parse_options results, the error buffer holds the message")
+    with Indenter(c, "enum {", "};"):
+        for idx, (name, comment) in enumerate(LIBRARY_STATUS, 1):
+            comment = f"  // {comment}" if comment else ""
+            c.emit(f"{name} = -{idx},{comment}")
+    c.emit("#endif")
+
+
 class CArgparseCodeGenerator(CodeGenerator):
     """Generates C argparse code for CLI parsing."""
 
@@ -103,11 +238,12 @@ class CArgparseCodeGenerator(CodeGenerator):
         #     opts->path = NULL;
         #     opts->positional = NULL;
         # }
-        with c.func("reset_options", ["Options* opts"]):
+        options = self.scoped("Options")
+        with c.func(self.scoped("reset_options"), [options + "* opts"]):
             for arg in self.args:
                 default = get_default(arg)
                 suffix = ""
-                if arg.type_ == "flag":
+                if arg.type_ == "flag" and not self.library:
                     if default == "1":
                         default = "0"
                         suffix = " // inverted internal polarity"
@@ -136,6 +272,326 @@ class CArgparseCodeGenerator(CodeGenerator):
                     c.emit("return 1;")
             c.emit("return 0;")
 
+    def has_choices_files(self) -> bool:
+        """whether any argument (of any command) has a choices_file"""
+        args = self.args + [arg for cmd in self.commands for arg in cmd.args]
+        return any(arg.choices_file for arg in args)
+
+    def _generate_choices_runtime(self, c: CEmitter) -> None:
+        """
+        Generates the hash of the choices_file lookups, and the search of
+        the choice closest to an invalid value (edit distance), shared by
+        all of them
+        """
+        c.cmnt("seeded and finalized FNV-1a, as the perfect hashes were built with")
+        with c.static_func(
+            "choice_hash", ["uint32_t seed", "const char *value"], ret="uint32_t"
+        ):
+            c.emit(f"uint32_t hash = {FNV_OFFSET:#x}u ^ seed;")
+            with c.while_loop("*value != '\\0'"):
+                c.emit(
+                    f"hash = (hash ^ (unsigned char)*value++) * {FNV_PRIME:#x}u;"
+                )
+            c.emit("hash ^= hash >> 16;")
+            c.emit(f"hash *= {MIX_PRIME_1:#x}u;")
+            c.emit("hash ^= hash >> 13;")
+            c.emit(f"hash *= {MIX_PRIME_2:#x}u;")
+            c.emit("return hash ^ (hash >> 16);")
+
+        c.cmnt("choice closest to value, NULL if none is within len / 3 edits")
+        with c.static_func(
+            "nearest_choice",
+            ["const char *const *choices", "const char *value"],
+            ret="const char*",
+        ):
+            c.emit("size_t row[64];")
+            c.emit("size_t len = strlen(value), i, j;")
+            c.emit("const char *nearest = NULL;")
+            c.emit("size_t nearest_distance = len / 3 + 1;")
+            with c.if_then("len > 63"):
+                c.emit("len = 63;")
+            with Indenter(c, "for (; *choices != NULL; choices++) {", "}"):
+                c.emit("const char *choice = *choices;")
+                c.emit("size_t choice_len = strlen(choice);")
+                with c.if_then("choice_len > 63"):
+                    c.emit("choice_len = 63;")
+                with Indenter(c, "for (j = 0; j <= len; j++) {", "}"):
+                    c.emit("row[j] = j;")
+                with Indenter(c, "for (i = 1; i <= choice_len; i++) {", "}"):
+                    c.emit("size_t diagonal = row[0];")
+                    c.emit("row[0] = i;")
+                    with Indenter(c, "for (j = 1; j <= len; j++) {", "}"):
+                        c.emit("size_t above = row[j];")
+                        c.emit(
+                            "size_t cost = diagonal + "
+                            "(choice[i - 1] != value[j - 1]);"
+                        )
+                        with c.if_then("above + 1 < cost"):
+                            c.emit("cost = above + 1;")
+                        with c.if_then("row[j - 1] + 1 < cost"):
+                            c.emit("cost = row[j - 1] + 1;")
+                        c.emit("row[j] = cost;")
+                        c.emit("diagonal = above;")
+                with c.if_then("row[len] < nearest_distance"):
+                    c.emit("nearest = choice;")
+                    c.emit("nearest_distance = row[len];")
+            c.emit("return nearest;")
+
+    def _generate_hashed_choices(self, c: CEmitter) -> None:
+        """
+        choices_file values of a (sub)command arguments, NULL terminated
+        in perfect hash slot order, the seeds of its buckets and the lookup
+        """
+        for arg in self.args:
+            if not arg.choices_file:
+                continue
+            slots, seeds = perfect_hash(arg.choices)
+            choices = self.scoped(f"{arg.dest}_choices")
+            filename = os.path.basename(arg.choices_file)
+            c.cmnt(f"{arg.name} choices from {filename}")
+            c.emit(f"static const char *const {choices}[] = {{")
+            emit_wrapped(c, [c_string(value) for value in slots] + ["NULL"])
+            c.emit("};")
+            c.emit(f"static const int {choices}_seeds[] = {{")
+            emit_wrapped(c, [str(seed) for seed in seeds])
+            c.emit("};")
+            c.new_line()
+
+            with c.static_func(
+                self.scoped(f"{arg.dest}_choice_index"),
+                ["const char *value"],
+                ret="int",
+            ):
+                c.emit(
+                    f"const uint32_t buckets = sizeof({choices}_seeds) / "
+                    f"sizeof({choices}_seeds[0]);"
+                )
+                c.emit(
+                    f"const uint32_t count = sizeof({choices}) / "
+                    f"sizeof({choices}[0]) - 1;"
+                )
+                c.emit(f"int seed = {choices}_seeds[choice_hash(0, value) % buckets];")
+                c.emit(
+                    "uint32_t slot = seed < 0 ? (uint32_t)(-seed - 1) "
+                    ": choice_hash((uint32_t)seed, value) % count;"
+                )
+                c.emit(
+                    f"return strcmp({choices}[slot], value) == 0 ? (int)slot : -1;"
+                )
+
+    def _generate_abbreviation_types(self, c: CEmitter) -> None:
+        """abbreviations table entry and lookup key, with their comparison"""
+        c.emit("typedef struct {")
+        with Indenter(c):
+            c.emit("const char *prefix;")
+            c.emit("const char *option;  // NULL when ambiguous")
+            c.emit("const char *message;")
+        c.emit("} Abbreviation;")
+        c.new_line()
+        c.emit("typedef struct {")
+        with Indenter(c):
+            c.emit("const char *name;")
+            c.emit("size_t len;")
+        c.emit("} AbbreviationKey;")
+        c.new_line()
+
+        with c.static_func(
+            "compare_abbreviation",
+            ["const void *key", "const void *abbreviation"],
+            ret="int",
+        ):
+            c.emit("const AbbreviationKey *k = (const AbbreviationKey *)key;")
+            c.emit(
+                "const char *prefix = "
+                "((const Abbreviation *)abbreviation)->prefix;"
+            )
+            c.emit("int cmp = strncmp(k->name, prefix, k->len);")
+            with c.if_then("cmp != 0"):
+                c.emit("return cmp;")
+            c.emit("return prefix[k->len] == '\\0' ? 0 : -1;")
+
+    def _generate_expand_abbreviations(self, c: CEmitter) -> None:
+        """
+        Generates the lookup of long option prefixes in a table sorted by
+        prefix, shared by all commands. The table is computed at generation
+        time, so the lookup is a binary search without any copy of argv.
+        Values of options are skipped, so "-o --verb" keeps its value
+        """
+        self._generate_abbreviation_types(c)
+
+        with c.static_func(
+            "compare_valued", ["const void *key", "const void *name"], ret="int"
+        ):
+            c.emit("return strcmp((const char *)key, *(const char *const *)name);")
+
+        c.cmnt("replace unique long option prefixes by the full option,")
+        c.cmnt("returns the entry of the first ambiguous prefix if any")
+        with c.static_func(
+            "expand_abbreviations",
+            [
+                "int argc",
+                "const char **argv",
+                "const Abbreviation *table",
+                "size_t size",
+                "const char *const *valued",
+                "size_t valued_size",
+                "const char *valued_shorts",
+            ],
+            ret="const Abbreviation*",
+        ):
+            with Indenter(c, "for (int i = 1; i < argc; i++) {", "}"):
+                c.emit("const char *arg = argv[i];")
+                with c.if_then('strcmp(arg, "--") == 0'):
+                    c.emit("break;")
+                with c.if_then("arg[0] == '-' && arg[1] != '-' && arg[1] != '\\0'"):
+                    c.cmnt("short options bundle, the first one taking a value")
+                    c.cmnt("ends it, with the next token if it is the last")
+                    with Indenter(
+                        c, "for (const char *s = arg + 1; *s != '\\0'; s++) {", "}"
+                    ):
+                        with c.if_then("strchr(valued_shorts, *s) != NULL"):
+                            c.emit("i += s[1] == '\\0';")
+                            c.emit("break;")
+                    c.emit("continue;")
+                with c.if_then('strncmp(arg, "--", 2) != 0'):
+                    c.emit("continue;")
+                c.emit("const char *equal = strchr(arg, '=');")
+                c.emit("AbbreviationKey key;")
+                c.emit("key.name = arg;")
+                c.emit("key.len = equal ? (size_t)(equal - arg) : strlen(arg);")
+                c.emit(
+                    "const Abbreviation *found = bsearch(&key, table, size, "
+                    "sizeof(table[0]), compare_abbreviation);"
+                )
+                with c.if_then("found != NULL && found->option == NULL"):
+                    c.emit("return found;")
+                with c.if_then("equal == NULL"):
+                    with c.if_then("found != NULL"):
+                        c.emit("argv[i] = found->option;")
+                    c.cmnt("the value of the option is the next token")
+                    c.emit(
+                        "i += bsearch(argv[i], valued, valued_size, "
+                        "sizeof(valued[0]), compare_valued) != NULL;"
+                    )
+                    c.emit("continue;")
+                with c.if_then("found == NULL"):
+                    c.emit("continue;")
+                c.cmnt("--prefix=value, kept for the process lifetime")
+                c.emit(
+                    "char *expanded = malloc(strlen(found->option) "
+                    "+ strlen(equal) + 1);"
+                )
+                with c.if_then("expanded == NULL"):
+                    c.emit('printf("ERROR: out of memory\\n");')
+                    c.emit("exit(1);")
+                c.emit("strcpy(expanded, found->option);")
+                c.emit("strcat(expanded, equal);")
+                c.emit("argv[i] = expanded;")
+            c.emit("return NULL;")
+
+    def _generate_abbreviations_table(self, c: CEmitter) -> None:
+        """table of unique and ambiguous long option prefixes, by prefix"""
+        unique, ambiguous = self.abbreviations()
+        entries = {prefix: f'"{name}", NULL' for prefix, name in unique.items()}
+        entries.update(
+            {prefix: f'NULL, "{msg}"' for prefix, msg in ambiguous.items()}
+        )
+        c.cmnt("sorted by prefix, for bsearch")
+        with Indenter(
+            c,
+            f"static const Abbreviation {self.scoped('abbreviations')}[] = {{",
+            "};",
+        ):
+            for prefix in sorted(entries):
+                c.emit(f'{{"{prefix}", {entries[prefix]}}},')
+        c.new_line()
+
+        if self.library:
+            return  # parse_table knows the options taking a value
+        names = self.valued_options()[0]
+        c.cmnt("options taking a value, sorted for bsearch (NULL terminated)")
+        c.emit(f"static const char *const {self.scoped('valued')}[] = {{")
+        emit_wrapped(c, [c_string(name) for name in names] + ["NULL"])
+        c.emit("};")
+
+    def _generate_valued_shorts(self, c: CEmitter) -> None:
+        """short options taking a value, whose value may be the next token"""
+        shorts = c_string(self.valued_options()[1])
+        c.emit(f"static const char {self.scoped('valued_shorts')}[] = {shorts};")
+        c.new_line()
+
+    def _generate_check_abbreviations_block(self, c: CEmitter) -> None:
+        """expand abbreviations, before the library sees them"""
+        table = self.scoped("abbreviations")
+        valued = self.scoped("valued")
+        with Indenter(c, "const Abbreviation *ambiguous = expand_abbreviations(", ");"):
+            c.emit(f"argc, *argv, {table}, sizeof({table}) / sizeof({table}[0]),")
+            c.emit(f"{valued}, sizeof({valued}) / sizeof({valued}[0]) - 1,")
+            c.emit(self.scoped("valued_shorts"))
+        with c.if_then("ambiguous != NULL"):
+            c.emit('printf("ERROR: %s\\n", ambiguous->message);')
+            c.emit("argparse_usage(&argparse);")
+            c.emit("exit(1);")
+
+    def _generate_trace_helpers(self, c: CEmitter) -> None:
+        """
+        Generates the CLIMETA_TRACE helpers. With -DCLIMETA_NO_TRACE the
+        destination is a constant NULL, so the compiler drops every trace
+        block as dead code
+        """
+        c.emit("#ifdef CLIMETA_NO_TRACE")
+        c.emit("#define trace_destination() ((const char *)NULL)")
+        c.emit("#else")
+        with c.static_func("trace_destination", ["void"], ret="const char*"):
+            c.emit('const char *destination = getenv("CLIMETA_TRACE");')
+            c.emit(
+                "return destination != NULL && *destination != '\\0' "
+                "? destination : NULL;"
+            )
+        c.emit("#endif")
+        c.new_line()
+
+        with c.static_func("trace_now_us", ["void"], ret="double"):
+            c.emit("struct timespec ts;")
+            c.emit("clock_gettime(CLOCK_MONOTONIC, &ts);")
+            c.emit("return ts.tv_sec * 1e6 + ts.tv_nsec / 1e3;")
+
+        c.cmnt("CLIMETA_TRACE line to stderr (1/stderr) or appended to a file,")
+        c.cmnt("marks: start, parsed, validated, choices checked")
+        with c.static_func(
+            "trace_line",
+            [
+                "const char *destination",
+                "const char *command",
+                "int tokens",
+                "const double *marks",
+            ],
+        ):
+            c.emit("FILE *out = stderr;")
+            with c.if_then(
+                'strcmp(destination, "1") != 0 && '
+                'strcmp(destination, "stderr") != 0'
+            ):
+                c.emit('out = fopen(destination, "a");')
+                with c.if_then("out == NULL"):
+                    c.emit("return;")
+            c.emit(f'fprintf(out, "{self.trace_prefix()}");')
+            with c.if_then("command != NULL"):
+                c.emit('fprintf(out, " command=%s", command);')
+            c.emit(
+                'fprintf(out, " tokens=%d parse_us=%.1f validate_us=%.1f '
+                'choices_us=%.1f total_us=%.1f\\n", tokens, '
+                "marks[1] - marks[0], marks[2] - marks[1], "
+                "marks[3] - marks[2], marks[3] - marks[0]);"
+            )
+            with c.if_then("out != stderr"):
+                c.emit("fclose(out);")
+
+    def _generate_trace_mark(self, c: CEmitter, idx: int) -> None:
+        """take the idx-th trace time mark"""
+        with c.if_then("trace != NULL"):
+            c.emit(f"trace_marks[{idx}] = trace_now_us();")
+
     def _generate_option_struct(self, c: CEmitter) -> None:
         """
         generate the control structure that defines the options in the
@@ -161,15 +617,184 @@ class CArgparseCodeGenerator(CodeGenerator):
                     raise RuntimeError(
                         "c_argparse_generator does not support 'multiple' yet"
                     )
-                short = arg.clean_short if arg.clean_short != "" else "\\0"
-                long = arg.clean_name
-                help_ = arg.help_ + " " + get_help_suffix(arg)
-                c.emit(
-                    f"{get_opt_type(arg.type_)}('{short}', \"{long}\", "
-                    f'&opts->{arg.dest}, "{help_}", NULL, 0, 0),'
-                )
+                c.emit(self._argparse_option(arg))
             c.emit("OPT_END(),")
 
+    def _argparse_option(self, arg: ArgSpec) -> str:
+        """argparse_option initializer of an argument"""
+        short = arg.clean_short if arg.clean_short != "" else "\\0"
+        long = arg.clean_name
+        help_ = arg.help_ + " " + get_help_suffix(arg)
+        callback = "NULL, 0"
+        if self.usage_counters:
+            index = self.counted_options().index(arg)
+            counter = f"&{self.scoped('usage_counts')}[{index}]"
+            callback = f"count_usage, (intptr_t){counter}"
+        return (
+            f"{get_opt_type(arg.type_)}('{short}', \"{long}\", "
+            f'&opts->{arg.dest}, "{help_}", {callback}, 0),'
+        )
+
+    def _generate_usage_counters(self, c: CEmitter) -> None:
+        """
+        Generates the option counters of every (sub)command, incremented by
+        an argparse callback, and their single write at exit
+        """
+        generators = [self.for_command(command) for command in self.commands]
+        emit_usage_writer(c, generators or [self], self.usage_file)
+
+        c.cmnt("argparse callback of every option: one more use")
+        with c.static_func(
+            "count_usage",
+            ["struct argparse *self", "const struct argparse_option *option"],
+            ret="int",
+        ):
+            c.emit("(void)self;")
+            c.emit("++*(unsigned *)option->data;")
+            c.emit("return 0;")
+
+    def reorders_options(self) -> bool:
+        """whether the profile reorders the options of this (sub)command"""
+        options = [arg for arg in self.args if not arg.is_positional]
+        return self.dispatch_order(options) != options
+
+    def has_dispatch_order(self) -> bool:
+        """whether the profile reorders the options of any (sub)command"""
+        generators = [self.for_command(command) for command in self.commands]
+        return any(generator.reorders_options() for generator in generators or [self])
+
+    def _generate_unknown_option(self, c: CEmitter) -> None:
+        """
+        Generates the check of the options given before parsing with a
+        dispatch table: argparse prints the usage of the table it parses
+        with after an unknown option, so those are reported beforehand with
+        the table in spec order. Long options are binary searched, so the
+        check costs much less than the scans the profile order saves
+        """
+        c.emit("typedef struct {")
+        with Indenter(c):
+            c.emit("const char *name;  // without --")
+            c.emit("char kind;  // 'f' flag (--no- too), 'v' taking a value, 'h' help")
+        c.emit("} KnownOption;")
+        c.new_line()
+
+        with c.static_func(
+            "compare_known", ["const void *key", "const void *option"], ret="int"
+        ):
+            c.emit("const char *name = ((const KnownOption *)option)->name;")
+            c.emit("size_t len = strcspn((const char *)key, \"=\");")
+            c.emit("int cmp = strncmp((const char *)key, name, len);")
+            with c.if_then("cmp != 0"):
+                c.emit("return cmp;")
+            c.emit("return name[len] == '\\0' ? 0 : -1;")
+
+        c.cmnt("first option of argv argparse doesn't know, NULL if none")
+        with c.static_func(
+            "unknown_option",
+            [
+                "int argc",
+                "const char **argv",
+                "const KnownOption *known",
+                "size_t size",
+                "const char *shorts",
+                "const char *valued_shorts",
+            ],
+            ret="const char*",
+        ):
+            with Indenter(c, "for (int i = 1; i < argc; i++) {", "}"):
+                c.emit("const char *arg = argv[i];")
+                with c.if_then("arg[0] != '-' || arg[1] == '\\0'"):
+                    c.emit("continue;")
+                with c.if_then('strcmp(arg, "--") == 0'):
+                    c.emit("break;")
+                with c.if_then("arg[1] == '-'"):
+                    c.emit(
+                        "const KnownOption *found = bsearch(arg + 2, known, size, "
+                        "sizeof(known[0]), compare_known);"
+                    )
+                    with c.if_then('found == NULL && strncmp(arg + 2, "no-", 3) == 0'):
+                        c.emit(
+                            "found = bsearch(arg + 5, known, size, "
+                            "sizeof(known[0]), compare_known);"
+                        )
+                        with c.if_then("found != NULL && found->kind != 'f'"):
+                            c.emit("return arg;")
+                    with c.if_then("found == NULL"):
+                        c.emit("return arg;")
+                    c.cmnt("the value of the option is the next token")
+                    c.emit("i += found->kind == 'v' && strchr(arg, '=') == NULL;")
+                    c.emit("continue;")
+                with Indenter(
+                    c, "for (const char *s = arg + 1; *s != '\\0'; s++) {", "}"
+                ):
+                    with c.if_then("strchr(shorts, *s) == NULL"):
+                        c.emit("return arg;")
+                    with c.if_then("strchr(valued_shorts, *s) != NULL"):
+                        c.emit("i += s[1] == '\\0';")
+                        c.emit("break;")
+            c.emit("return NULL;")
+
+    def _generate_known_options(self, c: CEmitter) -> None:
+        """long and short options argparse accepts, for unknown_option"""
+        options = [arg for arg in self.args if not arg.is_positional]
+        kinds = {arg.clean_name: "f" if arg.type_ == "flag" else "v" for arg in options}
+        kinds["help"] = "h"
+        c.cmnt("sorted by name, for bsearch")
+        with Indenter(
+            c, f"static const KnownOption {self.scoped('known_options')}[] = {{", "};"
+        ):
+            for name in sorted(kinds):
+                c.emit(f"{{{c_string(name)}, '{kinds[name]}'}},")
+        shorts = c_string("h" + "".join(arg.clean_short for arg in options))
+        c.emit(f"static const char {self.scoped('known_shorts')}[] = {shorts};")
+        c.new_line()
+
+    def _generate_check_unknown_block(self, c: CEmitter) -> None:
+        """unknown options reported with the usage in spec order"""
+        known = self.scoped("known_options")
+        with Indenter(c, "const char *unknown = unknown_option(", ");"):
+            c.emit(f"argc, *argv, {known}, sizeof({known}) / sizeof({known}[0]),")
+            c.emit(f"{self.scoped('known_shorts')}, {self.scoped('valued_shorts')}")
+        with c.if_then("unknown != NULL"):
+            c.emit('fprintf(stderr, "error: unknown option `%s`\\n", unknown);')
+            c.emit("argparse_usage(&argparse);")
+            c.emit("exit(EXIT_FAILURE);")
+
+    def _generate_help_in_spec_order(self, c: CEmitter) -> None:
+        """-h of the dispatch tables, printing the options in help order"""
+        c.cmnt("-h given: usage of the options in spec order (option->data)")
+        with c.static_func(
+            "help_in_spec_order",
+            ["struct argparse *self", "const struct argparse_option *option"],
+            ret="int",
+        ):
+            c.emit(
+                "self->options = "
+                "(const struct argparse_option *)option->data;"
+            )
+            c.emit("return argparse_help_cb(self, option);")
+
+    def _generate_dispatch_struct(self, c: CEmitter) -> bool:
+        """
+        the options again, most used first according to the profile, as
+        argparse tests them in array order. False if that's the spec order
+        """
+        options = [arg for arg in self.args if not arg.is_positional]
+        ordered = self.dispatch_order(options)
+        if ordered == options:
+            return False
+        c.cmnt("by decreasing use (profile), options[] keeps the help order")
+        with Indenter(c, "struct argparse_option dispatch[] = {", "};"):
+            for arg in ordered:
+                c.emit(self._argparse_option(arg))
+            c.emit(
+                "OPT_BOOLEAN('h', \"help\", NULL, "
+                "\"show this help message and exit\","
+            )
+            c.emit("            help_in_spec_order, (intptr_t)options, OPT_NONEG),")
+            c.emit("OPT_END(),")
+        return True
+
     def _generatel_help_block(self, c: CEmitter) -> None:
         """generate help, append positional help at the end"""
         c.emit("argparse_describe(&argparse, ")
@@ -202,7 +827,24 @@ class CArgparseCodeGenerator(CodeGenerator):
         # }
         c.cmnt("check choices")
         for arg in self.args:
-            if (choices := arg.choices) is not None:
+            if arg.choices_file:
+                value = f"opts->{arg.dest}"
+                with c.if_then(
+                    f"{self.scoped(arg.dest + '_choice_index')}({value}) < 0"
+                ):
+                    c.emit(
+                        "const char *nearest = nearest_choice("
+                        f"{self.scoped(arg.dest + '_choices')}, {value});"
+                    )
+                    c.emit(
+                        f"printf(\"ERROR: '{arg.clean_name}': invalid choice "
+                        f"'%s'\", {value});"
+                    )
+                    with c.if_then("nearest != NULL"):
+                        c.emit('printf(" (did you mean \'%s\'?)", nearest);')
+                    c.emit('printf("\\n");')
+                    c.emit("exit(1);")
+            elif (choices := arg.choices) is not None:
                 long = arg.clean_name
                 c.emit(
                     f"const char *{long}_valid[] = "
@@ -245,6 +887,15 @@ class CArgparseCodeGenerator(CodeGenerator):
         false
         """
         for arg in self.args:
+            if arg.env and arg.type_ == "flag":
+                # set by the environment, then maybe incremented by argparse
+                if get_default(arg) != "0":
+                    c.emit(
+                        f"opts->{arg.dest} = !opts->{arg.dest};  // invert back"
+                    )
+                else:
+                    c.emit(f"opts->{arg.dest} = opts->{arg.dest} != 0;")
+                continue
             if not arg.is_positional:
                 if arg.type_ == "flag" and get_default(arg) != "0":
                     # when flag default is true, we invert the meaning
@@ -270,30 +921,40 @@ class CArgparseCodeGenerator(CodeGenerator):
                     c.emit("exit(1);")
 
     def _generate_dump_options(self, c: CEmitter) -> None:
-        with c.func("dump_options", ["Options *opts"]):
+        options = self.scoped("Options")
+        with c.func(self.scoped("dump_options"), [options + " *opts"]):
             for arg in self.args:
                 dest = arg.dest
                 perc = get_printf_type(arg.type_)
                 c.emit(f'printf("{dest}: %{perc}\\n", opts->{dest});')
 
-    def generate_c_code(self, filename_base: str):
-        """generate .c code"""
-        c = CEmitter()
-
-        c.include(filename_base + ".h")
-        c.include("argparse.h")
-        c.include_sys("stdio.h", "stdlib.h", "string.h", "limits.h", "math.h")
-        c.emit("\n")
-
+    def _generate_parse_options(
+        self, c: CEmitter, with_set_includes: bool
+    ) -> None:
+        """reset_options, parse_options and dump_options of a (sub)command"""
         self._generate_reset_options(c)
 
-        any_arg_is_choices = any(arg.choices is not None for arg in self.args)
-        if any_arg_is_choices:
+        # shared by all commands, so only emitted once
+        if with_set_includes:
             self._generate_set_includes(c)
 
+        any_arg_is_choices = any(arg.choices is not None for arg in self.args)
+
+        if self.allow_abbrev:
+            self._generate_abbreviations_table(c)
+        if self.reorders_options():
+            self._generate_known_options(c)
+        if self.allow_abbrev or self.reorders_options():
+            self._generate_valued_shorts(c)
+        self._generate_hashed_choices(c)
+
         with c.func(
-            "parse_options",
-            ["int argc", "const char ***argv", "Options* opts"],
+            self.scoped("parse_options"),
+            [
+                "int argc",
+                "const char ***argv",
+                self.scoped("Options") + "* opts",
+            ],
             ret="int",
         ):
             # int parse_options(int argc, const char ***argv, Options* opts) {
@@ -307,9 +968,17 @@ class CArgparseCodeGenerator(CodeGenerator):
                 c.emit('"basic [options] positionals [[--] args]",')
                 c.emit('"basic [options] positionals ",')
                 c.emit("NULL,")
-            c.emit("reset_options(opts);")
+            if self.trace:
+                c.emit("const char *trace = trace_destination();")
+                c.emit("const int trace_tokens = argc - 1;")
+                c.emit("double trace_marks[4] = {0};")
+                self._generate_trace_mark(c, 0)
+            c.emit(self.scoped("reset_options") + "(opts);")
+            if self.env_bindings():
+                self._generate_env_defaults(c)
 
             self._generate_option_struct(c)
+            reordered = self._generate_dispatch_struct(c)
 
             c.emit("struct argparse argparse;")
             c.emit("argparse_init(&argparse, options, usages, 0);")
@@ -317,28 +986,1236 @@ class CArgparseCodeGenerator(CodeGenerator):
             # generate help, append positional help at the end
             self._generatel_help_block(c)
 
+            if self.allow_abbrev:
+                self._generate_check_abbreviations_block(c)
+            if reordered:
+                self._generate_check_unknown_block(c)
+                c.emit("argparse.options = dispatch;")
             c.emit("argc = argparse_parse(&argparse, argc, *argv);")
+            if reordered:
+                c.emit("argparse.options = options;")
+            if self.trace:
+                self._generate_trace_mark(c, 1)
 
             self._generate_assing_positionals_block(c)
             self._generate_flag_inverter_block(c)
             self._generate_check_missing_args_block(c)
+            if self.trace:
+                self._generate_trace_mark(c, 2)
 
             # if there is any 'choices' option, check here
             if any_arg_is_choices:
                 self._generate_check_choices_block(c)
 
+            if self.trace:
+                command = "NULL"
+                if self.command is not None:
+                    command = double_quote(self.command.name)
+                with c.if_then("trace != NULL"):
+                    c.emit("trace_marks[3] = trace_now_us();")
+                    c.emit(
+                        f"trace_line(trace, {command}, trace_tokens, "
+                        "trace_marks);"
+                    )
+            if self.usage_counters:
+                c.emit(f"count_run(&{self.scoped('usage_runs')});")
             c.emit("return argc;")
 
         self._generate_dump_options(c)
 
-        self.to_file(str(c), filename_base + ".c")
+    def _generate_commands_dispatch(self, c: CEmitter) -> None:
+        """
+        parse_options/dump_options jumping through a table sorted by
+        command name to the functions of the selected command, so only
+        its option table gets built and checked
+        """
+        commands = sorted(self.commands, key=lambda command: command.name)
 
-    def generate_h_code(self, filename_base: str) -> None:
-        """generate .h file"""
+        with c.static_func("usage_commands", ["FILE *out"]):
+            c.emit(
+                f'fprintf(out, "Usage: {self.program_name} '
+                'COMMAND [options]\\n");'
+            )
+            c.emit(
+                f'fprintf(out, "\\n{self.description}\\n\\ncommands:\\n");'
+            )
+            left_size = 1 + max(len(cmd.name) for cmd in commands)
+            for command in self.commands:
+                padding = " " * (left_size - len(command.name))
+                c.emit(
+                    f'fprintf(out, "  {command.name}{padding}: {command.help_}\\n");'
+                )
+            if self.epilog:
+                c.emit(f'fprintf(out, "\\n{self.epilog}\\n");')
+
+        for command in commands:
+            scoped = self.for_command(command).scoped
+            with c.static_func(
+                scoped("parse_command"),
+                ["int argc", "const char ***argv", "Options* opts"],
+                ret="int",
+            ):
+                c.emit(
+                    f"return {scoped('parse_options')}"
+                    f"(argc, argv, &opts->{command.ident});"
+                )
+
+        c.emit("typedef struct {")
+        with Indenter(c):
+            c.emit("const char *name;")
+            c.emit("int (*parse)(int argc, const char ***argv, Options* opts);")
+        c.emit("} Command;")
+        c.new_line()
+        c.cmnt("sorted by name, for bsearch")
+        with Indenter(c, "static const Command commands[] = {", "};"):
+            for command in commands:
+                scoped = self.for_command(command).scoped
+                c.emit(f'{{"{command.name}", {scoped("parse_command")}}},')
+        c.new_line()
+
+        with c.static_func(
+            "compare_command",
+            ["const void *key", "const void *command"],
+            ret="int",
+        ):
+            c.emit(
+                "return strcmp((const char *)key, "
+                "((const Command *)command)->name);"
+            )
+
+        with c.func(
+            "parse_options",
+            ["int argc", "const char ***argv", "Options* opts"],
+            ret="int",
+        ):
+            c.emit("const char *name = argc > 1 ? (*argv)[1] : NULL;")
+            c.emit("const Command *command = NULL;")
+            with c.if_then("name != NULL"):
+                c.emit(
+                    "command = bsearch(name, commands, "
+                    "sizeof(commands) / sizeof(commands[0]), "
+                    "sizeof(commands[0]), compare_command);"
+                )
+            with c.if_then("command == NULL"):
+                help_cond = (
+                    'name != NULL && (strcmp(name, "-h") == 0 || '
+                    'strcmp(name, "--help") == 0)'
+                )
+                with c.if_then(help_cond):
+                    c.emit("usage_commands(stdout);")
+                    c.emit("exit(0);")
+                with c.if_then("name != NULL"):
+                    c.emit(
+                        "printf(\"ERROR: unknown command '%s'\\n\", name);"
+                    )
+                c.emit("usage_commands(stdout);")
+                c.emit("exit(1);")
+            c.emit("opts->command = command->name;")
+            c.cmnt("the command name takes the place of the program name")
+            c.emit("(*argv)++;")
+            c.emit("return command->parse(argc - 1, argv, opts);")
+
+        with c.func("dump_options", ["Options *opts"]):
+            c.emit('printf("command: %s\\n", opts->command);')
+            for command in self.commands:
+                scoped = self.for_command(command).scoped
+                cond = f'strcmp(opts->command, "{command.name}") == 0'
+                with c.if_then(cond):
+                    c.emit(
+                        f"{scoped('dump_options')}(&opts->{command.ident});"
+                    )
+
+    # ----- environment variable bindings -----
+
+    def _generate_env_runtime(self, c: CEmitter) -> None:
+        """
+        Generates the single scan of the environment looking up the bound
+        variables, shared by all commands (and by both modes), and the
+        conversions of the values of default mode
+        """
+        c.emit("extern char **environ;")
+        c.new_line()
+        c.cmnt("bsearch comparison of an environ entry (NAME=value) with a name")
+        with c.static_func(
+            "compare_env", ["const void *entry", "const void *name"], ret="int"
+        ):
+            c.emit("const char *e = (const char *)entry;")
+            c.emit("const char *n = *(const char *const *)name;")
+            with c.while_loop("*e == *n && *n != '\\0'"):
+                c.emit("e++;")
+                c.emit("n++;")
+            c.cmnt("the '=' ends the name of the entry")
+            c.emit("return (*e == '=' ? 0 : (unsigned char)*e) - (unsigned char)*n;")
+
+        c.cmnt("values (after the '=') of the variables names (sorted) set in the")
+        c.cmnt("environment, NULL for the others: environ is scanned once, each")
+        c.cmnt("of its entries looked up in names, instead of a getenv per name")
+        with c.static_func(
+            "scan_environment",
+            ["const char *const *names", "size_t count", "const char **values"],
+        ):
+            with Indenter(c, "for (size_t i = 0; i < count; i++) {", "}"):
+                c.emit("values[i] = NULL;")
+            with Indenter(
+                c, "for (char **entry = environ; *entry != NULL; entry++) {", "}"
+            ):
+                with Indenter(c, "const char *const *name = bsearch(", ");"):
+                    c.emit("*entry, names, count, sizeof(names[0]), compare_env")
+                c.cmnt("the first one wins, as for getenv")
+                with c.if_then("name != NULL && values[name - names] == NULL"):
+                    c.emit("values[name - names] = *entry + strlen(*name) + 1;")
+
+        c.cmnt("1 / 0 for the true / false values of a flag variable, -1 if none")
+        with c.static_func("env_flag", ["const char *value"], ret="int"):
+            with Indenter(c, "static const char *const values[] = {", "};"):
+                c.emit('"1", "true", "yes", "on", "0", "false", "no", "off", "",')
+            with Indenter(c, "for (int i = 0; i < 9; i++) {", "}"):
+                with c.if_then("strcasecmp(value, values[i]) == 0"):
+                    c.emit("return i < 4;")
+            c.emit("return -1;")
+        if self.library:
+            return
+
+        c.cmnt("value of a flag variable, exits if it isn't one")
+        with c.static_func(
+            "env_bool", ["const char *name", "const char *value"], ret="int"
+        ):
+            c.emit("int flag = env_flag(value);")
+            with c.if_then("flag < 0"):
+                c.emit(
+                    "printf(\"ERROR: %s: invalid flag value '%s'\\n\", name, value);"
+                )
+                c.emit("exit(1);")
+            c.emit("return flag;")
+
+        c.cmnt("value of an int variable, exits if it isn't one")
+        with c.static_func(
+            "env_int", ["const char *name", "const char *value"], ret="int"
+        ):
+            c.emit("char *end;")
+            c.emit("errno = 0;")
+            c.emit("long number = strtol(value, &end, 0);")
+            with c.if_then(
+                "end == value || *end != '\\0' || errno != 0 || "
+                "number < INT_MIN || number > INT_MAX"
+            ):
+                c.emit(
+                    "printf(\"ERROR: %s: invalid int value '%s'\\n\", name, value);"
+                )
+                c.emit("exit(1);")
+            c.emit("return (int)number;")
+
+        c.cmnt("value of a float variable, exits if it isn't one")
+        with c.static_func(
+            "env_float", ["const char *name", "const char *value"], ret="float"
+        ):
+            c.emit("char *end;")
+            c.emit("errno = 0;")
+            c.emit("float number = strtof(value, &end);")
+            with c.if_then("end == value || *end != '\\0' || errno != 0"):
+                c.emit(
+                    "printf(\"ERROR: %s: invalid float value '%s'\\n\", name, value);"
+                )
+                c.emit("exit(1);")
+            c.emit("return number;")
+
+    def _generate_env_names(self, c: CEmitter, name: str) -> None:
+        """sorted table of the variables of the bound options, for bsearch"""
+        c.emit(f"static const char *const {name}[] = {{")
+        emit_wrapped(c, [c_string(arg.env) for arg in self.env_bindings()])
+        c.emit("};")
+
+    def _generate_env_defaults(self, c: CEmitter) -> None:
+        """
+        assign the options bound to variables set in the environment, in
+        internal polarity for flags, before argparse parses argv over them
+        """
+        bindings = self.env_bindings()
+        c.cmnt("the variables of the bound options, looked up in one scan")
+        self._generate_env_names(c, "env_names")
+        c.emit(f"const char *env[{len(bindings)}];")
+        c.emit(f"scan_environment(env_names, {len(bindings)}, env);")
+        for idx, arg in enumerate(bindings):
+            with c.if_then(f"env[{idx}] != NULL"):
+                if arg.type_ == "flag" and get_default(arg) != "0":
+                    value = f'!env_bool("{arg.env}", env[{idx}])'
+                elif arg.type_ == "flag":
+                    value = f'env_bool("{arg.env}", env[{idx}])'
+                elif arg.type_ == "int":
+                    value = f'env_int("{arg.env}", env[{idx}])'
+                elif arg.type_ == "float":
+                    value = f'env_float("{arg.env}", env[{idx}])'
+                else:
+                    value = f"env[{idx}]"
+                c.emit(f"opts->{arg.dest} = {value};")
+
+    def _generate_library_env_tables(self, c: CEmitter) -> None:
+        """the bound variables of a (sub)command, sorted, and their options"""
+        options = sorted(
+            (arg for arg in self.args if not arg.is_positional),
+            key=lambda arg: arg.name,
+        )
+        c.cmnt("bound environment variables, sorted for bsearch, and their options")
+        self._generate_env_names(c, self.scoped("env_names"))
+        env_options = self.scoped("env_options")
+        with Indenter(c, f"static const OptionSpec *const {env_options}[] = {{", "};"):
+            for arg in self.env_bindings():
+                c.emit(f"&{self.scoped('options')}[{options.index(arg)}],")
+
+    def _generate_library_store_environment(self, c: CEmitter) -> None:
+        """
+        Generates the store of the values of the bound variables set in the
+        environment, checked as if given on the command line
+        """
+        c.cmnt("store the values (see scan_environment) of the options bound to")
+        c.cmnt("the variables names, checked as if given in argv")
+        with c.static_func(
+            "store_environment",
+            [
+                "const char *const *names",
+                "const OptionSpec *const *options",
+                "size_t count",
+                "const char **values",
+                "void *opts",
+                "char *error",
+                "size_t error_size",
+            ],
+            ret="int",
+        ):
+            c.emit("scan_environment(names, count, values);")
+            with Indenter(c, "for (size_t i = 0; i < count; i++) {", "}"):
+                c.emit("int status;")
+                with c.if_then("values[i] == NULL"):
+                    c.emit("continue;")
+                with c.if_then("options[i]->type == 'b'"):
+                    c.emit("int flag = env_flag(values[i]);")
+                    with c.if_then("flag < 0"):
+                        with Indenter(c, "return fail(", ");"):
+                            c.emit("error, error_size, CLIMETA_INVALID_VALUE,")
+                            c.emit("\"%s expects a flag value, got '%s'\",")
+                            c.emit("names[i], values[i]")
+                    c.emit(
+                        "*(int *)((char *)opts + options[i]->offset) = flag;"
+                    )
+                    c.emit("continue;")
+                c.emit(
+                    "status = store_option(options[i], values[i], opts, "
+                    "error, error_size);"
+                )
+                with c.if_then("status < 0"):
+                    with c.if_then("error != NULL && error_size > 0"):
+                        c.emit("size_t len = strlen(error);")
+                        c.emit(
+                            "snprintf(error + len, error_size - len, "
+                            '" (from %s)", names[i]);'
+                        )
+                    c.emit("return status;")
+            c.emit("return 0;")
+
+    # ----- hand-off encoding -----
+
+    def _generate_handoff_helpers(self, c: CEmitter, types: set) -> None:
+        """
+        fields of the hand-off encoding (see CodeGenerator.handoff_header),
+        the helpers of the given argument types only
+        """
+        c.cmnt("text appended at buf + len if it fits (keeping room for the")
+        c.cmnt("'\\0'), the new length either way, as snprintf")
+        with c.static_func(
+            "handoff_append",
+            [
+                "char *buf",
+                "size_t size",
+                "size_t len",
+                "const char *text",
+                "size_t count",
+            ],
+            ret="size_t",
+        ):
+            with c.if_then("len + count < size"):
+                c.emit("memcpy(buf + len, text, count);")
+            c.emit("return len + count;")
+
+        c.cmnt("hand-off field of value: ~ if NULL, else <bytes>:<value>")
+        with c.static_func(
+            "handoff_put",
+            ["char *buf", "size_t size", "size_t len", "const char *value"],
+            ret="size_t",
+        ):
+            c.emit("char prefix[24];")
+            with c.if_then("value == NULL"):
+                c.emit('return handoff_append(buf, size, len, "~", 1);')
+            c.emit("size_t count = strlen(value);")
+            c.emit('int prefix_len = sprintf(prefix, "%lu:", (unsigned long)count);')
+            c.emit("len = handoff_append(buf, size, len, prefix, prefix_len);")
+            c.emit("return handoff_append(buf, size, len, value, count);")
+
+        if "int" in types:
+            with c.static_func(
+                "handoff_put_int",
+                ["char *buf", "size_t size", "size_t len", "int value"],
+                ret="size_t",
+            ):
+                c.emit("char text[16];")
+                with c.if_then("value == INT_MIN"):
+                    c.emit("return handoff_put(buf, size, len, NULL);")
+                c.emit('sprintf(text, "%d", value);')
+                c.emit("return handoff_put(buf, size, len, text);")
+
+        if "float" in types:
+            with c.static_func(
+                "handoff_put_float",
+                ["char *buf", "size_t size", "size_t len", "float value"],
+                ret="size_t",
+            ):
+                c.emit("char text[32];")
+                with c.if_then("isnan(value)"):
+                    c.emit("return handoff_put(buf, size, len, NULL);")
+                c.cmnt("the fewest digits reading back the same float (9 always do)")
+                with Indenter(c, "for (int digits = 6; digits <= 9; digits++) {", "}"):
+                    c.emit('sprintf(text, "%.*g", digits, value);')
+                    with c.if_then("strtof(text, NULL) == value"):
+                        c.emit("break;")
+                c.emit("return handoff_put(buf, size, len, text);")
+
+        c.cmnt("next field of *data into *value (NULL for ~), made a string in")
+        c.cmnt("place: moved over its ':', so its last byte can hold the '\\0'")
+        with c.static_func("handoff_take", ["char **data", "char **value"], ret="int"):
+            c.emit("char *end;")
+            c.emit("unsigned long count;")
+            with c.if_then("**data == '~'"):
+                c.emit("*value = NULL;")
+                c.emit("(*data)++;")
+                c.emit("return 0;")
+            with c.if_then("**data < '0' || **data > '9'"):
+                c.emit("return -1;")
+            c.emit("count = strtoul(*data, &end, 10);")
+            with c.if_then("*end != ':' || memchr(end + 1, '\\0', count) != NULL"):
+                c.emit("return -1;")
+            c.emit("memmove(end, end + 1, count);")
+            c.emit("end[count] = '\\0';")
+            c.emit("*value = end;")
+            c.emit("*data = end + count + 1;")
+            c.emit("return 0;")
+
+        if "flag" in types:
+            with c.static_func(
+                "handoff_take_flag", ["char **data", "int *value"], ret="int"
+            ):
+                c.emit("char *text;")
+                with c.if_then("handoff_take(data, &text) != 0"):
+                    c.emit("return -1;")
+                c.emit('*value = text != NULL && strcmp(text, "1") == 0;')
+                c.emit("return 0;")
+
+        if "int" in types:
+            with c.static_func(
+                "handoff_take_int", ["char **data", "int *value"], ret="int"
+            ):
+                c.emit("char *text, *end;")
+                with c.if_then("handoff_take(data, &text) != 0"):
+                    c.emit("return -1;")
+                with c.if_then("text == NULL"):
+                    c.emit("*value = INT_MIN;")
+                    c.emit("return 0;")
+                c.emit("*value = (int)strtol(text, &end, 10);")
+                c.emit("return *text != '\\0' && *end == '\\0' ? 0 : -1;")
+
+        if "float" in types:
+            with c.static_func(
+                "handoff_take_float", ["char **data", "float *value"], ret="int"
+            ):
+                c.emit("char *text, *end;")
+                with c.if_then("handoff_take(data, &text) != 0"):
+                    c.emit("return -1;")
+                with c.if_then("text == NULL"):
+                    c.emit("*value = NAN;")
+                    c.emit("return 0;")
+                c.emit("*value = strtof(text, &end);")
+                c.emit("return *text != '\\0' && *end == '\\0' ? 0 : -1;")
+
+    def _generate_handoff_fields(self, c: CEmitter) -> None:
+        """encoding and decoding of the fields of a (sub)command"""
+        options = self.scoped("Options")
+        c.cmnt("the options as hand-off fields appended at buf + len")
+        with c.static_func(
+            self.scoped("encode_fields"),
+            [f"const {options} *opts", "char *buf", "size_t size", "size_t len"],
+            ret="size_t",
+        ):
+            for arg in self.args:
+                value = f"opts->{arg.dest}"
+                if arg.type_ == "flag":
+                    put = "handoff_put"
+                    value = f'{value} ? "1" : "0"'
+                elif arg.type_ == "string":
+                    put = "handoff_put"
+                else:
+                    put = f"handoff_put_{arg.type_}"
+                c.emit(f"len = {put}(buf, size, len, {value});")
+            c.emit("return len;")
+
+        c.cmnt("the options from the hand-off fields at *data, -1 if malformed")
+        with c.static_func(
+            self.scoped("decode_fields"),
+            ["char **data", f"{options} *opts"],
+            ret="int",
+        ):
+            strings = [arg for arg in self.args if arg.type_ == "string"]
+            if strings:
+                c.emit("char *text;")
+            for arg in self.args:
+                if arg.type_ == "string":
+                    with c.if_then("handoff_take(data, &text) != 0"):
+                        c.emit("return -1;")
+                    c.emit(f"opts->{arg.dest} = text;")
+                else:
+                    cond = f"handoff_take_{arg.type_}(data, &opts->{arg.dest}) != 0"
+                    with c.if_then(cond):
+                        c.emit("return -1;")
+            if not self.args:
+                c.emit("(void)data;")
+                c.emit("(void)opts;")
+            c.emit("return 0;")
+
+    def handoff_types(self) -> set:
+        """types of the arguments of the program and its commands"""
+        generators = [self.for_command(command) for command in self.commands]
+        return {
+            arg.type_ for generator in generators or [self] for arg in generator.args
+        }
+
+    def _generate_handoff(self, c: CEmitter) -> None:
+        """hand-off helpers, then encode_options/decode_options of the program"""
+        self._generate_handoff_helpers(c, self.handoff_types())
+        self._generate_handoff_options(c)
+
+    def _generate_handoff_options(self, c: CEmitter) -> None:
+        """encode_options/decode_options of the program, after the helpers"""
+        generators = [self.for_command(command) for command in self.commands]
+        for generator in generators or [self]:
+            generator._generate_handoff_fields(c)
+
+        header = self.handoff_header()
+        options = self.scoped("Options")
+        with c.func(
+            self.scoped("encode_options"),
+            [f"const {options} *opts", "char *buf", "size_t size"],
+            ret="size_t",
+        ):
+            c.emit(
+                f'size_t len = handoff_append(buf, size, 0, "{header}", '
+                f"{len(header)});"
+            )
+            if self.commands:
+                c.emit("len = handoff_put(buf, size, len, opts->command);")
+                for idx, generator in enumerate(generators):
+                    name = generator.command.name
+                    keyword = "if" if idx == 0 else "} else if"
+                    c.emit(f'{keyword} (strcmp(opts->command, "{name}") == 0) {{')
+                    with Indenter(c):
+                        c.emit(
+                            f"len = {generator.scoped('encode_fields')}"
+                            f"(&opts->{generator.command.ident}, buf, size, len);"
+                        )
+                c.emit("}")
+            else:
+                c.emit(f"len = {self.scoped('encode_fields')}(opts, buf, size, len);")
+            with c.if_then("size > 0"):
+                c.emit("buf[len < size ? len : size - 1] = '\\0';")
+            c.emit("return len;")
+
+        with c.func(
+            self.scoped("decode_options"),
+            ["char *encoded", f"{options} *opts"],
+            ret="int",
+        ):
+            c.emit("char *data = encoded;")
+            with c.if_then(f'strncmp(encoded, "{header}", {len(header)}) != 0'):
+                c.emit("return -1;")
+            c.emit(f"data += {len(header)};")
+            if self.commands:
+                c.emit("char *command;")
+                with c.if_then(
+                    "handoff_take(&data, &command) != 0 || command == NULL"
+                ):
+                    c.emit("return -1;")
+                for idx, generator in enumerate(generators):
+                    name = generator.command.name
+                    keyword = "if" if idx == 0 else "} else if"
+                    c.emit(f'{keyword} (strcmp(command, "{name}") == 0) {{')
+                    with Indenter(c):
+                        c.emit(f'opts->command = "{name}";')
+                        with c.if_then(
+                            f"{generator.scoped('decode_fields')}"
+                            f"(&data, &opts->{generator.command.ident}) != 0"
+                        ):
+                            c.emit("return -1;")
+                c.emit("} else {")
+                with Indenter(c):
+                    c.emit("return -1;")
+                c.emit("}")
+            else:
+                with c.if_then(f"{self.scoped('decode_fields')}(&data, opts) != 0"):
+                    c.emit("return -1;")
+            c.emit("return *data == '\\0' ? 0 : -1;")
+
+    # ----- library mode -----
+
+    def _generate_library_runtime(self, c: CEmitter) -> None:
+        """
+        Generates the option table driven parser of library mode, shared
+        by all commands. It only reads constant tables and writes to the
+        Options struct, the argv array and the error buffer given, so it
+        is reentrant and never allocates
+        """
+        c.emit("typedef struct {")
+        with Indenter(c):
+            c.emit("const char *name;  // --long name, or positional name")
+            c.emit("char short_name;  // '\\0' when there is none")
+            c.emit("char type;  // 'b' flag, 's' string, 'i' int, 'f' float")
+            c.emit("int flag_value;  // stored when a flag is given")
+            c.emit("size_t offset;  // of the field in the Options struct")
+            c.emit("const char *const *choices;  // NULL terminated, or NULL")
+            c.emit("const char *choices_text;")
+            c.emit("int (*choice_index)(const char *value);  // choices_file, or NULL")
+        c.emit("} OptionSpec;")
+        c.new_line()
+
+        with c.static_func(
+            "fail",
+            [
+                "char *error",
+                "size_t error_size",
+                "int status",
+                "const char *format",
+                "...",
+            ],
+            ret="int",
+        ):
+            with c.if_then("error != NULL && error_size > 0"):
+                c.emit("va_list args;")
+                c.emit("va_start(args, format);")
+                c.emit("vsnprintf(error, error_size, format, args);")
+                c.emit("va_end(args);")
+            c.emit("return status;")
+
+        with c.static_func(
+            "compare_option",
+            ["const void *key", "const void *option"],
+            ret="int",
+        ):
+            c.emit("const AbbreviationKey *k = (const AbbreviationKey *)key;")
+            c.emit("const char *name = ((const OptionSpec *)option)->name;")
+            c.emit("int cmp = strncmp(k->name, name, k->len);")
+            with c.if_then("cmp != 0"):
+                c.emit("return cmp;")
+            c.emit("return name[k->len] == '\\0' ? 0 : -1;")
+
+        c.cmnt("convert and store the value of an option (NULL for flags)")
+        with c.static_func(
+            "store_option",
+            [
+                "const OptionSpec *option",
+                "const char *value",
+                "void *opts",
+                "char *error",
+                "size_t error_size",
+            ],
+            ret="int",
+        ):
+            c.emit("char *field = (char *)opts + option->offset;")
+            c.emit("char *end;")
+            with c.if_then("option->type == 'b'"):
+                c.emit("*(int *)field = option->flag_value;")
+                c.emit("return 0;")
+            with c.if_then("option->type == 's'"):
+                if self.has_choices_files():
+                    with c.if_then(
+                        "option->choice_index != NULL && "
+                        "option->choice_index(value) < 0"
+                    ):
+                        c.emit(
+                            "const char *nearest = "
+                            "nearest_choice(option->choices, value);"
+                        )
+                        with Indenter(c, "return fail(", ");"):
+                            c.emit("error, error_size, CLIMETA_INVALID_CHOICE,")
+                            c.emit("\"'%s': invalid choice '%s'%s%s%s\",")
+                            c.emit("option->name, value,")
+                            c.emit('nearest != NULL ? " (did you mean \'" : "",')
+                            c.emit('nearest != NULL ? nearest : "",')
+                            c.emit('nearest != NULL ? "\'?)" : ""')
+                with c.if_then(
+                    "option->choices != NULL && option->choice_index == NULL"
+                ):
+                    c.emit("const char *const *choice = option->choices;")
+                    with c.while_loop(
+                        "*choice != NULL && strcmp(*choice, value) != 0"
+                    ):
+                        c.emit("choice++;")
+                    with c.if_then("*choice == NULL"):
+                        with Indenter(c, "return fail(", ");"):
+                            c.emit("error, error_size, CLIMETA_INVALID_CHOICE,")
+                            c.emit("\"'%s' must be one of %s\",")
+                            c.emit("option->name, option->choices_text")
+                c.emit("*(const char **)field = value;")
+                c.emit("return 0;")
+            c.emit("errno = 0;")
+            with c.if_then("option->type == 'i'"):
+                c.emit("long number = strtol(value, &end, 0);")
+                with c.if_then(
+                    "end == value || *end != '\\0' || errno != 0 || "
+                    "number < INT_MIN || number > INT_MAX"
+                ):
+                    with Indenter(c, "return fail(", ");"):
+                        c.emit("error, error_size, CLIMETA_INVALID_VALUE,")
+                        c.emit("\"'%s' expects an integer, got '%s'\",")
+                        c.emit("option->name, value")
+                c.emit("*(int *)field = (int)number;")
+                c.emit("return 0;")
+            c.emit("float number = strtof(value, &end);")
+            with c.if_then("end == value || *end != '\\0' || errno != 0"):
+                with Indenter(c, "return fail(", ");"):
+                    c.emit("error, error_size, CLIMETA_INVALID_VALUE,")
+                    c.emit("\"'%s' expects a number, got '%s'\",")
+                    c.emit("option->name, value")
+            c.emit("*(float *)field = number;")
+            c.emit("return 0;")
+
+        c.cmnt("value of option from the rest of the token (possibly empty,")
+        c.cmnt("as in --output=) or when rest is NULL from the next one")
+        with c.static_func(
+            "take_value",
+            [
+                "const OptionSpec *option",
+                "const char *rest",
+                "int argc",
+                "const char **argv",
+                "int *i",
+                "void *opts",
+                "char *error",
+                "size_t error_size",
+            ],
+            ret="int",
+        ):
+            with c.if_then("rest == NULL"):
+                with c.if_then("*i + 1 >= argc"):
+                    with Indenter(c, "return fail(", ");"):
+                        c.emit("error, error_size, CLIMETA_MISSING_VALUE,")
+                        c.emit("\"'%s' expects a value\", option->name")
+                c.emit("rest = argv[++*i];")
+            c.emit("return store_option(option, rest, opts, error, error_size);")
+
+        c.cmnt("parse argv[1..argc) against the options of a table sorted by")
+        c.cmnt("name. The other arguments are moved to the front of argv,")
+        c.cmnt("returns how many or a negative CLIMETA_* status")
+        with c.static_func(
+            "parse_table",
+            [
+                "int argc",
+                "const char **argv",
+                "void *opts",
+                "const OptionSpec *options",
+                "size_t count",
+                "const Abbreviation *abbreviations",
+                "size_t abbreviations_count",
+                "const char *usage",
+                "char *error",
+                "size_t error_size",
+            ],
+            ret="int",
+        ):
+            c.emit("int rest = 0;")
+            with Indenter(c, "for (int i = 1; i < argc; i++) {", "}"):
+                c.emit("const char *arg = argv[i];")
+                c.emit("const OptionSpec *option = NULL;")
+                c.emit("int status;")
+                with c.if_then("arg[0] != '-' || arg[1] == '\\0'"):
+                    c.emit("argv[rest++] = arg;")
+                    c.emit("continue;")
+                with c.if_then('strcmp(arg, "--") == 0'):
+                    with c.while_loop("++i < argc"):
+                        c.emit("argv[rest++] = argv[i];")
+                    c.emit("break;")
+                with c.if_then('strcmp(arg, "--help") == 0'):
+                    c.emit('return fail(error, error_size, CLIMETA_HELP, "%s", usage);')
+                with c.if_then("arg[1] == '-'"):
+                    c.emit("const char *equal = strchr(arg, '=');")
+                    c.emit("AbbreviationKey key;")
+                    c.emit("key.name = arg;")
+                    c.emit(
+                        "key.len = equal ? (size_t)(equal - arg) : strlen(arg);"
+                    )
+                    c.emit(
+                        "option = bsearch(&key, options, count, "
+                        "sizeof(options[0]), compare_option);"
+                    )
+                    with c.if_then("option == NULL && abbreviations != NULL"):
+                        with Indenter(
+                            c, "const Abbreviation *found = bsearch(", ");"
+                        ):
+                            c.emit("&key, abbreviations, abbreviations_count,")
+                            c.emit("sizeof(abbreviations[0]), compare_abbreviation")
+                        with c.if_then("found != NULL && found->option == NULL"):
+                            with Indenter(c, "return fail(", ");"):
+                                c.emit("error, error_size, CLIMETA_AMBIGUOUS_OPTION,")
+                                c.emit('"%s", found->message')
+                        with c.if_then(
+                            'found != NULL && strcmp(found->option, "--help") == 0'
+                        ):
+                            with Indenter(c, "return fail(", ");"):
+                                c.emit('error, error_size, CLIMETA_HELP, "%s", usage')
+                        with c.if_then("found != NULL"):
+                            c.emit("AbbreviationKey full;")
+                            c.emit("full.name = found->option;")
+                            c.emit("full.len = strlen(found->option);")
+                            c.emit(
+                                "option = bsearch(&full, options, count, "
+                                "sizeof(options[0]), compare_option);"
+                            )
+                    with c.if_then("option == NULL"):
+                        with Indenter(c, "return fail(", ");"):
+                            c.emit("error, error_size, CLIMETA_UNKNOWN_OPTION,")
+                            c.emit("\"unknown option '%.*s'\", (int)key.len, arg")
+                    with c.if_then("option->type != 'b'"):
+                        with Indenter(c, "status = take_value(", ");"):
+                            c.emit("option, equal ? equal + 1 : NULL,")
+                            c.emit("argc, argv, &i, opts, error, error_size")
+                        with c.if_then("status < 0"):
+                            c.emit("return status;")
+                        c.emit("continue;")
+                    with c.if_then("equal != NULL"):
+                        with Indenter(c, "return fail(", ");"):
+                            c.emit("error, error_size, CLIMETA_INVALID_VALUE,")
+                            c.emit("\"'%s' takes no value\", option->name")
+                    c.emit("store_option(option, NULL, opts, error, error_size);")
+                    c.emit("continue;")
+                c.cmnt("shorts, bundled flags (-vq) and values (-i1, -i 1)")
+                with Indenter(
+                    c, "for (const char *p = arg + 1; *p != '\\0'; p++) {", "}"
+                ):
+                    with c.if_then("*p == 'h'"):
+                        c.emit(
+                            'return fail(error, error_size, CLIMETA_HELP, "%s", usage);'
+                        )
+                    c.emit("option = NULL;")
+                    with Indenter(
+                        c,
+                        "for (size_t j = 0; j < count && option == NULL; j++) {",
+                        "}",
+                    ):
+                        with c.if_then("options[j].short_name == *p"):
+                            c.emit("option = &options[j];")
+                    with c.if_then("option == NULL"):
+                        with Indenter(c, "return fail(", ");"):
+                            c.emit("error, error_size, CLIMETA_UNKNOWN_OPTION,")
+                            c.emit("\"unknown option '-%c'\", *p")
+                    with c.if_then("option->type != 'b'"):
+                        with Indenter(c, "status = take_value(", ");"):
+                            c.emit("option, p[1] != '\\0' ? p + 1 : NULL,")
+                            c.emit("argc, argv, &i, opts, error, error_size")
+                        with c.if_then("status < 0"):
+                            c.emit("return status;")
+                        c.emit("break;")
+                    c.emit("store_option(option, NULL, opts, error, error_size);")
+            c.emit("return rest;")
+
+    def _library_usage(self) -> str:
+        """help text of a (sub)command, computed at generation time"""
+        program_name = self.program_name
+        if self.command is not None:
+            program_name += " " + self.command.name
+        positionals = [arg for arg in self.args if arg.is_positional]
+        options = [arg for arg in self.args if not arg.is_positional]
+        usage = " ".join(
+            [f"Usage: {program_name} [options]"]
+            + [arg.clean_name for arg in positionals]
+        )
+        lines = [usage, "", self.description]
+
+        def row(left: str, help_: str) -> str:
+            padding = " " * max(1, 22 - len(left))
+            return f"    {left}{padding}{help_}"
+
+        if positionals:
+            lines += ["", "Positional arguments:"]
+            lines += [row(arg.clean_name, arg.help_) for arg in positionals]
+        lines += ["", "Options:"]
+        lines.append(row("-h, --help", "show this help message and exit"))
+        for arg in options:
+            left = f"-{arg.clean_short}, " if arg.clean_short else ""
+            left += arg.name
+            if arg.type_ != "flag":
+                left += f" {arg.metavar}"
+            lines.append(row(left, f"{arg.help_} {get_help_suffix(arg)}"))
+        if self.epilog:
+            lines += ["", self.epilog]
+        return "\n".join(lines) + "\n"
+
+    def _library_commands_usage(self) -> str:
+        """help text listing the commands, computed at generation time"""
+        left_size = 1 + max(len(cmd.name) for cmd in self.commands)
+        lines = [
+            f"Usage: {self.program_name} COMMAND [options]",
+            "",
+            self.description,
+            "",
+            "commands:",
+        ]
+        for command in self.commands:
+            padding = " " * (left_size - len(command.name))
+            lines.append(f"  {command.name}{padding}: {command.help_}")
+        if self.epilog:
+            lines += ["", self.epilog]
+        return "\n".join(lines) + "\n"
+
+    def _library_option_spec(self, arg: ArgSpec) -> str:
+        """OptionSpec initializer of an argument"""
+        name = arg.clean_name if arg.is_positional else arg.name
+        short = arg.clean_short if arg.clean_short != "" else "\\0"
+        flag_value = 0 if arg.type_ == "flag" and arg.default else 1
+        options = self.scoped("Options")
+        choices, choices_text, choice_index = "NULL", "NULL", "NULL"
+        if arg.choices_file:
+            choices = self.scoped(f"{arg.dest}_choices")
+            choice_index = self.scoped(f"{arg.dest}_choice_index")
+        elif arg.choices is not None:
+            choices = self.scoped(f"{arg.dest}_choices")
+            choices_text = f'"{single_quote_list(arg.choices)}"'
+        return (
+            f"{{\"{name}\", '{short}', '{LIBRARY_TYPES[arg.type_]}', "
+            f"{flag_value}, offsetof({options}, {arg.dest}), "
+            f"{choices}, {choices_text}, {choice_index}}},"
+        )
+
+    def _generate_library_tables(self, c: CEmitter) -> None:
+        """usage, choices and option tables of a (sub)command"""
+        if any(arg.multiple for arg in self.args):
+            raise RuntimeError(
+                "c_argparse_generator does not support 'multiple' yet"
+            )
+        with Indenter(
+            c, f"static const char {self.scoped('usage')}[] =", ";"
+        ):
+            for line in self._library_usage().splitlines(keepends=True):
+                c.emit(c_string(line))
+        c.new_line()
+
+        self._generate_hashed_choices(c)
+        for arg in self.args:
+            if arg.choices is not None and not arg.choices_file:
+                c.emit(
+                    "static const char *const "
+                    f"{self.scoped(arg.dest + '_choices')}[] "
+                    f"= {{{double_quote_list(arg.choices)}, NULL}};"
+                )
+
+        options = sorted(
+            (arg for arg in self.args if not arg.is_positional),
+            key=lambda arg: arg.name,
+        )
+        c.cmnt("sorted by name, for bsearch")
+        with Indenter(
+            c, f"static const OptionSpec {self.scoped('options')}[] = {{", "};"
+        ):
+            for arg in options:
+                c.emit(self._library_option_spec(arg))
+            if not options:
+                c.emit("{NULL, '\\0', 'b', 0, 0, NULL, NULL, NULL},")
+
+        positionals = [arg for arg in self.args if arg.is_positional]
+        if positionals:
+            with Indenter(
+                c,
+                f"static const OptionSpec {self.scoped('positionals')}[] = {{",
+                "};",
+            ):
+                for arg in positionals:
+                    c.emit(self._library_option_spec(arg))
+        if self.env_bindings():
+            self._generate_library_env_tables(c)
+        c.new_line()
+
+    def _generate_library_parse_options(self, c: CEmitter) -> None:
+        """reset_options, parse_options and dump_options of a (sub)command"""
+        self._generate_reset_options(c)
+        if self.allow_abbrev:
+            self._generate_abbreviations_table(c)
+        self._generate_library_tables(c)
+
+        options = self.scoped("options")
+        has_options = any(not arg.is_positional for arg in self.args)
+        count = f"sizeof({options}) / sizeof({options}[0])" if has_options else "0"
+        abbreviations, abbreviations_count = "NULL", "0"
+        if self.allow_abbrev:
+            abbreviations = self.scoped("abbreviations")
+            abbreviations_count = (
+                f"sizeof({abbreviations}) / sizeof({abbreviations}[0])"
+            )
+
+        with c.func(
+            self.scoped("parse_options"),
+            [
+                "int argc",
+                "const char ***argv",
+                self.scoped("Options") + "* opts",
+                "char *error",
+                "size_t error_size",
+            ],
+            ret="int",
+        ):
+            if self.trace:
+                c.emit("const char *trace = trace_destination();")
+                c.emit("const int trace_tokens = argc - 1;")
+                c.emit("double trace_marks[4] = {0};")
+                self._generate_trace_mark(c, 0)
+            c.emit(self.scoped("reset_options") + "(opts);")
+            bindings = self.env_bindings()
+            if bindings:
+                c.emit(f"const char *env[{len(bindings)}];")
+                with Indenter(c, "int status = store_environment(", ");"):
+                    c.emit(
+                        f"{self.scoped('env_names')}, {self.scoped('env_options')}, "
+                        f"{len(bindings)}, env,"
+                    )
+                    c.emit("opts, error, error_size")
+                with c.if_then("status < 0"):
+                    c.emit("return status;")
+            with Indenter(c, "argc = parse_table(", ");"):
+                c.emit(f"argc, *argv, opts, {options}, {count},")
+                c.emit(f"{abbreviations}, {abbreviations_count},")
+                c.emit(f"{self.scoped('usage')}, error, error_size")
+            with c.if_then("argc < 0"):
+                c.emit("return argc;")
+            if self.trace:
+                self._generate_trace_mark(c, 1)
+
+            c.cmnt("positionals")
+            positionals = [arg for arg in self.args if arg.is_positional]
+            if positionals and not bindings:
+                c.emit("int status;")
+            for idx, arg in enumerate(positionals):
+                with c.if_then("argc < 1"):
+                    with Indenter(c, "return fail(", ");"):
+                        c.emit("error, error_size, CLIMETA_MISSING_ARGUMENT,")
+                        c.emit(
+                            f"\"expecting positional argument '{arg.clean_name}'\""
+                        )
+                with Indenter(c, "status = store_option(", ");"):
+                    c.emit(f"&{self.scoped('positionals')}[{idx}], (*argv)[0],")
+                    c.emit("opts, error, error_size")
+                with c.if_then("status < 0"):
+                    c.emit("return status;")
+                c.emit("(*argv)++; argc--;")
+
+            for arg in self.args:
+                if arg.is_positional or arg.has_default:
+                    continue
+                cond = f"opts->{arg.dest} == {ungiven_default(arg.type_)}"
+                if arg.type_ == "float":
+                    cond = f"isnan(opts->{arg.dest})"
+                with c.if_then(cond):
+                    with Indenter(c, "return fail(", ");"):
+                        c.emit("error, error_size, CLIMETA_MISSING_ARGUMENT,")
+                        c.emit(f"\"expecting required argument '{arg.name}'\"")
+
+            if self.trace:
+                command = "NULL"
+                if self.command is not None:
+                    command = double_quote(self.command.name)
+                c.cmnt("choices are checked while parsing")
+                with c.if_then("trace != NULL"):
+                    c.emit("trace_marks[2] = trace_marks[3] = trace_now_us();")
+                    c.emit(
+                        f"trace_line(trace, {command}, trace_tokens, "
+                        "trace_marks);"
+                    )
+            c.emit("return argc;")
+
+        self._generate_dump_options(c)
+
+    def _generate_library_commands_dispatch(self, c: CEmitter) -> None:
+        """library mode parse_options/dump_options of a spec with commands"""
+        commands = sorted(self.commands, key=lambda command: command.name)
+
+        commands_usage = self.scoped("commands_usage")
+        with Indenter(c, f"static const char {commands_usage}[] =", ";"):
+            for line in self._library_commands_usage().splitlines(keepends=True):
+                c.emit(c_string(line))
+        c.new_line()
+
+        parse_args = [
+            "int argc",
+            "const char ***argv",
+            self.scoped("Options") + "* opts",
+            "char *error",
+            "size_t error_size",
+        ]
+        for command in commands:
+            scoped = self.for_command(command).scoped
+            with c.static_func(scoped("parse_command"), parse_args, ret="int"):
+                c.emit(
+                    f"return {scoped('parse_options')}"
+                    f"(argc, argv, &opts->{command.ident}, error, error_size);"
+                )
+
+        c.emit("typedef struct {")
+        with Indenter(c):
+            c.emit("const char *name;")
+            c.emit(f"int (*parse)({', '.join(parse_args)});")
+        c.emit(f"}} {self.scoped('Command')};")
+        c.new_line()
+        c.cmnt("sorted by name, for bsearch")
+        command_type = self.scoped("Command")
+        commands_table = self.scoped("commands")
+        with Indenter(
+            c, f"static const {command_type} {commands_table}[] = {{", "};"
+        ):
+            for command in commands:
+                scoped = self.for_command(command).scoped
+                c.emit(f'{{"{command.name}", {scoped("parse_command")}}},')
+        c.new_line()
+
+        compare_command = self.scoped("compare_command")
+        with c.static_func(
+            compare_command,
+            ["const void *key", "const void *command"],
+            ret="int",
+        ):
+            c.emit(
+                "return strcmp((const char *)key, "
+                f"((const {command_type} *)command)->name);"
+            )
+
+        with c.func(self.scoped("parse_options"), parse_args, ret="int"):
+            c.emit("const char *name = argc > 1 ? (*argv)[1] : NULL;")
+            c.emit(f"const {command_type} *command = NULL;")
+            with c.if_then("name != NULL"):
+                c.emit(
+                    f"command = bsearch(name, {commands_table}, "
+                    f"sizeof({commands_table}) / sizeof({commands_table}[0]), "
+                    f"sizeof({commands_table}[0]), {compare_command});"
+                )
+            with c.if_then("command == NULL"):
+                help_cond = (
+                    'name != NULL && (strcmp(name, "-h") == 0 || '
+                    'strcmp(name, "--help") == 0)'
+                )
+                with c.if_then(help_cond):
+                    with Indenter(c, "return fail(", ");"):
+                        c.emit(
+                            'error, error_size, CLIMETA_HELP, "%s", '
+                            + commands_usage
+                        )
+                with c.if_then("name != NULL"):
+                    with Indenter(c, "return fail(", ");"):
+                        c.emit("error, error_size, CLIMETA_UNKNOWN_COMMAND,")
+                        c.emit("\"unknown command '%s'\", name")
+                with Indenter(c, "return fail(", ");"):
+                    c.emit("error, error_size, CLIMETA_UNKNOWN_COMMAND,")
+                    c.emit(f'"expecting a command\\n%s", {commands_usage}')
+            c.emit("opts->command = command->name;")
+            c.cmnt("the command name takes the place of the program name")
+            c.emit("(*argv)++;")
+            c.emit("return command->parse(argc - 1, argv, opts, error, error_size);")
+
+        options = self.scoped("Options")
+        with c.func(self.scoped("dump_options"), [options + " *opts"]):
+            c.emit('printf("command: %s\\n", opts->command);')
+            for command in self.commands:
+                scoped = self.for_command(command).scoped
+                cond = f'strcmp(opts->command, "{command.name}") == 0'
+                with c.if_then(cond):
+                    c.emit(
+                        f"{scoped('dump_options')}(&opts->{command.ident});"
+                    )
+
+    def _generate_library_parsers(self, c: CEmitter) -> None:
+        """library mode parse_options of the program or of its commands"""
+        generators = [self.for_command(command) for command in self.commands]
+        for generator in generators or [self]:
+            generator._generate_library_parse_options(c)
+        if self.commands:
+            self._generate_library_commands_dispatch(c)
+
+    def generate_c_code(self, filename_base: str):
+        """generate .c code"""
         c = CEmitter()
 
-        c.header_guard_begin(filename_base)
+        c.include(filename_base + ".h")
+        if not self.library:
+            c.include("argparse.h")
+        c.include_sys("stdio.h", "stdlib.h", "string.h", "limits.h", "math.h")
+        if self.library:
+            c.include_sys("errno.h", "stdarg.h", "stddef.h")
+        elif self.has_env_bindings():
+            c.include_sys("errno.h")
+        if self.has_env_bindings():
+            c.include_sys("strings.h")
+        if self.has_choices_files():
+            c.include_sys("stdint.h")
+        if self.trace:
+            c.include_sys("time.h")
+        if self.usage_counters and not self.library:
+            c.include_sys("fcntl.h", "unistd.h")
+        c.emit("\n")
+
+        if self.trace:
+            self._generate_trace_helpers(c)
+        if self.has_choices_files():
+            self._generate_choices_runtime(c)
+        if self.has_env_bindings():
+            self._generate_env_runtime(c)
+
+        generators = [self.for_command(command) for command in self.commands]
+        if not generators:
+            generators = [self]
+
+        if self.library:
+            if self.usage_counters:
+                # the counters are global and written at exit, library mode
+                # keeps no state and is called from any thread
+                raise RuntimeError(
+                    "c_argparse_generator does not support 'usage_counters' "
+                    "in library mode"
+                )
+            # no argparse.h, the option tables are parsed by own code
+            self._generate_abbreviation_types(c)
+            self._generate_library_runtime(c)
+            if self.has_env_bindings():
+                self._generate_library_store_environment(c)
+            self._generate_library_parsers(c)
+            if self.handoff:
+                self._generate_handoff(c)
+            self.to_file(str(c), filename_base + ".c")
+            return
 
+        if self.allow_abbrev:
+            self._generate_expand_abbreviations(c)
+        if self.has_dispatch_order():
+            self._generate_help_in_spec_order(c)
+            self._generate_unknown_option(c)
+        if self.usage_counters:
+            self._generate_usage_counters(c)
+
+        any_arg_is_choices = any(
+            arg.choices is not None and not arg.choices_file
+            for generator in generators
+            for arg in generator.args
+        )
+        for i, generator in enumerate(generators):
+            generator._generate_parse_options(c, any_arg_is_choices and i == 0)
+
+        if self.commands:
+            self._generate_commands_dispatch(c)
+        if self.handoff:
+            self._generate_handoff(c)
+
+        self.to_file(str(c), filename_base + ".c")
+
+    def _generate_options_struct(self, c: CEmitter) -> None:
+        """typedef of the Options struct of a (sub)command"""
         c.emit("typedef struct {")
         with Indenter(c):
             for arg in self.args:
@@ -349,14 +2226,81 @@ class CArgparseCodeGenerator(CodeGenerator):
             for arg in self.args:
                 if arg.is_positional:
                     c.emit(f"{get_ctype(arg.type_)} {arg.dest};")
-        c.emit("} Options;")
+        c.emit(f"}} {self.scoped('Options')};")
 
-        c.extern_c_begin()
-        c.emit("void reset_options(Options* opts);")
+    def _generate_options_typedefs(self, c: CEmitter) -> None:
+        """Options structs of the commands and the program"""
+        generators = [self.for_command(command) for command in self.commands]
+        for generator in generators:
+            generator._generate_options_struct(c)
+            c.new_line()
+
+        if generators:
+            c.emit("typedef struct {")
+            with Indenter(c):
+                c.emit("const char *command;")
+                for generator in generators:
+                    c.emit(
+                        f"{generator.scoped('Options')} "
+                        f"{generator.command.ident};"
+                    )
+            c.emit(f"}} {self.scoped('Options')};")
+        else:
+            self._generate_options_struct(c)
+
+    def _generate_prototypes(self, c: CEmitter) -> None:
+        """reset/parse/dump_options declarations of the commands and program"""
+        # library mode parsers report errors in a caller buffer
+        error_args = ", char *error, size_t error_size" if self.library else ""
+        generators = [self.for_command(command) for command in self.commands]
+        if not generators:
+            generators = [self]
+        for generator in generators:
+            options = generator.scoped("Options")
+            c.emit(f"void {generator.scoped('reset_options')}({options}* opts);")
+            if generator.command is not None:
+                c.emit(
+                    f"int {generator.scoped('parse_options')}"
+                    f"(int argc, const char ***argv, {options}* opts{error_args});"
+                )
+                c.emit(f"void {generator.scoped('dump_options')}({options} *opts);")
+        options = self.scoped("Options")
         c.emit(
-            "int parse_options(int argc, const char ***argv, Options* opts);"
+            f"int {self.scoped('parse_options')}(int argc, const char ***argv, "
+            f"{options}* opts{error_args});"
         )
-        c.emit("void dump_options(Options *opts);")
+        c.emit(f"void {self.scoped('dump_options')}({options} *opts);")
+        if self.handoff:
+            c.cmnt("opts as a hand-off string (for CLIMETA_OPTIONS, say) loaded by")
+            c.cmnt("decode_options of the parsers of this spec, in any language.")
+            c.cmnt("Written to buf if size allows, returns its length (as snprintf)")
+            c.emit(
+                f"size_t {self.scoped('encode_options')}"
+                f"(const {options} *opts, char *buf, size_t size);"
+            )
+            c.cmnt("opts from a hand-off string, without parsing nor validating")
+            c.cmnt("them again. The string options point into encoded, modified")
+            c.cmnt("in place. 0, or -1 if malformed or of another spec")
+            c.emit(
+                f"int {self.scoped('decode_options')}"
+                f"(char *encoded, {options} *opts);"
+            )
+
+    def generate_h_code(self, filename_base: str) -> None:
+        """generate .h file"""
+        c = CEmitter()
+
+        c.header_guard_begin(filename_base)
+        if self.library or self.handoff:
+            c.include_sys("stddef.h")
+            c.new_line()
+
+        self._generate_options_typedefs(c)
+        if self.library:
+            emit_status_codes(c)
+
+        c.extern_c_begin()
+        self._generate_prototypes(c)
         c.extern_c_end()
 
         c.header_guard_end()
@@ -0,0 +1,242 @@
+"""
+Multicall C program: several specs sharing one executable
+
+busybox style, main runs the tool named by argv[0] (an installed symlink
+or hard link) or, when called under its own name, the tool named by its
+first argument. The option tables of every tool are read-only data
+walked by one copy of the library mode runtime, so N tools cost a table
+each instead of N copies of argparse and of the parsing code.
+"""
+
+import os
+import re
+from typing import Dict
+
+from .c_argparse_generator import CArgparseCodeGenerator, c_string, emit_status_codes
+from .c_emitter import CEmitter
+from .indenter import Indenter
+
+
+def tool_ident(name: str) -> str:
+    """prefix of the C symbols of a tool"""
+    ident = re.sub(r"\W", "_", name)
+    return "_" + ident if ident[0].isdigit() else ident
+
+
+class CMulticallCodeGenerator(CArgparseCodeGenerator):
+    """Generates one C program dispatching on argv[0] to several tools."""
+
+    def __init__(
+        self, tools: Dict[str, dict], program_name: str, handoff: bool = False
+    ):
+        super().__init__(
+            {
+                "program": {
+                    "name": program_name,
+                    "description": "multicall program",
+                    "library": "true",
+                }
+            }
+        )
+        # tool name -> generator of its library mode parser, handoff adds
+        # the encode/decode functions to every tool
+        self.tools: Dict[str, CArgparseCodeGenerator] = {}
+        for name, config in sorted(tools.items()):
+            generator = CArgparseCodeGenerator(config)
+            if generator.usage_counters:
+                # the tools run the library mode parsers, see
+                # c_argparse_generator
+                raise RuntimeError(
+                    "c_multicall_generator does not support 'usage_counters'"
+                )
+            if generator.trace:
+                raise RuntimeError("c_multicall_generator does not support 'trace' yet")
+            generator.handoff = generator.handoff or handoff
+            generator.library = True
+            generator.symbol_prefix = tool_ident(name) + "_"
+            generator.written = self.written
+            self.tools[name] = generator
+
+    def has_choices_files(self) -> bool:
+        """whether any argument of any tool has a choices_file"""
+        return any(tool.has_choices_files() for tool in self.tools.values())
+
+    def has_env_bindings(self) -> bool:
+        """whether any option of any tool is bound to the environment"""
+        return any(tool.has_env_bindings() for tool in self.tools.values())
+
+    def _error_size(self) -> int:
+        """error buffer able to hold the longest usage of any tool"""
+        usages = []
+        for tool in self.tools.values():
+            if tool.commands:
+                usages.append(tool._library_commands_usage())
+            for command in tool.commands:
+                usages.append(tool.for_command(command)._library_usage())
+            if not tool.commands:
+                usages.append(tool._library_usage())
+        return 1024 + max(len(usage) for usage in usages)
+
+    def _tools_usage(self) -> str:
+        """help text of the multicall program itself"""
+        left_size = 1 + max(len(name) for name in self.tools)
+        lines = [f"Usage: {self.program_name} TOOL [options]", "", "tools:"]
+        for name, tool in self.tools.items():
+            padding = " " * (left_size - len(name))
+            summary = tool.description.strip().split("\n")[0]
+            lines.append(f"  {name}{padding}: {summary}")
+        return "\n".join(lines) + "\n"
+
+    def _generate_parse_args(self, c: CEmitter, tool: CArgparseCodeGenerator):
+        """parse_args of a tool: parse_options printing and exiting on errors"""
+        with c.func(
+            tool.scoped("parse_args"),
+            [
+                "int argc",
+                "const char ***argv",
+                tool.scoped("Options") + "* opts",
+            ],
+            ret="int",
+        ):
+            c.emit("char error[CLIMETA_ERROR_SIZE];")
+            c.emit(
+                f"return exit_on_error({tool.scoped('parse_options')}"
+                "(argc, argv, opts, error, sizeof(error)), error);"
+            )
+
+    def _generate_main(self, c: CEmitter) -> None:
+        """main, looking up the tool to run by name"""
+        with Indenter(c, "static const char tools_usage[] =", ";"):
+            for line in self._tools_usage().splitlines(keepends=True):
+                c.emit(c_string(line))
+        c.new_line()
+
+        c.emit("typedef struct {")
+        with Indenter(c):
+            c.emit("const char *name;")
+            c.emit("int (*main)(int argc, const char **argv);")
+        c.emit("} Tool;")
+        c.new_line()
+        c.cmnt("sorted by name, for bsearch")
+        with Indenter(c, "static const Tool tools[] = {", "};"):
+            for name, tool in self.tools.items():
+                c.emit(f'{{"{name}", {tool.scoped("main")}}},')
+        c.new_line()
+
+        with c.static_func(
+            "compare_tool", ["const void *key", "const void *tool"], ret="int"
+        ):
+            c.emit(
+                "return strcmp((const char *)key, ((const Tool *)tool)->name);"
+            )
+
+        with c.static_func("find_tool", ["const char *name"], ret="const Tool*"):
+            c.emit("const char *slash = strrchr(name, '/');")
+            with Indenter(c, "return bsearch(", ");"):
+                c.emit("slash != NULL ? slash + 1 : name, tools,")
+                c.emit(
+                    "sizeof(tools) / sizeof(tools[0]), sizeof(tools[0]), "
+                    "compare_tool"
+                )
+
+        with c.func("main", ["int argc", "const char **argv"], ret="int"):
+            c.emit("const Tool *tool = argc > 0 ? find_tool(argv[0]) : NULL;")
+            with c.if_then("tool == NULL && argc > 1"):
+                c.cmnt("called as the multicall program: TOOL [options]")
+                with c.if_then(
+                    'strcmp(argv[1], "-h") == 0 || strcmp(argv[1], "--help") == 0'
+                ):
+                    c.emit("fputs(tools_usage, stdout);")
+                    c.emit("return 0;")
+                c.emit("tool = find_tool(argv[1]);")
+                c.emit("argc--;")
+                c.emit("argv++;")
+            with c.if_then("tool == NULL"):
+                c.emit("fputs(tools_usage, stderr);")
+                c.emit("return 1;")
+            c.emit("return tool->main(argc, argv);")
+
+    def generate_c_code(self, filename_base: str):
+        """generate .c code"""
+        c = CEmitter()
+
+        c.include(os.path.basename(filename_base) + ".h")
+        c.include_sys("stdio.h", "stdlib.h", "string.h", "limits.h", "math.h")
+        c.include_sys("errno.h", "stdarg.h", "stddef.h")
+        if self.has_choices_files():
+            c.include_sys("stdint.h")
+        if self.has_env_bindings():
+            c.include_sys("strings.h")
+        c.emit("\n")
+
+        c.cmnt("the runtime shared by all the tools")
+        if self.has_choices_files():
+            self._generate_choices_runtime(c)
+        if self.has_env_bindings():
+            self._generate_env_runtime(c)
+        self._generate_abbreviation_types(c)
+        self._generate_library_runtime(c)
+        if self.has_env_bindings():
+            self._generate_library_store_environment(c)
+        handoff_types = [
+            tool.handoff_types() for tool in self.tools.values() if tool.handoff
+        ]
+        if handoff_types:
+            self._generate_handoff_helpers(c, set().union(*handoff_types))
+
+        c.emit(f"#define CLIMETA_ERROR_SIZE {self._error_size()}")
+        c.new_line()
+        with c.static_func(
+            "exit_on_error", ["int status", "const char *error"], ret="int"
+        ):
+            with c.if_then("status == CLIMETA_HELP"):
+                c.emit("fputs(error, stdout);")
+                c.emit("exit(0);")
+            with c.if_then("status < 0"):
+                c.emit('fprintf(stderr, "ERROR: %s\\n", error);')
+                c.emit("exit(1);")
+            c.emit("return status;")
+
+        for name, tool in self.tools.items():
+            c.cmnt(f"----- {name} -----")
+            c.new_line()
+            tool._generate_library_parsers(c)
+            if tool.handoff:
+                tool._generate_handoff_options(c)
+            self._generate_parse_args(c, tool)
+
+        self._generate_main(c)
+        self.to_file(str(c), filename_base + ".c")
+
+    def generate_h_code(self, filename_base: str) -> None:
+        """generate .h file"""
+        c = CEmitter()
+
+        c.header_guard_begin(tool_ident(os.path.basename(filename_base)))
+        c.include_sys("stddef.h")
+        c.new_line()
+
+        for name, tool in self.tools.items():
+            c.cmnt(f"----- {name} -----")
+            c.new_line()
+            tool._generate_options_typedefs(c)
+            c.new_line()
+        emit_status_codes(c)
+
+        c.extern_c_begin()
+        for name, tool in self.tools.items():
+            options = tool.scoped("Options")
+            tool._generate_prototypes(c)
+            c.cmnt("parse_options printing the usage or error and exiting")
+            c.emit(
+                f"int {tool.scoped('parse_args')}"
+                f"(int argc, const char ***argv, {options}* opts);"
+            )
+            c.cmnt(f'implemented by the tool, run when argv[0] is "{name}"')
+            c.emit(f"int {tool.scoped('main')}(int argc, const char **argv);")
+            c.new_line()
+        c.extern_c_end()
+
+        c.header_guard_end()
+
+        self.to_file(str(c), filename_base + ".h")
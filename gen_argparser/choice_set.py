@@ -0,0 +1,41 @@
+"""
+Choices read from a choices_file, for the Python backend
+
+The class source is emitted as is in the generated parsers (so they keep
+depending only on the standard library) and used by the runtime mode.
+"""
+
+import argparse
+import difflib
+
+
+class ChoiceSet:
+    """
+    large set of choices: hashed membership test, and errors suggesting
+    the nearest choice instead of listing all of them
+    """
+
+    __slots__ = ("values",)
+
+    def __init__(self, values):
+        self.values = frozenset(values)
+
+    def nearest(self, value: str):
+        """closest choice to an invalid value, or None"""
+        matches = difflib.get_close_matches(value, self.values, n=1)
+        return matches[0] if matches else None
+
+    def argument(self, type_=str):
+        """argparse type callable accepting only the choices"""
+
+        def parse(value: str):
+            if value not in self.values:
+                nearest = self.nearest(value)
+                hint = f" (did you mean {nearest!r}?)" if nearest else ""
+                raise argparse.ArgumentTypeError(
+                    f"invalid choice: {value!r}{hint}"
+                )
+            return type_(value)
+
+        parse.__name__ = "choice"  # named in argparse invalid value errors
+        return parse
@@ -0,0 +1,126 @@
+"""
+Large 'choices' sets read from a file (choices_file = "skus.txt")
+
+The file holds one choice per line; blank lines and lines starting with
+'#' are skipped. The values are compiled at generation time into each
+backend's fastest membership test, for C a minimal perfect hash built
+here: a seeded FNV-1a (with murmur3's finalizer, so every bit of the seed
+reaches the low bits) hashes the value into one of a prime number of
+buckets, and each bucket stores either the slot of its only value or the
+seed that rehashes all of its values into free slots (hash and displace),
+so a lookup is at most two hashes and one strcmp. When no seed places a
+bucket, the values are spread over more buckets and placed again.
+"""
+
+import os
+from typing import Dict, List, Optional, Tuple
+
+FNV_OFFSET = 0x811C9DC5
+FNV_PRIME = 0x01000193
+# murmur3 fmix32 multipliers
+MIX_PRIME_1 = 0x85EBCA6B
+MIX_PRIME_2 = 0xC2B2AE35
+
+# seeds tried for a bucket before spreading the values over more buckets
+MAX_SEED = 1 << 12
+
+# (path, mtime, size) -> values, files are read once per change
+_loaded: Dict[Tuple[str, int, int], List[str]] = {}
+
+
+def load_choices(path: str) -> List[str]:
+    """values of a choices file, in file order and without duplicates"""
+    stat = os.stat(path)
+    key = (os.path.realpath(path), stat.st_mtime_ns, stat.st_size)
+    values = _loaded.get(key)
+    if values is None:
+        with open(path, encoding="utf-8") as f:
+            lines = (line.strip() for line in f)
+            values = list(
+                dict.fromkeys(
+                    line for line in lines if line and not line.startswith("#")
+                )
+            )
+        if not values:
+            raise RuntimeError(f"choices_file '{path}' has no choices")
+        values = _loaded[key] = values
+    return values
+
+
+def fnv1a(seed: int, value: str) -> int:
+    """32 bits FNV-1a hash of the UTF-8 value, seeded and finalized"""
+    hashed = FNV_OFFSET ^ seed
+    for byte in value.encode():
+        hashed = ((hashed ^ byte) * FNV_PRIME) & 0xFFFFFFFF
+    hashed ^= hashed >> 16
+    hashed = (hashed * MIX_PRIME_1) & 0xFFFFFFFF
+    hashed ^= hashed >> 13
+    hashed = (hashed * MIX_PRIME_2) & 0xFFFFFFFF
+    return hashed ^ (hashed >> 16)
+
+
+def next_prime(number: int) -> int:
+    """smallest prime >= number"""
+    candidate = max(number, 2)
+    while any(candidate % div == 0 for div in range(2, int(candidate**0.5) + 1)):
+        candidate += 1
+    return candidate
+
+
+def _place(values: List[str], count: int) -> Optional[Tuple[List[str], List[int]]]:
+    """(slots, seeds) of values hashed into count buckets, None if stuck"""
+    size = len(values)
+    buckets: List[List[str]] = [[] for _ in range(count)]
+    for value in values:
+        buckets[fnv1a(0, value) % count].append(value)
+
+    seeds = [0] * count
+    slots: List[str] = [""] * size
+    used = [False] * size
+    # the fullest buckets first, while most slots are still free
+    order = sorted(range(count), key=lambda idx: -len(buckets[idx]))
+    single = 0
+    for idx in order:
+        bucket = buckets[idx]
+        if len(bucket) <= 1:
+            break
+        for seed in range(1, MAX_SEED + 1):
+            taken = [fnv1a(seed, value) % size for value in bucket]
+            if len(set(taken)) == len(taken) and not any(
+                used[slot] for slot in taken
+            ):
+                break
+        else:
+            return None
+        seeds[idx] = seed
+        for slot, value in zip(taken, bucket):
+            used[slot] = True
+            slots[slot] = value
+        single += 1
+
+    # the buckets of one value go straight to the free slots left
+    free = (slot for slot in range(size) if not used[slot])
+    for idx in order[single:]:
+        if not buckets[idx]:
+            break
+        slot = next(free)
+        seeds[idx] = -slot - 1
+        slots[slot] = buckets[idx][0]
+    return slots, seeds
+
+
+def perfect_hash(values: List[str]) -> Tuple[List[str], List[int]]:
+    """
+    minimal perfect hash of values: (values in slot order, bucket seeds).
+    With n values and b = len(seeds) buckets (a prime), a value is in
+    slot -seed - 1 if the seed of its bucket fnv1a(0, value) % b is
+    negative, else in slot fnv1a(seed, value) % n
+    """
+    count = next_prime(len(values))
+    # once every value has a bucket of its own, placing can't fail
+    while count <= 64 * len(values) + 64:
+        placed = _place(values, count)
+        if placed is not None:
+            return placed
+        count = next_prime(2 * count)
+    raise RuntimeError("choices can't be perfectly hashed, some hashes are equal")
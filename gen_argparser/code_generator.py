@@ -2,33 +2,103 @@
 Few utilities to get fields from toml option dictionary
 """
 
+import copy
 import json
-from typing import List, Optional
+import os
+import sys
+from typing import Dict, List, Optional
 import re
 
+from .choices import FNV_OFFSET, FNV_PRIME, load_choices
+from .emitter import Emitter
+
+
+# bump when the hand-off encoding (see CodeGenerator.handoff_header) changes
+HANDOFF_VERSION = 1
+
+# file argument types -> open modes allowed, the first one is the default
+FILE_MODES = {
+    "infile": ["r", "rb"],
+    "outfile": ["w", "wb", "a", "ab", "x", "xb"],
+}
+
 
 class ArgSpec:
     """internally stores an argumen definition as defined by .toml file"""
 
-    def __init__(self, arg: dict):
-        self.name: str = arg["name"]
+    # specs with thousands of arguments are held by batch/worker processes,
+    # so no per instance __dict__ and the repeated strings are interned
+    __slots__ = (
+        "name",
+        "clean_name",
+        "type_",
+        "help_",
+        "short",
+        "clean_short",
+        "dest",
+        "multiple",
+        "has_metavar",
+        "metavar",
+        "choices",
+        "choices_file",
+        "is_positional",
+        "is_required",
+        "has_default",
+        "default",
+        "file_kind",
+        "file_mode",
+        "mmap",
+        "env",
+    )
+
+    def __init__(self, arg: dict, env_prefix: str = ""):
+        self.name: str = sys.intern(arg["name"])
         if self.name.strip().startswith("-") and not self.name.strip().startswith("--"):
             raise RuntimeError(f"name cannot start with a single -, found {self.name}")
-        self.clean_name: str = self.name.lstrip("--")
-        self.type_: str = arg["type"]
-        assert self.type_ in ["flag", "string", "int", "float"]
+        self.clean_name: str = sys.intern(self.name.lstrip("--"))
+        self.type_: str = sys.intern(arg["type"])
+        assert self.type_ in ["flag", "string", "int", "float", *FILE_MODES]
+        # file arguments are given as paths, so strings for every backend
+        # except python, that turns them into lazy handles
+        self.file_kind = ""
+        self.file_mode = ""
+        self.mmap: bool = arg.get("mmap", "false") == "true"
+        if self.type_ in FILE_MODES:
+            self.file_kind = self.type_
+            self.type_ = "string"
+            self.file_mode = arg.get("mode", FILE_MODES[self.file_kind][0])
+            if self.file_mode not in FILE_MODES[self.file_kind]:
+                raise RuntimeError(
+                    f"mode of an {self.file_kind} must be one of "
+                    f"{', '.join(FILE_MODES[self.file_kind])}, "
+                    f"found '{self.file_mode}'"
+                )
+        if self.mmap and self.file_kind != "infile":
+            raise RuntimeError("mmap is only supported for infile arguments")
         self.help_: str = arg["help"]
         short = arg.get("short")
-        self.short: str = "" if short is None else short
-        self.clean_short = "" if short is None else short.lstrip("-")
-        self.dest: str = arg.get("dest", self.clean_name)
+        self.short: str = "" if short is None else sys.intern(short)
+        self.clean_short = "" if short is None else sys.intern(short.lstrip("-"))
+        self.dest: str = sys.intern(arg.get("dest", self.clean_name))
         self.multiple: bool = arg.get("multiple", "false") == "true"
         self.has_metavar = arg.get("metavar") is not None
-        self.metavar: str = arg.get("metavar", self.clean_name).upper()
+        self.metavar: str = sys.intern(
+            arg.get("metavar", self.clean_name).upper()
+        )
+        # path of the file the choices were read from, for large sets the
+        # backends test with hashed lookups (see choices.py)
+        self.choices_file: str = arg.get("choices_file", "")
         if (choices := arg.get("choices")) is not None:
-            self.choices = re.split(r", *", choices)
+            self.choices = [sys.intern(item) for item in re.split(r", *", choices)]
+        elif self.choices_file:
+            self.choices = load_choices(self.choices_file)
         else:
             self.choices = None
+        if self.choices_file and (choices is not None or self.type_ != "string"):
+            raise RuntimeError(
+                "choices_file is only supported for string arguments "
+                "without choices"
+            )
 
         if self.type_ == "flag" and self.multiple:
             raise RuntimeError("multiple not supported for flags")
@@ -45,6 +115,13 @@ class ArgSpec:
         self.is_required = self.is_positional or explicit_required or not default_known
         self.has_default = not self.is_required
 
+        # environment variable the option falls back to before its default
+        self.env: str = sys.intern(env_variable(arg, env_prefix))
+        if self.env and self.is_positional:
+            raise RuntimeError("env is only supported for options")
+        if self.env and not re.fullmatch(r"[A-Za-z_]\w*", self.env, re.ASCII):
+            raise RuntimeError(f"env must be a variable name, found '{self.env}'")
+
         if not self.has_default:
             self.default = None
             return
@@ -66,6 +143,18 @@ class ArgSpec:
         )
 
 
+def env_variable(arg: dict, env_prefix: str = "") -> str:
+    """
+    environment variable of an argument: its env, else env_prefix + DEST
+    for options if there is a prefix. "" when not bound
+    """
+    env = arg.get("env")
+    if env is None and env_prefix and arg["name"].startswith("--"):
+        dest = arg.get("dest", arg["name"].lstrip("-"))
+        env = env_prefix + re.sub(r"\W", "_", dest).upper()
+    return env or ""
+
+
 def normalize_default(default: str, type_: str):
     """default value after cleanups and with propper type"""
     if type_ == "flag":
@@ -83,6 +172,11 @@ def normalize_default(default: str, type_: str):
     return default
 
 
+def bool_setting(value) -> bool:
+    """value of a bool setting, given as bool-string or native TOML bool"""
+    return str(value).lower() == "true"
+
+
 def double_quote(s: str) -> str:
     """just return input double quoted"""
     return '"' + str(s) + '"'
@@ -107,6 +201,22 @@ def single_quote_list(lst: list, sep: str = ", ") -> str:
     return _join_transformed_list(lst, single_quote, sep)
 
 
+class Command:
+    """internally stores a subcommand as defined by a [[commands]] section"""
+
+    def __init__(
+        self, cmd: dict, shared_args: List[ArgSpec], env_prefix: str = ""
+    ):
+        self.name: str = cmd["name"]
+        self.help_: str = cmd.get("help", "")
+        # usable as part of an identifier in any of the target languages
+        self.ident: str = re.sub(r"\W", "_", self.name)
+        # top level arguments are accepted by every command
+        self.args = shared_args + [
+            ArgSpec(arg, env_prefix) for arg in cmd.get("arguments", [])
+        ]
+
+
 class CodeGenerator:
     """Base class for code generators."""
 
@@ -114,16 +224,201 @@ class CodeGenerator:
         self.program_name = config["program"]["name"]
         self.description = config["program"]["description"]
         self.epilog = config["program"].get("epilog", "")
-        self.arguments = config["arguments"]
-        self.args = [ArgSpec(arg) for arg in config["arguments"]]
+        # None when not given, as some backends abbreviate by default
+        allow_abbrev = config["program"].get("allow_abbrev")
+        self.allow_abbrev: Optional[bool] = (
+            None if allow_abbrev is None else bool_setting(allow_abbrev)
+        )
+        # parse time instrumentation, active when CLIMETA_TRACE is set
+        self.trace: bool = bool_setting(config["program"].get("trace", False))
+        # bash/JavaScript only, see minified_code()
+        self.minify: bool = bool_setting(config["program"].get("minify", False))
+        # C/C++ only: reentrant parse_options returning error codes
+        self.library: bool = bool_setting(config["program"].get("library", False))
+        # per option counters appended to $CLIMETA_USAGE_FILE (or usage_file)
+        # at exit, aggregated by climeta.py stats
+        self.usage_counters: bool = bool_setting(
+            config["program"].get("usage_counters", False)
+        )
+        self.usage_file: str = config["program"].get("usage_file", "")
+        # encode_options/decode_options: the parsed options as a string a
+        # parser of any backend loads without parsing the command line again
+        self.handoff: bool = bool_setting(config["program"].get("handoff", False))
+        # options without env fall back to env_prefix + DEST
+        self.env_prefix: str = config["program"].get("env_prefix", "")
+        self.arguments = config.get("arguments", [])
+        self.args = [ArgSpec(arg, self.env_prefix) for arg in self.arguments]
+        self.commands = [
+            Command(cmd, self.args, self.env_prefix)
+            for cmd in config.get("commands", [])
+        ]
+        # set on the per-command copies returned by for_command
+        self.command: Optional[Command] = None
+        # files written by to_file, shared with the per-command copies
+        self.written: List[str] = []
+        # if set, to_file leaves the files already holding the code as they
+        # are (listed in unchanged), so their mtime only moves on changes
+        self.only_changed = False
+        self.unchanged: List[str] = []
+        # prepended to every scoped() symbol, per tool of a multicall program
+        self.symbol_prefix = ""
+        # option spelling -> times given, orders the dispatch code (profile.py)
+        self.profile: Dict[str, int] = {}
+
+    def for_command(self, command: Command) -> "CodeGenerator":
+        """copy of this generator restricted to a subcommand arguments"""
+        generator = copy.copy(self)
+        generator.args = command.args
+        generator.command = command
+        generator.description = command.help_ or self.description
+        generator.commands = []
+        return generator
+
+    def scoped(self, name: str) -> str:
+        """name of a generated symbol, made unique per subcommand"""
+        name = self.symbol_prefix + name
+        if self.command is None:
+            return name
+        return f"{name}_{self.command.ident}"
+
+    def usage_count(self, arg: ArgSpec) -> int:
+        """times arg was given, by any spelling, according to the profile"""
+        keys = [arg.name] + ([arg.short] if arg.short else [])
+        if self.command is not None:
+            keys += [f"{self.command.name} {key}" for key in keys]
+        return sum(self.profile.get(key, 0) for key in keys)
+
+    def dispatch_order(self, args: List[ArgSpec]) -> List[ArgSpec]:
+        """
+        args in the order parsers should test them: most used first
+        according to the profile, in spec (help) order otherwise
+        """
+        if not self.profile:
+            return list(args)
+        return sorted(args, key=lambda arg: -self.usage_count(arg))
+
+    def abbreviations(self) -> tuple:
+        """
+        unique long option prefixes of the (sub)command arguments, computed
+        once at generation time. Returns two dicts sorted by prefix:
+        prefix -> long option, and ambiguous prefix -> error message
+        """
+        long_names = ["--help"] + [
+            arg.name for arg in self.args if not arg.is_positional
+        ]
+        candidates = {}
+        for name in long_names:
+            for end in range(3, len(name)):
+                candidates.setdefault(name[:end], []).append(name)
+
+        unique = {}
+        ambiguous = {}
+        for prefix, names in sorted(candidates.items()):
+            if prefix in long_names:
+                continue  # exact matches always win
+            if len(names) == 1:
+                unique[prefix] = names[0]
+            else:
+                ambiguous[prefix] = (
+                    f"ambiguous option: {prefix} could match {', '.join(names)}"
+                )
+        return unique, ambiguous
+
+    def valued_options(self) -> tuple:
+        """
+        long options (sorted) and short option letters of the (sub)command
+        taking a value, whose next token abbreviations must not rewrite
+        """
+        options = [arg for arg in self.args if not arg.is_positional]
+        valued = [arg for arg in options if arg.type_ != "flag"]
+        names = sorted(arg.name for arg in valued)
+        shorts = "".join(arg.clean_short for arg in valued)
+        return names, shorts
+
+    def trace_prefix(self) -> str:
+        """start of every CLIMETA_TRACE line of the generated parser"""
+        prog = re.sub(r"\s", "_", self.program_name)
+        if self.command is not None:
+            return f"climeta-trace prog={prog} command={self.command.name}"
+        return f"climeta-trace prog={prog}"
+
+    def usage_prefix(self) -> str:
+        """start of the usage counters line of the (sub)command parser"""
+        prog = re.sub(r"\s", "_", self.program_name)
+        if self.command is not None:
+            return f"climeta-usage prog={prog} command={self.command.name}"
+        return f"climeta-usage prog={prog}"
+
+    def counted_options(self) -> List[ArgSpec]:
+        """options with a usage counter, in spec order (counter index)"""
+        return [arg for arg in self.args if not arg.is_positional]
+
+    def env_bindings(self) -> List[ArgSpec]:
+        """the (sub)command options bound to an environment variable, by name"""
+        return sorted((arg for arg in self.args if arg.env), key=lambda arg: arg.env)
+
+    def has_env_bindings(self) -> bool:
+        """whether any option (of any command) is bound to the environment"""
+        args = self.args + [arg for cmd in self.commands for arg in cmd.args]
+        return any(arg.env for arg in args)
+
+    def handoff_header(self) -> str:
+        """
+        start of the hand-off encodings of the spec: CLM, the format
+        version and the FNV-1a hash of the dest, type and multiplicity of
+        every argument of every (sub)command, so an encoding is only
+        loaded by the parsers of a spec with the same layout. Then come
+        the command name (if the spec has commands) and the value of each
+        argument in spec order, each as "~" (none) or "<bytes>:<value>",
+        the values of multiple arguments after "<count>*"
+        """
+        generators = [self.for_command(command) for command in self.commands]
+        layout = ";".join(
+            ("" if generator.command is None else generator.command.name + ":")
+            + ",".join(
+                f"{arg.dest}={arg.type_}" + ("*" if arg.multiple else "")
+                for arg in generator.args
+            )
+            for generator in generators or [self]
+        )
+        fingerprint = FNV_OFFSET
+        for byte in layout.encode():
+            fingerprint = ((fingerprint ^ byte) * FNV_PRIME) & 0xFFFFFFFF
+        return f"CLM{HANDOFF_VERSION}{fingerprint:08x}"
+
+    def minified_code(
+        self, c: Emitter, roots: List[str], filename: str
+    ) -> str:
+        """
+        code emitted to c, minified (see Emitter.minified) if asked to,
+        reporting the bytes saved on stderr
+        """
+        code = str(c)
+        if not self.minify:
+            return code
+        minified = c.minified(roots)
+        full_size = len(code.encode())
+        size = len(minified.encode())
+        print(
+            f"{filename}: minified {full_size} -> {size} bytes "
+            f"({100 * (full_size - size) // full_size}% smaller)",
+            file=sys.stderr,
+        )
+        return minified
 
     def to_file(self, code: str, filename: str) -> None:
         """dump string to file"""
         if filename in ["-", ""]:
             print(code)
             return
+        if self.only_changed and os.path.exists(filename):
+            with open(filename, encoding="utf-8") as fin:
+                if fin.read() == code:
+                    self.unchanged.append(filename)
+                    return
         with open(filename, "w", encoding="utf-8") as fout:
             fout.write(code)
+        self.written.append(filename)
 
     def generate_code(self, filename_base: str) -> None:
         """Abstract method to generate code. To be implemented by subclasses."""
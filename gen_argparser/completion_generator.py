@@ -0,0 +1,234 @@
+"""
+Generate static shell completion scripts (bash and zsh)
+
+All the tables (option names, shorts, choices and which options take a
+value) are computed here, so completing never runs the program itself
+"""
+
+import os
+import re
+from typing import List
+
+from .code_generator import (
+    ArgSpec,
+    CodeGenerator,
+)
+from .bash_emitter import BashEmitter
+from .indenter import Indenter
+
+
+def option_names(arg: ArgSpec) -> List[str]:
+    """all the spellings of a non positional argument"""
+    if arg.short != "":
+        return [arg.name, arg.short]
+    return [arg.name]
+
+
+def zsh_escape(text: str) -> str:
+    """escape a description/message for an _arguments spec"""
+    text = text.replace("'", "'\\''")
+    return re.sub(r"([\[\]:\\])", r"\\\1", text)
+
+
+class CompletionCodeGenerator(CodeGenerator):
+    """Common functionality of the shell completion generators."""
+
+    EXTENSION = ""
+
+    def completed_command(self, filename_base: str) -> str:
+        """name of the executable to complete"""
+        # program names can be descriptive ("Example program"), in that
+        # case use the output file name
+        if filename_base in ["-", ""]:
+            return self.program_name
+        if re.fullmatch(r"[\w.+-]+", self.program_name):
+            return self.program_name
+        return os.path.basename(filename_base)
+
+    def func_name(self, command: str) -> str:
+        """completion function name for the executable"""
+        return "_" + re.sub(r"\W", "_", command)
+
+    def generate_script(self, c: BashEmitter, command: str) -> None:
+        """Abstract method to generate the script for the given command"""
+        raise NotImplementedError(
+            "Subclasses must implement generate_script method"
+        )
+
+    def generate_code(self, filename_base: str) -> None:
+        c = BashEmitter()
+        self.generate_script(c, self.completed_command(filename_base))
+        c.new_line()
+        self.to_file(str(c), filename_base + self.EXTENSION)
+
+
+class BashCompletionCodeGenerator(CompletionCodeGenerator):
+    """Generates a static bash completion script."""
+
+    EXTENSION = ".bash-completion"
+
+    def _generate_complete_args(self, c: BashEmitter) -> None:
+        """complete the arguments of a (sub)command, from $prev/$cur"""
+        options = [arg for arg in self.args if not arg.is_positional]
+        takes_value = [arg for arg in options if arg.type_ != "flag"]
+
+        if takes_value:
+            with c.case("$prev"):
+                for arg in takes_value:
+                    with c.case_pattern("|".join(option_names(arg))):
+                        if arg.choices is not None:
+                            words = " ".join(arg.choices)
+                            c.emit(
+                                f'COMPREPLY=($(compgen -W "{words}" -- "$cur"))'
+                            )
+                        elif arg.type_ == "string":
+                            c.emit('COMPREPLY=($(compgen -f -- "$cur"))')
+                        else:
+                            c.emit("COMPREPLY=()")
+                        c.emit("return")
+
+        words = ["--help", "-h"]
+        for arg in options:
+            words += option_names(arg)
+        with c.case("$cur"):
+            with c.case_pattern("-*"):
+                words_str = " ".join(words)
+                c.emit(f'COMPREPLY=($(compgen -W "{words_str}" -- "$cur"))')
+            with c.case_pattern("*"):
+                if any(arg.is_positional for arg in self.args):
+                    c.emit('COMPREPLY=($(compgen -f -- "$cur"))')
+                else:
+                    c.emit("COMPREPLY=()")
+
+    def generate_script(self, c: BashEmitter, command: str) -> None:
+        func_name = self.func_name(command)
+        c.cmnt(f"bash completion for {command}, source it to enable it")
+
+        for cmd in self.commands:
+            generator = self.for_command(cmd)
+            with c.func(generator.scoped(func_name)):
+                generator._generate_complete_args(c)
+
+        with c.func(func_name):
+            c.emit("local cur prev")
+            c.emit('cur="${COMP_WORDS[COMP_CWORD]}"')
+            c.emit('prev="${COMP_WORDS[COMP_CWORD-1]}"')
+            c.cmnt("--opt=value is split by bash into --opt, =, value")
+            with c.if_then('"$cur" = "="'):
+                c.emit('cur=""')
+            with c.if_then('"$prev" = "="'):
+                c.emit('prev="${COMP_WORDS[COMP_CWORD-2]}"')
+
+            if self.commands:
+                names = " ".join(cmd.name for cmd in self.commands)
+                with c.if_then('"$COMP_CWORD" -eq 1'):
+                    c.emit(f'COMPREPLY=($(compgen -W "{names}" -- "$cur"))')
+                    c.emit("return")
+                with c.case("${COMP_WORDS[1]}"):
+                    for cmd in self.commands:
+                        scoped = self.for_command(cmd).scoped
+                        with c.case_pattern(cmd.name):
+                            c.emit(scoped(func_name))
+            else:
+                self._generate_complete_args(c)
+
+        c.emit(f"complete -F {func_name} {command}")
+
+
+class ZshCompletionCodeGenerator(CompletionCodeGenerator):
+    """Generates a static zsh completion script (_arguments based)."""
+
+    EXTENSION = ".zsh-completion"
+
+    def _argument_specs(self) -> List[str]:
+        """_arguments specs for each argument of a (sub)command"""
+        specs = ["'(- *)'{-h,--help}'[show this help message and exit]'"]
+        positional_idx = 0
+        for arg in self.args:
+            help_ = zsh_escape(arg.help_)
+            if arg.choices is not None:
+                action = "(" + " ".join(arg.choices) + ")"
+            elif arg.type_ == "string":
+                action = "_files"
+            else:
+                action = " "
+
+            if arg.is_positional:
+                positional_idx += 1
+                specs.append(f"'{positional_idx}:{help_}:{action}'")
+                continue
+
+            repeat = "*" if arg.multiple else ""
+            names = option_names(arg)
+            if arg.type_ == "flag":
+                value = ""
+            else:
+                value = f":{zsh_escape(arg.metavar)}:{action}"
+                # value in the same word (--opt=value, -ovalue) or the next
+                names = [
+                    name + ("=" if name.startswith("--") else "+")
+                    for name in names
+                ]
+            if len(names) == 1:
+                specs.append(f"'{repeat}{names[0]}[{help_}]{value}'")
+            else:
+                exclusion = ""
+                if not arg.multiple:
+                    exclusion = f"({' '.join(option_names(arg))})"
+                specs.append(
+                    f"'{exclusion}{repeat}'{{{','.join(names)}}}"
+                    f"'[{help_}]{value}'"
+                )
+        return specs
+
+    def _generate_arguments(self, c: BashEmitter) -> None:
+        """_arguments call with all the specs of a (sub)command"""
+        specs = self._argument_specs()
+        with Indenter(c, "_arguments -s \\"):
+            for spec in specs[:-1]:
+                c.emit(spec + " \\")
+            c.emit(specs[-1])
+
+    def generate_script(self, c: BashEmitter, command: str) -> None:
+        func_name = self.func_name(command)
+        c.emit(f"#compdef {command}")
+        c.new_line()
+        c.cmnt(f"zsh completion for {command}, add it to $fpath as")
+        c.cmnt(f"{func_name} or source it after compinit")
+        c.new_line()
+
+        for cmd in self.commands:
+            generator = self.for_command(cmd)
+            with c.func(generator.scoped(func_name)):
+                generator._generate_arguments(c)
+
+        with c.func(func_name):
+            if self.commands:
+                c.emit('local curcontext="$curcontext" state line')
+                c.emit(
+                    "_arguments -C '1:command:->command' '*::argument:->argument'"
+                )
+                with c.case("$state"):
+                    with c.case_pattern("command"):
+                        with Indenter(c, "_values 'command' \\"):
+                            values = [
+                                f"'{cmd.name}[{zsh_escape(cmd.help_)}]'"
+                                for cmd in self.commands
+                            ]
+                            for value in values[:-1]:
+                                c.emit(value + " \\")
+                            c.emit(values[-1])
+                    with c.case_pattern("argument"):
+                        with c.case("${line[1]}"):
+                            for cmd in self.commands:
+                                scoped = self.for_command(cmd).scoped
+                                with c.case_pattern(cmd.name):
+                                    c.emit(scoped(func_name))
+            else:
+                self._generate_arguments(c)
+
+        c.cmnt("autoloaded from $fpath vs sourced")
+        with c.if_then_else(f'"$funcstack[1]" = "{func_name}"'):
+            c.emit(f'{func_name} "$@"')
+        with c.else_():
+            c.emit(f"compdef {func_name} {command}")
@@ -2,12 +2,21 @@
 Generate CLI parsing code in C++ using cxxopt library dependency
 """
 
+import contextlib
+import os
+
 from .code_generator import (
     ArgSpec,
     CodeGenerator,
     double_quote,
     single_quote,
 )
+from .c_argparse_generator import (
+    c_string,
+    emit_status_codes,
+    emit_usage_writer,
+    emit_wrapped,
+)
 from .cpp_emitter import CppEmitter
 from .indenter import Indenter
 
@@ -35,6 +44,27 @@ def get_default_init(arg: ArgSpec) -> str:
     return ""
 
 
+def get_env_value(arg: ArgSpec, idx: int) -> str:
+    """value of an option bound to the idx-th scanned environment variable"""
+    cpp_type = get_cpp_type(arg.type_, arg.multiple)
+    if arg.type_ == "flag":
+        inverted = "true" if arg.default else "false"
+        return (
+            f"env_default(cxxopts::value<bool>(), env_flag(env[{idx}], {inverted}), "
+            "nullptr)"
+        )
+    fallback = "nullptr"
+    if arg.has_default:
+        default = arg.default
+        if arg.multiple:
+            default = ",".join(str(item) for item in default)
+        fallback = f'"{default}"'
+    multiple = ", true" if arg.multiple else ""
+    return (
+        f"env_default(cxxopts::value<{cpp_type}>(), env[{idx}], {fallback}{multiple})"
+    )
+
+
 def get_help_str(arg: ArgSpec) -> str:
     """return help string, potentially augmented with default/required"""
     help_ = arg.help_
@@ -46,6 +76,20 @@ def get_help_str(arg: ArgSpec) -> str:
     return help_
 
 
+# library mode parse_options error reporting parameters
+LIBRARY_ERROR_PARAMS = ["char *error", "size_t error_size"]
+
+# cxxopts exceptions -> library mode status, most derived first
+LIBRARY_EXCEPTIONS = [
+    ("no_such_option", "CLIMETA_UNKNOWN_OPTION"),
+    ("missing_argument", "CLIMETA_MISSING_VALUE"),
+    ("option_requires_argument", "CLIMETA_MISSING_VALUE"),
+    ("incorrect_argument_type", "CLIMETA_INVALID_VALUE"),
+    ("gratuitous_argument_for_option", "CLIMETA_INVALID_VALUE"),
+    ("option_has_no_value", "CLIMETA_MISSING_ARGUMENT"),
+]
+
+
 class CppCxxoptsCodeGenerator(CodeGenerator):
     """Generates C++ argparse code for CLI parsing."""
 
@@ -69,7 +113,9 @@ class CppCxxoptsCodeGenerator(CodeGenerator):
         # }
         c.cmnt("check choices")
         for arg in self.args:
-            if arg.choices is not None:
+            if arg.choices_file:
+                self._generate_check_hashed_choices(c, arg)
+            elif arg.choices is not None:
                 long = arg.clean_name
                 choices_dbl_quoted = ", ".join(
                     double_quote(choice) for choice in arg.choices
@@ -87,6 +133,13 @@ class CppCxxoptsCodeGenerator(CodeGenerator):
                 with c.if_then(
                     f"{long}_valid.find(opts->{arg.dest}) == {long}_valid.end()"
                 ):
+                    if self.library:
+                        c.emit(
+                            "return fail(error, error_size, "
+                            f"CLIMETA_INVALID_CHOICE, \"'{long}' must be one "
+                            f'of {choices_sgl_quoted}");'
+                        )
+                        continue
                     c.emit(
                         f"std::cout << \"ERROR: '{long}' must be one of "
                         + choices_sgl_quoted
@@ -94,6 +147,277 @@ class CppCxxoptsCodeGenerator(CodeGenerator):
                     )
                     c.emit("exit(1);")
 
+    def _generate_check_hashed_choices(self, c: CppEmitter, arg: ArgSpec) -> None:
+        """check of a choices_file argument, in a set built on first use"""
+        long = arg.clean_name
+        c.cmnt(f"from {os.path.basename(arg.choices_file)}")
+        c.emit(f"static const std::unordered_set<std::string> {long}_valid{{")
+        emit_wrapped(c, [c_string(choice) for choice in arg.choices])
+        c.emit("};")
+        with c.if_then(f"{long}_valid.count(opts->{arg.dest}) == 0"):
+            c.emit(
+                "const std::string nearest = "
+                f"nearest_choice({long}_valid, opts->{arg.dest});"
+            )
+            c.emit(
+                "const std::string message = "
+                f"\"'{long}': invalid choice '\" + opts->{arg.dest} + \"'\" +"
+            )
+            with Indenter(c):
+                c.emit(
+                    "(nearest.empty() ? \"\" : \" (did you mean '\" + "
+                    "nearest + \"'?)\");"
+                )
+            if self.library:
+                c.emit(
+                    "return fail(error, error_size, CLIMETA_INVALID_CHOICE, "
+                    "message);"
+                )
+                return
+            c.emit('std::cout << "ERROR: " << message << std::endl;')
+            c.emit("exit(1);")
+
+    def _generate_nearest_choice(self, c: CppEmitter) -> None:
+        """closest choice to an invalid value of a choices_file argument"""
+        c.cmnt("choice closest to value, empty if none is within len / 3 edits")
+        with c.static_func(
+            "nearest_choice",
+            [
+                "const std::unordered_set<std::string> &choices",
+                "const std::string &value",
+            ],
+            ret="std::string",
+        ):
+            c.emit("std::string nearest;")
+            c.emit("size_t nearest_distance = value.size() / 3 + 1;")
+            c.emit("std::vector<size_t> row(value.size() + 1);")
+            with Indenter(
+                c, "for (const std::string &choice : choices) {", "}"
+            ):
+                with Indenter(c, "for (size_t j = 0; j < row.size(); j++) {", "}"):
+                    c.emit("row[j] = j;")
+                with Indenter(
+                    c, "for (size_t i = 1; i <= choice.size(); i++) {", "}"
+                ):
+                    c.emit("size_t diagonal = row[0];")
+                    c.emit("row[0] = i;")
+                    with Indenter(
+                        c, "for (size_t j = 1; j < row.size(); j++) {", "}"
+                    ):
+                        c.emit("size_t above = row[j];")
+                        c.emit(
+                            "size_t cost = diagonal + "
+                            "(choice[i - 1] != value[j - 1]);"
+                        )
+                        with c.if_then("above + 1 < cost"):
+                            c.emit("cost = above + 1;")
+                        with c.if_then("row[j - 1] + 1 < cost"):
+                            c.emit("cost = row[j - 1] + 1;")
+                        c.emit("row[j] = cost;")
+                        c.emit("diagonal = above;")
+                c.emit("size_t distance = row[value.size()];")
+                c.cmnt("the set is unordered, ties go to the smallest choice")
+                with c.if_then(
+                    "distance < nearest_distance || (!nearest.empty() && "
+                    "distance == nearest_distance && choice < nearest)"
+                ):
+                    c.emit("nearest = choice;")
+                    c.emit("nearest_distance = distance;")
+            c.emit("return nearest;")
+
+    def _generate_expand_abbreviations(self, c: CppEmitter) -> None:
+        """
+        Generates the lookup of long option prefixes in a table sorted by
+        prefix, shared by all commands. The table is computed at generation
+        time, so the lookup is a binary search
+        """
+        with Indenter(c, "struct Abbreviation {", "};"):
+            c.emit("const char *prefix;")
+            c.emit("const char *option;  // nullptr when ambiguous")
+            c.emit("const char *message;")
+        c.new_line()
+
+        params = [
+            "int argc",
+            "const char **argv",
+            "const Abbreviation *begin",
+            "const Abbreviation *end",
+            "const std::set<std::string> &valued",
+            "const char *valued_shorts",
+        ]
+        c.cmnt("copy of argv with unique long option prefixes replaced by")
+        if self.library:
+            c.cmnt("the full option, ambiguous set to the first ambiguous one")
+            params.append("const char **ambiguous")
+        else:
+            c.cmnt("the full option, exits on ambiguous prefixes")
+        with c.static_func(
+            "expand_abbreviations", params, ret="std::vector<std::string>"
+        ):
+            c.emit("std::vector<std::string> expanded(argv, argv + argc);")
+            with Indenter(c, "for (int i = 1; i < argc; i++) {", "}"):
+                c.emit("std::string &arg = expanded[i];")
+                with c.if_then('arg == "--"'):
+                    c.emit("break;")
+                with c.if_then("arg.size() > 1 && arg[0] == '-' && arg[1] != '-'"):
+                    c.cmnt("short options bundle, the first one taking a value")
+                    c.cmnt("ends it, with the next token if it is the last")
+                    c.emit("size_t valued_at = arg.find_first_of(valued_shorts, 1);")
+                    c.emit("i += valued_at == arg.size() - 1;")
+                    c.emit("continue;")
+                with c.if_then('arg.compare(0, 2, "--") != 0'):
+                    c.emit("continue;")
+                c.emit("size_t equal = arg.find('=');")
+                c.emit("std::string name = arg.substr(0, equal);")
+                c.cmnt("the value of an option without = is the next token")
+                c.emit("bool next_is_value = equal == std::string::npos;")
+                with Indenter(c, "const Abbreviation *found = std::lower_bound("):
+                    c.emit("begin, end, name,")
+                    with Indenter(
+                        c,
+                        "[](const Abbreviation &abbrev, const std::string &key) {",
+                        "});",
+                    ):
+                        c.emit("return std::strcmp(abbrev.prefix, key.c_str()) < 0;")
+                with c.if_then("found == end || name != found->prefix"):
+                    c.emit("i += next_is_value && valued.count(name);")
+                    c.emit("continue;")
+                with c.if_then("found->option == nullptr"):
+                    if self.library:
+                        c.emit("*ambiguous = found->message;")
+                        c.emit("return expanded;")
+                    else:
+                        c.emit(
+                            'std::cout << "ERROR: " << found->message << std::endl;'
+                        )
+                        c.emit("exit(1);")
+                c.emit("arg.replace(0, equal, found->option);")
+                c.emit("i += next_is_value && valued.count(found->option);")
+            c.emit("return expanded;")
+
+    def _generate_abbreviations_table(self, c: CppEmitter) -> None:
+        """table of unique and ambiguous long option prefixes, by prefix"""
+        unique, ambiguous = self.abbreviations()
+        entries = {
+            prefix: f'"{name}", nullptr' for prefix, name in unique.items()
+        }
+        entries.update(
+            {prefix: f'nullptr, "{msg}"' for prefix, msg in ambiguous.items()}
+        )
+        c.cmnt("sorted by prefix, for binary search")
+        with Indenter(
+            c,
+            f"static const Abbreviation {self.scoped('abbreviations')}[] = {{",
+            "};",
+        ):
+            for prefix in sorted(entries):
+                c.emit(f'{{"{prefix}", {entries[prefix]}}},')
+        c.new_line()
+
+        names, shorts = self.valued_options()
+        c.cmnt("options taking a value, their next token is not rewritten")
+        valued = f"static const std::set<std::string> {self.scoped('valued')}"
+        if names:
+            c.emit(f"{valued} = {{")
+            emit_wrapped(c, [c_string(name) for name in names])
+            c.emit("};")
+        else:
+            c.emit(f"{valued};")
+        shorts = c_string(shorts)
+        c.emit(f"static const char {self.scoped('valued_shorts')}[] = {shorts};")
+        c.new_line()
+
+    def _generate_parse_expanded(self, c: CppEmitter) -> None:
+        """parse a copy of argv with the abbreviations expanded"""
+        table = self.scoped("abbreviations")
+        if self.library:
+            c.emit("const char *ambiguous = nullptr;")
+        with Indenter(
+            c, "std::vector<std::string> expanded = expand_abbreviations(", ");"
+        ):
+            c.emit(
+                f"argc, argv, {table}, "
+                f"{table} + sizeof({table}) / sizeof({table}[0]),"
+            )
+            c.emit(
+                f"{self.scoped('valued')}, {self.scoped('valued_shorts')}"
+                + (", &ambiguous" if self.library else "")
+            )
+        if self.library:
+            with c.if_then("ambiguous != nullptr"):
+                c.emit(
+                    "return fail(error, error_size, CLIMETA_AMBIGUOUS_OPTION, "
+                    "ambiguous);"
+                )
+        c.emit("std::vector<const char *> expanded_argv;")
+        with c.for_list_loop("const auto& arg", "expanded"):
+            c.emit("expanded_argv.push_back(arg.c_str());")
+        c.emit(
+            "cxxopts::ParseResult result = "
+            "options.parse(argc, expanded_argv.data());"
+        )
+
+    def _generate_trace_helpers(self, c: CppEmitter) -> None:
+        """
+        Generates the CLIMETA_TRACE helpers. With -DCLIMETA_NO_TRACE the
+        destination is a constant nullptr, so the compiler drops every
+        trace block as dead code
+        """
+        c.emit("#ifdef CLIMETA_NO_TRACE")
+        c.emit("#define trace_destination() ((const char *)nullptr)")
+        c.emit("#else")
+        with c.static_func("trace_destination", [], ret="const char*"):
+            c.emit('const char *destination = std::getenv("CLIMETA_TRACE");')
+            c.emit(
+                "return destination != nullptr && *destination != '\\0' "
+                "? destination : nullptr;"
+            )
+        c.emit("#endif")
+        c.new_line()
+
+        with c.static_func("trace_now_us", [], ret="double"):
+            c.emit("using namespace std::chrono;")
+            c.emit(
+                "return duration<double, std::micro>"
+                "(steady_clock::now().time_since_epoch()).count();"
+            )
+
+        c.cmnt("CLIMETA_TRACE line to stderr (1/stderr) or appended to a file,")
+        c.cmnt("marks: start, parsed, validated, choices checked")
+        with c.static_func(
+            "trace_line",
+            [
+                "const char *destination",
+                "const char *command",
+                "int tokens",
+                "const double *marks",
+            ],
+        ):
+            c.emit("std::ostringstream line;")
+            c.emit(f'line << "{self.trace_prefix()}";')
+            with c.if_then("command != nullptr"):
+                c.emit('line << " command=" << command;')
+            c.emit(
+                'line << " tokens=" << tokens << std::fixed << std::setprecision(1)'
+            )
+            with Indenter(c):
+                c.emit('<< " parse_us=" << marks[1] - marks[0]')
+                c.emit('<< " validate_us=" << marks[2] - marks[1]')
+                c.emit('<< " choices_us=" << marks[3] - marks[2]')
+                c.emit('<< " total_us=" << marks[3] - marks[0] << "\\n";')
+            with c.if_then(
+                'std::strcmp(destination, "1") == 0 || '
+                'std::strcmp(destination, "stderr") == 0'
+            ):
+                c.emit("std::cerr << line.str() << std::flush;")
+                c.emit("return;")
+            c.emit("std::ofstream(destination, std::ios::app) << line.str();")
+
+    def _generate_trace_mark(self, c: CppEmitter, idx: int) -> None:
+        """take the idx-th trace time mark"""
+        with c.if_then("trace != nullptr"):
+            c.emit(f"trace_marks[{idx}] = trace_now_us();")
+
     def _generate_option_struct(self, c: CppEmitter) -> None:
         """
         generate the control structure that defines the options in the
@@ -101,6 +425,7 @@ class CppCxxoptsCodeGenerator(CodeGenerator):
         """
         c.cmnt("define all options")
         c.emit("options.add_options()")
+        bindings = self.env_bindings()
         with Indenter(c):
             c.emit('("h,help", "show this help message and exit")')
             for arg in self.args:
@@ -111,9 +436,10 @@ class CppCxxoptsCodeGenerator(CodeGenerator):
                 if short != "":
                     short += ","
                 cpp_type = get_cpp_type(arg.type_, arg.multiple)
-                c.emit(
-                    f'("{short}{long}", "{help_}", cxxopts::value<{cpp_type}>(){default})'
-                )
+                value = f"cxxopts::value<{cpp_type}>(){default}"
+                if arg.env:
+                    value = get_env_value(arg, bindings.index(arg))
+                c.emit(f'("{short}{long}", "{help_}", {value})')
         c.emit(";")
 
     def _generatel_help_block(
@@ -127,19 +453,28 @@ class CppCxxoptsCodeGenerator(CodeGenerator):
         #       ... help on positionals
         #       exit(0);
         #     }
+        # library mode writes the help to the error buffer
+        out = "help" if self.library else "std::cout"
         with Indenter(c, 'if (result.count("help")) {', "}"):
-            c.emit("std::cout << options.help() << std::endl;")
+            if self.library:
+                c.emit("std::ostringstream help;")
+            c.emit(f"{out} << options.help() << std::endl;")
             if num_positionals > 0:
-                c.emit('std::cout << "positional arguments:\\n";')
+                c.emit(f'{out} << "positional arguments:\\n";')
                 for arg in self.args:
                     if arg.is_positional:
                         padding = " " * max(0, 17 - len(arg.name))
                         c.emit(
-                            f'std::cout << "  {arg.name} {padding}"'
+                            f'{out} << "  {arg.name} {padding}"'
                             + f' << "{arg.help_} (required)\\n";'
                         )
-            c.emit(f'std::cout << "\\n{self.epilog}" << std::endl;')
-            c.emit("exit(0);")
+            c.emit(f'{out} << "\\n{self.epilog}" << std::endl;')
+            if self.library:
+                c.emit(
+                    "return fail(error, error_size, CLIMETA_HELP, help.str());"
+                )
+            else:
+                c.emit("exit(0);")
 
     def _generate_fillup_options_block(self, c: CppEmitter) -> None:
         """
@@ -162,18 +497,113 @@ class CppCxxoptsCodeGenerator(CodeGenerator):
             else:
                 c.emit(f'opts->{dest} = result["{long}"].as<{cpp_type}>();')
 
-    def generate_c_code(self, filename_base: str):
-        """generate .c code"""
-        c = CppEmitter()
+    def _generate_parse_body(
+        self, c: CppEmitter, program_name: str, any_arg_is_choices: bool
+    ) -> None:
+        """options declaration, parsing, help, fill-up and checks"""
+        bindings = self.env_bindings()
+        if bindings:
+            c.cmnt("the variables of the bound options, looked up in one scan")
+            c.emit("static const char *const env_names[] = {")
+            emit_wrapped(c, [c_string(arg.env) for arg in bindings])
+            c.emit("};")
+            c.emit(f"const char *env[{len(bindings)}];")
+            c.emit(f"scan_environment(env_names, {len(bindings)}, env);")
+        c.emit(
+            f'cxxopts::Options options("{program_name}", "{self.description}");'
+        )
+        self._generate_option_struct(c)
 
-        any_arg_is_choices = any(arg.choices is not None for arg in self.args)
+        num_positionals = sum(1 for arg in self.args if arg.is_positional)
+        if num_positionals > 0:
+            c.cmnt("declare positionals")
+            for arg in self.args:
+                if arg.is_positional:
+                    c.emit(f'options.parse_positional("{arg.name}");')
 
-        c.include(filename_base + ".hpp")
-        c.include_sys("iostream")
-        if any_arg_is_choices:
-            c.include_sys("set")
-        c.new_line()
         c.new_line()
+        if self.allow_abbrev:
+            self._generate_parse_expanded(c)
+        else:
+            c.emit(
+                "cxxopts::ParseResult result = options.parse(argc, argv);"
+            )
+        if self.trace:
+            self._generate_trace_mark(c, 1)
+        self._generatel_help_block(c, num_positionals)
+        self._generate_fillup_options_block(c)
+        if self.trace:
+            self._generate_trace_mark(c, 2)
+
+        # if there is any 'choices' option, check here
+        if any_arg_is_choices:
+            self._generate_check_choices_block(c)
+
+        if self.trace:
+            command = "nullptr"
+            if self.command is not None:
+                command = double_quote(self.command.name)
+            with c.if_then("trace != nullptr"):
+                c.emit("trace_marks[3] = trace_now_us();")
+                c.emit(
+                    f"trace_line(trace, {command}, argc - 1, trace_marks);"
+                )
+        if self.usage_counters:
+            with Indenter(
+                c,
+                "static const std::unordered_map<std::string, unsigned *> "
+                "usage_index = usage_index_of(",
+                ");",
+            ):
+                c.emit(
+                    f"{self.scoped('usage_names')}, "
+                    f"{self.scoped('usage_counts')}, "
+                    f"{len(self.counted_options())}"
+                )
+            c.emit("count_usage(result, usage_index);")
+            c.emit(f"count_run(&{self.scoped('usage_runs')});")
+        c.emit("return 0;" if self.library else "return result;")
+
+    def _generate_usage_counters(self, c: CppEmitter) -> None:
+        """
+        Generates the option counters of every (sub)command, incremented
+        from the options cxxopts parsed, and their single write at exit
+        """
+        generators = [self.for_command(command) for command in self.commands]
+        emit_usage_writer(c, generators or [self], self.usage_file)
+
+        c.cmnt("counter of each option, by cxxopts key (long name)")
+        with c.static_func(
+            "usage_index_of",
+            ["const char *const *names", "unsigned *counts", "size_t count"],
+            ret="std::unordered_map<std::string, unsigned *>",
+        ):
+            c.emit("std::unordered_map<std::string, unsigned *> index;")
+            with Indenter(c, "for (size_t i = 0; i < count; i++) {", "}"):
+                c.emit("index[names[i] + 2] = &counts[i];")
+            c.emit("return index;")
+
+        c.cmnt("one more use of every option given")
+        with c.static_func(
+            "count_usage",
+            [
+                "const cxxopts::ParseResult &result",
+                "const std::unordered_map<std::string, unsigned *> &index",
+            ],
+        ):
+            with c.for_list_loop(
+                "const cxxopts::KeyValue &given", "result.arguments()"
+            ):
+                c.emit("auto found = index.find(given.key());")
+                with c.if_then("found != index.end()"):
+                    c.emit("++*found->second;")
+
+    def _generate_parse_options(self, c: CppEmitter) -> None:
+        """parse_options and dump_options of a (sub)command"""
+        any_arg_is_choices = any(arg.choices is not None for arg in self.args)
+        program_name = self.program_name
+        if self.command is not None:
+            program_name += " " + self.command.name
 
         # cxxopts::ParseResult parse_options(int argc, char** argv, Options* opts) {
         #     cxxopts::Options options("test", "A brief description");
@@ -190,36 +620,40 @@ class CppCxxoptsCodeGenerator(CodeGenerator):
         #     cxxopts::ParseResult result = options.parse(argc, argv);
         #     ...
 
+        if self.allow_abbrev:
+            self._generate_abbreviations_table(c)
+
+        params = ["int argc", "const char **argv", self.scoped("Options") + "* opts"]
+        if self.library:
+            params += LIBRARY_ERROR_PARAMS
         with c.func(
-            "parse_options",
-            ["int argc", "const char **argv", "Options* opts"],
-            ret="cxxopts::ParseResult",
+            self.scoped("parse_options"),
+            params,
+            ret="int" if self.library else "cxxopts::ParseResult",
         ):
-            c.emit(
-                f'cxxopts::Options options("{self.program_name}", "{self.description}");'
-            )
-
-            self._generate_option_struct(c)
-
-            num_positionals = sum(1 for arg in self.args if arg.is_positional)
-            if num_positionals > 0:
-                c.cmnt("declare positionals")
-                for arg in self.args:
-                    if arg.is_positional:
-                        c.emit(f'options.parse_positional("{arg.name}");')
-
-            c.new_line()
-            c.emit("cxxopts::ParseResult result = options.parse(argc, argv);")
-            self._generatel_help_block(c, num_positionals)
-            self._generate_fillup_options_block(c)
-
-            # if there is any 'choices' option, check here
-            if any_arg_is_choices:
-                self._generate_check_choices_block(c)
-
-            c.emit("return result;")
+            if self.trace:
+                c.emit("const char *trace = trace_destination();")
+                c.emit("double trace_marks[4] = {0};")
+                self._generate_trace_mark(c, 0)
+            # library mode turns the cxxopts exceptions into status codes
+            if self.library:
+                body = Indenter(
+                    c,
+                    "try {",
+                    "} catch (const cxxopts::exceptions::exception &e) {",
+                )
+            else:
+                body = contextlib.nullcontext()
+            with body:
+                self._generate_parse_body(c, program_name, any_arg_is_choices)
+            if self.library:
+                with Indenter(c, post_text="}"):
+                    c.emit("return parse_error(e, error, error_size);")
 
-        with c.func("dump_options", ["const Options &opts"]):
+        with c.func(
+            self.scoped("dump_options"),
+            [f"const {self.scoped('Options')} &opts"],
+        ):
             for arg in self.args:
                 dest = arg.dest
                 if arg.multiple:
@@ -229,17 +663,526 @@ class CppCxxoptsCodeGenerator(CodeGenerator):
                 else:
                     c.emit(f'std::cout << "{dest}: " << opts.{dest} << "\\n";')
 
-        self.to_file(str(c), filename_base + ".cpp")
+    def _generate_commands_dispatch(self, c: CppEmitter) -> None:
+        """
+        parse_options/dump_options jumping through a table sorted by
+        command name to the functions of the selected command, so only
+        its options get declared and checked
+        """
+        commands = sorted(self.commands, key=lambda command: command.name)
 
-    def generate_h_code(self, filename_base: str) -> None:
-        """generate .hpp code"""
+        if self.library:
+            self._generate_commands_usage_string(c, commands)
+        else:
+            with c.static_func("usage_commands", []):
+                c.emit(
+                    f'std::cout << "Usage: {self.program_name} COMMAND [options]\\n"'
+                )
+                with Indenter(c):
+                    c.emit(f'<< "\\n{self.description}\\n\\ncommands:\\n"')
+                    left_size = 1 + max(len(cmd.name) for cmd in commands)
+                    for command in self.commands:
+                        padding = " " * (left_size - len(command.name))
+                        c.emit(f'<< "  {command.name}{padding}: {command.help_}\\n"')
+                    if self.epilog:
+                        c.emit(f'<< "\\n{self.epilog}\\n"')
+                    c.emit("<< std::flush;")
+
+        parse_args = ["int argc", "const char **argv", "Options* opts"]
+        error_args = ""
+        ret = "cxxopts::ParseResult"
+        if self.library:
+            parse_args += LIBRARY_ERROR_PARAMS
+            error_args = ", error, error_size"
+            ret = "int"
+        for command in commands:
+            scoped = self.for_command(command).scoped
+            with c.static_func(scoped("parse_command"), parse_args, ret=ret):
+                c.emit(
+                    f"return {scoped('parse_options')}"
+                    f"(argc, argv, &opts->{command.ident}{error_args});"
+                )
+
+        with Indenter(c, "struct Command {", "};"):
+            c.emit("const char *name;")
+            c.emit(f"{ret} (*parse)({', '.join(parse_args)});")
+        c.new_line()
+        c.cmnt("sorted by name, for binary search")
+        with Indenter(c, "static const Command commands[] = {", "};"):
+            for command in commands:
+                scoped = self.for_command(command).scoped
+                c.emit(f'{{"{command.name}", {scoped("parse_command")}}},')
+        c.new_line()
+
+        with c.func("parse_options", parse_args, ret=ret):
+            c.emit("const char *name = argc > 1 ? argv[1] : nullptr;")
+            c.emit(
+                "const Command *end = "
+                "commands + sizeof(commands) / sizeof(commands[0]);"
+            )
+            c.emit("const Command *command = end;")
+            with c.if_then("name != nullptr"):
+                with Indenter(c, "command = std::lower_bound("):
+                    c.emit("commands, end, name,")
+                    with Indenter(
+                        c, "[](const Command &cmd, const char *key) {", "});"
+                    ):
+                        c.emit("return std::strcmp(cmd.name, key) < 0;")
+            cond = "command == end || std::strcmp(command->name, name) != 0"
+            with c.if_then(cond):
+                help_cond = (
+                    'name != nullptr && (std::strcmp(name, "-h") == 0 || '
+                    'std::strcmp(name, "--help") == 0)'
+                )
+                if self.library:
+                    self._generate_library_command_errors(c, help_cond)
+                else:
+                    with c.if_then(help_cond):
+                        c.emit("usage_commands();")
+                        c.emit("exit(0);")
+                    with c.if_then("name != nullptr"):
+                        c.emit(
+                            "std::cout << \"ERROR: unknown command '\" << name "
+                            "<< \"'\" << std::endl;"
+                        )
+                    c.emit("usage_commands();")
+                    c.emit("exit(1);")
+            c.emit("opts->command = command->name;")
+            c.cmnt("the command name takes the place of the program name")
+            c.emit(f"return command->parse(argc - 1, argv + 1, opts{error_args});")
+
+        with c.func("dump_options", ["const Options &opts"]):
+            c.emit('std::cout << "command: " << opts.command << "\\n";')
+            for command in self.commands:
+                scoped = self.for_command(command).scoped
+                with c.if_then(f'opts.command == "{command.name}"'):
+                    c.emit(f"{scoped('dump_options')}(opts.{command.ident});")
+
+    def _generate_handoff_helpers(self, c: CppEmitter, types: set) -> None:
+        """
+        fields of the hand-off encoding (see CodeGenerator.handoff_header),
+        overloaded per type of the (type, multiple) given
+        """
+        c.cmnt("hand-off field of a value: <bytes>:<value>")
+        with c.static_func(
+            "handoff_put", ["std::string &out", "const std::string &value"]
+        ):
+            c.emit("out += std::to_string(value.size());")
+            c.emit("out += ':';")
+            c.emit("out += value;")
+        scalars = {type_ for type_, _ in types}
+        if "flag" in scalars:
+            with c.static_func("handoff_put", ["std::string &out", "bool value"]):
+                c.emit('handoff_put(out, std::string(value ? "1" : "0"));')
+        if "int" in scalars:
+            with c.static_func("handoff_put", ["std::string &out", "int value"]):
+                c.emit("handoff_put(out, std::to_string(value));")
+        if "float" in scalars:
+            with c.static_func("handoff_put", ["std::string &out", "float value"]):
+                c.emit("char text[32];")
+                c.cmnt("the fewest digits reading back the same float (9 always do)")
+                with Indenter(c, "for (int digits = 6; digits <= 9; digits++) {", "}"):
+                    c.emit('std::snprintf(text, sizeof(text), "%.*g", digits, value);')
+                    with c.if_then("std::strtof(text, nullptr) == value"):
+                        c.emit("break;")
+                c.emit("handoff_put(out, std::string(text));")
+        multiple = any(is_multiple for _, is_multiple in types)
+        if multiple:
+            c.cmnt("values of a multiple option: <count>* then their fields")
+            c.emit("template <typename T>")
+            with c.static_func(
+                "handoff_put", ["std::string &out", "const std::vector<T> &values"]
+            ):
+                c.emit("out += std::to_string(values.size());")
+                c.emit("out += '*';")
+                with c.for_list_loop("const T &value", "values"):
+                    c.emit("handoff_put(out, value);")
+
+        c.cmnt("count of the field at pos ended by sep, false if not digits")
+        with c.static_func(
+            "handoff_count",
+            ["const std::string &data", "size_t &pos", "char sep", "size_t &count"],
+            ret="bool",
+        ):
+            c.emit('size_t end = data.find_first_not_of("0123456789", pos);')
+            with c.if_then(
+                "end == pos || end == std::string::npos || data[end] != sep"
+            ):
+                c.emit("return false;")
+            c.emit("count = std::strtoul(data.c_str() + pos, nullptr, 10);")
+            c.emit("pos = end + 1;")
+            c.emit("return count <= data.size() - pos;")
+
+        c.cmnt("next hand-off field of data at pos, empty for ~")
+        with c.static_func(
+            "handoff_get",
+            ["const std::string &data", "size_t &pos", "std::string &value"],
+            ret="bool",
+        ):
+            c.emit("size_t count;")
+            with c.if_then("pos < data.size() && data[pos] == '~'"):
+                c.emit("pos++;")
+                c.emit("value.clear();")
+                c.emit("return true;")
+            with c.if_then("!handoff_count(data, pos, ':', count)"):
+                c.emit("return false;")
+            c.emit("value.assign(data, pos, count);")
+            c.emit("pos += count;")
+            c.emit("return true;")
+        if "flag" in scalars:
+            with c.static_func(
+                "handoff_get",
+                ["const std::string &data", "size_t &pos", "bool &value"],
+                ret="bool",
+            ):
+                c.emit("std::string text;")
+                with c.if_then("!handoff_get(data, pos, text)"):
+                    c.emit("return false;")
+                c.emit('value = text == "1";')
+                c.emit("return true;")
+        for type_, convert in [("int", "(int)std::strtol(text.c_str(), &end, 10)"),
+                               ("float", "std::strtof(text.c_str(), &end)")]:
+            if type_ not in scalars:
+                continue
+            with c.static_func(
+                "handoff_get",
+                ["const std::string &data", "size_t &pos", f"{type_} &value"],
+                ret="bool",
+            ):
+                c.emit("std::string text;")
+                c.emit("char *end;")
+                with c.if_then("!handoff_get(data, pos, text)"):
+                    c.emit("return false;")
+                c.emit(f"value = {convert};")
+                c.emit("return *end == '\\0';")
+        if multiple:
+            c.emit("template <typename T>")
+            with c.static_func(
+                "handoff_get",
+                ["const std::string &data", "size_t &pos", "std::vector<T> &values"],
+                ret="bool",
+            ):
+                c.emit("size_t count;")
+                c.emit("values.clear();")
+                with c.if_then("pos < data.size() && data[pos] == '~'"):
+                    c.emit("pos++;")
+                    c.emit("return true;")
+                with c.if_then("!handoff_count(data, pos, '*', count)"):
+                    c.emit("return false;")
+                c.emit("values.resize(count);")
+                with c.for_list_loop("T &value", "values"):
+                    with c.if_then("!handoff_get(data, pos, value)"):
+                        c.emit("return false;")
+                c.emit("return true;")
+
+    def _generate_handoff_fields(self, c: CppEmitter) -> None:
+        """encoding and decoding of the fields of a (sub)command"""
+        options = self.scoped("Options")
+        with c.static_func(
+            self.scoped("encode_fields"),
+            [f"const {options} &opts", "std::string &out"],
+        ):
+            for arg in self.args:
+                c.emit(f"handoff_put(out, opts.{arg.dest});")
+            if not self.args:
+                c.emit("(void)opts;")
+                c.emit("(void)out;")
+        with c.static_func(
+            self.scoped("decode_fields"),
+            ["const std::string &data", "size_t &pos", f"{options} *opts"],
+            ret="bool",
+        ):
+            conds = [f"handoff_get(data, pos, opts->{arg.dest})" for arg in self.args]
+            if not conds:
+                c.emit("(void)data;")
+                c.emit("(void)pos;")
+                c.emit("(void)opts;")
+                c.emit("return true;")
+            else:
+                c.emit(f"return {conds[0]}" + (" &&" if len(conds) > 1 else ";"))
+                with Indenter(c):
+                    for idx, cond in enumerate(conds[1:], 2):
+                        c.emit(cond + (" &&" if idx < len(conds) else ";"))
+
+    def _generate_handoff(self, c: CppEmitter) -> None:
+        """encode_options/decode_options of the program"""
+        generators = [self.for_command(command) for command in self.commands]
+        types = {
+            (arg.type_, arg.multiple)
+            for generator in generators or [self]
+            for arg in generator.args
+        }
+        self._generate_handoff_helpers(c, types)
+        for generator in generators or [self]:
+            generator._generate_handoff_fields(c)
+
+        header = self.handoff_header()
+        with c.func("encode_options", ["const Options &opts"], ret="std::string"):
+            c.emit(f'std::string out = "{header}";')
+            if self.commands:
+                c.emit("handoff_put(out, opts.command);")
+                for idx, generator in enumerate(generators):
+                    keyword = "if" if idx == 0 else "} else if"
+                    name = generator.command.name
+                    c.emit(f'{keyword} (opts.command == "{name}") {{')
+                    with Indenter(c):
+                        c.emit(
+                            f"{generator.scoped('encode_fields')}"
+                            f"(opts.{generator.command.ident}, out);"
+                        )
+                c.emit("}")
+            else:
+                c.emit("encode_fields(opts, out);")
+            c.emit("return out;")
+
+        with c.func(
+            "decode_options",
+            ["const std::string &encoded", "Options *opts"],
+            ret="bool",
+        ):
+            c.emit(f"size_t pos = {len(header)};")
+            with c.if_then(f'encoded.compare(0, pos, "{header}") != 0'):
+                c.emit("return false;")
+            if self.commands:
+                c.emit("bool decoded = false;")
+                with c.if_then("!handoff_get(encoded, pos, opts->command)"):
+                    c.emit("return false;")
+                for idx, generator in enumerate(generators):
+                    keyword = "if" if idx == 0 else "} else if"
+                    name = generator.command.name
+                    c.emit(f'{keyword} (opts->command == "{name}") {{')
+                    with Indenter(c):
+                        c.emit(
+                            f"decoded = {generator.scoped('decode_fields')}"
+                            f"(encoded, pos, &opts->{generator.command.ident});"
+                        )
+                c.emit("}")
+            else:
+                c.emit("bool decoded = decode_fields(encoded, pos, opts);")
+            c.emit("return decoded && pos == encoded.size();")
+
+    def _generate_commands_usage_string(self, c: CppEmitter, commands) -> None:
+        """library mode commands usage, returned in the error buffer"""
+        left_size = 1 + max(len(cmd.name) for cmd in commands)
+        lines = [
+            f"Usage: {self.program_name} COMMAND [options]",
+            "",
+            self.description,
+            "",
+            "commands:",
+        ]
+        for command in self.commands:
+            padding = " " * (left_size - len(command.name))
+            lines.append(f"  {command.name}{padding}: {command.help_}")
+        if self.epilog:
+            lines += ["", self.epilog]
+        with Indenter(c, "static const char commands_usage[] =", ";"):
+            for line in lines:
+                c.emit(c_string(line + "\n"))
+        c.new_line()
+
+    def _generate_library_command_errors(
+        self, c: CppEmitter, help_cond: str
+    ) -> None:
+        """library mode help/unknown command, failing instead of exiting"""
+        with c.if_then(help_cond):
+            c.emit(
+                "return fail(error, error_size, CLIMETA_HELP, commands_usage);"
+            )
+        with c.if_then("name != nullptr"):
+            with Indenter(c, "return fail(", ");"):
+                c.emit("error, error_size, CLIMETA_UNKNOWN_COMMAND,")
+                c.emit("std::string(\"unknown command '\") + name + \"'\"")
+        with Indenter(c, "return fail(", ");"):
+            c.emit("error, error_size, CLIMETA_UNKNOWN_COMMAND,")
+            c.emit('std::string("expecting a command\\n") + commands_usage')
+
+    def _generate_env_helpers(self, c: CppEmitter) -> None:
+        """
+        the single scan of the environment looking up the bound variables,
+        and the defaults they give, checked by cxxopts as given values
+        """
+        c.emit("extern char **environ;")
+        c.new_line()
+        c.cmnt("bsearch comparison of an environ entry (NAME=value) with a name")
+        with c.static_func(
+            "compare_env", ["const void *entry", "const void *name"], ret="int"
+        ):
+            c.emit("const char *e = static_cast<const char *>(entry);")
+            c.emit("const char *n = *static_cast<const char *const *>(name);")
+            with c.while_loop("*e == *n && *n != '\\0'"):
+                c.emit("e++;")
+                c.emit("n++;")
+            c.cmnt("the '=' ends the name of the entry")
+            c.emit("return (*e == '=' ? 0 : (unsigned char)*e) - (unsigned char)*n;")
+
+        c.cmnt("values (after the '=') of the variables names (sorted) set in the")
+        c.cmnt("environment, nullptr for the others: environ is scanned once, each")
+        c.cmnt("of its entries looked up in names, instead of a getenv per name")
+        with c.static_func(
+            "scan_environment",
+            ["const char *const *names", "size_t count", "const char **values"],
+        ):
+            c.emit("std::fill(values, values + count, nullptr);")
+            with Indenter(
+                c, "for (char **entry = environ; *entry != nullptr; entry++) {", "}"
+            ):
+                with Indenter(c, "const void *found = std::bsearch(", ");"):
+                    c.emit("*entry, names, count, sizeof(names[0]), compare_env")
+                c.emit("auto name = static_cast<const char *const *>(found);")
+                c.cmnt("the first one wins, as for getenv")
+                with c.if_then("name != nullptr && values[name - names] == nullptr"):
+                    c.emit("values[name - names] = *entry + std::strlen(*name) + 1;")
+
+        c.cmnt("option value defaulting to the variable value env if set (space")
+        c.cmnt("separated values if multiple), else to fallback if any")
+        with c.static_func(
+            "env_default",
+            [
+                "std::shared_ptr<cxxopts::Value> value",
+                "const char *env",
+                "const char *fallback",
+                "bool multiple = false",
+            ],
+            ret="std::shared_ptr<cxxopts::Value>",
+        ):
+            with c.if_then("env == nullptr"):
+                c.emit(
+                    "return fallback != nullptr ? "
+                    "value->default_value(fallback) : value;"
+                )
+            with c.if_then("!multiple"):
+                c.emit("return value->default_value(env);")
+            c.emit("std::istringstream items(env);")
+            c.emit("std::string item, text;")
+            with c.while_loop("items >> item"):
+                c.emit('text += (text.empty() ? "" : ",") + item;')
+            c.emit("return value->default_value(text);")
+
+        c.cmnt('"true" / "false" internal default of a flag bound to a variable')
+        c.cmnt("of value env, nullptr if unset")
+        with c.static_func(
+            "env_flag", ["const char *env", "bool inverted"], ret="const char*"
+        ):
+            with c.if_then("env == nullptr"):
+                c.emit("return nullptr;")
+            with Indenter(c, "static const char *const values[] = {", "};"):
+                c.emit('"1", "true", "yes", "on", "0", "false", "no", "off", "",')
+            with Indenter(c, "for (int i = 0; i < 9; i++) {", "}"):
+                with c.if_then("strcasecmp(env, values[i]) == 0"):
+                    c.emit('return (i < 4) != inverted ? "true" : "false";')
+            c.emit("throw cxxopts::exceptions::incorrect_argument_type(env);")
+
+    def _generate_library_helpers(self, c: CppEmitter) -> None:
+        """library mode fail() and cxxopts exception to status mapping"""
+        with c.static_func(
+            "fail",
+            LIBRARY_ERROR_PARAMS + ["int status", "const std::string &message"],
+            ret="int",
+        ):
+            with c.if_then("error != nullptr && error_size > 0"):
+                c.emit('std::snprintf(error, error_size, "%s", message.c_str());')
+            c.emit("return status;")
+
+        with c.static_func(
+            "parse_error",
+            ["const cxxopts::exceptions::exception &e"] + LIBRARY_ERROR_PARAMS,
+            ret="int",
+        ):
+            c.emit("int status = CLIMETA_PARSE_ERROR;")
+            for idx, (exception, status) in enumerate(LIBRARY_EXCEPTIONS):
+                cond = (
+                    f"dynamic_cast<const cxxopts::exceptions::{exception} *>"
+                    "(&e) != nullptr"
+                )
+                keyword = "if" if idx == 0 else "} else if"
+                c.emit(f"{keyword} ({cond}) {{")
+                with Indenter(c):
+                    c.emit(f"status = {status};")
+            c.emit("}")
+            c.emit("return fail(error, error_size, status, e.what());")
+
+    def generate_c_code(self, filename_base: str):
+        """generate .c code"""
         c = CppEmitter()
 
-        c.header_guard_begin(filename_base)
+        generators = [self.for_command(command) for command in self.commands]
+        if not generators:
+            generators = [self]
 
-        c.include("cxxopts.hpp")
+        any_arg_is_choices = any(
+            arg.choices is not None and not arg.choices_file
+            for generator in generators
+            for arg in generator.args
+        )
+        any_arg_is_choices_file = any(
+            arg.choices_file for generator in generators for arg in generator.args
+        )
 
-        c.emit("struct Options {")
+        c.include(filename_base + ".hpp")
+        if self.commands or self.allow_abbrev:
+            c.include_sys("algorithm", "cstring")
+        c.include_sys("iostream")
+        if any_arg_is_choices:
+            c.include_sys("set")
+        if any_arg_is_choices_file:
+            c.include_sys("string", "unordered_set", "vector")
+        if self.allow_abbrev:
+            c.include_sys("set", "string", "vector")
+        if self.trace:
+            c.include_sys("chrono", "cstdlib", "cstring", "fstream")
+            c.include_sys("iomanip", "sstream")
+        if self.library:
+            c.include_sys("cstdio", "sstream", "string")
+        if self.has_env_bindings():
+            c.include_sys("algorithm", "cstdlib", "cstring", "sstream", "string")
+            c.include_sys("strings.h")
+        if self.handoff:
+            c.include_sys("cstdio", "cstdlib", "string", "vector")
+        if self.usage_counters:
+            if self.library:
+                # the counters are global and written at exit, library mode
+                # keeps no state and is called from any thread
+                raise RuntimeError(
+                    "cpp_cxxopts_generator does not support 'usage_counters' "
+                    "in library mode"
+                )
+            c.include_sys("cstdio", "cstdlib", "string", "unordered_map")
+            c.include_sys("fcntl.h", "unistd.h")
+        c.new_line()
+        c.new_line()
+
+        if self.trace:
+            self._generate_trace_helpers(c)
+
+        if self.library:
+            self._generate_library_helpers(c)
+
+        if self.has_env_bindings():
+            self._generate_env_helpers(c)
+
+        if self.usage_counters:
+            self._generate_usage_counters(c)
+
+        if any_arg_is_choices_file:
+            self._generate_nearest_choice(c)
+
+        if self.allow_abbrev:
+            self._generate_expand_abbreviations(c)
+
+        for generator in generators:
+            generator._generate_parse_options(c)
+
+        if self.commands:
+            self._generate_commands_dispatch(c)
+        if self.handoff:
+            self._generate_handoff(c)
+
+        self.to_file(str(c), filename_base + ".cpp")
+
+    def _generate_options_struct(self, c: CppEmitter) -> None:
+        """definition of the Options struct of a (sub)command"""
+        c.emit(f"struct {self.scoped('Options')} {{")
         with Indenter(c):
             for arg in self.args:
                 if not arg.is_positional:
@@ -253,11 +1196,61 @@ class CppCxxoptsCodeGenerator(CodeGenerator):
                     c.emit(f"{cpp_type} {arg.dest};")
         c.emit("};")
 
+    def generate_h_code(self, filename_base: str) -> None:
+        """generate .hpp code"""
+        c = CppEmitter()
+
+        c.header_guard_begin(filename_base)
+
+        c.include("cxxopts.hpp")
+
+        generators = [self.for_command(command) for command in self.commands]
+        for generator in generators:
+            generator._generate_options_struct(c)
+            c.new_line()
+
+        if generators:
+            c.emit("struct Options {")
+            with Indenter(c):
+                c.emit("std::string command;")
+                for generator in generators:
+                    c.emit(
+                        f"{generator.scoped('Options')} "
+                        f"{generator.command.ident};"
+                    )
+            c.emit("};")
+        else:
+            self._generate_options_struct(c)
+
+        ret = "cxxopts::ParseResult"
+        error_params = ""
+        if self.library:
+            emit_status_codes(c)
+            ret = "int"
+            error_params = ", " + ", ".join(LIBRARY_ERROR_PARAMS)
+
         c.new_line()
+        for generator in generators:
+            options = generator.scoped("Options")
+            c.emit(
+                f"{ret} {generator.scoped('parse_options')}"
+                f"(int argc, const char** argv, {options}* opts{error_params});"
+            )
+            c.emit(
+                f"void {generator.scoped('dump_options')}"
+                f"(const {options}& opts);"
+            )
         c.emit(
-            "cxxopts::ParseResult parse_options(int argc, const char** argv, Options* opts);"
+            f"{ret} parse_options(int argc, const char** argv, Options* opts{error_params});"
         )
         c.emit("void dump_options(const Options& opts);")
+        if self.handoff:
+            c.cmnt("opts as a hand-off string (for CLIMETA_OPTIONS, say), loaded by")
+            c.cmnt("decode_options of the parsers of this spec, in any language")
+            c.emit("std::string encode_options(const Options& opts);")
+            c.cmnt("opts from a hand-off string, without parsing nor validating")
+            c.cmnt("them again. false if malformed or of another spec")
+            c.emit("bool decode_options(const std::string& encoded, Options* opts);")
 
         c.header_guard_end()
 
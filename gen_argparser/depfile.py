@@ -0,0 +1,103 @@
+"""
+Make compatible dependency files (climeta.py -MD)
+
+Lists, for the files written by a generator, the spec, the specs it
+includes, the script run (climeta.py) and the modules of this package
+the generation went through, so make (-include) or ninja (depfile)
+regenerate exactly the outputs that changed. Like gcc -MP, every
+dependency also gets an empty rule so a deleted include doesn't break
+the build.
+"""
+
+import inspect
+import os
+import sys
+from typing import List
+
+from .includes import spec_dependencies
+
+# modules every generation goes through (spec parsing and validation)
+PARSE_MODULES = ["gen_argparser.includes", "gen_argparser.validator"]
+
+# imports every generator, so not followed (it would list all of them)
+DRIVER_MODULE = "gen_argparser.gen_argparser"
+
+
+def _package_module(value):
+    """module of this package defining value (or value itself), or None"""
+    if inspect.ismodule(value):
+        name = value.__name__
+    else:
+        name = getattr(value, "__module__", None)
+    if not isinstance(name, str) or not name.startswith(__package__ + "."):
+        return None
+    return sys.modules.get(name)
+
+
+def generator_modules(generator) -> List[str]:
+    """
+    source files of the package modules used to generate code with
+    generator: the driver, those of its class hierarchy and of spec
+    parsing, and whatever they import from the package, transitively
+    """
+    pending = [sys.modules[cls.__module__] for cls in type(generator).__mro__]
+    pending += [sys.modules[name] for name in PARSE_MODULES]
+    seen = {DRIVER_MODULE: sys.modules[DRIVER_MODULE].__file__}
+    while pending:
+        module = pending.pop()
+        if module.__name__ in seen or not module.__name__.startswith(__package__):
+            continue
+        seen[module.__name__] = module.__file__
+        for value in vars(module).values():
+            used = _package_module(value)
+            if used is not None:
+                pending.append(used)
+    return sorted(seen.values())
+
+
+def entry_script() -> List[str]:
+    """the script the generation was run from (climeta.py), if any"""
+    path = getattr(sys.modules.get("__main__"), "__file__", None)
+    if not path or not path.endswith(".py"):
+        return []
+    return [os.path.abspath(path)]
+
+
+def _make_path(path: str) -> str:
+    """path as written in the rules: relative if under the current dir"""
+    relative = os.path.relpath(path)
+    if not relative.startswith(".."):
+        path = relative
+    return path.replace(" ", "\\ ").replace("#", "\\#")
+
+
+def write_depfile(
+    spec_paths: List[str],
+    targets: List[str],
+    generator,
+    data_files: List[str] = (),
+) -> str:
+    """
+    write <first target>.d for the targets generated, returns its path.
+    data_files are other inputs of the generation (a usage profile)
+    """
+    dependencies = list(spec_paths)
+    for spec_path in spec_paths:
+        dependencies += spec_dependencies(spec_path)
+    dependencies += data_files
+    dependencies += entry_script()
+    dependencies += generator_modules(generator)
+    dependencies = list(dict.fromkeys(_make_path(path) for path in dependencies))
+
+    lines = [f"{' '.join(_make_path(target) for target in targets)}:"]
+    lines += [f"  {dependency}" for dependency in dependencies]
+    rules = " \\\n".join(lines) + "\n"
+    # empty rules, for the dependencies that aren't targets themselves
+    rules += "".join(
+        f"\n{dependency}:\n" for dependency in dependencies[len(spec_paths) :]
+    )
+
+    path = targets[0] + ".d"
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(rules)
+    return path
@@ -2,12 +2,23 @@
 Base cleass for code emitters for different languages
 """
 
+import re
+from typing import List, Optional
+
 
 class Emitter:
     """base class for several emitters"""
 
     INDENT = "    "
 
+    # for minified(): a whole line comment, a trailing comment (outside of
+    # any string), and the first line of a top level function definition
+    # with the function name as group 1
+    COMMENT_RE: Optional[re.Pattern] = None
+    TRAILING_COMMENT_RE: Optional[re.Pattern] = None
+    FUNC_RE: Optional[re.Pattern] = None
+    FUNC_END = "}"
+
     def __init__(self):
         self.code = []
         self.indent_level = 0
@@ -36,3 +47,62 @@ class Emitter:
     def new_line(self) -> None:
         """emit a new line"""
         self.emit_noindent("")
+
+    def _functions(self, lines: List[str]) -> dict:
+        """name -> (first, last) line index of each top level function"""
+        functions = {}
+        start = None
+        for idx, line in enumerate(lines):
+            match = self.FUNC_RE.match(line)
+            if match is not None and start is None:
+                start, name = idx, match.group(1)
+            elif line == self.FUNC_END and start is not None:
+                functions[name] = (start, idx)
+                start = None
+        return functions
+
+    def minified(self, roots: List[str]) -> str:
+        """
+        emitted code without comments, indentation and blank lines, keeping
+        only the top level functions reachable from the roots (or called
+        from top level code)
+        """
+        lines = []
+        for line in str(self).split("\n"):
+            if line.strip() == "" or self.COMMENT_RE.match(line):
+                continue
+            lines.append(self.TRAILING_COMMENT_RE.sub("", line))
+
+        functions = self._functions(lines)
+        in_function = set()
+        for first, last in functions.values():
+            in_function.update(range(first, last + 1))
+        top_level = "\n".join(
+            line for idx, line in enumerate(lines) if idx not in in_function
+        )
+
+        def callees(code: str) -> List[str]:
+            return [
+                name
+                for name in functions
+                if re.search(r"\b" + re.escape(name) + r"\b", code)
+            ]
+
+        reachable = set()
+        pending = list(roots) + callees(top_level)
+        while pending:
+            name = pending.pop()
+            if name in reachable or name not in functions:
+                continue
+            reachable.add(name)
+            first, last = functions[name]
+            # the body only, the definition line names the function itself
+            pending += callees("\n".join(lines[first + 1 : last + 1]))
+
+        dropped = set()
+        for name, (first, last) in functions.items():
+            if name not in reachable:
+                dropped.update(range(first, last + 1))
+        return "\n".join(
+            line.strip() for idx, line in enumerate(lines) if idx not in dropped
+        )
@@ -0,0 +1,90 @@
+"""
+Environment variable bindings (env, env_prefix) of the Python backend
+
+The class source is emitted as is in the generated parsers (so they keep
+depending only on the standard library) and used by the runtime mode.
+"""
+
+import argparse
+import os
+
+
+class Environment:
+    """
+    the variables the options are bound to, read once when the parser is
+    built, and the defaults they give
+    """
+
+    __slots__ = ("values", "errors")
+
+    # values of the flags bound to a variable, compared in lowercase
+    FLAGS = {
+        **dict.fromkeys(["1", "true", "yes", "on"], True),
+        **dict.fromkeys(["0", "false", "no", "off", ""], False),
+    }
+
+    def __init__(self, names: frozenset):
+        # a pass over the variable names only (os.environ decodes what it
+        # returns), unless there are few names to look up
+        if len(names) * 5 < len(os.environ):
+            found = [name for name in names if name in os.environ]
+        else:
+            found = names.intersection(os.environ)
+        self.values = {name: os.environ[name] for name in found}
+        # (parser, message) of the invalid values, reported by check
+        self.errors = []
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.values
+
+    @staticmethod
+    def flag(value: str) -> bool:
+        """argparse like type callable of the flags"""
+        return Environment.FLAGS[value.lower()]
+
+    def default(
+        self,
+        parser: argparse.ArgumentParser,
+        name: str,
+        default,
+        type_=str,
+        choices=None,
+        multiple: bool = False,
+    ):
+        """
+        default of an option bound to the variable name: its value if set
+        (space separated values if multiple), converted and checked as on
+        the command line. An invalid value gives default, its error being
+        reported by check once parser is complete
+        """
+        if name not in self.values:
+            return default
+        text = self.values[name]
+        values = []
+        for item in text.split() if multiple else [text]:
+            try:
+                value = type_(item)
+            except argparse.ArgumentTypeError as err:
+                self.errors.append((parser, f"{name}: {err}"))
+                return default
+            except (KeyError, TypeError, ValueError):
+                type_name = getattr(type_, "__name__", repr(type_))
+                message = f"{name}: invalid {type_name} value: {item!r}"
+                self.errors.append((parser, message))
+                return default
+            if choices is not None and value not in choices:
+                expected = ", ".join(map(repr, choices))
+                message = f"{name}: invalid choice: {item!r} (choose from {expected})"
+                self.errors.append((parser, message))
+                return default
+            values.append(value)
+        return values if multiple else values[0]
+
+    def check(self) -> None:
+        """
+        report the first invalid value, once the parsers are built (an
+        error while adding the arguments would print a partial usage)
+        """
+        if self.errors:
+            parser, message = self.errors[0]
+            parser.error(message)
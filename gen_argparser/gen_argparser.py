@@ -2,26 +2,86 @@
 Common functions to drive CLI code generation from toml def file
 """
 
-import tomllib
+import os
+from typing import List
+
+from .code_generator import CodeGenerator
+from .depfile import write_depfile
+from .includes import load_compiled_spec, resolve_spec
+from .profile import load_profile
+from .spec_formats import dump_spec, is_compiled_spec
+from .validator import validate_spec
 from .python_generator import PythonCodeGenerator
 from .bash_generator import BashCodeGenerator
 from .c_argparse_generator import CArgparseCodeGenerator
+from .c_multicall_generator import CMulticallCodeGenerator
 from .cpp_cxxopts_generator import CppCxxoptsCodeGenerator
 from .js_cla_generator import JavaScriptCommandLineArgsCodeGenerator
+from .completion_generator import (
+    BashCompletionCodeGenerator,
+    ZshCompletionCodeGenerator,
+)
 
 
 def parse_cli_spec(file_path: str) -> dict:
-    """Parse the CLI specification from a TOML file."""
-    with open(file_path, "rb") as f:
-        config = tomllib.load(f)
+    """
+    Parse the CLI specification from a TOML or JSON file, resolving its
+    includes and argument groups, and validate it. Compiled specs are
+    loaded as they are, they were validated when compiled.
+    """
+    if is_compiled_spec(file_path):
+        return load_compiled_spec(file_path)
+    config, locations = resolve_spec(file_path)
+    validate_spec(config, file_path, locations=locations)
 
     # Return the parsed configuration
     return config
 
 
-def generate_cli_code(file_path: str, language: str, output: str) -> None:
-    """Generates CLI parsing code for the specified language."""
+def compile_cli_spec(file_path: str, output: str) -> None:
+    """
+    Writes a spec resolved and validated, as a compiled spec (JSON if
+    output ends with .json), fast to load by parse_cli_spec
+    """
+    dump_spec(parse_cli_spec(file_path), output)
+
+
+def generate_cli_code(
+    file_path: str,
+    language: str,
+    output: str,
+    trace: bool = False,
+    usage_counters: bool = False,
+    handoff: bool = False,
+    minify: bool = False,
+    library: bool = False,
+    depfile: bool = False,
+    profile: str = "",
+    only_changed: bool = False,
+) -> CodeGenerator:
+    """
+    Generates CLI parsing code for the specified language. trace forces
+    the CLIMETA_TRACE instrumentation on, as if the spec asked for it,
+    usage_counters forces the option counters for climeta.py stats on,
+    handoff adds encode/decode functions of the parsed options,
+    minify strips the bash/JavaScript output down to what parsing needs,
+    library makes C/C++ parsers reentrant and non-exiting, depfile
+    writes a make dependency file next to the outputs, profile is a JSON
+    usage profile ordering the option dispatch code (see profile.py),
+    only_changed leaves the outputs already up to date untouched. Returns
+    the generator, listing the files it wrote (and left unchanged)
+    """
     config = parse_cli_spec(file_path)
+    if trace:
+        config["program"]["trace"] = "true"
+    if usage_counters:
+        config["program"]["usage_counters"] = "true"
+    if handoff:
+        config["program"]["handoff"] = "true"
+    if minify:
+        config["program"]["minify"] = "true"
+    if library:
+        config["program"]["library"] = "true"
 
     # Choose the appropriate code generator
     if language == "python":
@@ -34,8 +94,46 @@ def generate_cli_code(file_path: str, language: str, output: str) -> None:
         generator = CppCxxoptsCodeGenerator(config)
     elif language == "js-cla":
         generator = JavaScriptCommandLineArgsCodeGenerator(config)
+    elif language == "bash-completion":
+        generator = BashCompletionCodeGenerator(config)
+    elif language == "zsh-completion":
+        generator = ZshCompletionCodeGenerator(config)
     else:
         raise ValueError(f"Unsupported language: {language}")
 
+    if profile:
+        generator.profile = load_profile(profile)
+    generator.only_changed = only_changed
+
     # Generate and print the code
     generator.generate_code(output)
+    if depfile and generator.written:
+        write_depfile(
+            [file_path],
+            generator.written,
+            generator,
+            data_files=[profile] if profile else [],
+        )
+    return generator
+
+
+def generate_multicall_code(
+    file_paths: List[str], output: str, depfile: bool = False, handoff: bool = False
+) -> None:
+    """
+    Generates one C program running any of the tools specified, picked by
+    the name it's called as. Each tool is named after its spec file
+    (tools/ls.toml -> ls) and implemented by the caller as <tool>_main.
+    handoff adds encode/decode functions of the options of every tool
+    """
+    tools = {}
+    for file_path in file_paths:
+        name = os.path.splitext(os.path.basename(file_path))[0]
+        if name in tools:
+            raise ValueError(f"Two tools named {name}: {file_path}")
+        tools[name] = parse_cli_spec(file_path)
+
+    generator = CMulticallCodeGenerator(tools, os.path.basename(output), handoff)
+    generator.generate_code(output)
+    if depfile:
+        write_depfile(file_paths, generator.written, generator)
@@ -0,0 +1,256 @@
+"""
+Resolve spec includes and argument groups
+
+A spec can pull arguments and groups from other files, with paths
+relative to the including file:
+
+    include = ["common.toml"]
+
+and splice a named group of arguments anywhere an argument can go:
+
+    [[groups.logging]]
+    name = "--log-level"
+    ...
+
+    [[arguments]]
+    group = "logging"
+
+Included files are parsed once per content, memoized by path (only the
+last content of a file is kept, as --watch runs for long), and merged
+once per spec even when included along several paths (diamonds). The
+include graph is recorded so batch or incremental runs can
+tell which specs are affected by a changed file. The choices files of the
+arguments (choices_file, also relative to the file defining them) are
+recorded in the graph as includes of that file.
+
+Specs and included files can be TOML or JSON, see spec_formats.py.
+Compiled specs are already resolved, only their choices files are
+recorded.
+"""
+
+import hashlib
+import os
+from typing import Dict, Iterable, List, Tuple
+
+from .spec_formats import choices_files, is_compiled_spec, load_compiled, loads_spec
+from .validator import SpecValidationError, section_lines
+
+# realpath -> (sha256 of contents, (config, section lines))
+_parsed_files: Dict[str, Tuple[str, tuple]] = {}
+
+# realpath -> realpaths of its direct includes
+_include_graph: Dict[str, List[str]] = {}
+
+# realpaths of the specs resolved (not just included)
+_resolved_specs: Dict[str, None] = {}
+
+
+def _parse_file(file_path: str) -> tuple:
+    """TOML/JSON contents and section lines of a file, parsed once per content"""
+    with open(file_path, "rb") as f:
+        content = f.read()
+    real_path = os.path.realpath(file_path)
+    digest = hashlib.sha256(content).hexdigest()
+    cached = _parsed_files.get(real_path)
+    if cached is not None and cached[0] == digest:
+        return cached[1]
+    text = content.decode()
+    # no section lines in JSON, errors are located by file only
+    parsed = (loads_spec(file_path, text), section_lines(text))
+    _parsed_files[real_path] = (digest, parsed)
+    return parsed
+
+
+class _Resolver:
+    """resolves the includes and groups of one spec"""
+
+    def __init__(self):
+        # group name -> [(argument, where), ...], later definitions win
+        self.groups: Dict[str, list] = {}
+        self.errors: List[str] = []
+        # realpaths of the files loaded, whose arguments are merged once
+        self.loaded: Dict[str, None] = {}
+
+    def _where(self, file_path: str, lines: list, idx: int) -> str:
+        if idx < len(lines):
+            return f"{file_path}:{lines[idx]}"
+        return file_path
+
+    def _choices_path(
+        self, arg: dict, file_path: str, where: str, files: List[str]
+    ) -> dict:
+        """
+        argument with its choices_file, relative to the file defining it,
+        made relative to the current dir. The file is appended to files
+        """
+        choices_file = arg.get("choices_file")
+        if not isinstance(choices_file, str):
+            return arg
+        path = os.path.join(os.path.dirname(file_path), choices_file)
+        if not os.path.exists(path):
+            self.errors.append(f"{where}: choices file '{choices_file}' not found")
+            return arg
+        files.append(os.path.realpath(path))
+        return {**arg, "choices_file": path}
+
+    def _expand(self, entries: list, stack: List[str]) -> list:
+        """[(argument, where)] with group references spliced in"""
+        expanded = []
+        for arg, where in entries:
+            name = arg.get("group")
+            if name is None:
+                expanded.append((arg, where))
+            elif name in stack:
+                cycle = " -> ".join(stack + [name])
+                self.errors.append(f"{where}: group cycle {cycle}")
+            elif name not in self.groups:
+                self.errors.append(f"{where}: unknown group '{name}'")
+            else:
+                expanded += self._expand(self.groups[name], stack + [name])
+        return expanded
+
+    def load(self, file_path: str, stack: List[str]) -> list:
+        """
+        read a spec or included file, registering its groups. Returns its
+        top level arguments (the included ones first), not yet expanded
+        """
+        real_path = os.path.realpath(file_path)
+        if real_path in stack:
+            cycle = " -> ".join(stack + [real_path])
+            raise SpecValidationError([f"{file_path}: include cycle {cycle}"])
+        if real_path in self.loaded:
+            # included along another path too, already merged
+            return []
+        self.loaded[real_path] = None
+        config, lines = _parse_file(file_path)
+
+        arguments = []
+        includes = []
+        for include in config.get("include", []):
+            include_path = os.path.join(os.path.dirname(file_path), include)
+            if not os.path.exists(include_path):
+                self.errors.append(
+                    f"{file_path}: included file '{include}' not found"
+                )
+                continue
+            includes.append(os.path.realpath(include_path))
+            arguments += self.load(include_path, stack + [real_path])
+        _include_graph[real_path] = includes
+
+        def located(entries: list, entry_lines: list) -> list:
+            """[(argument, where)] of the entries of a section"""
+            result = []
+            for idx, arg in enumerate(entries):
+                where = self._where(file_path, entry_lines, idx)
+                arg = self._choices_path(arg, file_path, where, includes)
+                result.append((arg, where))
+            return result
+
+        for name, entries in config.get("groups", {}).items():
+            self.groups[name] = located(entries, lines["groups"].get(name, []))
+
+        arguments += located(config.get("arguments", []), lines["arguments"])
+        return arguments
+
+    def resolve(self, file_path: str) -> Tuple[dict, dict]:
+        """spec with includes and groups resolved, and argument locations"""
+        arguments = self._expand(self.load(file_path, []), [])
+        config, lines = _parse_file(file_path)
+        _resolved_specs[os.path.realpath(file_path)] = None
+
+        resolved = {
+            key: value
+            for key, value in config.items()
+            if key not in ["include", "groups"]
+        }
+        resolved["arguments"] = [arg for arg, _ in arguments]
+        locations = {
+            "arguments": [where for _, where in arguments],
+            "commands": [
+                self._where(file_path, lines["commands"], idx)
+                for idx in range(len(config.get("commands", [])))
+            ],
+            "commands.arguments": [],
+        }
+
+        if "commands" in config:
+            resolved["commands"] = []
+            for idx, cmd in enumerate(config["commands"]):
+                cmd_lines = (
+                    lines["commands.arguments"][idx]
+                    if idx < len(lines["commands.arguments"])
+                    else []
+                )
+                entries = []
+                for arg_idx, arg in enumerate(cmd.get("arguments", [])):
+                    where = self._where(file_path, cmd_lines, arg_idx)
+                    arg = self._choices_path(
+                        arg,
+                        file_path,
+                        where,
+                        _include_graph[os.path.realpath(file_path)],
+                    )
+                    entries.append((arg, where))
+                cmd_arguments = self._expand(entries, [])
+                resolved["commands"].append(
+                    {**cmd, "arguments": [arg for arg, _ in cmd_arguments]}
+                )
+                locations["commands.arguments"].append(
+                    [where for _, where in cmd_arguments]
+                )
+
+        if self.errors:
+            raise SpecValidationError(self.errors)
+        return resolved, locations
+
+
+def resolve_spec(file_path: str) -> Tuple[dict, dict]:
+    """
+    parse a spec resolving its includes and groups. Returns the config and
+    the location (file:line) of each of its arguments, see validate_spec
+    """
+    return _Resolver().resolve(file_path)
+
+
+def load_compiled_spec(file_path: str) -> dict:
+    """config of a compiled spec (validated when compiled)"""
+    config = load_compiled(file_path)
+    real_path = os.path.realpath(file_path)
+    _include_graph[real_path] = [
+        os.path.realpath(path) for path in choices_files(config)
+    ]
+    _resolved_specs[real_path] = None
+    return config
+
+
+def spec_dependencies(file_path: str) -> List[str]:
+    """
+    all the files a spec includes, directly or not, as recorded when it
+    was last resolved (it is resolved now if it never was)
+    """
+    real_path = os.path.realpath(file_path)
+    if real_path not in _include_graph:
+        if is_compiled_spec(file_path):
+            load_compiled_spec(file_path)
+        else:
+            resolve_spec(file_path)
+
+    dependencies = []
+    pending = list(reversed(_include_graph[real_path]))
+    while pending:
+        path = pending.pop()
+        if path in dependencies:
+            continue
+        dependencies.append(path)
+        pending += reversed(_include_graph.get(path, []))
+    return dependencies
+
+
+def affected_specs(changed: Iterable[str]) -> List[str]:
+    """the resolved specs that are, or include, any of the changed files"""
+    changed = {os.path.realpath(path) for path in changed}
+    return [
+        path
+        for path in _resolved_specs
+        if path in changed or changed.intersection(spec_dependencies(path))
+    ]
@@ -2,7 +2,10 @@
 Generate CLI parsing code in C using c_argparse library dependency
 """
 
+import json
+import os
 import re
+from typing import List
 
 from .code_generator import (
     ArgSpec,
@@ -48,18 +51,24 @@ class JavaScriptCommandLineArgsCodeGenerator(CodeGenerator):
     """Generates JS command-line-args code for CLI parsing for node."""
 
     def _generate_help(self, c: JavaScriptEmitter) -> None:
-        with c.func("usage", ["optionDefinitions", "rc = 0"]):
-            c.emit("const usageText = commandLineUsage([{")
-            c.emit('  header: "Header for help",')
-            c.emit('  content: "Description for help",')
-            c.emit("}, {")
-            c.emit('  header: "Options",')
-            c.emit("  optionList: optionDefinitions,")
-            c.emit("}, {")
-            c.emit('  content: "Epilog"')
-            c.emit("}]);")
-            c.emit("console.log(usageText);")
-            c.emit("process.exit(rc);")
+        """usage() and error() methods, the usage text built on first use"""
+        with Indenter(c, "usage() {", "}"):
+            with c.if_then("this.usageText === null"):
+                c.emit("this.usageText = commandLineUsage([{")
+                c.emit('  header: "Header for help",')
+                c.emit('  content: "Description for help",')
+                c.emit("}, {")
+                c.emit('  header: "Options",')
+                c.emit("  optionList: this.optionDefinitions,")
+                c.emit("}, {")
+                c.emit('  content: "Epilog"')
+                c.emit("}]);")
+            c.emit("return this.usageText;")
+        c.new_line()
+        c.cmnt("error followed by the usage")
+        with Indenter(c, "error(message) {", "}"):
+            c.emit("return new ParseError(`${message}\\n${this.usage()}`, 1);")
+        c.new_line()
 
     def _generate_option_defaults_block(self, c: JavaScriptEmitter) -> None:
         # // Defaults for each of the options
@@ -72,7 +81,7 @@ class JavaScriptCommandLineArgsCodeGenerator(CodeGenerator):
         # };
 
         c.cmnt("Defaults for each of the options")
-        with Indenter(c, "const defaults = {", "};"):
+        with Indenter(c, "this.defaults = Object.freeze({", "});"):
             for arg in self.args:
                 if not arg.is_positional:
                     long = arg.clean_name
@@ -85,6 +94,9 @@ class JavaScriptCommandLineArgsCodeGenerator(CodeGenerator):
                     if arg.multiple:
                         default = format_list(default)
                     c.emit(f"{long}: {default},{suffix}")
+            if self.env_bindings():
+                c.cmnt("overridden by the bound variables set in the environment")
+                c.emit(f"...environmentDefaults({self.scoped('envBindings')}),")
 
     def _generate_option_struct_block(self, c: JavaScriptEmitter) -> None:
         # const optionDefinitions = [
@@ -158,17 +170,41 @@ class JavaScriptCommandLineArgsCodeGenerator(CodeGenerator):
                     c.emit("multiple: true,")
                     c.emit("defaultOption: true")
 
+    def _dispatch_indexes(self) -> List[int]:
+        """
+        optionDefinitions indexes (help, the options, then positionals if
+        any) most used first according to the profile, [] if unchanged
+        """
+        options = [arg for arg in self.args if not arg.is_positional]
+        ordered = self.dispatch_order(options)
+        if ordered == options:
+            return []
+        indexes = [1 + options.index(arg) for arg in ordered] + [0]
+        if len(options) < len(self.args):
+            indexes.append(1 + len(options))
+        return indexes
+
+    def _generate_dispatch_definitions(self, c: JavaScriptEmitter) -> None:
+        """the definitions command-line-args searches, in dispatch order"""
+        indexes = self._dispatch_indexes()
+        if indexes:
+            c.cmnt("by decreasing use (profile), searched in this order")
+            c.emit(
+                f"this.dispatchDefinitions = [{', '.join(map(str, indexes))}]"
+                ".map((i) => optionDefinitions[i]);"
+            )
+
     def _augment_help_info(self, c: JavaScriptEmitter) -> None:
         """append default to help string"""
         # for (const opt of optionDefinitions) {
-        #   const default_ = defaults[opt.name]
+        #   const default_ = this.defaults[opt.name]
         #   if (typeof default_ !== "undefined") {
         #     opt.description += default_ == null ? " (required)" : ` (default ${default_})`
         #   }
         # }
         c.cmnt("append default to help string")
         with c.for_of_loop("const opt", "optionDefinitions"):
-            c.emit("const default_ = defaults[opt.name];")
+            c.emit("const default_ = this.defaults[opt.name];")
             with c.if_then('typeof default_ !== "undefined"'):
                 c.emit(
                     "opt.description += default_ == null ?"
@@ -181,8 +217,7 @@ class JavaScriptCommandLineArgsCodeGenerator(CodeGenerator):
         # const num_positionals = (typeof opts.positionals === "undefined")
         #                       ? 0 : opts.positionals.length
         #   if (num_positionals != 2) {
-        #     console.log(`Expecting 2 positional argument(s), but got ${num_positionals}`)
-        #     usage(optionDefinitions, 1)
+        #     throw this.error(`Expecting 2 positional argument(s), but got ${num_positionals}`)
         # }
         # opts.pos1 = opts.positionals[0]
         # opts.pos2 = opts.positionals[1]
@@ -197,10 +232,9 @@ class JavaScriptCommandLineArgsCodeGenerator(CodeGenerator):
         )
         with c.if_then("num_positionals != exp_positionals"):
             c.emit(
-                "console.log(`Expecting ${exp_positionals} positional argument(s), "
+                "throw this.error(`Expecting ${exp_positionals} positional argument(s), "
                 "but got ${num_positionals}`);"
             )
-            c.emit("usage(optionDefinitions, 1);")
         i = 0
         for arg in self.args:
             if arg.is_positional:
@@ -208,13 +242,9 @@ class JavaScriptCommandLineArgsCodeGenerator(CodeGenerator):
                 i += 1
         c.emit("delete opts.positionals;")
 
-    def _generate_check_choices_block(self, c: JavaScriptEmitter) -> None:
-        # // check choices
-        # const lang_valid = ["python", "bash"]
-        # if (!lang_valid.includes(opts.lang)) {
-        #       console.log("ERROR: 'lang' must be one of", lang_valid)
-        #       process.exit(1)
-        # }
+    def _generate_choices_block(self, c: JavaScriptEmitter) -> None:
+        """valid values of the 'choices' options, built with the parser"""
+        # this.lang_valid = Object.freeze(["python", "bash"]);
         first = True
         for arg in self.args:
             if (choices := arg.choices) is not None:
@@ -222,15 +252,56 @@ class JavaScriptCommandLineArgsCodeGenerator(CodeGenerator):
                 choices_dbl_quoted = ", ".join(
                     double_quote(choice) for choice in choices
                 )
+                if first:
+                    c.cmnt("valid values of the choices options")
+                    first = False
+                if arg.choices_file:
+                    c.emit(
+                        f"this.{long}_valid = "
+                        f"{self.scoped(arg.dest + '_choices')};"
+                    )
+                    continue
+                c.emit(
+                    f"this.{long}_valid = Object.freeze([{choices_dbl_quoted}]);"
+                )
+
+    def _generate_check_choices_block(self, c: JavaScriptEmitter) -> None:
+        # // check choices
+        # if (!this.lang_valid.includes(opts.lang)) {
+        #   throw new ParseError(`ERROR: 'lang' must be one of ${...}`, 1);
+        # }
+        first = True
+        for arg in self.args:
+            if arg.choices_file:
+                long = arg.clean_name
                 if first:
                     c.cmnt("check choices")
                     first = False
-                c.emit(f"const {long}_valid = [{choices_dbl_quoted}];")
-                with c.if_then(f"!{long}_valid.includes(opts.{arg.dest})"):
+                with c.if_then(f"!this.{long}_valid.has(opts.{arg.dest})"):
                     c.emit(
-                        f"console.log(\"ERROR: '{long}' must be one of\", {long}_valid);"
+                        "const nearest = "
+                        f"nearestChoice(this.{long}_valid, opts.{arg.dest});"
                     )
-                    c.emit("process.exit(1);")
+                    with Indenter(c, "throw new ParseError(", ");"):
+                        c.emit(
+                            f"`ERROR: '{long}': invalid choice "
+                            f"'${{opts.{arg.dest}}}'` +"
+                        )
+                        c.emit(
+                            "(nearest === null ? '' : "
+                            "` (did you mean '${nearest}'?)`), 1"
+                        )
+            elif arg.choices is not None:
+                long = arg.clean_name
+                if first:
+                    c.cmnt("check choices")
+                    first = False
+                with c.if_then(f"!this.{long}_valid.includes(opts.{arg.dest})"):
+                    with Indenter(c, "throw new ParseError(", ");"):
+                        c.emit(
+                            f"`ERROR: '{long}' must be one of "
+                            f"${{this.{long}_valid.join(', ')}}`, 1"
+                        )
 
     def _generate_name_translation_block(self, c: JavaScriptEmitter) -> None:
         """
@@ -242,7 +313,12 @@ class JavaScriptCommandLineArgsCodeGenerator(CodeGenerator):
         for arg in self.args:
             dest = arg.dest
             long = arg.clean_name
-            if dest != long:
+            if dest == long and arg.type_ == "flag" and arg.default:
+                if first:
+                    c.cmnt("translate from external to internal name")
+                    first = False
+                c.emit(f"opts.{dest} = !opts.{dest};  // invert")
+            elif dest != long:
                 if first:
                     c.cmnt("translate from external to internal name")
                     first = False
@@ -252,56 +328,591 @@ class JavaScriptCommandLineArgsCodeGenerator(CodeGenerator):
                     c.emit(f"opts.{dest} = opts.{long};")
                 c.emit(f"delete opts.{long}")
 
-    def generate_code(self, filename_base: str) -> None:
-        c = JavaScriptEmitter()
+    def _generate_abbreviations(self, c: JavaScriptEmitter) -> None:
+        """precomputed maps of unique and ambiguous long option prefixes"""
+        unique, ambiguous = self.abbreviations()
+        c.cmnt("unique prefix -> long option")
+        with Indenter(
+            c, f"const {self.scoped('abbreviations')} = new Map([", "]);"
+        ):
+            for prefix, name in unique.items():
+                c.emit(f'["{prefix}", "{name}"],')
+        c.cmnt("ambiguous prefix -> error message")
+        with Indenter(
+            c, f"const {self.scoped('ambiguousAbbreviations')} = new Map([", "]);"
+        ):
+            for prefix, message in ambiguous.items():
+                c.emit(f'["{prefix}", "{message}"],')
+        names, shorts = self.valued_options()
+        c.cmnt("options taking a value, their next token is not rewritten")
+        with Indenter(c, f"const {self.scoped('valued')} = new Set([", "]);"):
+            for name in names:
+                c.emit(f'"{name}",')
+        c.emit(f'const {self.scoped("valuedShorts")} = "{shorts}";')
+        c.new_line()
 
-        c.cmnt("https://github.com/75lb/command-line-args")
-        c.import_("command-line-args", "commandLineArgs")
+    def has_choices_files(self) -> bool:
+        """whether any argument (of any command) has a choices_file"""
+        args = self.args + [arg for cmd in self.commands for arg in cmd.args]
+        return any(arg.choices_file for arg in args)
 
-        c.cmnt("https://github.com/75lb/command-line-usage")
-        c.import_("command-line-usage", "commandLineUsage")
+    def _generate_choices_sets(self, c: JavaScriptEmitter) -> None:
+        """Sets of the choices_file values of a (sub)command, for .has()"""
+        for arg in self.args:
+            if not arg.choices_file:
+                continue
+            filename = os.path.basename(arg.choices_file)
+            c.cmnt(f"{arg.name} choices from {filename}")
+            with Indenter(
+                c, f"const {self.scoped(arg.dest + '_choices')} = new Set([", "]);"
+            ):
+                line = ""
+                for choice in arg.choices:
+                    item = json.dumps(choice) + ","
+                    if line and len(line) + len(item) > 70:
+                        c.emit(line)
+                        line = ""
+                    line += (" " if line else "") + item
+                c.emit(line)
+            c.new_line()
+
+    def _generate_environment_defaults(self, c: JavaScriptEmitter) -> None:
+        """defaults of the options bound to the variables set in the environment"""
+        c.cmnt("values of the flags bound to a variable, in lowercase")
+        with Indenter(c, "const envFlags = new Map([", "]);"):
+            c.emit('["1", true], ["true", true], ["yes", true], ["on", true],')
+            c.emit('["0", false], ["false", false], ["no", false], ["off", false],')
+            c.emit('["", false],')
+        c.new_line()
+        c.cmnt("defaults of the options bound (envBindings: variable -> [option,")
+        c.cmnt("type, multiple, inverted]) to the variables set: process.env is")
+        c.cmnt("scanned once, instead of a lookup per option")
+        with c.func("environmentDefaults", ["envBindings"]):
+            c.emit("const defaults = {};")
+            with c.for_of_loop(
+                "const [name, value]", "Object.entries(process.env)"
+            ):
+                c.emit("const binding = envBindings.get(name);")
+                with c.if_then("typeof binding === 'undefined'"):
+                    c.emit("continue;")
+                c.emit("const [option, type, multiple, inverted] = binding;")
+                with Indenter(c, "const convert = (item) => {", "};"):
+                    with c.if_then("type === 'flag'"):
+                        c.emit("const flag = envFlags.get(item.toLowerCase());")
+                        with c.if_then("typeof flag === 'undefined'"):
+                            c.emit(
+                                "throw new ParseError("
+                                "`ERROR: ${name}: invalid flag value '${item}'`, 1);"
+                            )
+                        c.emit("return flag !== inverted;")
+                    with c.if_then("type === 'number'"):
+                        c.emit("const number = Number(item);")
+                        with c.if_then("item.trim() === '' || Number.isNaN(number)"):
+                            c.emit(
+                                "throw new ParseError("
+                                "`ERROR: ${name}: invalid number value '${item}'`, 1);"
+                            )
+                        c.emit("return number;")
+                    c.emit("return item;")
+                c.emit(
+                    "defaults[option] = multiple ? "
+                    "value.split(/\\s+/).filter(Boolean).map(convert) : convert(value);"
+                )
+            c.emit("return defaults;")
+
+    def _generate_env_bindings(self, c: JavaScriptEmitter) -> None:
+        """map of the variables of a (sub)command to their options"""
+        bindings = self.env_bindings()
+        if not bindings:
+            return
+        c.cmnt("bound variable -> [option, type, multiple, inverted]")
+        with Indenter(c, f"const {self.scoped('envBindings')} = new Map([", "]);"):
+            for arg in bindings:
+                type_ = "flag" if arg.type_ == "flag" else get_jstype(arg.type_)
+                type_ = type_.lower()
+                multiple = "true" if arg.multiple else "false"
+                inverted = "true" if arg.type_ == "flag" and arg.default else "false"
+                c.emit(
+                    f'["{arg.env}", ["{arg.clean_name}", "{type_}", {multiple}, '
+                    f"{inverted}]],"
+                )
+        c.new_line()
 
+    def _generate_nearest_choice(self, c: JavaScriptEmitter) -> None:
+        """closest choice to an invalid value of a choices_file argument"""
+        c.cmnt("choice closest to value, null if none is within length / 3 edits")
+        with c.func("nearestChoice", ["choices", "value"]):
+            c.emit("let nearest = null;")
+            c.emit("let nearestDistance = Math.floor(value.length / 3) + 1;")
+            c.emit("const row = new Array(value.length + 1);")
+            with c.for_of_loop("const choice", "choices"):
+                with Indenter(c, "for (let j = 0; j <= value.length; j++) {", "}"):
+                    c.emit("row[j] = j;")
+                with Indenter(c, "for (let i = 1; i <= choice.length; i++) {", "}"):
+                    c.emit("let diagonal = row[0];")
+                    c.emit("row[0] = i;")
+                    with Indenter(
+                        c, "for (let j = 1; j <= value.length; j++) {", "}"
+                    ):
+                        c.emit("const above = row[j];")
+                        c.emit(
+                            "row[j] = Math.min(above + 1, row[j - 1] + 1, "
+                            "diagonal + (choice[i - 1] === value[j - 1] ? 0 : 1));"
+                        )
+                        c.emit("diagonal = above;")
+                with c.if_then("row[value.length] < nearestDistance"):
+                    c.emit("nearest = choice;")
+                    c.emit("nearestDistance = row[value.length];")
+            c.emit("return nearest;")
+
+    def _generate_expand_abbreviations(self, c: JavaScriptEmitter) -> None:
+        """
+        helper replacing long option prefixes using the maps, skipping the
+        values of options so "-o --verb" keeps its value
+        """
+        with c.func(
+            "expandAbbreviations",
+            ["argv", "abbreviations", "ambiguous", "valued", "valuedShorts"],
+        ):
+            c.emit("const expanded = [...argv];")
+            with Indenter(c, "for (let i = 0; i < expanded.length; i++) {", "}"):
+                c.emit("const arg = expanded[i];")
+                with c.if_then('arg === "--"'):
+                    c.emit("break;")
+                with c.if_then('arg.length > 1 && arg[0] === "-" && arg[1] !== "-"'):
+                    c.cmnt("short options bundle, the first one taking a value")
+                    c.cmnt("ends it, with the next token if it is the last")
+                    c.emit(
+                        "const valuedAt = [...arg].findIndex("
+                        "(letter, at) => at > 0 && valuedShorts.includes(letter));"
+                    )
+                    with c.if_then("valuedAt === arg.length - 1"):
+                        c.emit("i++;")
+                    c.emit("continue;")
+                c.emit('const equal = arg.indexOf("=");')
+                c.emit("const name = equal < 0 ? arg : arg.slice(0, equal);")
+                with c.if_then("ambiguous.has(name)"):
+                    c.emit("throw new ParseError(`ERROR: ${ambiguous.get(name)}`, 1);")
+                c.emit("const option = abbreviations.get(name);")
+                with c.if_then("typeof option !== 'undefined'"):
+                    c.emit("expanded[i] = option + arg.slice(name.length);")
+                c.cmnt("the value of an option without = is the next token")
+                with c.if_then("equal < 0 && valued.has(option ?? name)"):
+                    c.emit("i++;")
+            c.emit("return expanded;")
+
+    def _generate_trace_line(self, c: JavaScriptEmitter) -> None:
+        """CLIMETA_TRACE line to stderr (1/stderr) or appended to a file"""
+        with c.func("traceLine", ["destination", "fields"]):
+            c.emit(f"const line = `{self.trace_prefix()} ${{fields}}\\n`;")
+            with c.if_then('destination === "1" || destination === "stderr"'):
+                c.emit("process.stderr.write(line);")
+                c.emit("return;")
+            c.emit("appendFileSync(destination, line);")
+
+    def _generate_trace_mark(self, c: JavaScriptEmitter, name: str) -> None:
+        """time mark, only taken when tracing"""
+        c.emit(f"const {name} = trace ? performance.now() : 0;")
+
+    def _generate_trace_report(self, c: JavaScriptEmitter) -> None:
+        """
+        emit the trace line from the time marks, in microseconds. The
+        parser is built once, so only its first parse reports setup_us
+        """
+        fields = "tokens=${argv.length}"
+        if self.command is not None:
+            fields = f"command={self.command.name} " + fields
+        phases = [
+            ("setup_us", "this.traceSetupMs"),
+            ("parse_us", "traceParsed - traceStart"),
+            ("validate_us", "traceValidated - traceParsed"),
+            ("choices_us", "traceEnd - traceValidated"),
+            ("total_us", "this.traceSetupMs + traceEnd - traceStart"),
+        ]
+        with c.if_then("trace"):
+            c.emit("const traceEnd = performance.now();")
+            with Indenter(c, "traceLine(trace, [", "].join(' '));"):
+                c.emit(f"`{fields}`,")
+                for field, elapsed in phases:
+                    c.emit(f"`{field}=${{(({elapsed}) * 1000).toFixed(1)}}`,")
+            c.emit("this.traceSetupMs = 0;")
+
+    def _generate_usage_counters(self, c: JavaScriptEmitter) -> None:
+        """
+        counters of the options parsed by each (sub)command, appended in
+        one write to CLIMETA_USAGE_FILE at exit. command-line-args rejects
+        options given twice, so an option is counted once per parse
+        """
+        generators = [self.for_command(command) for command in self.commands]
+        c.cmnt("(sub)command -> [usage line prefix, option names, counters]")
+        c.cmnt("the counters being the runs, then the times each option was given")
+        with Indenter(c, "const usageCounters = new Map([", "]);\n"):
+            for generator in generators or [self]:
+                command = "" if generator.command is None else generator.command.name
+                options = generator.counted_options()
+                with Indenter(c, f'["{command}", [', "]],"):
+                    c.emit(f'"{generator.usage_prefix()}",')
+                    names = ", ".join(f"'{arg.clean_name}'" for arg in options)
+                    c.emit(f"[{names}],")
+                    c.emit(f"new Array({len(options) + 1}).fill(0),")
+
+        with c.func("countUsage", ["command", "rawOptions"]):
+            c.emit("const [, names, counts] = usageCounters.get(command);")
+            c.emit("counts[0]++;")
+            with Indenter(c, "names.forEach((name, idx) => {", "});"):
+                with c.if_then("typeof rawOptions[name] !== 'undefined'"):
+                    c.emit("counts[idx + 1]++;")
+
+        with c.func("writeUsage", []):
+            c.emit(
+                "const path = process.env.CLIMETA_USAGE_FILE ?? "
+                f"{double_quote(self.usage_file)};"
+            )
+            c.emit("const lines = [];")
+            with Indenter(
+                c,
+                "for (const [prefix, names, [runs, ...counts]] of "
+                "usageCounters.values()) {",
+                "}",
+            ):
+                with c.if_then("runs > 0"):
+                    with Indenter(c, "const given = names.flatMap((name, idx) =>", ");"):
+                        c.emit("counts[idx] > 0 ? [` --${name}=${counts[idx]}`] : []")
+                    c.emit("lines.push(`${prefix} runs=${runs}${given.join('')}\\n`);")
+            with c.if_then("path && lines.length > 0"):
+                with Indenter(c, "try {", "} catch {"):
+                    c.emit("appendFileSync(path, lines.join(''));")
+                with Indenter(c, post_text="}"):
+                    c.cmnt("best effort, the counters are lost")
+        c.emit("process.on('exit', writeUsage);")
         c.new_line()
 
-        with c.exported_func("parseArgs", []):
+    def _generate_handoff(self, c: JavaScriptEmitter) -> None:
+        """
+        encodeOptions/decodeOptions: parsed options to and from the
+        hand-off string of the spec (see CodeGenerator.handoff_header)
+        """
+        generators = [self.for_command(command) for command in self.commands]
+        c.cmnt("(sub)command -> [dest, type, multiple] of its arguments in spec order")
+        with Indenter(c, "const handoffFields = new Map([", "]);"):
+            for generator in generators or [self]:
+                command = "" if generator.command is None else generator.command.name
+                with Indenter(c, f'["{command}", [', "]],"):
+                    for arg in generator.args:
+                        multiple = "true" if arg.multiple else "false"
+                        c.emit(f'["{arg.dest}", "{arg.type_}", {multiple}],')
+        c.emit(f'const handoffHeader = "{self.handoff_header()}";')
+        c.new_line()
 
+        c.cmnt("a value as a hand-off field: ~ for none, else <bytes>:<value>")
+        with c.func("handoffValue", ["value"]):
+            with c.if_then("value === null || typeof value === 'undefined'"):
+                c.emit("return '~';")
+            c.emit(
+                "const text = typeof value === 'boolean' ? "
+                "(value ? '1' : '0') : String(value);"
+            )
+            c.emit("return `${Buffer.byteLength(text)}:${text}`;")
+
+        c.cmnt("opts (as parsed) as a hand-off string (for CLIMETA_OPTIONS, say),")
+        c.cmnt("loaded by decode_options of the parsers of this spec, in any language")
+        with c.exported_func("encodeOptions", ["opts"]):
+            c.emit("const parts = [handoffHeader];")
+            if self.commands:
+                c.emit("const command = opts.command;")
+                c.emit("parts.push(handoffValue(command));")
+            else:
+                c.emit('const command = "";')
+            with c.for_of_loop(
+                "const [dest, , multiple]", "handoffFields.get(command)"
+            ):
+                c.emit("const value = opts[dest];")
+                with Indenter(c, "if (multiple && Array.isArray(value)) {", "} else {"):
+                    c.emit(
+                        "parts.push(`${value.length}*`, ...value.map(handoffValue));"
+                    )
+                with Indenter(c, post_text="}"):
+                    c.emit("parts.push(handoffValue(value));")
+            c.emit("return parts.join('');")
+
+        c.cmnt("opts of a hand-off string, of any backend, without parsing nor")
+        c.cmnt("validating them again. Throws an Error if malformed or of another spec")
+        with c.exported_func("decodeOptions", ["encoded"]):
+            with c.if_then("!encoded.startsWith(handoffHeader)"):
+                c.emit("throw new Error('not a hand-off encoding of this spec');")
+            c.emit("const data = Buffer.from(encoded);")
+            c.emit("let pos = handoffHeader.length;")
+            with Indenter(c, "const count = (separator) => {", "};"):
+                c.emit("const end = data.indexOf(separator, pos);")
+                c.emit(
+                    "const digits = end < 0 ? '' : data.toString('latin1', pos, end);"
+                )
+                with c.if_then("!/^[0-9]+$/.test(digits)"):
+                    c.emit("throw new Error('malformed hand-off field');")
+                c.emit("pos = end + 1;")
+                c.emit("return Number(digits);")
+            with Indenter(c, "const take = (type) => {", "};"):
+                with c.if_then("data[pos] === 0x7e"):
+                    c.cmnt("~, no value")
+                    c.emit("pos++;")
+                    c.emit("return null;")
+                c.emit("const size = count(':');")
+                with c.if_then("pos + size > data.length"):
+                    c.emit("throw new Error('truncated hand-off encoding');")
+                c.emit("const text = data.toString('utf8', pos, pos + size);")
+                c.emit("pos += size;")
+                with c.if_then("type === 'flag'"):
+                    c.emit("return text === '1';")
+                c.emit("return type === 'string' ? text : Number(text);")
+            c.emit("const opts = {};")
+            if self.commands:
+                c.emit("const command = take('string');")
+                with c.if_then("!handoffFields.has(command)"):
+                    c.emit("throw new Error(`unknown command ${command}`);")
+                c.emit("opts.command = command;")
+            else:
+                c.emit('const command = "";')
+            with c.for_of_loop(
+                "const [dest, type, multiple]", "handoffFields.get(command)"
+            ):
+                with Indenter(c, "if (multiple && data[pos] !== 0x7e) {", "} else {"):
+                    c.emit(
+                        "opts[dest] = Array.from({ length: count('*') }, () => take(type));"
+                    )
+                with Indenter(c, post_text="}"):
+                    c.emit("opts[dest] = take(type);")
+            with c.if_then("pos !== data.length"):
+                c.emit("throw new Error('trailing data after the hand-off fields');")
+            c.emit("return opts;")
+
+    def _generate_parse_error(self, c: JavaScriptEmitter) -> None:
+        """error thrown by Parser.parse() instead of exiting"""
+        c.cmnt("thrown by Parser.parse(): status 0 for help (the usage is the")
+        c.cmnt("message), 1 for errors")
+        with Indenter(c, "export class ParseError extends Error {", "};\n"):
+            with Indenter(c, "constructor(message, status) {", "}"):
+                c.emit("super(message);")
+                c.emit("this.name = 'ParseError';")
+                c.emit("this.status = status;")
+
+    def _generate_parser_class(self, c: JavaScriptEmitter) -> None:
+        """
+        Parser class of a (sub)command: the option definitions and usage
+        are built once, parse(argv) can then be called any number of times
+        without modifying them, and throws ParseError instead of exiting
+        """
+        if self.command is None:
+            header = "export class Parser {"
+        else:
+            header = f"class {self.scoped('Parser')} {{"
+
+        with Indenter(c, header, "};\n"):
+            with Indenter(c, "constructor() {", "}"):
+                if self.trace:
+                    c.emit("this.trace = process.env.CLIMETA_TRACE;")
+                    c.emit(
+                        "const traceStart = this.trace ? performance.now() : 0;"
+                    )
+                self._generate_option_defaults_block(c)
+                self._generate_option_struct_block(c)
+                self._augment_help_info(c)
+                c.emit("this.optionDefinitions = optionDefinitions;")
+                self._generate_dispatch_definitions(c)
+                self._generate_choices_block(c)
+                c.emit("this.usageText = null;")
+                if self.trace:
+                    c.emit(
+                        "this.traceSetupMs = "
+                        "this.trace ? performance.now() - traceStart : 0;"
+                    )
+            c.new_line()
             self._generate_help(c)
-            self._generate_option_defaults_block(c)
-            self._generate_option_struct_block(c)
-            self._augment_help_info(c)
-
-            # const rawOptions = commandLineArgs(optionDefinitions)
-            # // fill up with defaults the options not provided
-            # const opts = {...defaults, ...rawOptions }
-            # if (opts.help) {
-            #   usage(optionDefinitions, 0)
-            # }
-            # for (const optName in opts) {
-            #   if (opts[optName] == null) {
-            #     console.log("Invalid or no option passed for", "--" + optName)
-            #     usage(optionDefinitions, 1)
+
+            # parse(argv) {
+            #   const rawOptions = commandLineArgs(this.optionDefinitions, { argv });
+            #   // fill up with defaults the options not provided
+            #   const opts = {...this.defaults, ...rawOptions };
+            #   if (opts.help) {
+            #     throw new ParseError(this.usage(), 0);
             #   }
+            #   for (const optName in opts) {
+            #     if (opts[optName] == null) {
+            #       throw this.error(`Invalid or no option passed for --${optName}`);
+            #     }
+            #   }
+            #   return opts;
             # }
-            # return opts
-
-            c.emit("const rawOptions = commandLineArgs(optionDefinitions);")
-            c.cmnt("fill up with defaults the options not provided")
-            c.emit("const opts = {...defaults, ...rawOptions };")
-            with c.if_then("opts.help"):
-                c.emit("usage(optionDefinitions, 0);")
-            with c.for_in_loop("const optName", "opts"):
-                with c.if_then("opts[optName] == null"):
+            with Indenter(c, "parse(argv) {", "}"):
+                if self.trace:
+                    c.emit("const trace = this.trace;")
+                    self._generate_trace_mark(c, "traceStart")
+
+                if self.allow_abbrev:
+                    with Indenter(c, "argv = expandAbbreviations(", ");"):
+                        c.emit(
+                            f"argv, {self.scoped('abbreviations')}, "
+                            f"{self.scoped('ambiguousAbbreviations')},"
+                        )
+                        c.emit(
+                            f"{self.scoped('valued')}, {self.scoped('valuedShorts')}"
+                        )
+                c.emit("let rawOptions;")
+                with Indenter(c, "try {", "} catch (e) {"):
+                    definitions = (
+                        "dispatchDefinitions"
+                        if self._dispatch_indexes()
+                        else "optionDefinitions"
+                    )
                     c.emit(
-                        'console.log("Invalid or no option passed for", "--" + optName);'
+                        "rawOptions = "
+                        f"commandLineArgs(this.{definitions}, {{ argv }});"
                     )
-                    c.emit("usage(optionDefinitions, 1);")
+                with Indenter(c, post_text="}"):
+                    c.cmnt("unknown options, values given to flags...")
+                    c.emit("throw new ParseError(`ERROR: ${e.message}`, 1);")
+                if self.trace:
+                    self._generate_trace_mark(c, "traceParsed")
+                c.cmnt("fill up with defaults the options not provided")
+                c.emit("const opts = {...this.defaults, ...rawOptions };")
+                with c.if_then("opts.help"):
+                    c.emit("throw new ParseError(this.usage(), 0);")
+                with c.for_in_loop("const optName", "opts"):
+                    with c.if_then("opts[optName] == null"):
+                        c.emit(
+                            "throw this.error(`Invalid or no option passed for --${optName}`);"
+                        )
+
+                # translate from external to internal name with possible flag inversion
+                self._generate_name_translation_block(c)
+
+                self._generate_assing_positionals_block(c)
+                if self.trace:
+                    self._generate_trace_mark(c, "traceValidated")
+                self._generate_check_choices_block(c)
+                if self.trace:
+                    self._generate_trace_report(c)
+                if self.usage_counters:
+                    command = "" if self.command is None else self.command.name
+                    c.emit(f'countUsage("{command}", rawOptions);')
+
+                c.emit("return opts;")
+
+    def _generate_commands_dispatch(self, c: JavaScriptEmitter) -> None:
+        """
+        exported Parser jumping to the parser of the selected command,
+        built on first use, so only the option definitions of the commands
+        used get built
+        """
+        with c.func("usageCommands", []):
+            with Indenter(c, "return [", "].join('\\n');"):
+                c.emit(f'"Usage: {self.program_name} COMMAND [options]",')
+                c.emit(f'"\\n{self.description}\\n\\ncommands:",')
+                left_size = 1 + max(len(cmd.name) for cmd in self.commands)
+                for command in self.commands:
+                    padding = " " * (left_size - len(command.name))
+                    c.emit(f'"  {command.name}{padding}: {command.help_}",')
+                if self.epilog:
+                    c.emit(f'"\\n{self.epilog}",')
+
+        with Indenter(c, "const commands = new Map([", "]);\n"):
+            for command in self.commands:
+                scoped = self.for_command(command).scoped
+                c.emit(f'["{command.name}", {scoped("Parser")}],')
+
+        with Indenter(c, "export class Parser {", "};\n"):
+            with Indenter(c, "constructor() {", "}"):
+                c.cmnt("command name -> its parser, built on first use")
+                c.emit("this.parsers = new Map();")
+            c.new_line()
+            with Indenter(c, "parse(argv) {", "}"):
+                c.emit("const command = argv[0];")
+                c.emit("const commandParser = commands.get(command);")
+                with c.if_then("typeof commandParser === 'undefined'"):
+                    with c.if_then('command === "-h" || command === "--help"'):
+                        c.emit("throw new ParseError(usageCommands(), 0);")
+                    with c.if_then("typeof command !== 'undefined'"):
+                        with Indenter(c, "throw new ParseError(", ");"):
+                            c.emit(
+                                "`ERROR: unknown command ${command}\\n"
+                                "${usageCommands()}`, 1"
+                            )
+                    c.emit("throw new ParseError(usageCommands(), 1);")
+                c.emit("let parser = this.parsers.get(command);")
+                with c.if_then("typeof parser === 'undefined'"):
+                    c.emit("parser = new commandParser();")
+                    c.emit("this.parsers.set(command, parser);")
+                c.emit("const opts = parser.parse(argv.slice(1));")
+                c.emit("opts.command = command;")
+                c.emit("return opts;")
+
+    def _generate_parse_args(self, c: JavaScriptEmitter) -> None:
+        """
+        parseArgs() of the process command line: prints the usage/errors
+        and exits, as expected from a CLI
+        """
+        with c.exported_func("parseArgs", []):
+            with Indenter(c, "try {", "} catch (e) {"):
+                c.emit("return new Parser().parse(process.argv.slice(2));")
+            with Indenter(c, post_text="}"):
+                with c.if_then("!(e instanceof ParseError)"):
+                    c.emit("throw e;")
+                c.emit("console.log(e.message);")
+                c.emit("process.exit(e.status);")
 
-            # translate from external to internal name with possible flag inversion
-            self._generate_name_translation_block(c)
+    def generate_code(self, filename_base: str) -> None:
+        c = JavaScriptEmitter()
 
-            self._generate_assing_positionals_block(c)
-            self._generate_check_choices_block(c)
+        c.cmnt("https://github.com/75lb/command-line-args")
+        c.import_("command-line-args", "commandLineArgs")
 
-            c.emit("return opts;")
+        c.cmnt("https://github.com/75lb/command-line-usage")
+        c.import_("command-line-usage", "commandLineUsage")
+
+        if self.trace or self.usage_counters:
+            c.emit("import { appendFileSync } from 'node:fs';")
+
+        c.new_line()
 
-        self.to_file(str(c), filename_base + ".mjs")
+        if self.trace:
+            self._generate_trace_line(c)
+        if self.usage_counters:
+            self._generate_usage_counters(c)
+        if self.handoff:
+            self._generate_handoff(c)
+
+        self._generate_parse_error(c)
+
+        if self.allow_abbrev:
+            if self.commands:
+                for command in self.commands:
+                    self.for_command(command)._generate_abbreviations(c)
+            else:
+                self._generate_abbreviations(c)
+            self._generate_expand_abbreviations(c)
+
+        if self.has_choices_files():
+            self._generate_nearest_choice(c)
+            for command in self.commands:
+                self.for_command(command)._generate_choices_sets(c)
+            self._generate_choices_sets(c)
+
+        if self.has_env_bindings():
+            self._generate_environment_defaults(c)
+            for command in self.commands:
+                self.for_command(command)._generate_env_bindings(c)
+            if not self.commands:
+                self._generate_env_bindings(c)
+
+        if self.commands:
+            for command in self.commands:
+                self.for_command(command)._generate_parser_class(c)
+            self._generate_commands_dispatch(c)
+        else:
+            self._generate_parser_class(c)
+        self._generate_parse_args(c)
+
+        roots = ["parseArgs"]
+        if self.handoff:
+            roots += ["encodeOptions", "decodeOptions"]
+        filename = filename_base + ".mjs"
+        self.to_file(self.minified_code(c, roots, filename), filename)
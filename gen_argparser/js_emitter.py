@@ -2,6 +2,7 @@
 Code emitter specialized for several JavaScript constructs
 """
 
+import re
 from typing import List
 from .emitter import Emitter
 from .indenter import Indenter
@@ -12,6 +13,11 @@ class JavaScriptEmitter(Emitter):
 
     INDENT = "  "
 
+    COMMENT_RE = re.compile(r"^\s*//")
+    TRAILING_COMMENT_RE = re.compile(r"\s+// [^'\"`]*$")
+    FUNC_RE = re.compile(r"^(?:export )?function (\w+)\(")
+    FUNC_END = "};"
+
     def cmnt(self, text: str) -> None:
         """emit a single line comment"""
         self.emit("// " + text)
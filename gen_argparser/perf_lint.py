@@ -0,0 +1,419 @@
+"""
+Performance advisor of specs, for climeta.py lint --perf
+
+Predicts from the shape of a spec the work the parser generated by each
+backend does on every run: the string compares looking an option up
+(a scan of every spelling, a bsearch or a hash lookup), the choices
+checks, the work done before parsing (options built, defaults converted
+from strings, help formatters and descriptions), the processes bash
+spawns, and the modules, headers or commands the generated code pulls
+in. The costs over the thresholds below are warnings, with the setting
+(or backend) that avoids them.
+"""
+
+import contextlib
+import copy
+import io
+import json
+import math
+import os
+import re
+import tempfile
+from typing import Dict, List, Optional
+
+from .bash_generator import BashCodeGenerator
+from .c_argparse_generator import CArgparseCodeGenerator
+from .code_generator import ArgSpec, CodeGenerator
+from .cpp_cxxopts_generator import CppCxxoptsCodeGenerator
+from .js_cla_generator import JavaScriptCommandLineArgsCodeGenerator
+from .python_generator import PythonCodeGenerator
+
+BACKENDS = {
+    "python": PythonCodeGenerator,
+    "bash": BashCodeGenerator,
+    "c-argparse": CArgparseCodeGenerator,
+    "cpp-cxxopts": CppCxxoptsCodeGenerator,
+    "js-cla": JavaScriptCommandLineArgsCodeGenerator,
+}
+
+# spellings an option given is compared with one after another
+LINEAR_DISPATCH = 32
+# inline choices scanned (or, in C++, inserted in a set) on every parse
+LARGE_CHOICES = 32
+# options built (or defaults converted from strings) before each parse
+STARTUP_ITEMS = 64
+# processes a bash parse spawns even when no option is given
+BASH_FORKS = 3
+# bytes of bash parsed when the script is sourced
+SCRIPT_BYTES = 64 * 1024
+
+
+def _finding(
+    severity: str, check: str, command: str, message: str, advice: str = ""
+) -> dict:
+    """a finding of the analysis, severity being 'warning' or 'info'"""
+    return {
+        "severity": severity,
+        "check": check,
+        "command": command,
+        "message": message,
+        "advice": advice,
+    }
+
+
+def dispatch(generator: CodeGenerator, backend: str) -> dict:
+    """
+    how the backend looks the (sub)command options up: kind (linear,
+    bsearch or hash), the compares to reach the last option and, for the
+    linear scans of a profiled spec, the compares expected per option
+    given
+    """
+    options = [
+        arg for arg in generator.dispatch_order(generator.args) if not arg.is_positional
+    ]
+    if backend in ["python", "cpp-cxxopts"]:
+        return {"kind": "hash", "worst": 1, "expected": None}
+    if backend == "c-argparse" and generator.library:
+        # long options, the shorts are a char compare each
+        worst = 1 + math.ceil(math.log2(len(options) + 1))
+        return {"kind": "bsearch", "worst": worst, "expected": None}
+
+    # compares per token before the options are tested: the help option
+    # of C argparse and command-line-args, the prefix patterns of bash
+    before = 1
+    if backend == "bash":
+        before = 0
+        if generator.allow_abbrev:
+            unique, ambiguous = generator.abbreviations()
+            before = 1 + len(unique) + len(ambiguous)
+    # the case patterns of bash, the options table of C argparse, the
+    # definitions command-line-args searches
+    tested = before
+    total = 0
+    for arg in options:
+        tested += 1 + (backend == "bash" and arg.short != "")
+        total += tested * generator.usage_count(arg)
+    given = sum(generator.usage_count(arg) for arg in options)
+    expected = round(total / given, 1) if given else None
+    return {"kind": "linear", "worst": tested, "expected": expected}
+
+
+def _choices_options(generator: CodeGenerator) -> List[ArgSpec]:
+    """the options checked against inline choices (choices_file are hashed)"""
+    return [arg for arg in generator.args if arg.choices and not arg.choices_file]
+
+
+def _default_items(arg: ArgSpec) -> int:
+    """values of the default of an argument"""
+    if not arg.has_default or arg.type_ == "flag":
+        return 0
+    return len(arg.default) if arg.multiple else 1
+
+
+def analyse_command(generator: CodeGenerator, backend: str) -> tuple:
+    """costs and findings of the parser of a (sub)command"""
+    command = "" if generator.command is None else generator.command.name
+    options = [arg for arg in generator.args if not arg.is_positional]
+    lookup = dispatch(generator, backend)
+    choices = _choices_options(generator)
+    costs = {
+        "options": len(options),
+        "dispatch": lookup["kind"],
+        "dispatch_compares": lookup["worst"],
+        "expected_compares": lookup["expected"],
+        # the choices of every choices option are checked on every parse
+        "choice_compares": sum(len(arg.choices) for arg in choices),
+        "startup_items": 0,
+        "forks": 0,
+    }
+    findings = []
+
+    # with a profile, the compares of the options actually given
+    compares = lookup["worst"] if lookup["expected"] is None else lookup["expected"]
+    if lookup["kind"] == "linear" and compares >= LINEAR_DISPATCH:
+        advice = []
+        if backend == "c-argparse":
+            advice.append(
+                'library = "true" looks them up with bsearch '
+                f"({1 + math.ceil(math.log2(len(options) + 1))} compares)"
+            )
+        expected = ""
+        if lookup["expected"] is None:
+            advice.append("--profile tests the most used options first")
+        else:
+            expected = f", {lookup['expected']} expected with the profile"
+        advice.append("python and cpp-cxxopts use hash lookups")
+        findings.append(
+            _finding(
+                "warning",
+                "linear-dispatch",
+                command,
+                f"{len(options)} options looked up by a linear scan, "
+                f"up to {lookup['worst']} compares per option given{expected}",
+                ", ".join(advice),
+            )
+        )
+    if backend == "bash" and generator.allow_abbrev:
+        findings.append(
+            _finding(
+                "info",
+                "abbreviations",
+                command,
+                "every argument is first matched against the "
+                f"{len(generator.abbreviations()[0])} unique prefixes "
+                "(allow_abbrev)",
+            )
+        )
+
+    for arg in choices:
+        count = len(arg.choices)
+        if backend == "bash":
+            # validate_args expr matches every choices option, given or not
+            costs["forks"] += 1
+        if backend == "cpp-cxxopts":
+            costs["startup_items"] += count
+        if count < LARGE_CHOICES:
+            continue
+        scan = {
+            "python": "argparse scans the choices list",
+            "bash": "expr matches them as one pattern",
+            "c-argparse": "strcmp scans them",
+            "cpp-cxxopts": "a std::set of them is built on every parse",
+            "js-cla": "Array.includes scans them",
+        }[backend]
+        findings.append(
+            _finding(
+                "warning",
+                "large-choices",
+                command,
+                f"{arg.name} has {count} inline choices, {scan}",
+                "choices_file compiles them into a hashed lookup",
+            )
+        )
+
+    if backend == "python":
+        # add_argument formats the metavar of each argument to check it,
+        # with a new HelpFormatter (querying the terminal size)
+        costs["startup_items"] += len(generator.args)
+        if len(generator.args) >= STARTUP_ITEMS:
+            findings.append(
+                _finding(
+                    "warning",
+                    "startup",
+                    command,
+                    f"build_parser adds {len(generator.args)} arguments at each "
+                    "process start, argparse building a help formatter for each",
+                    "reuse a Parser in long running processes, or hand the "
+                    'options to workers (handoff = "true")',
+                )
+            )
+    if backend == "cpp-cxxopts":
+        # the options, their help strings and their defaults (as strings)
+        # are given to cxxopts again on every parse
+        defaults = sum(_default_items(arg) for arg in options)
+        costs["startup_items"] += len(options) + defaults
+        if len(options) + defaults >= STARTUP_ITEMS:
+            findings.append(
+                _finding(
+                    "warning",
+                    "startup",
+                    command,
+                    f"every parse builds {len(options)} cxxopts options and "
+                    f"converts {defaults} default values from strings",
+                    "the c-argparse library mode keeps them in static tables",
+                )
+            )
+        multiple = [arg for arg in options if arg.multiple and arg.has_default]
+        if multiple:
+            items = sum(_default_items(arg) for arg in multiple)
+            findings.append(
+                _finding(
+                    "info",
+                    "multiple-defaults",
+                    command,
+                    f"the defaults of {len(multiple)} multiple options are "
+                    f"split and converted again on every parse ({items} values)",
+                )
+            )
+    if backend == "js-cla":
+        # the constructor appends the default to every option description
+        costs["startup_items"] += len(options)
+
+    if backend == "bash" and costs["forks"] >= BASH_FORKS:
+        findings.append(
+            _finding(
+                "warning",
+                "forks",
+                command,
+                f"validate_args runs expr for each of the {costs['forks']} "
+                "choices options, on every parse",
+                "choices_file checks them in an associative array",
+            )
+        )
+    return costs, findings
+
+
+def generated_code(config: dict, backend: str, profile: Dict[str, int]) -> dict:
+    """file name -> code of the parser generated by backend"""
+    generator = BACKENDS[backend](copy.deepcopy(config))
+    generator.profile = profile
+    with tempfile.TemporaryDirectory(prefix="climeta-lint-") as work_dir:
+        # --minify reports the bytes it saved on stderr
+        with contextlib.redirect_stderr(io.StringIO()):
+            generator.generate_code(os.path.join(work_dir, "spec"))
+        code = {}
+        for path in generator.written:
+            with open(path, encoding="utf-8") as f:
+                code[os.path.basename(path)] = f.read()
+    return code
+
+
+def imports(backend: str, code: dict) -> List[str]:
+    """modules, headers, packages or commands the generated code pulls in"""
+    found = []
+    for name, text in code.items():
+        if backend == "python":
+            found += re.findall(r"^(?:import|from) (\w+)", text, re.M)
+        elif backend == "js-cla":
+            found += re.findall(r"^import .* from '([^']+)';", text, re.M)
+        elif backend == "bash":
+            # the commands run in command substitutions, not the functions
+            functions = set(re.findall(r"^\s*(\w+)\(\) \{", text, re.M))
+            commands = re.findall(r"\$\((\w+)", text)
+            found += [command for command in commands if command not in functions]
+        else:
+            # but the header of the parser itself
+            headers = re.findall(r'^#include [<"]([^>"]+)[>"]', text, re.M)
+            own = os.path.splitext(name)[0]
+            found += [
+                header
+                for header in headers
+                if os.path.splitext(os.path.basename(header))[0] != own
+            ]
+    return sorted(set(found))
+
+
+def _all_args(generator: CodeGenerator) -> List[ArgSpec]:
+    """arguments of the program and of all its commands"""
+    return generator.args + [arg for cmd in generator.commands for arg in cmd.args]
+
+
+def analyse_backend(config: dict, backend: str, profile: Dict[str, int]) -> dict:
+    """costs, imports and findings of the parser generated by backend"""
+    try:
+        code = generated_code(config, backend, profile)
+    except RuntimeError as err:
+        return {"supported": False, "reason": str(err), "findings": []}
+    generator = BACKENDS[backend](copy.deepcopy(config))
+    generator.profile = profile
+    generators = [generator.for_command(cmd) for cmd in generator.commands]
+    commands = {}
+    findings = []
+    for scoped in generators or [generator]:
+        costs, scoped_findings = analyse_command(scoped, backend)
+        commands["" if scoped.command is None else scoped.command.name] = costs
+        findings += scoped_findings
+
+    size = sum(len(text.encode()) for text in code.values())
+    if backend == "bash" and any(arg.short for arg in _all_args(generator)):
+        findings.append(
+            _finding(
+                "info",
+                "forks",
+                "",
+                "the short options given are split by running expr for "
+                "each letter",
+            )
+        )
+    if backend == "bash" and size >= SCRIPT_BYTES and not generator.minify:
+        findings.append(
+            _finding(
+                "warning",
+                "script-size",
+                "",
+                f"{size // 1024} KiB of bash parsed whenever the script is sourced",
+                "--minify drops the comments, indentation and dump_args",
+            )
+        )
+    mode = None
+    if backend in ["c-argparse", "cpp-cxxopts"]:
+        mode = "library" if generator.library else "default"
+    return {
+        "supported": True,
+        # of the C/C++ parsers
+        "mode": mode,
+        "bytes": size,
+        "imports": imports(backend, code),
+        "commands": commands,
+        "findings": findings,
+    }
+
+
+def analyse_spec(
+    config: dict, library: bool = False, profile: Optional[Dict[str, int]] = None
+) -> dict:
+    """
+    report of a spec: backend -> analysis (see analyse_backend), and the
+    backends without warnings (recommended). library analyses the C/C++
+    library modes (as climeta.py --library), profile the dispatch order
+    of a usage profile (as climeta.py --profile)
+    """
+    config = copy.deepcopy(config)
+    if library:
+        config["program"]["library"] = "true"
+    backends = {
+        backend: analyse_backend(config, backend, profile or {}) for backend in BACKENDS
+    }
+    warnings = sum(
+        finding["severity"] == "warning"
+        for analysis in backends.values()
+        for finding in analysis["findings"]
+    )
+    return {
+        "program": config["program"]["name"],
+        "warnings": warnings,
+        "recommended": [
+            backend
+            for backend, analysis in backends.items()
+            if analysis["supported"]
+            and not any(f["severity"] == "warning" for f in analysis["findings"])
+        ],
+        "backends": backends,
+    }
+
+
+def format_report(spec: str, report: dict) -> str:
+    """human readable report of analyse_spec"""
+    lines = [f"{spec} ({report['program']}): {report['warnings']} warnings"]
+    for backend, analysis in report["backends"].items():
+        if not analysis["supported"]:
+            lines.append(f"  {backend}: not supported, {analysis['reason']}")
+            continue
+        mode = f"{analysis['mode']} mode, " if analysis["mode"] else ""
+        lines.append(f"  {backend} ({mode}{analysis['bytes']} bytes)")
+        for command, costs in analysis["commands"].items():
+            title = f"{command}: " if command else ""
+            expected = ""
+            if costs["expected_compares"] is not None:
+                expected = f" ({costs['expected_compares']} expected)"
+            lines.append(
+                f"    {title}{costs['options']} options, {costs['dispatch']} "
+                f"lookup of up to {costs['dispatch_compares']} compares{expected}, "
+                f"{costs['choice_compares']} choice compares, "
+                f"{costs['startup_items']} startup items, {costs['forks']} forks"
+            )
+        if analysis["imports"]:
+            lines.append(f"    imports: {' '.join(analysis['imports'])}")
+        for finding in analysis["findings"]:
+            where = f"[{finding['command']}] " if finding["command"] else ""
+            lines.append(f"    {finding['severity']}: {where}{finding['message']}")
+            if finding["advice"]:
+                lines.append(f"      -> {finding['advice']}")
+    recommended = ", ".join(report["recommended"]) or "none"
+    lines.append(f"  recommended (no warnings): {recommended}")
+    return "\n".join(lines) + "\n"
+
+
+def format_json(reports: Dict[str, dict]) -> str:
+    """spec -> analyse_spec report, as JSON for builds"""
+    return json.dumps(reports, indent=2)
@@ -0,0 +1,32 @@
+"""
+Usage profiles: how often each option is given, for profile-guided
+ordering of the generated dispatch code (climeta.py --profile)
+
+A profile is a JSON object mapping option spellings to counts, either
+for every command ("--verbose", "-v") or for one ("build --jobs"):
+
+    {"--output": 9120, "-v": 4410, "--dry-run": 3, "build --jobs": 870}
+
+Only the order the parsers test options in changes, help is unchanged.
+"""
+
+import json
+from typing import Dict
+
+
+def load_profile(path: str) -> Dict[str, int]:
+    """option spelling -> times given, as read from a JSON profile"""
+    with open(path, encoding="utf-8") as f:
+        try:
+            profile = json.load(f)
+        except json.JSONDecodeError as err:
+            raise RuntimeError(f"profile '{path}': {err}") from err
+    if not isinstance(profile, dict):
+        raise RuntimeError(f"profile '{path}' is not an object")
+    for option, count in profile.items():
+        if not isinstance(count, int) or isinstance(count, bool) or count < 0:
+            raise RuntimeError(
+                f"profile '{path}': count of '{option}' is not a "
+                f"non negative integer: {count!r}"
+            )
+    return profile
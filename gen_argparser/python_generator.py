@@ -2,13 +2,21 @@
 Generate CLI parsing code in python using argparse built-in module import
 """
 
+import inspect
+import os
+import re
+from typing import Dict, List
+
+from .choice_set import ChoiceSet
 from .code_generator import (
     ArgSpec,
     CodeGenerator,
     double_quote,
 )
 from .emitter import Emitter
+from .environment import Environment
 from .indenter import Indenter
+from .lazy_file import LazyFile
 
 
 def get_default(arg: ArgSpec):
@@ -26,6 +34,150 @@ def python_type(type_: str) -> str:
     return type_
 
 
+def python_field_type(arg: ArgSpec) -> str:
+    """python type annotation for the typed result field of an argument"""
+    if arg.file_kind:
+        field_type = "LazyFile"
+    elif arg.type_ == "flag":
+        field_type = "bool"
+    else:
+        field_type = python_type(arg.type_)
+    if arg.multiple:
+        return f"list[{field_type}]"
+    return field_type
+
+
+def params_type(arg: ArgSpec) -> tuple:
+    """LazyFile.argument parameters of an infile/outfile argument"""
+    return (arg.file_kind, arg.file_mode, arg.mmap)
+
+
+def choices_constants(args: List[ArgSpec]) -> Dict[str, str]:
+    """
+    choices_file (real path) -> module level ChoiceSet of its arguments,
+    named after the file, numbered if files of other directories are too
+    """
+    constants: Dict[str, str] = {}
+    for arg in args:
+        path = os.path.realpath(arg.choices_file) if arg.choices_file else ""
+        if not path or path in constants:
+            continue
+        stem = os.path.splitext(os.path.basename(path))[0]
+        name = base = re.sub(r"\W", "_", stem).upper() + "_CHOICES"
+        number = 2
+        while name in constants.values():
+            name = f"{base}_{number}"
+            number += 1
+        constants[path] = name
+    return constants
+
+
+def argparse_params(arg: ArgSpec) -> tuple:
+    """
+    names and keyword parameters of the add_argument call for an
+    argument. Values are plain data (the type is given by name) so
+    they can be both rendered as code and marshalled
+    """
+    # short option, then long option or positional
+    names = [arg.short, arg.name] if arg.short != "" else [arg.name]
+    params = {}
+
+    # type
+    if arg.type_ == "flag":
+        params["action"] = "store_false" if arg.default else "store_true"
+    elif arg.file_kind:
+        params["type"] = params_type(arg)
+    elif arg.choices_file:
+        # checked by ChoiceSet.argument, not listed in help and errors
+        params["type"] = ("choices", python_type(arg.type_), tuple(arg.choices))
+    else:
+        params["type"] = python_type(arg.type_)
+
+    # destination
+    if arg.dest != arg.clean_name:
+        params["dest"] = arg.dest
+
+    # default, given by the environment variable if bound to one and set
+    if arg.has_default:
+        if arg.type_ != "flag" or arg.env:
+            params["default"] = arg.default
+    elif not arg.is_positional:
+        if arg.env:
+            params["default"] = None
+        params["required"] = True
+
+    # metavar
+    if arg.has_metavar:
+        params["metavar"] = arg.metavar
+
+    # nargs
+    if arg.multiple:
+        params["nargs"] = "+"
+
+    # choices
+    if arg.choices is not None and not arg.choices_file:
+        params["choices"] = arg.choices
+
+    # help
+    params["help"] = arg.help_
+
+    # the defaults and required of the options bound to the environment
+    # are resolved when the parser is built (see Environment)
+    if arg.env:
+        params["env"] = arg.env
+    return names, params
+
+
+def format_param(arg: ArgSpec, key: str, value, constants: Dict[str, str]) -> str:
+    """
+    render an add_argument keyword value as python code, constants
+    naming the ChoiceSet of each choices_file (see choices_constants)
+    """
+    if key == "type":
+        if isinstance(value, tuple) and value[0] == "choices":
+            constant = constants[os.path.realpath(arg.choices_file)]
+            return f"{constant}.argument({value[1]})"
+        if isinstance(value, tuple):
+            kind, mode, use_mmap = value
+            return f'LazyFile.argument("{kind}", "{mode}", {use_mmap})'
+        return value
+    if key == "default" and arg.file_kind:
+        # already a handle, argparse only checks the paths given
+        kind, mode, use_mmap = params_type(arg)
+        handles = [
+            f'LazyFile("{path}", "{kind}", "{mode}", {use_mmap})'
+            for path in (value if arg.multiple else [value])
+        ]
+        return f"[{', '.join(handles)}]" if arg.multiple else handles[0]
+    if key == "default":
+        return "None" if value is None else str(get_default(arg))
+    if key in ["required", "choices"]:
+        return str(value)
+    return double_quote(value)
+
+
+def format_env_param(
+    arg: ArgSpec, key: str, params: dict, constants: Dict[str, str]
+) -> str:
+    """
+    render the default or required keyword value of an option bound to
+    the environment variable arg.env, read in 'env' by build_parser
+    """
+    if key == "required":
+        return f'"{arg.env}" not in env'
+    if arg.type_ == "flag":
+        type_ = "env.flag"
+    else:
+        type_ = format_param(arg, "type", params["type"], constants)
+    default = format_param(arg, "default", params["default"], constants)
+    values = [f'"{arg.env}"', default, type_]
+    if "choices" in params:
+        values.append(f"choices={params['choices']}")
+    if arg.multiple:
+        values.append("multiple=True")
+    return f"env.default(parser, {', '.join(values)})"
+
+
 def format_list(lst: list) -> str:
     """format default list as expected by cxx options from .toml format"""
     return "[" + (", ".join(double_quote(item) for item in lst)) + "]"
@@ -34,82 +186,753 @@ def format_list(lst: list) -> str:
 class PythonCodeGenerator(CodeGenerator):
     """Generates Python argparse code for CLI parsing."""
 
-    def generate_code(self, filename_base: str) -> None:
-        """generate .py file"""
-        c = Emitter()
+    def __init__(self, config: dict):
+        super().__init__(config)
+        # choices_file (real path) -> ChoiceSet constant, set by generate_code
+        self.choice_constants: Dict[str, str] = {}
 
-        c.emit('"""CLI argument parsing"""')
+    def has_files(self) -> bool:
+        """whether any argument (of any command) is an infile/outfile"""
+        args = self.args + [arg for cmd in self.commands for arg in cmd.args]
+        return any(arg.file_kind for arg in args)
+
+    def choices_files(self) -> dict:
+        """ChoiceSet constant -> values, of the choices_file arguments"""
+        args = self.args + [arg for cmd in self.commands for arg in cmd.args]
+        return {
+            self.choice_constants[os.path.realpath(arg.choices_file)]: arg.choices
+            for arg in args
+            if arg.choices_file
+        }
+
+    def _generate_choice_sets(self, c: Emitter, choices: dict) -> None:
+        """ChoiceSet class, and a constant per choices file"""
+        for line in inspect.getsource(ChoiceSet).rstrip().split("\n"):
+            c.emit(line)
+        c.new_line()
+        c.new_line()
+        for name, values in choices.items():
+            with Indenter(c, f"{name} = ChoiceSet(", ")"):
+                with Indenter(c, "(", ")"):
+                    line = ""
+                    for value in values:
+                        item = double_quote(value) + ","
+                        if line and len(line) + len(item) > 70:
+                            c.emit(line)
+                            line = ""
+                        line += (" " if line else "") + item
+                    c.emit(line)
         c.new_line()
-        c.emit("import argparse\n")
         c.new_line()
 
-        # Import and argparse setup
-        c.emit("def parse_args() -> tuple:")
+    def _generate_lazy_file(self, c: Emitter) -> None:
+        """class of the infile/outfile arguments, same as in the runtime"""
+        for line in inspect.getsource(LazyFile).rstrip().split("\n"):
+            c.emit(line)
+        c.new_line()
+        c.new_line()
+
+    def _generate_environment(self, c: Emitter) -> None:
+        """Environment class, same as in the runtime, and the bound variables"""
+        for line in inspect.getsource(Environment).rstrip().split("\n"):
+            c.emit(line)
+        c.new_line()
+        c.new_line()
+        args = self.args + [arg for cmd in self.commands for arg in cmd.args]
+        names = sorted({arg.env for arg in args if arg.env})
+        c.emit("# the environment variables options are bound to")
+        with Indenter(c, "ENV_NAMES = frozenset(", ")"):
+            with Indenter(c, "{", "}"):
+                for name in names:
+                    c.emit(f'"{name}",')
+        c.new_line()
+        c.new_line()
+
+    def _generate_args_class(self, c: Emitter) -> None:
+        """typed, immutable and slotted result class, one field per dest"""
+        c.emit("@dataclass(frozen=True, slots=True)")
+        c.emit(f"class {self.scoped('Args')}:")
         with Indenter(c):
-            c.emit('"""CLI argument parsing entry point"""')
-            with Indenter(c, "parser = argparse.ArgumentParser(", ")"):
+            c.emit('"""Typed CLI arguments, as returned by parse_typed_args"""')
+            c.new_line()
+            if self.command is not None:
+                c.emit("command: str")
+            for arg in self.args:
+                c.emit(f"{arg.dest}: {python_field_type(arg)}")
+        c.new_line()
+        c.new_line()
+
+        # argparse sets the values one by one on a mutable namespace, so
+        # the frozen Args is built from its fields (no vars() dict, no **)
+        args_class = self.scoped("Args")
+        fields = (["command"] if self.command is not None else []) + [
+            arg.dest for arg in self.args
+        ]
+        c.emit(
+            f"def {self.scoped('_typed_args')}(args: argparse.Namespace) "
+            f"-> {args_class}:"
+        )
+        with Indenter(c):
+            c.emit(f'"""{args_class} of the parsed namespace"""')
+            if not fields:
+                c.emit(f"return {args_class}()")
+            else:
+                with Indenter(c, f"return {args_class}(", ")"):
+                    for field in fields:
+                        c.emit(f"args.{field},")
+        c.new_line()
+        c.new_line()
+
+    def _generate_add_arguments(self, c: Emitter) -> None:
+        """add_argument calls on 'parser' for each argument"""
+        for arg in self.args:
+            names, params = argparse_params(arg)
+            params.pop("env", None)
+            opts = [double_quote(name) for name in names]
+            opts += [
+                f"{key}={format_env_param(arg, key, params, self.choice_constants)}"
+                if arg.env and key in ["default", "required"]
+                else f"{key}={format_param(arg, key, value, self.choice_constants)}"
+                for key, value in params.items()
+            ]
+            with Indenter(c, "parser.add_argument(", ")"):
+                for opt in opts:
+                    c.emit(f"{opt},")
+
+    def _generate_command_builder(self, c: Emitter) -> None:
+        """function adding the arguments of a subcommand to its parser"""
+        func_name = self.scoped("_add_arguments")
+        params = "parser: argparse.ArgumentParser"
+        if self.has_env_bindings():
+            params += ", env: Environment"
+        c.emit(f"def {func_name}({params}) -> None:")
+        with Indenter(c):
+            c.emit(f'"""arguments of the {self.command.name} command"""')
+            self._generate_add_arguments(c)
+        c.new_line()
+        c.new_line()
+
+    def _generate_commands_table(self, c: Emitter) -> None:
+        """map from command name to its help, builder and typed result"""
+        c.emit("# command name -> (help, arguments builder, typed Args of a namespace)")
+        with Indenter(c, "COMMANDS = {", "}"):
+            for command in self.commands:
+                scoped = self.for_command(command).scoped
+                c.emit(
+                    f'"{command.name}": ("{command.help_}", '
+                    f'{scoped("_add_arguments")}, {scoped("_typed_args")}),'
+                )
+        c.new_line()
+        c.new_line()
+
+    def _generate_commands_dispatch(self, c: Emitter) -> None:
+        """add the subparsers of the commands given (all if None)"""
+        env_bound = self.has_env_bindings()
+        with Indenter(c, "subparsers = parser.add_subparsers(", ")"):
+            c.emit('dest="command",')
+            c.emit("required=True,")
+            c.emit('metavar="COMMAND",')
+        c.emit("for name in COMMANDS if commands is None else commands:")
+        with Indenter(c):
+            c.emit("help_, add_arguments, _ = COMMANDS[name]")
+            with Indenter(c, "add_arguments(", ")"):
+                with Indenter(
+                    c, "subparsers.add_parser(", ")," if env_bound else ")"
+                ):
+                    c.emit("name,")
+                    c.emit("help=help_,")
+                    c.emit("description=help_,")
+                    c.emit(
+                        "formatter_class=argparse.ArgumentDefaultsHelpFormatter,"
+                    )
+                    if self.allow_abbrev is not None:
+                        c.emit("allow_abbrev=False,")
+                if env_bound:
+                    c.emit("env,")
+
+    def _generate_build_parser(self, c: Emitter) -> None:
+        """function building the argparse parser, shared by all entry points"""
+        with Indenter(c, "def build_parser(", ") -> argparse.ArgumentParser:"):
+            c.emit("parser_class: type = argparse.ArgumentParser,")
+            if self.commands:
+                c.emit("commands: list | None = None,")
+        with Indenter(c):
+            if self.commands:
+                c.emit('"""argparse parser, with the given commands (all if None)"""')
+            else:
+                c.emit('"""argparse parser of the program"""')
+            with Indenter(c, "parser = parser_class(", ")"):
                 c.emit(f'description="{self.description}",')
                 c.emit(
                     "formatter_class=argparse.ArgumentDefaultsHelpFormatter,"
                 )
                 c.emit(f'epilog="{self.epilog}",')
+                # abbreviations, when allowed, are expanded from the tables
+                if self.allow_abbrev is not None:
+                    c.emit("allow_abbrev=False,")
+            if self.has_env_bindings():
+                c.emit("# read once, the defaults of the bound options")
+                c.emit("env = Environment(ENV_NAMES)")
 
-            # Process each argument
-            for arg in self.args:
-                opts = []
+            # Process each argument, or each command
+            if self.commands:
+                self._generate_commands_dispatch(c)
+            else:
+                self._generate_add_arguments(c)
+            if self.has_env_bindings():
+                c.emit("env.check()")
+            c.emit("return parser")
+        c.new_line()
+        c.new_line()
 
-                # short option
-                if arg.short != "":
-                    opts.append(double_quote(arg.short))
+    def _generate_parse_argv(self, c: Emitter) -> None:
+        """parsing of an argv with a built parser, abbreviations expanded"""
+        c.emit(
+            "def parse_argv(parser: argparse.ArgumentParser, argv: list) -> tuple:"
+        )
+        with Indenter(c):
+            c.emit('"""args, unknown of argv (the arguments after the program name)"""')
+            if self.allow_abbrev and self.commands:
+                c.emit("if argv and argv[0] in COMMAND_ABBREVIATIONS:")
+                with Indenter(c):
+                    with Indenter(c, "argv = argv[:1] + expand_abbreviations(", ")"):
+                        c.emit("parser, argv[1:], *COMMAND_ABBREVIATIONS[argv[0]]")
+            elif self.allow_abbrev:
+                with Indenter(c, "argv = expand_abbreviations(", ")"):
+                    c.emit(
+                        "parser, argv, ABBREVIATIONS, AMBIGUOUS_ABBREVIATIONS"
+                    )
+            if self.usage_counters:
+                c.emit("args, unknown = parser.parse_known_args(argv)")
+                command = "args.command" if self.commands else '""'
+                c.emit(f"count_usage({command}, argv)")
+                c.emit("return args, unknown")
+            else:
+                c.emit("return parser.parse_known_args(argv)")
+        c.new_line()
+        c.new_line()
 
-                # long option or positional
-                opts.append(double_quote(arg.name))
+    def _generate_usage_tables(self, c: Emitter) -> None:
+        """option spellings and counters of every (sub)command"""
+        generators = [self.for_command(command) for command in self.commands]
+        c.emit(
+            "# (sub)command -> (usage line prefix, option names, "
+            "spelling -> (index, takes a value))"
+        )
+        with Indenter(c, "USAGE_OPTIONS = {", "}"):
+            for generator in generators or [self]:
+                command = "" if generator.command is None else generator.command.name
+                options = generator.counted_options()
+                with Indenter(c, f'"{command}": (', "),"):
+                    c.emit(f'"{generator.usage_prefix()}",')
+                    names = ", ".join(f'"{arg.name}"' for arg in options)
+                    c.emit(f"[{names}],")
+                    with Indenter(c, "{", "},"):
+                        for index, arg in enumerate(options):
+                            takes_value = arg.type_ != "flag"
+                            for spelling in filter(None, [arg.name, arg.short]):
+                                c.emit(f'"{spelling}": ({index}, {takes_value}),')
+        c.emit("# (sub)command -> [runs, times each option was given]")
+        with Indenter(c, "USAGE_COUNTS = {", "}"):
+            for generator in generators or [self]:
+                command = "" if generator.command is None else generator.command.name
+                size = 1 + len(generator.counted_options())
+                c.emit(f'"{command}": [0] * {size},')
+        c.new_line()
+        c.new_line()
 
-                # type
-                if arg.type_ == "flag":
-                    flag_action = (
-                        "store_false" if arg.default else "store_true"
+    def _generate_usage_counters(self, c: Emitter) -> None:
+        """
+        counting of the options in the argv parsed, and the write of the
+        counters at exit, in one O_APPEND write
+        """
+        self._generate_usage_tables(c)
+        c.emit("def count_usage(command: str, argv: list) -> None:")
+        with Indenter(c):
+            c.emit('"""one more run of the (sub)command, and use of the options of argv"""')
+            c.emit("spellings = USAGE_OPTIONS[command][2]")
+            c.emit("counts = USAGE_COUNTS[command]")
+            c.emit("counts[0] += 1")
+            c.emit("value = False  # arg is the value of the previous option")
+            c.emit("for arg in argv:")
+            with Indenter(c):
+                c.emit("if value:")
+                with Indenter(c):
+                    c.emit("value = False")
+                    c.emit("continue")
+                c.emit('if arg == "--":')
+                with Indenter(c):
+                    c.emit("return")
+                c.emit('name, equal, _ = arg.partition("=")')
+                c.emit("found = spellings.get(name)")
+                c.emit("if found is not None:")
+                with Indenter(c):
+                    c.emit("counts[found[0] + 1] += 1")
+                    c.emit("value = found[1] and not equal")
+                c.emit('elif arg[:1] == "-" and arg[1:2] != "-":')
+                with Indenter(c):
+                    c.emit("# bundled short options, as -vj4")
+                    c.emit("for idx, char in enumerate(arg[1:], 2):")
+                    with Indenter(c):
+                        c.emit('found = spellings.get("-" + char)')
+                        c.emit("if found is None:")
+                        with Indenter(c):
+                            c.emit("break")
+                        c.emit("counts[found[0] + 1] += 1")
+                        c.emit("if found[1]:")
+                        with Indenter(c):
+                            c.emit("value = idx == len(arg)")
+                            c.emit("break")
+        c.new_line()
+        c.new_line()
+        c.emit("def write_usage() -> None:")
+        with Indenter(c):
+            c.emit('"""counters of the (sub)commands parsed, appended to CLIMETA_USAGE_FILE"""')
+            c.emit(
+                f'path = os.environ.get("CLIMETA_USAGE_FILE", '
+                f"{double_quote(self.usage_file)})"
+            )
+            c.emit("lines = []")
+            c.emit("for command, (prefix, names, _) in USAGE_OPTIONS.items():")
+            with Indenter(c):
+                c.emit("runs, *counts = USAGE_COUNTS[command]")
+                c.emit("if runs:")
+                with Indenter(c):
+                    c.emit(
+                        'given = [f"{name}={count}" '
+                        "for name, count in zip(names, counts) if count]"
                     )
-                    opts.append(f'action="{flag_action}"')
-                else:
-                    opts.append(f"type={python_type(arg.type_)}")
+                    c.emit(
+                        'lines.append(" ".join([prefix, f"runs={runs}", *given]) + "\\n")'
+                    )
+            c.emit("if not path or not lines:")
+            with Indenter(c):
+                c.emit("return")
+            c.emit("try:")
+            with Indenter(c):
+                c.emit("fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)")
+                c.emit("try:")
+                with Indenter(c):
+                    c.emit('os.write(fd, "".join(lines).encode())')
+                c.emit("finally:")
+                with Indenter(c):
+                    c.emit("os.close(fd)")
+            c.emit("except OSError:")
+            with Indenter(c):
+                c.emit("pass  # best effort, the counters are lost")
+        c.new_line()
+        c.new_line()
+        c.emit("atexit.register(write_usage)")
+        c.new_line()
+        c.new_line()
 
-                # destination
-                if arg.dest != arg.clean_name:
-                    opts.append(f'dest="{arg.dest}"')
+    def _generate_handoff_tables(self, c: Emitter) -> None:
+        """layout of the hand-off encoding of every (sub)command"""
+        generators = [self.for_command(command) for command in self.commands]
+        c.emit(
+            "# (sub)command -> (dest, type, multiple) of its arguments in spec"
+        )
+        c.emit("# order, the type of files being their LazyFile parameters")
+        with Indenter(c, "HANDOFF_FIELDS = {", "}"):
+            for generator in generators or [self]:
+                command = "" if generator.command is None else generator.command.name
+                with Indenter(c, f'"{command}": [', "],"):
+                    for arg in generator.args:
+                        type_ = double_quote(arg.type_)
+                        if arg.file_kind:
+                            type_ = str(params_type(arg)).replace("'", '"')
+                        c.emit(f'("{arg.dest}", {type_}, {arg.multiple}),')
+        c.emit(f'HANDOFF_HEADER = "{self.handoff_header()}"')
+        c.new_line()
+        c.new_line()
 
-                # default
-                if arg.has_default:
-                    if arg.type_ != "flag":
-                        opts.append(f"default={get_default(arg)}")
-                elif not arg.is_positional:
-                    opts.append("required=True")
+    def _generate_handoff(self, c: Emitter) -> None:
+        """
+        encode_options/decode_options: parsed args to and from the
+        hand-off string of the spec (see CodeGenerator.handoff_header)
+        """
+        self._generate_handoff_tables(c)
+        c.emit("def handoff_value(value) -> str:")
+        with Indenter(c):
+            c.emit('"""a value as a hand-off field: ~ for none, else <bytes>:<text>"""')
+            c.emit("if value is None:")
+            with Indenter(c):
+                c.emit('return "~"')
+            c.emit("if isinstance(value, bool):")
+            with Indenter(c):
+                c.emit('value = "1" if value else "0"')
+            if self.has_files():
+                c.emit("elif isinstance(value, LazyFile):")
+                with Indenter(c):
+                    c.emit("value = value.path")
+            c.emit("elif isinstance(value, float):")
+            with Indenter(c):
+                c.emit("value = repr(value)")
+            c.emit("else:")
+            with Indenter(c):
+                c.emit("value = str(value)")
+            c.emit('size = len(value.encode("utf-8", "surrogateescape"))')
+            c.emit('return f"{size}:{value}"')
+        c.new_line()
+        c.new_line()
+        c.emit("def encode_options(args: argparse.Namespace) -> str:")
+        with Indenter(c):
+            c.emit('"""')
+            c.emit("args as a hand-off string (for CLIMETA_OPTIONS, say), loaded by")
+            c.emit("decode_options of the parsers of this spec, in any language")
+            c.emit('"""')
+            c.emit("parts = [HANDOFF_HEADER]")
+            if self.commands:
+                c.emit("command = args.command")
+                c.emit("parts.append(handoff_value(command))")
+            else:
+                c.emit('command = ""')
+            c.emit("for dest, _, multiple in HANDOFF_FIELDS[command]:")
+            with Indenter(c):
+                c.emit("value = getattr(args, dest)")
+                c.emit("if multiple and value is not None:")
+                with Indenter(c):
+                    c.emit('parts.append(f"{len(value)}*")')
+                    c.emit("parts += [handoff_value(item) for item in value]")
+                c.emit("else:")
+                with Indenter(c):
+                    c.emit("parts.append(handoff_value(value))")
+            c.emit('return "".join(parts)')
+        c.new_line()
+        c.new_line()
+        c.emit("def decode_options(encoded: str) -> argparse.Namespace:")
+        with Indenter(c):
+            c.emit('"""')
+            c.emit("args of an encode_options string, of any backend, without")
+            c.emit("parsing nor validating them again. ValueError if malformed or")
+            c.emit("of another spec")
+            c.emit('"""')
+            c.emit("if not encoded.startswith(HANDOFF_HEADER):")
+            with Indenter(c):
+                c.emit('raise ValueError("not a hand-off encoding of this spec")')
+            c.emit('data = encoded.encode("utf-8", "surrogateescape")')
+            c.emit("pos = len(HANDOFF_HEADER)")
+            c.new_line()
+            c.emit("def take(type_):")
+            with Indenter(c):
+                c.emit("nonlocal pos")
+                c.emit('if data[pos : pos + 1] == b"~":')
+                with Indenter(c):
+                    c.emit("pos += 1")
+                    c.emit("return None")
+                c.emit('colon = data.index(b":", pos)')
+                c.emit("size = data[pos:colon]")
+                c.emit("if not size.isdigit():")
+                with Indenter(c):
+                    c.emit('raise ValueError("malformed hand-off field")')
+                c.emit("start, pos = colon + 1, colon + 1 + int(size)")
+                c.emit("if pos > len(data):")
+                with Indenter(c):
+                    c.emit('raise ValueError("truncated hand-off encoding")')
+                c.emit('text = data[start:pos].decode("utf-8", "surrogateescape")')
+                c.emit('if type_ == "flag":')
+                with Indenter(c):
+                    c.emit('return text == "1"')
+                c.emit('if type_ == "int":')
+                with Indenter(c):
+                    c.emit("return int(text)")
+                c.emit('if type_ == "float":')
+                with Indenter(c):
+                    c.emit("return float(text)")
+                if self.has_files():
+                    c.emit("if isinstance(type_, tuple):")
+                    with Indenter(c):
+                        c.emit("return LazyFile(text, *type_)")
+                c.emit("return text")
+            c.new_line()
+            c.emit("args = argparse.Namespace()")
+            if self.commands:
+                c.emit('args.command = command = take("string")')
+                c.emit("if command not in HANDOFF_FIELDS:")
+                with Indenter(c):
+                    c.emit('raise ValueError(f"unknown command {command!r}")')
+            else:
+                c.emit('command = ""')
+            c.emit("for dest, type_, multiple in HANDOFF_FIELDS[command]:")
+            with Indenter(c):
+                c.emit('if multiple and data[pos : pos + 1] != b"~":')
+                with Indenter(c):
+                    c.emit('star = data.index(b"*", pos)')
+                    c.emit("count, pos = int(data[pos:star]), star + 1")
+                    c.emit("value = [take(type_) for _ in range(count)]")
+                c.emit("else:")
+                with Indenter(c):
+                    c.emit("value = take(type_)")
+                c.emit("setattr(args, dest, value)")
+            c.emit("if pos != len(data):")
+            with Indenter(c):
+                c.emit('raise ValueError("trailing data after the hand-off fields")')
+            c.emit("return args")
+        c.new_line()
+        c.new_line()
+
+    def _generate_parser_class(self, c: Emitter) -> None:
+        """
+        build-once parser for in-process use, raising ParseError instead of
+        printing and exiting
+        """
+        c.emit("class ParseError(Exception):")
+        with Indenter(c):
+            c.emit('"""')
+            c.emit("command line rejected by Parser.parse (status 2), or help")
+            c.emit("asked for (status 0, the help is the message)")
+            c.emit('"""')
+            c.new_line()
+            c.emit("def __init__(self, message: str, status: int):")
+            with Indenter(c):
+                c.emit("super().__init__(message)")
+                c.emit("self.status = status")
+        c.new_line()
+        c.new_line()
+        c.emit("class RaisingArgumentParser(argparse.ArgumentParser):")
+        with Indenter(c):
+            c.emit('"""ArgumentParser raising ParseError instead of printing and exiting"""')
+            c.new_line()
+            c.emit("def print_help(self, file=None):")
+            with Indenter(c):
+                c.emit("raise ParseError(self.format_help(), 0)")
+            c.new_line()
+            c.emit("def error(self, message: str):")
+            with Indenter(c):
+                c.emit('raise ParseError(f"{self.prog}: error: {message}", 2)')
+        c.new_line()
+        c.new_line()
+        c.emit("class Parser:")
+        with Indenter(c):
+            c.emit('"""')
+            c.emit("parser built once, parse() can then be called any number of")
+            c.emit("times, from any thread, and raises ParseError instead of exiting")
+            c.emit('"""')
+            c.new_line()
+            c.emit("def __init__(self):")
+            with Indenter(c):
+                c.emit("self._parser = build_parser(RaisingArgumentParser)")
+            c.new_line()
+            c.emit("def parse(self, argv: list) -> tuple:")
+            with Indenter(c):
+                c.emit('"""args, unknown of argv (the arguments after the program name)"""')
+                c.emit("return parse_argv(self._parser, argv)")
+            c.new_line()
+            c.emit("def parse_typed(self, argv: list) -> tuple:")
+            with Indenter(c):
+                c.emit('"""typed Args, unknown of argv"""')
+                c.emit("args, unknown = self.parse(argv)")
+                self._generate_typed_return(c)
+        c.new_line()
+        c.new_line()
+
+    def _generate_abbreviations(self, c: Emitter) -> None:
+        """precomputed tables of unique and ambiguous long option prefixes"""
+        unique, ambiguous = self.abbreviations()
+        c.emit("# unique prefix -> long option")
+        with Indenter(c, f"{self.scoped('ABBREVIATIONS')} = {{", "}"):
+            for prefix, name in unique.items():
+                c.emit(f'"{prefix}": "{name}",')
+        c.emit("# ambiguous prefix -> error message")
+        with Indenter(c, f"{self.scoped('AMBIGUOUS_ABBREVIATIONS')} = {{", "}"):
+            for prefix, message in ambiguous.items():
+                c.emit(f'"{prefix}": "{message}",')
+        c.new_line()
+        c.new_line()
 
-                # metavar
-                if arg.has_metavar:
-                    opts.append(f'metavar="{arg.metavar}"')
+    def _generate_commands_abbreviations(self, c: Emitter) -> None:
+        """map from command name to its abbreviation tables"""
+        for command in self.commands:
+            self.for_command(command)._generate_abbreviations(c)
+        c.emit("# command name -> (unique prefixes, ambiguous prefixes)")
+        with Indenter(c, "COMMAND_ABBREVIATIONS = {", "}"):
+            for command in self.commands:
+                scoped = self.for_command(command).scoped
+                c.emit(
+                    f'"{command.name}": ({scoped("ABBREVIATIONS")}, '
+                    f'{scoped("AMBIGUOUS_ABBREVIATIONS")}),'
+                )
+        c.new_line()
+        c.new_line()
 
-                # nargs
-                if arg.multiple:
-                    opts.append('nargs="+"')
+    def _generate_expand_abbreviations(self, c: Emitter) -> None:
+        """helper replacing long option prefixes using the tables"""
+        with Indenter(c, "def expand_abbreviations(", ") -> list:"):
+            c.emit("parser: argparse.ArgumentParser,")
+            c.emit("argv: list,")
+            c.emit("abbreviations: dict,")
+            c.emit("ambiguous: dict,")
+        with Indenter(c):
+            c.emit('"""replace unique long option prefixes by the full option"""')
+            c.emit("expanded = []")
+            c.emit("for idx, arg in enumerate(argv):")
+            with Indenter(c):
+                c.emit('if arg == "--":')
+                with Indenter(c):
+                    c.emit("return expanded + argv[idx:]")
+                c.emit('name, equal, value = arg.partition("=")')
+                c.emit("if name in ambiguous:")
+                with Indenter(c):
+                    c.emit("parser.error(ambiguous[name])")
+                c.emit(
+                    "expanded.append(abbreviations.get(name, name) + equal + value)"
+                )
+            c.emit("return expanded")
+        c.new_line()
+        c.new_line()
 
-                # choices
-                if arg.choices is not None:
-                    opts.append(f"choices={arg.choices}")
+    def _generate_trace_line(self, c: Emitter) -> None:
+        """helper writing the CLIMETA_TRACE line"""
+        c.emit("def trace_line(destination: str, fields: str) -> None:")
+        with Indenter(c):
+            c.emit('"""CLIMETA_TRACE line to stderr (1/stderr) or appended to a file"""')
+            c.emit(f'line = "{self.trace_prefix()} " + fields')
+            c.emit('if destination in ["1", "stderr"]:')
+            with Indenter(c):
+                c.emit("print(line, file=sys.stderr)")
+            c.emit("else:")
+            with Indenter(c):
+                c.emit('with open(destination, "a", encoding="utf-8") as f:')
+                with Indenter(c):
+                    c.emit('f.write(line + "\\n")')
+        c.new_line()
+        c.new_line()
 
-                # help
-                opts.append(f'help="{arg.help_}"')
+    def _generate_traced_parse(self, c: Emitter) -> None:
+        """
+        parsing, timed when CLIMETA_TRACE is set. argparse validates and
+        checks choices while parsing, so those are part of parse_us
+        """
+        c.emit("if not trace:")
+        with Indenter(c):
+            c.emit("return parse_argv(parser, argv)  # args, unknown")
+        c.emit("built = time.perf_counter()")
+        c.emit("args, unknown = parse_argv(parser, argv)")
+        c.emit("done = time.perf_counter()")
+        fields = []
+        if self.commands:
+            fields.append("command={args.command}")
+        fields += [
+            "tokens={len(sys.argv) - 1}",
+            "setup_us={(built - start) * 1e6:.1f}",
+            "parse_us={(done - built) * 1e6:.1f}",
+            "total_us={(done - start) * 1e6:.1f}",
+        ]
+        with Indenter(c, "trace_line(", ")"):
+            c.emit("trace,")
+            for field in fields[:-1]:
+                c.emit(f'f"{field} "')
+            c.emit(f'f"{fields[-1]}",')
+        c.emit("return args, unknown")
 
-                with Indenter(c, "parser.add_argument(", ")"):
-                    for opt in opts:
-                        c.emit(f"{opt},")
+    def _generate_parse_typed_args(self, c: Emitter) -> None:
+        """entry point returning an Args object instead of a Namespace"""
+        c.emit("def parse_typed_args() -> tuple:")
+        with Indenter(c):
+            c.emit('"""CLI argument parsing entry point returning typed Args"""')
+            c.emit("args, unknown = parse_args()")
+            self._generate_typed_return(c)
+        c.new_line()
+        c.new_line()
 
-            # Parse args, including retaining arguments after "--"
-            c.new_line()
-            c.emit("return parser.parse_known_args()  # args, unknown")
+    def _generate_typed_return(self, c: Emitter) -> None:
+        """return of the typed Args of the namespace in 'args'"""
+        if self.commands:
+            c.emit("typed_args = COMMANDS[args.command][2]")
+            c.emit("return typed_args(args), unknown")
+        else:
+            c.emit("return _typed_args(args), unknown")
+
+    def generate_code(self, filename_base: str) -> None:
+        """generate .py file"""
+        c = Emitter()
+
+        c.emit('"""CLI argument parsing"""')
         c.new_line()
+        has_files = self.has_files()
+        # named once for the program, shared by the per-command copies
+        self.choice_constants = choices_constants(
+            self.args + [arg for cmd in self.commands for arg in cmd.args]
+        )
+        choices = self.choices_files()
+        env_bound = self.has_env_bindings()
+        c.emit("import argparse")
+        if self.usage_counters:
+            c.emit("import atexit")
+        if choices:
+            c.emit("import difflib")
+        if has_files:
+            c.emit("import io")
+            c.emit("import mmap")
+        if self.trace or has_files or self.usage_counters or env_bound:
+            c.emit("import os")
+        c.emit("import sys")
+        if self.trace:
+            c.emit("import time")
+        c.emit("from dataclasses import dataclass\n")
         c.new_line()
 
+        if has_files:
+            self._generate_lazy_file(c)
+        if choices:
+            self._generate_choice_sets(c, choices)
+        if env_bound:
+            self._generate_environment(c)
+
+        if self.commands:
+            for command in self.commands:
+                self.for_command(command)._generate_args_class(c)
+            for command in self.commands:
+                self.for_command(command)._generate_command_builder(c)
+            self._generate_commands_table(c)
+        else:
+            self._generate_args_class(c)
+
+        if self.allow_abbrev:
+            if self.commands:
+                self._generate_commands_abbreviations(c)
+            else:
+                self._generate_abbreviations(c)
+            self._generate_expand_abbreviations(c)
+
+        if self.trace:
+            self._generate_trace_line(c)
+        if self.usage_counters:
+            self._generate_usage_counters(c)
+        if self.handoff:
+            self._generate_handoff(c)
+
+        self._generate_build_parser(c)
+        self._generate_parse_argv(c)
+
+        c.emit("def parse_args() -> tuple:")
+        with Indenter(c):
+            c.emit('"""CLI argument parsing entry point"""')
+            c.emit("argv = sys.argv[1:]")
+            if self.trace:
+                c.emit('trace = os.environ.get("CLIMETA_TRACE")')
+                c.emit("if trace:")
+                with Indenter(c):
+                    c.emit("start = time.perf_counter()")
+            if self.commands:
+                c.emit("# only the selected command parser is built, all of them")
+                c.emit("# when there is none (help or error message)")
+                c.emit(
+                    "selected = argv[:1] if argv and argv[0] in COMMANDS else None"
+                )
+                c.emit("parser = build_parser(commands=selected)")
+            else:
+                c.emit("parser = build_parser()")
+            if self.trace:
+                self._generate_traced_parse(c)
+            else:
+                c.emit("return parse_argv(parser, argv)  # args, unknown")
+        c.new_line()
+        c.new_line()
+
+        self._generate_parse_typed_args(c)
+        self._generate_parser_class(c)
+
         c.emit('if __name__ == "__main__":')
         with Indenter(c):
             c.emit("args, unknown = parse_args()")
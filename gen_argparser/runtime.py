@@ -0,0 +1,270 @@
+"""
+Interpret a CLI spec at runtime instead of generating code for it
+
+The .toml spec is compiled once into plain data (validated through ArgSpec,
+same as for code generation) and cached on disk, keyed by a hash of the spec
+contents, so later process starts skip TOML parsing and validation entirely.
+The files the spec includes are stored along and compared on load, so
+changing any of them invalidates the entry.
+
+    from gen_argparser import runtime
+
+    args, unknown = runtime.parse_args("args0.toml")
+
+parse_args() follows the same contract as the parse_args() function in the
+code generated by PythonCodeGenerator.
+
+Note this module is on the startup path of the tools using it, so it only
+imports what is needed to load an already compiled spec.
+"""
+
+import argparse
+import marshal
+import os
+import sys
+import zlib
+
+# bump when the layout of the compiled data changes
+CACHE_VERSION = 7
+
+PYTHON_TYPES = {"str": str, "int": int, "float": float}
+
+
+def default_cache_dir() -> str:
+    """directory holding compiled specs, CLIMETA_CACHE_DIR overrides it"""
+    cache_dir = os.environ.get("CLIMETA_CACHE_DIR")
+    if cache_dir:
+        return cache_dir
+    return os.path.join(os.path.expanduser("~"), ".cache", "climeta")
+
+
+def compile_spec(config: dict) -> tuple:
+    """
+    compile an already parsed spec into marshal friendly data:
+    (description, epilog, allow_abbrev, entries, {command: (help, entries)})
+    where entries is [(names, add_argument params), ...]. argparse own
+    prefix matching has the same semantics as the generated tables
+    """
+    # pylint: disable=import-outside-toplevel
+    from .code_generator import CodeGenerator
+    from .python_generator import argparse_params
+
+    spec = CodeGenerator(config)
+    entries = [argparse_params(arg) for arg in spec.args]
+    commands = {
+        command.name: (
+            command.help_,
+            [argparse_params(arg) for arg in command.args],
+        )
+        for command in spec.commands
+    }
+    allow_abbrev = spec.allow_abbrev is not False
+    return (spec.description, spec.epilog, allow_abbrev, entries, commands)
+
+
+def _environment(entries: list):
+    """Environment of the variables the entries are bound to, None if none"""
+    names = frozenset(params["env"] for _, params in entries if "env" in params)
+    if not names:
+        return None
+    # pylint: disable=import-outside-toplevel
+    from .environment import Environment
+
+    return Environment(names)
+
+
+def _add_arguments(parser: argparse.ArgumentParser, entries: list, env) -> None:
+    """add the compiled arguments to a parser, env giving the bound defaults"""
+    for names, params in entries:
+        params = dict(params)
+        name = params.pop("env", "")
+        if isinstance(params.get("type"), tuple) and params["type"][0] == "choices":
+            # pylint: disable=import-outside-toplevel
+            from .choice_set import ChoiceSet
+
+            _, type_name, values = params["type"]
+            params["type"] = ChoiceSet(values).argument(PYTHON_TYPES[type_name])
+        elif isinstance(params.get("type"), tuple):
+            # pylint: disable=import-outside-toplevel
+            from .lazy_file import LazyFile
+
+            # defaults are handles already, only given paths are checked
+            if "default" in params:
+                default = params["default"]
+                paths = default if isinstance(default, list) else [default]
+                handles = [LazyFile(path, *params["type"]) for path in paths]
+                params["default"] = (
+                    handles if isinstance(default, list) else handles[0]
+                )
+            params["type"] = LazyFile.argument(*params["type"])
+        elif "type" in params:
+            params["type"] = PYTHON_TYPES[params["type"]]
+        if name:
+            if "required" in params:
+                params["required"] = name not in env
+            params["default"] = env.default(
+                parser,
+                name,
+                params["default"],
+                params.get("type", env.flag),
+                params.get("choices"),
+                params.get("nargs") == "+",
+            )
+        parser.add_argument(*names, **params)
+
+
+class CompiledSpec:
+    """A compiled spec, builds each of its argparse parsers only once"""
+
+    def __init__(self, data: tuple):
+        (
+            self.description,
+            self.epilog,
+            self.allow_abbrev,
+            self.entries,
+            self.commands,
+        ) = data
+        # keyed by selected command, None for no command/all commands
+        self._parsers = {}
+
+    def parser(self, command: str | None = None) -> argparse.ArgumentParser:
+        """
+        argparse parser for the spec, built on first use. For specs with
+        commands only the subparser of the given command is built (all of
+        them if None, as needed for help and error messages)
+        """
+        parser = self._parsers.get(command)
+        if parser is not None:
+            return parser
+
+        parser = argparse.ArgumentParser(
+            description=self.description,
+            formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+            epilog=self.epilog,
+            allow_abbrev=self.allow_abbrev,
+        )
+        if self.commands:
+            subparsers = parser.add_subparsers(
+                dest="command", required=True, metavar="COMMAND"
+            )
+            selected = [command] if command is not None else self.commands
+            # the bound variables of the selected commands, in a single scan
+            env = _environment(
+                [entry for name in selected for entry in self.commands[name][1]]
+            )
+            for name in selected:
+                help_, entries = self.commands[name]
+                _add_arguments(
+                    subparsers.add_parser(
+                        name,
+                        help=help_,
+                        description=help_,
+                        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+                        allow_abbrev=self.allow_abbrev,
+                    ),
+                    entries,
+                    env,
+                )
+        else:
+            env = _environment(self.entries)
+            _add_arguments(parser, self.entries, env)
+        if env is not None:
+            env.check()
+
+        self._parsers[command] = parser
+        return parser
+
+    def parse_args(self, args=None) -> tuple:
+        """parse args (sys.argv[1:] if not given), returns args, unknown"""
+        if args is None:
+            args = sys.argv[1:]
+        command = args[0] if args and args[0] in self.commands else None
+        return self.parser(command).parse_known_args(args)
+
+
+def _cache_path(cache_dir: str, spec_path: str, content: bytes) -> str:
+    """
+    cache entry name for a given spec content and location: the same text
+    elsewhere may include other files (includes are relative to the spec)
+    """
+    where = zlib.crc32(spec_path.encode())
+    key = f"{zlib.crc32(content):08x}-{len(content)}-{where:08x}-v{CACHE_VERSION}"
+    return os.path.join(cache_dir, key + ".marshal")
+
+
+def _read_file(path: str):
+    """file contents, or None if it can't be read"""
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _read_cache(path: str, spec_path: str, content: bytes):
+    """compiled data from cache, or None if missing/stale/corrupted"""
+    try:
+        with open(path, "rb") as f:
+            cached_path, cached_content, includes, data = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    # the spec is stored along, so a hash collision can't return stale data
+    if cached_path != spec_path or cached_content != content:
+        return None
+    for include_path, include_content in includes:
+        if _read_file(include_path) != include_content:
+            return None
+    return data
+
+
+def _write_cache(
+    path: str, spec_path: str, content: bytes, includes: list, data: tuple
+) -> None:
+    """atomically store compiled data, failures are not fatal"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            marshal.dump((spec_path, content, includes, data), f)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def load_spec(file_path: str, cache_dir: str | None = None) -> CompiledSpec:
+    """compile a .toml spec, reusing the on-disk compiled form if valid"""
+    with open(file_path, "rb") as f:
+        content = f.read()
+
+    if cache_dir is None:
+        cache_dir = default_cache_dir()
+    spec_path = os.path.realpath(file_path)
+    path = _cache_path(cache_dir, spec_path, content)
+
+    data = _read_cache(path, spec_path, content)
+    if data is None:
+        # pylint: disable=import-outside-toplevel
+        from .gen_argparser import parse_cli_spec
+        from .includes import spec_dependencies
+
+        data = compile_spec(parse_cli_spec(file_path))
+        includes = [
+            (include_path, _read_file(include_path))
+            for include_path in spec_dependencies(file_path)
+        ]
+        _write_cache(path, spec_path, content, includes, data)
+    return CompiledSpec(data)
+
+
+_loaded_specs = {}
+
+
+def parse_args(file_path: str, args=None) -> tuple:
+    """
+    CLI argument parsing entry point, same contract as the generated
+    python parse_args(). Compiled specs are kept for the process lifetime
+    """
+    spec = _loaded_specs.get(file_path)
+    if spec is None:
+        spec = _loaded_specs[file_path] = load_spec(file_path)
+    return spec.parse_args(args)
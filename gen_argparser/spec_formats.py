@@ -0,0 +1,134 @@
+"""
+Spec file formats: TOML (written by hand), JSON (same structure, for specs
+generated by other tools) and compiled specs (climeta.py compile)
+
+A compiled spec is a spec with its includes and groups resolved, already
+validated, marshalled after a magic header:
+
+    b"CLIMETA\\0" + format version byte + marshal(config)
+
+so loading it skips TOML parsing, include resolution and validation.
+The format is detected from the extension (.climeta, .json, anything
+else being TOML), or from the magic bytes whatever the file is named.
+
+choices_file paths are relative to the file naming them, as in the
+sources, so a compiled spec can be moved along with its choices files.
+"""
+
+import json
+import marshal
+import os
+import tomllib
+from typing import Callable, List
+
+from .validator import SpecValidationError
+
+MAGIC = b"CLIMETA\0"
+
+# bump when the layout of the compiled config changes
+FORMAT_VERSION = 1
+
+COMPILED_EXTENSION = ".climeta"
+
+
+def is_compiled_spec(file_path: str) -> bool:
+    """
+    whether a file is a compiled spec: named *.climeta (load_compiled
+    then checks it is one) or starting with the magic bytes
+    """
+    if os.path.splitext(file_path)[1] == COMPILED_EXTENSION:
+        return True
+    with open(file_path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def loads_spec(file_path: str, text: str) -> dict:
+    """contents of a TOML or JSON (by extension) spec source"""
+    if os.path.splitext(file_path)[1] != ".json":
+        return tomllib.loads(text)
+    try:
+        config = json.loads(text)
+    except json.JSONDecodeError as err:
+        raise SpecValidationError([f"{file_path}:{err.lineno}: {err.msg}"]) from err
+    if not isinstance(config, dict):
+        raise SpecValidationError([f"{file_path}: not a JSON object"])
+    return config
+
+
+def _arguments(config: dict) -> list:
+    """all the arguments of a resolved spec, of every command"""
+    arguments = list(config.get("arguments", []))
+    for command in config.get("commands", []):
+        arguments += command.get("arguments", [])
+    return arguments
+
+
+def _rebase_choices_files(config: dict, rebase: Callable[[str], str]) -> dict:
+    """config with the choices_file of every argument rebased"""
+
+    def rebased(arguments: list) -> list:
+        return [
+            {**arg, "choices_file": rebase(arg["choices_file"])}
+            if "choices_file" in arg
+            else arg
+            for arg in arguments
+        ]
+
+    config = {**config, "arguments": rebased(config.get("arguments", []))}
+    if "commands" in config:
+        config["commands"] = [
+            {**command, "arguments": rebased(command.get("arguments", []))}
+            for command in config["commands"]
+        ]
+    return config
+
+
+def dump_spec(config: dict, output: str) -> None:
+    """
+    write a resolved and validated spec as a compiled spec, or as JSON if
+    output ends with .json. choices_file paths are made relative to it
+    """
+    base_dir = os.path.dirname(os.path.abspath(output))
+    config = _rebase_choices_files(
+        config, lambda path: os.path.relpath(path, base_dir)
+    )
+    if os.path.splitext(output)[1] == ".json":
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(config, f, indent=2)
+            f.write("\n")
+        return
+    with open(output, "wb") as f:
+        f.write(MAGIC + bytes([FORMAT_VERSION]))
+        marshal.dump(config, f)
+
+
+def load_compiled(file_path: str) -> dict:
+    """
+    config of a compiled spec, its choices_file paths made relative to
+    the current dir (as resolve_spec does)
+    """
+    with open(file_path, "rb") as f:
+        content = f.read()
+    if not content.startswith(MAGIC):
+        raise SpecValidationError([f"{file_path}: not a compiled spec"])
+    version = content[len(MAGIC) : len(MAGIC) + 1]
+    if version != bytes([FORMAT_VERSION]):
+        raise SpecValidationError(
+            [
+                f"{file_path}: compiled spec format {version.hex() or '?'}, "
+                f"expecting {FORMAT_VERSION:02x} (compile it again)"
+            ]
+        )
+    try:
+        config = marshal.loads(content[len(MAGIC) + 1 :])
+    except (EOFError, ValueError, TypeError) as err:
+        raise SpecValidationError([f"{file_path}: corrupted ({err})"]) from err
+    base_dir = os.path.dirname(file_path)
+    return _rebase_choices_files(config, lambda path: os.path.join(base_dir, path))
+
+
+def choices_files(config: dict) -> List[str]:
+    """the choices files a resolved spec refers to"""
+    return [
+        arg["choices_file"] for arg in _arguments(config) if "choices_file" in arg
+    ]
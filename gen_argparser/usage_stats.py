@@ -0,0 +1,138 @@
+"""
+Aggregation of the usage counters written by the generated parsers
+(usage_counters = "true"), for climeta.py stats
+
+Each process appends one line per (sub)command it parsed:
+
+    climeta-usage prog=example command=build runs=3 --jobs=2 --mode=1
+
+runs is the number of successful parses, then the times each option was
+given (options never given are left out). Lines are aggregated by
+program and command, specs add the options nobody used.
+"""
+
+import json
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .code_generator import CodeGenerator
+
+PREFIX = "climeta-usage"
+
+
+def parse_usage_line(line: str) -> Optional[Tuple[str, str, int, Dict[str, int]]]:
+    """(prog, command, runs, option -> count) of a line, None if malformed"""
+    tokens = line.split()
+    if not tokens or tokens[0] != PREFIX:
+        return None
+    fields = {}
+    counts = {}
+    for token in tokens[1:]:
+        key, equal, value = token.partition("=")
+        if not equal:
+            return None
+        if key.startswith("-"):
+            if not value.isdigit():
+                return None
+            counts[key] = int(value)
+        else:
+            fields[key] = value
+    if "prog" not in fields or not fields.get("runs", "").isdigit():
+        return None
+    return fields["prog"], fields.get("command", ""), int(fields["runs"]), counts
+
+
+def _entry(stats: dict, prog: str, command: str) -> dict:
+    """stats of a (sub)command, created empty"""
+    return stats.setdefault(prog, {}).setdefault(
+        command, {"lines": 0, "runs": 0, "options": {}}
+    )
+
+
+def read_usage(paths: Iterable[str]) -> Tuple[dict, int]:
+    """
+    prog -> command ("" if none) -> {lines, runs, options: name -> count}
+    of the usage files, and the number of malformed lines skipped
+    """
+    stats: dict = {}
+    skipped = 0
+    for path in paths:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                parsed = parse_usage_line(line)
+                if parsed is None:
+                    skipped += line.strip() != ""
+                    continue
+                prog, command, runs, counts = parsed
+                entry = _entry(stats, prog, command)
+                entry["lines"] += 1
+                entry["runs"] += runs
+                options = entry["options"]
+                for name, count in counts.items():
+                    options[name] = options.get(name, 0) + count
+    return stats, skipped
+
+
+def restrict_to_specs(stats: dict, configs: List[dict]) -> dict:
+    """
+    stats of the programs of the specs only, listing all their options
+    (at 0 if never given) in spec order
+    """
+    restricted: dict = {}
+    for config in configs:
+        generator = CodeGenerator(config)
+        prog = re.sub(r"\s", "_", generator.program_name)
+        generators = [generator.for_command(cmd) for cmd in generator.commands]
+        for scoped in generators or [generator]:
+            command = "" if scoped.command is None else scoped.command.name
+            found = stats.get(prog, {}).get(command)
+            entry = _entry(restricted, prog, command)
+            if found is not None:
+                entry["lines"] = found["lines"]
+                entry["runs"] = found["runs"]
+            counts = {} if found is None else found["options"]
+            names = [arg.name for arg in scoped.counted_options()]
+            entry["options"] = {name: counts.get(name, 0) for name in names}
+            # options the spec doesn't have (anymore)
+            for name, count in counts.items():
+                entry["options"].setdefault(name, count)
+    return restricted
+
+
+def format_report(stats: dict) -> str:
+    """human readable report, the most used options first"""
+    lines = []
+    for prog, commands in sorted(stats.items()):
+        for command, entry in sorted(commands.items()):
+            title = f"{prog} {command}".strip()
+            runs = entry["runs"]
+            lines.append(f"{title}: {runs} runs ({entry['lines']} lines)")
+            options = sorted(entry["options"].items(), key=lambda item: -item[1])
+            used = [(name, count) for name, count in options if count > 0]
+            if used:
+                width = max(len(name) for name, _ in used)
+                lines.append(f"  {'option':<{width}} {'given':>8} {'per run':>8}")
+                for name, count in used:
+                    per_run = count / runs if runs else 0.0
+                    lines.append(f"  {name:<{width}} {count:>8} {per_run:>8.2f}")
+            unused = [name for name, count in options if count == 0]
+            if unused:
+                lines.append(f"  never used: {' '.join(unused)}")
+            lines.append("")
+    return "\n".join(lines)
+
+
+def format_json(stats: dict) -> str:
+    """the stats as JSON, for scripts"""
+    return json.dumps(stats, indent=2, sort_keys=True)
+
+
+def usage_profile(stats: dict, prog: str) -> Dict[str, int]:
+    """profile of a program for climeta.py --profile (see profile.py)"""
+    profile = {}
+    for command, entry in stats.get(prog, {}).items():
+        prefix = f"{command} " if command else ""
+        for name, count in entry["options"].items():
+            if count > 0:
+                profile[prefix + name] = count
+    return profile
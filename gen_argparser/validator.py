@@ -0,0 +1,296 @@
+"""
+Validate a parsed CLI spec, reporting every problem found at once
+
+Each scope (the top level arguments, or each command together with the
+top level arguments it shares) is walked once, building hash indexes of
+names, shorts and dests as it goes, so duplicates are detected without
+comparing arguments pairwise. Errors are located by file and line of the
+section defining the argument.
+"""
+
+import re
+from typing import Dict, List, Optional
+
+from .code_generator import ArgSpec, env_variable
+
+ARG_TYPES = ["flag", "string", "int", "float", "infile", "outfile"]
+
+# spellings/dests taken by the generated code itself
+RESERVED_NAMES = {"--help": "the generated help option"}
+RESERVED_SHORTS = {"-h": "the generated help option"}
+RESERVED_COMMAND_DESTS = {"command": "the selected command name"}
+
+# empty, or the start of an environment variable name
+ENV_PREFIX_RE = re.compile(r"([A-Za-z_]\w*)?", re.ASCII)
+ENV_RE = re.compile(r"[A-Za-z_]\w*", re.ASCII)
+
+SECTION_RE = re.compile(r"^\s*\[\[\s*([\w.]+)\s*\]\]")
+
+
+class SpecValidationError(ValueError):
+    """a spec has one or more errors, all of them listed in errors"""
+
+    def __init__(self, errors: List[str]):
+        self.errors = errors
+        super().__init__("\n".join(errors))
+
+
+def section_lines(text: str) -> Dict[str, list]:
+    """
+    line numbers of the [[arguments]] sections, plus those of the
+    [[commands.arguments]] sections of each [[commands]] and of the
+    [[groups.<name>]] sections of each group, in file order:
+    {"arguments": [line, ...], "commands": [line, ...],
+     "commands.arguments": [[line, ...] per command],
+     "groups": {name: [line, ...]}}
+    """
+    lines = {
+        "arguments": [],
+        "commands": [],
+        "commands.arguments": [],
+        "groups": {},
+    }
+    for lineno, line in enumerate(text.splitlines(), 1):
+        match = SECTION_RE.match(line)
+        if match is None:
+            continue
+        section = match.group(1)
+        if section == "commands":
+            lines["commands.arguments"].append([])
+        if section == "commands.arguments":
+            if lines["commands.arguments"]:
+                lines["commands.arguments"][-1].append(lineno)
+        elif section.startswith("groups."):
+            group = section[len("groups."):]
+            lines["groups"].setdefault(group, []).append(lineno)
+        elif section in lines:
+            lines[section].append(lineno)
+    return lines
+
+
+def locations_from_text(file_path: str, text: str) -> dict:
+    """
+    file:line of each argument and command of a spec without includes,
+    same layout as section_lines
+    """
+    lines = section_lines(text)
+
+    def where(line: int) -> str:
+        return f"{file_path}:{line}"
+
+    return {
+        "arguments": [where(line) for line in lines["arguments"]],
+        "commands": [where(line) for line in lines["commands"]],
+        "commands.arguments": [
+            [where(line) for line in cmd_lines]
+            for cmd_lines in lines["commands.arguments"]
+        ],
+    }
+
+
+def _location(file_path: str, locations: list, idx: int) -> str:
+    """location of the idx-th argument/command of a list, or just file"""
+    if idx < len(locations):
+        return locations[idx]
+    return file_path
+
+
+def _check_fields(arg: dict, env_prefix: str = "") -> List[str]:
+    """errors on the fields of an argument not caught by the indexes"""
+    errors = []
+    for field in ["name", "type", "help"]:
+        if field not in arg:
+            errors.append(f"missing required field '{field}'")
+    if errors:
+        return errors
+    if not isinstance(arg["name"], str):
+        return ["name must be a string"]
+
+    name = arg["name"]
+    if arg["type"] not in ARG_TYPES:
+        errors.append(
+            f"{name}: type must be one of {', '.join(ARG_TYPES)}, "
+            f"got '{arg['type']}'"
+        )
+    for field in [
+        "default",
+        "choices",
+        "choices_file",
+        "short",
+        "dest",
+        "metavar",
+        "mode",
+        "mmap",
+        "env",
+    ]:
+        if field in arg and not isinstance(arg[field], str):
+            errors.append(f"{name}: {field} must be a string")
+    if errors:
+        return errors
+
+    try:
+        spec = ArgSpec(arg, env_prefix)
+    except (AssertionError, RuntimeError, ValueError, OSError) as err:
+        reason = str(err) or "invalid default"
+        return [f"{name}: {reason}"]
+
+    if spec.choices is not None and spec.has_default:
+        defaults = spec.default if spec.multiple else [spec.default]
+        for default in defaults:
+            if str(default) not in spec.choices:
+                errors.append(
+                    f"{name}: default '{default}' is not one of the choices "
+                    f"{', '.join(spec.choices)}"
+                )
+    return errors
+
+
+def _has_valid_name(arg: dict) -> bool:
+    """
+    whether an argument can be indexed: its other fields are indexed even
+    when some have errors, so their collisions are reported too
+    """
+    name = arg.get("name")
+    if not isinstance(name, str):
+        return False
+    name = name.strip()
+    return not (name.startswith("-") and not name.startswith("--"))
+
+
+def _sort_key(error: str) -> tuple:
+    """file, line of a located error"""
+    file_path, _, rest = error.partition(":")
+    line = rest.partition(":")[0]
+    return (file_path, int(line) if line.isdigit() else 0)
+
+
+class _Scope:
+    """indexes of the arguments seen so far in a (sub)command"""
+
+    def __init__(self, command: Optional[str], env_prefix: str = ""):
+        self.command = command
+        self.env_prefix = env_prefix
+        self.names = dict(RESERVED_NAMES)
+        self.shorts = dict(RESERVED_SHORTS)
+        self.dests = dict(RESERVED_COMMAND_DESTS) if command else {}
+        self.envs: Dict[str, str] = {}
+        self.variadic_positional: Optional[str] = None
+
+    def add(self, arg: dict, where: str) -> List[str]:
+        """index the valid fields of an argument, returns the errors it causes"""
+        errors = []
+        name = arg["name"]
+        prefix = f"command '{self.command}': " if self.command else ""
+
+        def check(index: dict, key: str, what: str) -> None:
+            if key in index:
+                errors.append(
+                    f"{prefix}{name}: {what} '{key}' already used by "
+                    f"{index[key]}"
+                )
+            else:
+                index[key] = f"{name} ({where})"
+
+        check(self.names, name, "name")
+        if arg.get("short") and isinstance(arg["short"], str):
+            check(self.shorts, arg["short"], "short")
+        dest = arg.get("dest", name.lstrip("-"))
+        if isinstance(dest, str):
+            check(self.dests, dest, "dest")
+            env = env_variable(arg, self.env_prefix)
+            if name.startswith("--") and isinstance(env, str) and ENV_RE.fullmatch(env):
+                check(self.envs, env, "env")
+
+        if not name.startswith("--"):
+            if self.variadic_positional is not None:
+                errors.append(
+                    f"{prefix}{name}: positional after the variadic "
+                    f"positional {self.variadic_positional} can't be given"
+                )
+            elif arg.get("multiple", "false") == "true":
+                self.variadic_positional = name
+        return errors
+
+
+def validate_spec(
+    config: dict,
+    file_path: str = "<spec>",
+    text: str = "",
+    locations: Optional[dict] = None,
+) -> None:
+    """
+    check a parsed spec, raise SpecValidationError listing all the errors
+    found. Errors are located from the TOML source text, or from the
+    given locations of each argument when it has includes/groups
+    """
+    lines = locations or locations_from_text(file_path, text)
+    errors = {}  # message -> order, to list them in file order
+
+    def report(where: str, found: List[str]) -> None:
+        for error in found:
+            errors.setdefault(f"{where}: {error}", len(errors))
+
+    program = config.get("program")
+    env_prefix = ""
+    if not isinstance(program, dict):
+        report(file_path, ["missing [program] section"])
+    else:
+        for field in ["name", "description"]:
+            if field not in program:
+                report(file_path, [f"[program] missing field '{field}'"])
+        env_prefix = program.get("env_prefix", "")
+        if not isinstance(env_prefix, str) or not ENV_PREFIX_RE.fullmatch(
+            env_prefix
+        ):
+            message = f"[program] env_prefix '{env_prefix}' can't start a variable"
+            report(file_path, [message])
+            env_prefix = ""
+
+    # top level arguments, checked once and indexed once per scope
+    top_level = []
+    for idx, arg in enumerate(config.get("arguments", [])):
+        where = _location(file_path, lines["arguments"], idx)
+        report(where, _check_fields(arg, env_prefix))
+        if _has_valid_name(arg):
+            top_level.append((arg, where))
+
+    commands = config.get("commands", [])
+    scopes = []
+    if not commands:
+        scopes.append((_Scope(None, env_prefix), []))
+    command_names = {}
+    for cmd_idx, cmd in enumerate(commands):
+        where = _location(file_path, lines["commands"], cmd_idx)
+        name = cmd.get("name")
+        if name is None:
+            report(where, ["command missing required field 'name'"])
+            continue
+        if name in command_names:
+            report(
+                where,
+                [f"command '{name}' already defined at {command_names[name]}"],
+            )
+            continue
+        command_names[name] = where
+
+        arg_lines = (
+            lines["commands.arguments"][cmd_idx]
+            if cmd_idx < len(lines["commands.arguments"])
+            else []
+        )
+        own = []
+        for idx, arg in enumerate(cmd.get("arguments", [])):
+            arg_where = _location(file_path, arg_lines, idx)
+            report(arg_where, _check_fields(arg, env_prefix))
+            if _has_valid_name(arg):
+                own.append((arg, arg_where))
+        scopes.append((_Scope(name, env_prefix), own))
+
+    for scope, own in scopes:
+        for arg, where in top_level + own:
+            report(where, scope.add(arg, where))
+
+    if errors:
+        # top level arguments are shared, so errors found again while
+        # indexing each command were merged by the dict
+        raise SpecValidationError(sorted(errors, key=_sort_key))
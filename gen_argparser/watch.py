@@ -0,0 +1,266 @@
+"""
+Watch mode (climeta.py --watch DIR): regenerate the parsers of the specs
+of a directory as they are edited, from a process kept warm
+
+Changes are waited for with inotify where available (Linux, through
+ctypes), by polling the modification times otherwise. Once a change
+comes in, more are collected until none arrived for the debounce window
+(editors write a file in several steps, and a save can touch several
+files), then only the specs that changed, or whose includes or choices
+files changed (see includes.affected_specs), are generated again.
+Included files are parsed once per content, so the unchanged ones are
+not even parsed again, and outputs whose code didn't change are left
+untouched (CodeGenerator.only_changed), so builds don't rerun on them.
+
+Files of the directory included by its other specs (common.toml) are
+not specs of their own, they're only watched.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from .includes import affected_specs, spec_dependencies
+from .spec_formats import COMPILED_EXTENSION
+from .validator import SpecValidationError
+
+SPEC_EXTENSIONS = [".toml", ".json", COMPILED_EXTENSION]
+
+# inotify(7) events: written, moved in or out, created, deleted
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_EVENTS = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+# struct inotify_event header: wd, mask, cookie, len (then the name)
+IN_EVENT_HEADER = struct.Struct("iIII")
+
+
+class InotifyWatcher:
+    """changes of the files of some directories, as told by inotify"""
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        # watch descriptor -> directory
+        self.directories: Dict[int, str] = {}
+
+    def add(self, directory: str) -> None:
+        """also watch the files of directory"""
+        if directory in self.directories.values():
+            return
+        wd = self._add_watch(self.fd, os.fsencode(directory), IN_EVENTS)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"cannot watch {directory}")
+        self.directories[wd] = directory
+
+    def wait(self, timeout: Optional[float]) -> Set[str]:
+        """paths changed, waiting for them up to timeout (None: forever)"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed = set()
+        data = os.read(self.fd, 64 * 1024)
+        offset = 0
+        while offset < len(data):
+            wd, _, _, size = IN_EVENT_HEADER.unpack_from(data, offset)
+            offset += IN_EVENT_HEADER.size
+            name = data[offset : offset + size].rstrip(b"\0")
+            offset += size
+            if wd in self.directories and name:
+                changed.add(os.path.join(self.directories[wd], os.fsdecode(name)))
+        return changed
+
+    def close(self) -> None:
+        """stop watching"""
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """changes of the files of some directories, by polling their mtimes"""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        # directory -> {path: (mtime_ns, size)}
+        self.snapshots: Dict[str, Dict[str, Tuple[int, int]]] = {}
+
+    @staticmethod
+    def _snapshot(directory: str) -> Dict[str, Tuple[int, int]]:
+        """mtime and size of the files of a directory"""
+        snapshot = {}
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            pass
+        return snapshot
+
+    def add(self, directory: str) -> None:
+        """also watch the files of directory"""
+        if directory not in self.snapshots:
+            self.snapshots[directory] = self._snapshot(directory)
+
+    def wait(self, timeout: Optional[float]) -> Set[str]:
+        """paths changed, waiting for them up to timeout (None: forever)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            changed = set()
+            for directory, before in self.snapshots.items():
+                after = self.snapshots[directory] = self._snapshot(directory)
+                changed.update(
+                    path
+                    for path in before.keys() | after.keys()
+                    if before.get(path) != after.get(path)
+                )
+            if changed:
+                return changed
+            if deadline is None:
+                time.sleep(self.interval)
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return changed
+            time.sleep(min(self.interval, remaining))
+
+    def close(self) -> None:
+        """stop watching"""
+        self.snapshots.clear()
+
+
+def make_watcher(polling: bool = False):
+    """inotify watcher if available (and not polling), else polling one"""
+    if not polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher()
+        except (OSError, AttributeError, TypeError):
+            pass  # no libc, or one without inotify
+    return PollingWatcher()
+
+
+def _candidate_specs(directory: str) -> List[str]:
+    """the files of directory that look like specs"""
+    return sorted(
+        os.path.realpath(os.path.join(directory, name))
+        for name in os.listdir(directory)
+        if os.path.splitext(name)[1] in SPEC_EXTENSIONS
+    )
+
+
+class SpecWatcher:
+    """the specs of a directory, and the generation of their outputs"""
+
+    def __init__(
+        self,
+        directory: str,
+        generate: Callable[[str], object],
+        log: Callable[[str], None] = print,
+    ):
+        self.directory = directory
+        # spec path -> generator of its outputs (with written/unchanged)
+        self.generate = generate
+        self.log = log
+        self.specs: List[str] = []
+
+    def scan(self) -> None:
+        """the specs of the directory: the candidates no other one includes"""
+        candidates = _candidate_specs(self.directory)
+        included = set()
+        for path in candidates:
+            try:
+                included.update(spec_dependencies(path))
+            except (SpecValidationError, ValueError, OSError):
+                pass  # reported when generated
+        self.specs = [path for path in candidates if path not in included]
+
+    def watched_directories(self) -> List[str]:
+        """the directories of the specs and of all their dependencies"""
+        directories = {os.path.realpath(self.directory)}
+        for spec in self.specs:
+            try:
+                dependencies = spec_dependencies(spec)
+            except (SpecValidationError, ValueError, OSError):
+                continue
+            directories.update(os.path.dirname(path) for path in dependencies)
+        return sorted(directories)
+
+    def regenerate(self, specs: List[str]) -> None:
+        """generate the outputs of specs, logging what changed"""
+        for spec in specs:
+            name = os.path.relpath(spec)
+            start = time.perf_counter()
+            try:
+                generator = self.generate(spec)
+            except SpecValidationError as err:
+                self.log(f"{name}: ERROR: invalid spec\n{err}")
+                continue
+            except (RuntimeError, ValueError, OSError) as err:
+                self.log(f"{name}: ERROR: {err}")
+                continue
+            elapsed_ms = (time.perf_counter() - start) * 1e3
+            written = [os.path.relpath(path) for path in generator.written]
+            if written:
+                self.log(f"{name}: wrote {' '.join(written)} ({elapsed_ms:.1f} ms)")
+            else:
+                self.log(f"{name}: up to date ({elapsed_ms:.1f} ms)")
+
+    def changed_specs(self, changed: Set[str]) -> List[str]:
+        """the specs to generate again after changes of the given files"""
+        changed = {os.path.realpath(path) for path in changed}
+        if any(os.path.splitext(path)[1] in SPEC_EXTENSIONS for path in changed):
+            self.scan()  # specs may have been added, removed or included
+        # changed specs that never resolved are not in the include graph
+        affected = changed.union(affected_specs(changed))
+        return [spec for spec in self.specs if spec in affected]
+
+
+def watch(
+    directory: str,
+    generate: Callable[[str], object],
+    debounce: float = 0.03,
+    polling: bool = False,
+    log: Callable[[str], None] = print,
+) -> None:
+    """
+    generate the outputs of the specs of directory, then again for the
+    specs affected by each (debounced) batch of changes, until interrupted
+    """
+    specs = SpecWatcher(directory, generate, log)
+    specs.scan()
+    specs.regenerate(specs.specs)
+
+    watcher = make_watcher(polling)
+    kind = "inotify" if isinstance(watcher, InotifyWatcher) else "polling"
+    try:
+        for path in specs.watched_directories():
+            watcher.add(path)
+        log(f"watching {len(specs.specs)} specs in {directory} ({kind})")
+        while True:
+            changed = watcher.wait(None)
+            while True:
+                more = watcher.wait(debounce)
+                if not more:
+                    break
+                changed |= more
+            specs.regenerate(specs.changed_specs(changed))
+            # includes or choices files may have been added
+            for path in specs.watched_directories():
+                watcher.add(path)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
@@ -0,0 +1,8 @@
+#!/bin/bash
+
+# source the CLI parsing functions
+source "$(dirname $0)"/../sample10.sh
+
+# Example of use:
+get_cli_args "$@"
+dump_args
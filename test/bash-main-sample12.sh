@@ -0,0 +1,14 @@
+#!/bin/bash
+
+# source the CLI parsing functions
+source "$(dirname $0)"/../sample12.sh
+
+# Example of use: the options handed off by a parser of the same spec, or
+# the ones given
+if [ -n "${CLIMETA_OPTIONS:-}" ]; then
+    decode_args "$CLIMETA_OPTIONS" || exit 1
+else
+    get_cli_args "$@"
+fi
+dump_args
+echo "encoded: $(encode_args)"
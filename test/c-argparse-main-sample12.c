@@ -0,0 +1,25 @@
+#include "../sample12.h"
+#include <stdio.h>
+#include <stdlib.h>
+
+int main(int argc, const char **argv) {
+    Options opts;
+    char handed_off[1024];
+    char encoded[1024];
+    const char *env = getenv("CLIMETA_OPTIONS");
+
+    if (env != NULL) {
+        // options handed off by a parser of the same spec, decoded in place
+        snprintf(handed_off, sizeof(handed_off), "%s", env);
+        if (decode_options(handed_off, &opts) != 0) {
+            printf("ERROR: malformed CLIMETA_OPTIONS\n");
+            return 1;
+        }
+    } else {
+        argc = parse_options(argc, &argv, &opts);
+    }
+    dump_options(&opts);
+    encode_options(&opts, encoded, sizeof(encoded));
+    printf("encoded: %s\n", encoded);
+    return 0;
+}
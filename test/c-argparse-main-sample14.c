@@ -0,0 +1,25 @@
+#include "../sample14.h"
+#include <stdio.h>
+
+int main(int argc, const char **argv) {
+    Options opts;
+    char error[1024];
+
+    // the status is returned instead of exiting, with the message in error
+    argc = parse_options(argc, &argv, &opts, error, sizeof(error));
+    if (argc < 0) {
+        printf("status %d: %s\n", argc, error);
+        return argc == CLIMETA_HELP ? 0 : 1;
+    }
+    dump_options(&opts);
+
+    // positionals
+    if (argc != 0) {
+        printf("argc: %d\n", argc);
+        int i;
+        for (i = 0; i < argc; i++) {
+            printf("argv[%d]: %s\n", i, *(argv + i));
+        }
+    }
+    return 0;
+}
@@ -0,0 +1,54 @@
+#include "../multicall.h"
+#include <stdio.h>
+
+static int dump_rest(int argc, const char **argv) {
+    // positionals
+    if (argc != 0) {
+        printf("argc: %d\n", argc);
+        int i;
+        for (i = 0; i < argc; i++) {
+            printf("argv[%d]: %s\n", i, *(argv + i));
+        }
+    }
+    return 0;
+}
+
+int args0_main(int argc, const char **argv) {
+    args0_Options opts;
+
+    argc = args0_parse_args(argc, &argv, &opts);
+    args0_dump_options(&opts);
+    return dump_rest(argc, argv);
+}
+
+int args1_main(int argc, const char **argv) {
+    args1_Options opts;
+
+    argc = args1_parse_args(argc, &argv, &opts);
+    args1_dump_options(&opts);
+    return dump_rest(argc, argv);
+}
+
+int args4_main(int argc, const char **argv) {
+    args4_Options opts;
+
+    argc = args4_parse_args(argc, &argv, &opts);
+    args4_dump_options(&opts);
+    return dump_rest(argc, argv);
+}
+
+int args5_main(int argc, const char **argv) {
+    args5_Options opts;
+
+    argc = args5_parse_args(argc, &argv, &opts);
+    args5_dump_options(&opts);
+    return dump_rest(argc, argv);
+}
+
+int args6_main(int argc, const char **argv) {
+    args6_Options opts;
+
+    argc = args6_parse_args(argc, &argv, &opts);
+    args6_dump_options(&opts);
+    return dump_rest(argc, argv);
+}
@@ -0,0 +1,11 @@
+#include "../sample10.hpp"
+
+int main(int argc, const char** argv)
+{
+    Options opts;
+
+    parse_options(argc, argv, &opts);
+    dump_options(opts);
+
+    return 0;
+}
@@ -0,0 +1,23 @@
+#include "../sample12.hpp"
+#include <cstdlib>
+#include <iostream>
+
+int main(int argc, const char** argv)
+{
+    Options opts;
+    const char* env = std::getenv("CLIMETA_OPTIONS");
+
+    if (env != nullptr) {
+        // options handed off by a parser of the same spec
+        if (!decode_options(env, &opts)) {
+            std::cout << "ERROR: malformed CLIMETA_OPTIONS" << std::endl;
+            return 1;
+        }
+    } else {
+        parse_options(argc, argv, &opts);
+    }
+    dump_options(opts);
+    std::cout << "encoded: " << encode_options(opts) << std::endl;
+
+    return 0;
+}
@@ -0,0 +1,18 @@
+#include "../sample14.hpp"
+#include <cstdio>
+
+int main(int argc, const char** argv)
+{
+    Options opts;
+    char error[1024];
+
+    // the status is returned instead of exiting, with the message in error
+    int status = parse_options(argc, argv, &opts, error, sizeof(error));
+    if (status < 0) {
+        printf("status %d: %s\n", status, error);
+        return status == CLIMETA_HELP ? 0 : 1;
+    }
+    dump_options(opts);
+
+    return 0;
+}
@@ -0,0 +1,9 @@
+#!/usr/bin/env node
+import * as cli from '../sample11.mjs'
+
+function main() {
+  const opts = cli.parseArgs()
+  console.log(opts)
+}
+
+main()
@@ -0,0 +1,12 @@
+#!/usr/bin/env node
+import * as cli from '../sample12.mjs'
+
+function main() {
+  // the options handed off by a parser of the same spec, or the ones given
+  const handedOff = process.env.CLIMETA_OPTIONS
+  const opts = handedOff ? cli.decodeOptions(handedOff) : cli.parseArgs()
+  console.log(opts)
+  console.log(`encoded: ${cli.encodeOptions(opts)}`)
+}
+
+main()
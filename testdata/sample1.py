@@ -1,11 +1,33 @@
 """CLI argument parsing"""
 
 import argparse
+import sys
+from dataclasses import dataclass
 
 
-def parse_args() -> tuple:
-    """CLI argument parsing entry point"""
-    parser = argparse.ArgumentParser(
+@dataclass(frozen=True, slots=True)
+class Args:
+    """Typed CLI arguments, as returned by parse_typed_args"""
+
+    input: str
+    output: str
+    lang: str
+
+
+def _typed_args(args: argparse.Namespace) -> Args:
+    """Args of the parsed namespace"""
+    return Args(
+        args.input,
+        args.output,
+        args.lang,
+    )
+
+
+def build_parser(
+    parser_class: type = argparse.ArgumentParser,
+) -> argparse.ArgumentParser:
+    """argparse parser of the program"""
+    parser = parser_class(
         description="The description of the program",
         formatter_class=argparse.ArgumentDefaultsHelpFormatter,
         epilog="Goes at the end",
@@ -30,8 +52,65 @@ def parse_args() -> tuple:
         choices=['python', 'bash'],
         help="language for the generated code",
     )
+    return parser
+
+
+def parse_argv(parser: argparse.ArgumentParser, argv: list) -> tuple:
+    """args, unknown of argv (the arguments after the program name)"""
+    return parser.parse_known_args(argv)
+
+
+def parse_args() -> tuple:
+    """CLI argument parsing entry point"""
+    argv = sys.argv[1:]
+    parser = build_parser()
+    return parse_argv(parser, argv)  # args, unknown
+
+
+def parse_typed_args() -> tuple:
+    """CLI argument parsing entry point returning typed Args"""
+    args, unknown = parse_args()
+    return _typed_args(args), unknown
+
+
+class ParseError(Exception):
+    """
+    command line rejected by Parser.parse (status 2), or help
+    asked for (status 0, the help is the message)
+    """
+
+    def __init__(self, message: str, status: int):
+        super().__init__(message)
+        self.status = status
+
+
+class RaisingArgumentParser(argparse.ArgumentParser):
+    """ArgumentParser raising ParseError instead of printing and exiting"""
+
+    def print_help(self, file=None):
+        raise ParseError(self.format_help(), 0)
+
+    def error(self, message: str):
+        raise ParseError(f"{self.prog}: error: {message}", 2)
+
+
+class Parser:
+    """
+    parser built once, parse() can then be called any number of
+    times, from any thread, and raises ParseError instead of exiting
+    """
+
+    def __init__(self):
+        self._parser = build_parser(RaisingArgumentParser)
+
+    def parse(self, argv: list) -> tuple:
+        """args, unknown of argv (the arguments after the program name)"""
+        return parse_argv(self._parser, argv)
 
-    return parser.parse_known_args()  # args, unknown
+    def parse_typed(self, argv: list) -> tuple:
+        """typed Args, unknown of argv"""
+        args, unknown = self.parse(argv)
+        return _typed_args(args), unknown
 
 
 if __name__ == "__main__":
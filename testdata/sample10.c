@@ -0,0 +1,184 @@
+#include "sample10.h"
+#include "argparse.h"
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <limits.h>
+#include <math.h>
+#include <errno.h>
+#include <strings.h>
+
+
+extern char **environ;
+
+// bsearch comparison of an environ entry (NAME=value) with a name
+static int compare_env(const void *entry, const void *name) {
+    const char *e = (const char *)entry;
+    const char *n = *(const char *const *)name;
+    while (*e == *n && *n != '\0') {
+        e++;
+        n++;
+    }
+    // the '=' ends the name of the entry
+    return (*e == '=' ? 0 : (unsigned char)*e) - (unsigned char)*n;
+}
+
+// values (after the '=') of the variables names (sorted) set in the
+// environment, NULL for the others: environ is scanned once, each
+// of its entries looked up in names, instead of a getenv per name
+static void scan_environment(const char *const *names, size_t count, const char **values) {
+    for (size_t i = 0; i < count; i++) {
+        values[i] = NULL;
+    }
+    for (char **entry = environ; *entry != NULL; entry++) {
+        const char *const *name = bsearch(
+            *entry, names, count, sizeof(names[0]), compare_env
+        );
+        // the first one wins, as for getenv
+        if (name != NULL && values[name - names] == NULL) {
+            values[name - names] = *entry + strlen(*name) + 1;
+        }
+    }
+}
+
+// 1 / 0 for the true / false values of a flag variable, -1 if none
+static int env_flag(const char *value) {
+    static const char *const values[] = {
+        "1", "true", "yes", "on", "0", "false", "no", "off", "",
+    };
+    for (int i = 0; i < 9; i++) {
+        if (strcasecmp(value, values[i]) == 0) {
+            return i < 4;
+        }
+    }
+    return -1;
+}
+
+// value of a flag variable, exits if it isn't one
+static int env_bool(const char *name, const char *value) {
+    int flag = env_flag(value);
+    if (flag < 0) {
+        printf("ERROR: %s: invalid flag value '%s'\n", name, value);
+        exit(1);
+    }
+    return flag;
+}
+
+// value of an int variable, exits if it isn't one
+static int env_int(const char *name, const char *value) {
+    char *end;
+    errno = 0;
+    long number = strtol(value, &end, 0);
+    if (end == value || *end != '\0' || errno != 0 || number < INT_MIN || number > INT_MAX) {
+        printf("ERROR: %s: invalid int value '%s'\n", name, value);
+        exit(1);
+    }
+    return (int)number;
+}
+
+// value of a float variable, exits if it isn't one
+static float env_float(const char *name, const char *value) {
+    char *end;
+    errno = 0;
+    float number = strtof(value, &end);
+    if (end == value || *end != '\0' || errno != 0) {
+        printf("ERROR: %s: invalid float value '%s'\n", name, value);
+        exit(1);
+    }
+    return number;
+}
+
+void reset_options(Options* opts) {
+    opts->input = NULL;
+    opts->output = NULL;
+    opts->verbose = 0;
+    opts->level = 1;
+    opts->mode = "fast";
+    opts->name = "anonymous";
+}
+
+static int set_includes(const char* words[], const char* test_word) {
+    while (*words != NULL) {
+        if (strcmp(*words++, test_word) == 0) {
+            return 1;
+        }
+    }
+    return 0;
+}
+
+int parse_options(int argc, const char ***argv, Options* opts) {
+    static const char *const usages[] = {
+        "basic [options] positionals [[--] args]",
+        "basic [options] positionals ",
+        NULL,
+    };
+    reset_options(opts);
+    // the variables of the bound options, looked up in one scan
+    static const char *const env_names[] = {
+        "LEVEL", "SAMPLE10_MODE", "SAMPLE10_OUTPUT", "SAMPLE10_VERBOSE",
+    };
+    const char *env[4];
+    scan_environment(env_names, 4, env);
+    if (env[0] != NULL) {
+        opts->level = env_int("LEVEL", env[0]);
+    }
+    if (env[1] != NULL) {
+        opts->mode = env[1];
+    }
+    if (env[2] != NULL) {
+        opts->output = env[2];
+    }
+    if (env[3] != NULL) {
+        opts->verbose = env_bool("SAMPLE10_VERBOSE", env[3]);
+    }
+    struct argparse_option options[] = {
+        OPT_HELP(),
+        OPT_STRING('o', "output", &opts->output, "output file path (required)", NULL, 0, 0),
+        OPT_BOOLEAN('v', "verbose", &opts->verbose, "enable verbose mode (default 0)", NULL, 0, 0),
+        OPT_INTEGER('\0', "level", &opts->level, "compression level (default 1)", NULL, 0, 0),
+        OPT_STRING('\0', "mode", &opts->mode, "compression mode (default 'fast')", NULL, 0, 0),
+        OPT_STRING('\0', "name", &opts->name, "name of the archive, never read from the environment (default 'anonymous')", NULL, 0, 0),
+        OPT_END(),
+    };
+    struct argparse argparse;
+    argparse_init(&argparse, options, usages, 0);
+    argparse_describe(&argparse, 
+        "\nExample of options bound to environment variables",
+        "\nPositional arguments:"
+        "\n    input                 input file path\n"
+        "\nExample: SAMPLE10_OUTPUT=out.txt sample10 input.txt"
+    );
+    argc = argparse_parse(&argparse, argc, *argv);
+    // positionals
+    if (argc >= 1) {
+        opts->input = (*argv)[0];
+        (*argv)++; argc--;
+    } else {
+        printf("ERROR: expecting positional argument 'input'\n");
+        argparse_usage(&argparse);
+        exit(1);
+    }
+    opts->verbose = opts->verbose != 0;
+    // check if --output has been given
+    if (opts->output == NULL) {
+        printf("ERROR: expecting required argument '--output'\n");
+        argparse_usage(&argparse);
+        exit(1);
+    }
+    // check choices
+    const char *mode_valid[] = {"fast", "slow", NULL};
+    if (!set_includes(mode_valid, opts->mode)) {
+        printf("ERROR: 'mode' must be one of 'fast', 'slow'\n");
+        exit(1);
+    }
+    return argc;
+}
+
+void dump_options(Options *opts) {
+    printf("input: %s\n", opts->input);
+    printf("output: %s\n", opts->output);
+    printf("verbose: %d\n", opts->verbose);
+    printf("level: %d\n", opts->level);
+    printf("mode: %s\n", opts->mode);
+    printf("name: %s\n", opts->name);
+}
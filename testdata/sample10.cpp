@@ -0,0 +1,129 @@
+#include "sample10.hpp"
+#include <iostream>
+#include <set>
+#include <algorithm>
+#include <cstdlib>
+#include <cstring>
+#include <sstream>
+#include <string>
+#include <strings.h>
+
+
+extern char **environ;
+
+// bsearch comparison of an environ entry (NAME=value) with a name
+static int compare_env(const void *entry, const void *name) {
+    const char *e = static_cast<const char *>(entry);
+    const char *n = *static_cast<const char *const *>(name);
+    while (*e == *n && *n != '\0') {
+        e++;
+        n++;
+    }
+    // the '=' ends the name of the entry
+    return (*e == '=' ? 0 : (unsigned char)*e) - (unsigned char)*n;
+}
+
+// values (after the '=') of the variables names (sorted) set in the
+// environment, nullptr for the others: environ is scanned once, each
+// of its entries looked up in names, instead of a getenv per name
+static void scan_environment(const char *const *names, size_t count, const char **values) {
+    std::fill(values, values + count, nullptr);
+    for (char **entry = environ; *entry != nullptr; entry++) {
+        const void *found = std::bsearch(
+            *entry, names, count, sizeof(names[0]), compare_env
+        );
+        auto name = static_cast<const char *const *>(found);
+        // the first one wins, as for getenv
+        if (name != nullptr && values[name - names] == nullptr) {
+            values[name - names] = *entry + std::strlen(*name) + 1;
+        }
+    }
+}
+
+// option value defaulting to the variable value env if set (space
+// separated values if multiple), else to fallback if any
+static std::shared_ptr<cxxopts::Value> env_default(std::shared_ptr<cxxopts::Value> value, const char *env, const char *fallback, bool multiple = false) {
+    if (env == nullptr) {
+        return fallback != nullptr ? value->default_value(fallback) : value;
+    }
+    if (!multiple) {
+        return value->default_value(env);
+    }
+    std::istringstream items(env);
+    std::string item, text;
+    while (items >> item) {
+        text += (text.empty() ? "" : ",") + item;
+    }
+    return value->default_value(text);
+}
+
+// "true" / "false" internal default of a flag bound to a variable
+// of value env, nullptr if unset
+static const char* env_flag(const char *env, bool inverted) {
+    if (env == nullptr) {
+        return nullptr;
+    }
+    static const char *const values[] = {
+        "1", "true", "yes", "on", "0", "false", "no", "off", "",
+    };
+    for (int i = 0; i < 9; i++) {
+        if (strcasecmp(env, values[i]) == 0) {
+            return (i < 4) != inverted ? "true" : "false";
+        }
+    }
+    throw cxxopts::exceptions::incorrect_argument_type(env);
+}
+
+cxxopts::ParseResult parse_options(int argc, const char **argv, Options* opts) {
+    // the variables of the bound options, looked up in one scan
+    static const char *const env_names[] = {
+        "LEVEL", "SAMPLE10_MODE", "SAMPLE10_OUTPUT", "SAMPLE10_VERBOSE",
+    };
+    const char *env[4];
+    scan_environment(env_names, 4, env);
+    cxxopts::Options options("example", "Example of options bound to environment variables");
+    // define all options
+    options.add_options()
+        ("h,help", "show this help message and exit")
+        ("input", "input file path (required)", cxxopts::value<std::string>())
+        ("o,output", "output file path (required)", env_default(cxxopts::value<std::string>(), env[2], nullptr))
+        ("v,verbose", "enable verbose mode (default: false)", env_default(cxxopts::value<bool>(), env_flag(env[3], false), nullptr))
+        ("level", "compression level", env_default(cxxopts::value<int>(), env[0], "1"))
+        ("mode", "compression mode", env_default(cxxopts::value<std::string>(), env[1], "fast"))
+        ("name", "name of the archive, never read from the environment", cxxopts::value<std::string>()->default_value("anonymous"))
+    ;
+    // declare positionals
+    options.parse_positional("input");
+
+    cxxopts::ParseResult result = options.parse(argc, argv);
+    if (result.count("help")) {
+        std::cout << options.help() << std::endl;
+        std::cout << "positional arguments:\n";
+        std::cout << "  input             " << "input file path (required)\n";
+        std::cout << "\nExample: SAMPLE10_OUTPUT=out.txt sample10 input.txt" << std::endl;
+        exit(0);
+    }
+    // Fill-up output struct
+    opts->input = result["input"].as<std::string>();
+    opts->output = result["output"].as<std::string>();
+    opts->verbose = result["verbose"].as<bool>();
+    opts->level = result["level"].as<int>();
+    opts->mode = result["mode"].as<std::string>();
+    opts->name = result["name"].as<std::string>();
+    // check choices
+    std::set<std::string> mode_valid{"fast", "slow"};
+    if (mode_valid.find(opts->mode) == mode_valid.end()) {
+        std::cout << "ERROR: 'mode' must be one of 'fast', 'slow'" << std::endl;
+        exit(1);
+    }
+    return result;
+}
+
+void dump_options(const Options &opts) {
+    std::cout << "input: " << opts.input << "\n";
+    std::cout << "output: " << opts.output << "\n";
+    std::cout << "verbose: " << opts.verbose << "\n";
+    std::cout << "level: " << opts.level << "\n";
+    std::cout << "mode: " << opts.mode << "\n";
+    std::cout << "name: " << opts.name << "\n";
+}
@@ -0,0 +1,26 @@
+#ifndef __sample10_h__
+#define __sample10_h__
+
+typedef struct {
+    const char * output;
+    int verbose;
+    int level;
+    const char * mode;
+    const char * name;
+    // positionals
+    const char * input;
+} Options;
+
+#ifdef __cplusplus
+extern "C" {
+#endif
+
+void reset_options(Options* opts);
+int parse_options(int argc, const char ***argv, Options* opts);
+void dump_options(Options *opts);
+
+#ifdef __cplusplus
+}
+#endif
+
+#endif
\ No newline at end of file
@@ -0,0 +1,15 @@
+#pragma once
+
+#include "cxxopts.hpp"
+struct Options {
+    std::string output;
+    bool verbose;
+    int level;
+    std::string mode;
+    std::string name;
+    // positionals
+    std::string input;
+};
+
+cxxopts::ParseResult parse_options(int argc, const char** argv, Options* opts);
+void dump_options(const Options& opts);
\ No newline at end of file
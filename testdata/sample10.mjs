@@ -0,0 +1,197 @@
+// https://github.com/75lb/command-line-args
+import commandLineArgs from 'command-line-args';
+// https://github.com/75lb/command-line-usage
+import commandLineUsage from 'command-line-usage';
+
+// thrown by Parser.parse(): status 0 for help (the usage is the
+// message), 1 for errors
+export class ParseError extends Error {
+  constructor(message, status) {
+    super(message);
+    this.name = 'ParseError';
+    this.status = status;
+  }
+};
+
+// values of the flags bound to a variable, in lowercase
+const envFlags = new Map([
+  ["1", true], ["true", true], ["yes", true], ["on", true],
+  ["0", false], ["false", false], ["no", false], ["off", false],
+  ["", false],
+]);
+
+// defaults of the options bound (envBindings: variable -> [option,
+// type, multiple, inverted]) to the variables set: process.env is
+// scanned once, instead of a lookup per option
+function environmentDefaults(envBindings) {
+  const defaults = {};
+  for (const [name, value] of Object.entries(process.env)) {
+    const binding = envBindings.get(name);
+    if (typeof binding === 'undefined') {
+      continue;
+    }
+    const [option, type, multiple, inverted] = binding;
+    const convert = (item) => {
+      if (type === 'flag') {
+        const flag = envFlags.get(item.toLowerCase());
+        if (typeof flag === 'undefined') {
+          throw new ParseError(`ERROR: ${name}: invalid flag value '${item}'`, 1);
+        }
+        return flag !== inverted;
+      }
+      if (type === 'number') {
+        const number = Number(item);
+        if (item.trim() === '' || Number.isNaN(number)) {
+          throw new ParseError(`ERROR: ${name}: invalid number value '${item}'`, 1);
+        }
+        return number;
+      }
+      return item;
+    };
+    defaults[option] = multiple ? value.split(/\s+/).filter(Boolean).map(convert) : convert(value);
+  }
+  return defaults;
+};
+
+// bound variable -> [option, type, multiple, inverted]
+const envBindings = new Map([
+  ["LEVEL", ["level", "number", false, false]],
+  ["SAMPLE10_MODE", ["mode", "string", false, false]],
+  ["SAMPLE10_OUTPUT", ["output", "string", false, false]],
+  ["SAMPLE10_VERBOSE", ["verbose", "flag", false, false]],
+]);
+
+export class Parser {
+  constructor() {
+    // Defaults for each of the options
+    this.defaults = Object.freeze({
+      output: null,
+      verbose: false,
+      level: 1,
+      mode: "fast",
+      name: "anonymous",
+      // overridden by the bound variables set in the environment
+      ...environmentDefaults(envBindings),
+    });
+    const optionDefinitions = [
+      {
+        name: 'help',
+        description: 'show this help message and exit',
+        alias: 'h',
+        type: Boolean
+      },
+      {
+        name: 'output',
+        description: 'output file path',
+        alias: 'o',
+        type: String
+      },
+      {
+        name: 'verbose',
+        description: 'enable verbose mode',
+        alias: 'v',
+        type: Boolean
+      },
+      {
+        name: 'level',
+        description: 'compression level',
+        type: Number
+      },
+      {
+        name: 'mode',
+        description: 'compression mode',
+        type: String
+      },
+      {
+        name: 'name',
+        description: 'name of the archive, never read from the environment',
+        type: String
+      },
+      {
+        name: 'positionals',
+        description: 'positional arguments (can omit --positionals) Corresponding to:\n>> {bold input} : input file path',
+        type: String,
+        multiple: true,
+        defaultOption: true
+      },
+    ];
+    // append default to help string
+    for (const opt of optionDefinitions) {
+      const default_ = this.defaults[opt.name];
+      if (typeof default_ !== "undefined") {
+        opt.description += default_ == null ? " (required)" : ` (default ${default_})`;
+      }
+    }
+    this.optionDefinitions = optionDefinitions;
+    // valid values of the choices options
+    this.mode_valid = Object.freeze(["fast", "slow"]);
+    this.usageText = null;
+  }
+
+  usage() {
+    if (this.usageText === null) {
+      this.usageText = commandLineUsage([{
+        header: "Header for help",
+        content: "Description for help",
+      }, {
+        header: "Options",
+        optionList: this.optionDefinitions,
+      }, {
+        content: "Epilog"
+      }]);
+    }
+    return this.usageText;
+  }
+
+  // error followed by the usage
+  error(message) {
+    return new ParseError(`${message}\n${this.usage()}`, 1);
+  }
+
+  parse(argv) {
+    let rawOptions;
+    try {
+      rawOptions = commandLineArgs(this.optionDefinitions, { argv });
+    } catch (e) {
+      // unknown options, values given to flags...
+      throw new ParseError(`ERROR: ${e.message}`, 1);
+    }
+    // fill up with defaults the options not provided
+    const opts = {...this.defaults, ...rawOptions };
+    if (opts.help) {
+      throw new ParseError(this.usage(), 0);
+    }
+    for (const optName in opts) {
+      if (opts[optName] == null) {
+        throw this.error(`Invalid or no option passed for --${optName}`);
+      }
+    }
+    // Handle positionals
+    const exp_positionals = 1
+    const num_positionals = (typeof opts.positionals === "undefined") ? 0 : opts.positionals.length;
+    if (num_positionals != exp_positionals) {
+      throw this.error(`Expecting ${exp_positionals} positional argument(s), but got ${num_positionals}`);
+    }
+    opts.input = opts.positionals[0];
+    delete opts.positionals;
+    // check choices
+    if (!this.mode_valid.includes(opts.mode)) {
+      throw new ParseError(
+        `ERROR: 'mode' must be one of ${this.mode_valid.join(', ')}`, 1
+      );
+    }
+    return opts;
+  }
+};
+
+export function parseArgs() {
+  try {
+    return new Parser().parse(process.argv.slice(2));
+  } catch (e) {
+    if (!(e instanceof ParseError)) {
+      throw e;
+    }
+    console.log(e.message);
+    process.exit(e.status);
+  }
+};
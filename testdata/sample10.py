@@ -0,0 +1,241 @@
+"""CLI argument parsing"""
+
+import argparse
+import os
+import sys
+from dataclasses import dataclass
+
+
+class Environment:
+    """
+    the variables the options are bound to, read once when the parser is
+    built, and the defaults they give
+    """
+
+    __slots__ = ("values", "errors")
+
+    # values of the flags bound to a variable, compared in lowercase
+    FLAGS = {
+        **dict.fromkeys(["1", "true", "yes", "on"], True),
+        **dict.fromkeys(["0", "false", "no", "off", ""], False),
+    }
+
+    def __init__(self, names: frozenset):
+        # a pass over the variable names only (os.environ decodes what it
+        # returns), unless there are few names to look up
+        if len(names) * 5 < len(os.environ):
+            found = [name for name in names if name in os.environ]
+        else:
+            found = names.intersection(os.environ)
+        self.values = {name: os.environ[name] for name in found}
+        # (parser, message) of the invalid values, reported by check
+        self.errors = []
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.values
+
+    @staticmethod
+    def flag(value: str) -> bool:
+        """argparse like type callable of the flags"""
+        return Environment.FLAGS[value.lower()]
+
+    def default(
+        self,
+        parser: argparse.ArgumentParser,
+        name: str,
+        default,
+        type_=str,
+        choices=None,
+        multiple: bool = False,
+    ):
+        """
+        default of an option bound to the variable name: its value if set
+        (space separated values if multiple), converted and checked as on
+        the command line. An invalid value gives default, its error being
+        reported by check once parser is complete
+        """
+        if name not in self.values:
+            return default
+        text = self.values[name]
+        values = []
+        for item in text.split() if multiple else [text]:
+            try:
+                value = type_(item)
+            except argparse.ArgumentTypeError as err:
+                self.errors.append((parser, f"{name}: {err}"))
+                return default
+            except (KeyError, TypeError, ValueError):
+                type_name = getattr(type_, "__name__", repr(type_))
+                message = f"{name}: invalid {type_name} value: {item!r}"
+                self.errors.append((parser, message))
+                return default
+            if choices is not None and value not in choices:
+                expected = ", ".join(map(repr, choices))
+                message = f"{name}: invalid choice: {item!r} (choose from {expected})"
+                self.errors.append((parser, message))
+                return default
+            values.append(value)
+        return values if multiple else values[0]
+
+    def check(self) -> None:
+        """
+        report the first invalid value, once the parsers are built (an
+        error while adding the arguments would print a partial usage)
+        """
+        if self.errors:
+            parser, message = self.errors[0]
+            parser.error(message)
+
+
+# the environment variables options are bound to
+ENV_NAMES = frozenset(
+    {
+        "LEVEL",
+        "SAMPLE10_MODE",
+        "SAMPLE10_OUTPUT",
+        "SAMPLE10_VERBOSE",
+    }
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Args:
+    """Typed CLI arguments, as returned by parse_typed_args"""
+
+    input: str
+    output: str
+    verbose: bool
+    level: int
+    mode: str
+    name: str
+
+
+def _typed_args(args: argparse.Namespace) -> Args:
+    """Args of the parsed namespace"""
+    return Args(
+        args.input,
+        args.output,
+        args.verbose,
+        args.level,
+        args.mode,
+        args.name,
+    )
+
+
+def build_parser(
+    parser_class: type = argparse.ArgumentParser,
+) -> argparse.ArgumentParser:
+    """argparse parser of the program"""
+    parser = parser_class(
+        description="Example of options bound to environment variables",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+        epilog="Example: SAMPLE10_OUTPUT=out.txt sample10 input.txt",
+    )
+    # read once, the defaults of the bound options
+    env = Environment(ENV_NAMES)
+    parser.add_argument(
+        "input",
+        type=str,
+        help="input file path",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        default=env.default(parser, "SAMPLE10_OUTPUT", None, str),
+        required="SAMPLE10_OUTPUT" not in env,
+        help="output file path",
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="store_true",
+        default=env.default(parser, "SAMPLE10_VERBOSE", False, env.flag),
+        help="enable verbose mode",
+    )
+    parser.add_argument(
+        "--level",
+        type=int,
+        default=env.default(parser, "LEVEL", 1, int),
+        help="compression level",
+    )
+    parser.add_argument(
+        "--mode",
+        type=str,
+        default=env.default(parser, "SAMPLE10_MODE", "fast", str, choices=['fast', 'slow']),
+        choices=['fast', 'slow'],
+        help="compression mode",
+    )
+    parser.add_argument(
+        "--name",
+        type=str,
+        default="anonymous",
+        help="name of the archive, never read from the environment",
+    )
+    env.check()
+    return parser
+
+
+def parse_argv(parser: argparse.ArgumentParser, argv: list) -> tuple:
+    """args, unknown of argv (the arguments after the program name)"""
+    return parser.parse_known_args(argv)
+
+
+def parse_args() -> tuple:
+    """CLI argument parsing entry point"""
+    argv = sys.argv[1:]
+    parser = build_parser()
+    return parse_argv(parser, argv)  # args, unknown
+
+
+def parse_typed_args() -> tuple:
+    """CLI argument parsing entry point returning typed Args"""
+    args, unknown = parse_args()
+    return _typed_args(args), unknown
+
+
+class ParseError(Exception):
+    """
+    command line rejected by Parser.parse (status 2), or help
+    asked for (status 0, the help is the message)
+    """
+
+    def __init__(self, message: str, status: int):
+        super().__init__(message)
+        self.status = status
+
+
+class RaisingArgumentParser(argparse.ArgumentParser):
+    """ArgumentParser raising ParseError instead of printing and exiting"""
+
+    def print_help(self, file=None):
+        raise ParseError(self.format_help(), 0)
+
+    def error(self, message: str):
+        raise ParseError(f"{self.prog}: error: {message}", 2)
+
+
+class Parser:
+    """
+    parser built once, parse() can then be called any number of
+    times, from any thread, and raises ParseError instead of exiting
+    """
+
+    def __init__(self):
+        self._parser = build_parser(RaisingArgumentParser)
+
+    def parse(self, argv: list) -> tuple:
+        """args, unknown of argv (the arguments after the program name)"""
+        return parse_argv(self._parser, argv)
+
+    def parse_typed(self, argv: list) -> tuple:
+        """typed Args, unknown of argv"""
+        args, unknown = self.parse(argv)
+        return _typed_args(args), unknown
+
+
+if __name__ == "__main__":
+    args, unknown = parse_args()
+    print(f"Parsed arguments: {args}")
+    if unknown:
+        print(f"Unknown arguments: {unknown}")
@@ -0,0 +1,181 @@
+# set flag $1 to 1 or 0 from the variable named $2, to $3 if unset
+env_flag() {
+    local value="${!2-$3}"
+    case "${value,,}" in
+        1|true|yes|on)
+            printf -v "$1" 1
+            ;;
+        0|false|no|off|'')
+            printf -v "$1" 0
+            ;;
+        *)
+            echo "ERROR: $2: invalid flag value '$value'" >&2
+            return 1
+            ;;
+    esac
+}
+
+# Usage function
+usage() {
+    echo "Usage: $0 [options]"
+    echo ""
+    echo "Example of options bound to environment variables"
+    echo ""
+    echo "positional arguments:"
+    echo "  input INPUT                   : input file path (required)"
+    echo ""
+    echo "options:"
+    echo '  -h, --help                    : show this help message and exit'
+    echo '  -o OUTPUT, --output OUTPUT    : output file path (required)'
+    echo '  -v VERBOSE, --verbose VERBOSE : enable verbose mode (default "0")'
+    echo '  --level LEVEL                 : compression level (default "1")'
+    echo '  --mode MODE                   : compression mode (default "fast")'
+    echo '  --name NAME                   : name of the archive, never read from the environment (default "anonymous")'
+    echo ""
+    echo "Example: SAMPLE10_OUTPUT=out.txt sample10 input.txt"
+    exit "$1"
+}
+
+# check if a valid argument follows
+check_valid_arg() {
+    case "$2" in
+        -*|'')
+            echo "ERROR: $1 requires a value." >&2
+            usage 1
+            ;;
+    esac
+}
+
+# Argument parsing function
+parse_args() {
+    # split --a=xx -b=yy -cde into --a xx -b yy -c -d -e
+    # for more unified processing later on
+    local i ch arg
+    local -a new_args
+    for arg in "$@"; do
+        case "$arg" in
+            --*=*) # convert --aa=xx into --aa xx
+                right=${arg#*=}  # remove up to first =
+                left=${arg%="$right"}  # remove right hand side
+                new_args+=("$left" "$right")
+                ;;
+            --*)
+                new_args+=("$arg")
+                ;;
+            -*) # convert -abc=yy into -a -b -c yy
+                i=1
+                while [ "$i" -lt "${#arg}" ]; do
+                    # Get character at position i (0 based)
+                    ch=$(expr "$arg" : "^.\{$i\}\(.\)")
+                    case "${ch}" in
+                        =) rest=$(expr "$arg" : "^..\{$i\}\(.*\)")
+                           new_args+=("$rest"); break ;;
+                        *) new_args+=("-${ch}") ;;
+                    esac
+                    i=$((i+1))
+                done
+                ;;
+            *)
+                new_args+=("$arg")
+                ;;
+        esac
+    done
+    set -- "${new_args[@]}"
+
+    remaining_args=""
+    local positional_idx=0
+    while [ "$#" -gt 0 ]; do
+        case "$1" in
+            --output|-o)
+                check_valid_arg "$1" "$2"
+                output="$2"
+                shift;;
+            --verbose|-v)
+                verbose="1"
+                ;;
+            --level)
+                check_valid_arg "$1" "$2"
+                level="$2"
+                shift;;
+            --mode)
+                check_valid_arg "$1" "$2"
+                mode="$2"
+                shift;;
+            --name)
+                check_valid_arg "$1" "$2"
+                name="$2"
+                shift;;
+            --help|-h)
+                usage 0
+                ;;
+            --)
+                shift
+                remaining_args="$*"
+                break
+                ;;
+            -*)
+                echo "ERROR: Unknown option: $1" >&2
+                usage 1
+                ;;
+            *) # handle positional arguments
+                if [ $positional_idx -eq 0 ]; then
+                    input="$1"
+                else
+                    echo "ERROR: Unexpected positional argument: $1" >&2
+                    usage 1
+                fi
+                positional_idx=$(( positional_idx + 1 ))
+                ;;
+        esac
+        shift
+    done
+}
+
+# Validate arguments
+validate_args() {
+    if [ -z "$input" ]; then
+        echo "ERROR: input is required" >&2
+        usage 1
+    fi
+    if [ -z "$output" ]; then
+        echo "ERROR: --output is required" >&2
+        usage 1
+    fi
+    local match
+    match=$(expr "|fast|slow|" : ".*|$mode|")
+    if [ "$match" -eq 0 ]; then
+        echo "ERROR: --mode must be one of: fast, slow (got '$mode')" >&2
+        usage 1
+    fi
+}
+
+# Dump argument values for debug
+dump_args() {
+    echo "Parsed arguments:"
+    echo "input: $input"
+    echo "output: $output"
+    echo "verbose: $verbose"
+    echo "level: $level"
+    echo "mode: $mode"
+    echo "name: $name"
+    echo "remaining_args:"
+    for arg in $remaining_args; do
+        echo "  $arg"
+    done
+}
+
+# Main entry point, parse CLI
+get_cli_args() {
+    # set defaults
+    output="${SAMPLE10_OUTPUT-}"
+    env_flag verbose SAMPLE10_VERBOSE "0" || usage 1
+    level="${LEVEL-1}"
+    mode="${SAMPLE10_MODE-fast}"
+    name="anonymous"
+    parse_args "$@"
+    validate_args
+}
+
+# Example of use:
+# get_cli_args "$@"
+# dump_args
\ No newline at end of file
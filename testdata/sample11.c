@@ -0,0 +1,239 @@
+#include "sample11.h"
+#include "argparse.h"
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <limits.h>
+#include <math.h>
+#include <fcntl.h>
+#include <unistd.h>
+
+
+static unsigned usage_runs_push;
+static unsigned usage_counts_push[3];
+static const char *const usage_names_push[] = {"--verbose", "--force", "--tag"};
+static unsigned usage_runs_pull;
+static unsigned usage_counts_pull[2];
+static const char *const usage_names_pull[] = {"--verbose", "--rebase"};
+
+// usage line of a (sub)command written to line, if it was parsed
+static size_t usage_line(char *line, const char *prefix, unsigned runs, const char *const *names, const unsigned *counts, size_t count) {
+    if (runs == 0) {
+        return 0;
+    }
+    size_t len = sprintf(line, "%s runs=%u", prefix, runs);
+    for (size_t i = 0; i < count; i++) {
+        if (counts[i] != 0) {
+            len += sprintf(line + len, " %s=%u", names[i], counts[i]);
+        }
+    }
+    line[len++] = '\n';
+    return len;
+}
+
+// all the lines in one O_APPEND write: no lock, no interleaving
+static void write_usage(void) {
+    static char line[211];
+    const char *path = getenv("CLIMETA_USAGE_FILE");
+    size_t len = 0;
+    if (path == NULL) {
+        path = "";
+    }
+    len += usage_line(
+        line + len, "climeta-usage prog=example command=push",
+        usage_runs_push, usage_names_push, usage_counts_push, 3
+    );
+    len += usage_line(
+        line + len, "climeta-usage prog=example command=pull",
+        usage_runs_pull, usage_names_pull, usage_counts_pull, 2
+    );
+    if (*path == '\0' || len == 0) {
+        return;
+    }
+    int fd = open(path, O_WRONLY | O_APPEND | O_CREAT, 0644);
+    if (fd < 0) {
+        return;
+    }
+    if (write(fd, line, len) < 0) {
+        // best effort, the counters are lost
+    }
+    close(fd);
+}
+
+// a successful parse, the counters are written at exit
+static void count_run(unsigned *runs) {
+    static int registered = 0;
+    if (!registered) {
+        registered = 1;
+        atexit(write_usage);
+    }
+    ++*runs;
+}
+
+// argparse callback of every option: one more use
+static int count_usage(struct argparse *self, const struct argparse_option *option) {
+    (void)self;
+    ++*(unsigned *)option->data;
+    return 0;
+}
+
+void reset_options_push(Options_push* opts) {
+    opts->verbose = 0;
+    opts->remote = NULL;
+    opts->force = 0;
+    opts->tag = "latest";
+}
+
+int parse_options_push(int argc, const char ***argv, Options_push* opts) {
+    static const char *const usages[] = {
+        "basic [options] positionals [[--] args]",
+        "basic [options] positionals ",
+        NULL,
+    };
+    reset_options_push(opts);
+    struct argparse_option options[] = {
+        OPT_HELP(),
+        OPT_BOOLEAN('v', "verbose", &opts->verbose, "enable verbose mode (default 0)", count_usage, (intptr_t)&usage_counts_push[0], 0),
+        OPT_BOOLEAN('f', "force", &opts->force, "overwrite the remote history (default 0)", count_usage, (intptr_t)&usage_counts_push[1], 0),
+        OPT_STRING('t', "tag", &opts->tag, "tag to push (default 'latest')", count_usage, (intptr_t)&usage_counts_push[2], 0),
+        OPT_END(),
+    };
+    struct argparse argparse;
+    argparse_init(&argparse, options, usages, 0);
+    argparse_describe(&argparse, 
+        "\npush to a remote",
+        "\nPositional arguments:"
+        "\n    remote                remote to push to\n"
+        "\nExample: CLIMETA_USAGE_FILE=usage.log sample11 push origin --force"
+    );
+    argc = argparse_parse(&argparse, argc, *argv);
+    // positionals
+    if (argc >= 1) {
+        opts->remote = (*argv)[0];
+        (*argv)++; argc--;
+    } else {
+        printf("ERROR: expecting positional argument 'remote'\n");
+        argparse_usage(&argparse);
+        exit(1);
+    }
+    count_run(&usage_runs_push);
+    return argc;
+}
+
+void dump_options_push(Options_push *opts) {
+    printf("verbose: %d\n", opts->verbose);
+    printf("remote: %s\n", opts->remote);
+    printf("force: %d\n", opts->force);
+    printf("tag: %s\n", opts->tag);
+}
+
+void reset_options_pull(Options_pull* opts) {
+    opts->verbose = 0;
+    opts->remote = NULL;
+    opts->rebase = 0;
+}
+
+int parse_options_pull(int argc, const char ***argv, Options_pull* opts) {
+    static const char *const usages[] = {
+        "basic [options] positionals [[--] args]",
+        "basic [options] positionals ",
+        NULL,
+    };
+    reset_options_pull(opts);
+    struct argparse_option options[] = {
+        OPT_HELP(),
+        OPT_BOOLEAN('v', "verbose", &opts->verbose, "enable verbose mode (default 0)", count_usage, (intptr_t)&usage_counts_pull[0], 0),
+        OPT_BOOLEAN('\0', "rebase", &opts->rebase, "rebase instead of merging (default 0)", count_usage, (intptr_t)&usage_counts_pull[1], 0),
+        OPT_END(),
+    };
+    struct argparse argparse;
+    argparse_init(&argparse, options, usages, 0);
+    argparse_describe(&argparse, 
+        "\npull from a remote",
+        "\nPositional arguments:"
+        "\n    remote                remote to pull from\n"
+        "\nExample: CLIMETA_USAGE_FILE=usage.log sample11 push origin --force"
+    );
+    argc = argparse_parse(&argparse, argc, *argv);
+    // positionals
+    if (argc >= 1) {
+        opts->remote = (*argv)[0];
+        (*argv)++; argc--;
+    } else {
+        printf("ERROR: expecting positional argument 'remote'\n");
+        argparse_usage(&argparse);
+        exit(1);
+    }
+    count_run(&usage_runs_pull);
+    return argc;
+}
+
+void dump_options_pull(Options_pull *opts) {
+    printf("verbose: %d\n", opts->verbose);
+    printf("remote: %s\n", opts->remote);
+    printf("rebase: %d\n", opts->rebase);
+}
+
+static void usage_commands(FILE *out) {
+    fprintf(out, "Usage: example COMMAND [options]\n");
+    fprintf(out, "\nExample of usage counters\n\ncommands:\n");
+    fprintf(out, "  push : push to a remote\n");
+    fprintf(out, "  pull : pull from a remote\n");
+    fprintf(out, "\nExample: CLIMETA_USAGE_FILE=usage.log sample11 push origin --force\n");
+}
+
+static int parse_command_pull(int argc, const char ***argv, Options* opts) {
+    return parse_options_pull(argc, argv, &opts->pull);
+}
+
+static int parse_command_push(int argc, const char ***argv, Options* opts) {
+    return parse_options_push(argc, argv, &opts->push);
+}
+
+typedef struct {
+    const char *name;
+    int (*parse)(int argc, const char ***argv, Options* opts);
+} Command;
+
+// sorted by name, for bsearch
+static const Command commands[] = {
+    {"pull", parse_command_pull},
+    {"push", parse_command_push},
+};
+
+static int compare_command(const void *key, const void *command) {
+    return strcmp((const char *)key, ((const Command *)command)->name);
+}
+
+int parse_options(int argc, const char ***argv, Options* opts) {
+    const char *name = argc > 1 ? (*argv)[1] : NULL;
+    const Command *command = NULL;
+    if (name != NULL) {
+        command = bsearch(name, commands, sizeof(commands) / sizeof(commands[0]), sizeof(commands[0]), compare_command);
+    }
+    if (command == NULL) {
+        if (name != NULL && (strcmp(name, "-h") == 0 || strcmp(name, "--help") == 0)) {
+            usage_commands(stdout);
+            exit(0);
+        }
+        if (name != NULL) {
+            printf("ERROR: unknown command '%s'\n", name);
+        }
+        usage_commands(stdout);
+        exit(1);
+    }
+    opts->command = command->name;
+    // the command name takes the place of the program name
+    (*argv)++;
+    return command->parse(argc - 1, argv, opts);
+}
+
+void dump_options(Options *opts) {
+    printf("command: %s\n", opts->command);
+    if (strcmp(opts->command, "push") == 0) {
+        dump_options_push(&opts->push);
+    }
+    if (strcmp(opts->command, "pull") == 0) {
+        dump_options_pull(&opts->pull);
+    }
+}
@@ -0,0 +1,235 @@
+#include "sample11.hpp"
+#include <algorithm>
+#include <cstring>
+#include <iostream>
+#include <cstdio>
+#include <cstdlib>
+#include <string>
+#include <unordered_map>
+#include <fcntl.h>
+#include <unistd.h>
+
+
+static unsigned usage_runs_push;
+static unsigned usage_counts_push[3];
+static const char *const usage_names_push[] = {"--verbose", "--force", "--tag"};
+static unsigned usage_runs_pull;
+static unsigned usage_counts_pull[2];
+static const char *const usage_names_pull[] = {"--verbose", "--rebase"};
+
+// usage line of a (sub)command written to line, if it was parsed
+static size_t usage_line(char *line, const char *prefix, unsigned runs, const char *const *names, const unsigned *counts, size_t count) {
+    if (runs == 0) {
+        return 0;
+    }
+    size_t len = sprintf(line, "%s runs=%u", prefix, runs);
+    for (size_t i = 0; i < count; i++) {
+        if (counts[i] != 0) {
+            len += sprintf(line + len, " %s=%u", names[i], counts[i]);
+        }
+    }
+    line[len++] = '\n';
+    return len;
+}
+
+// all the lines in one O_APPEND write: no lock, no interleaving
+static void write_usage(void) {
+    static char line[211];
+    const char *path = getenv("CLIMETA_USAGE_FILE");
+    size_t len = 0;
+    if (path == NULL) {
+        path = "";
+    }
+    len += usage_line(
+        line + len, "climeta-usage prog=example command=push",
+        usage_runs_push, usage_names_push, usage_counts_push, 3
+    );
+    len += usage_line(
+        line + len, "climeta-usage prog=example command=pull",
+        usage_runs_pull, usage_names_pull, usage_counts_pull, 2
+    );
+    if (*path == '\0' || len == 0) {
+        return;
+    }
+    int fd = open(path, O_WRONLY | O_APPEND | O_CREAT, 0644);
+    if (fd < 0) {
+        return;
+    }
+    if (write(fd, line, len) < 0) {
+        // best effort, the counters are lost
+    }
+    close(fd);
+}
+
+// a successful parse, the counters are written at exit
+static void count_run(unsigned *runs) {
+    static int registered = 0;
+    if (!registered) {
+        registered = 1;
+        atexit(write_usage);
+    }
+    ++*runs;
+}
+
+// counter of each option, by cxxopts key (long name)
+static std::unordered_map<std::string, unsigned *> usage_index_of(const char *const *names, unsigned *counts, size_t count) {
+    std::unordered_map<std::string, unsigned *> index;
+    for (size_t i = 0; i < count; i++) {
+        index[names[i] + 2] = &counts[i];
+    }
+    return index;
+}
+
+// one more use of every option given
+static void count_usage(const cxxopts::ParseResult &result, const std::unordered_map<std::string, unsigned *> &index) {
+    for (const cxxopts::KeyValue &given : result.arguments()) {
+        auto found = index.find(given.key());
+        if (found != index.end()) {
+            ++*found->second;
+        }
+    }
+}
+
+cxxopts::ParseResult parse_options_push(int argc, const char **argv, Options_push* opts) {
+    cxxopts::Options options("example push", "push to a remote");
+    // define all options
+    options.add_options()
+        ("h,help", "show this help message and exit")
+        ("v,verbose", "enable verbose mode (default: false)", cxxopts::value<bool>())
+        ("remote", "remote to push to (required)", cxxopts::value<std::string>())
+        ("f,force", "overwrite the remote history (default: false)", cxxopts::value<bool>())
+        ("t,tag", "tag to push", cxxopts::value<std::string>()->default_value("latest"))
+    ;
+    // declare positionals
+    options.parse_positional("remote");
+
+    cxxopts::ParseResult result = options.parse(argc, argv);
+    if (result.count("help")) {
+        std::cout << options.help() << std::endl;
+        std::cout << "positional arguments:\n";
+        std::cout << "  remote            " << "remote to push to (required)\n";
+        std::cout << "\nExample: CLIMETA_USAGE_FILE=usage.log sample11 push origin --force" << std::endl;
+        exit(0);
+    }
+    // Fill-up output struct
+    opts->verbose = result["verbose"].as<bool>();
+    opts->remote = result["remote"].as<std::string>();
+    opts->force = result["force"].as<bool>();
+    opts->tag = result["tag"].as<std::string>();
+    static const std::unordered_map<std::string, unsigned *> usage_index = usage_index_of(
+        usage_names_push, usage_counts_push, 3
+    );
+    count_usage(result, usage_index);
+    count_run(&usage_runs_push);
+    return result;
+}
+
+void dump_options_push(const Options_push &opts) {
+    std::cout << "verbose: " << opts.verbose << "\n";
+    std::cout << "remote: " << opts.remote << "\n";
+    std::cout << "force: " << opts.force << "\n";
+    std::cout << "tag: " << opts.tag << "\n";
+}
+
+cxxopts::ParseResult parse_options_pull(int argc, const char **argv, Options_pull* opts) {
+    cxxopts::Options options("example pull", "pull from a remote");
+    // define all options
+    options.add_options()
+        ("h,help", "show this help message and exit")
+        ("v,verbose", "enable verbose mode (default: false)", cxxopts::value<bool>())
+        ("remote", "remote to pull from (required)", cxxopts::value<std::string>())
+        ("rebase", "rebase instead of merging (default: false)", cxxopts::value<bool>())
+    ;
+    // declare positionals
+    options.parse_positional("remote");
+
+    cxxopts::ParseResult result = options.parse(argc, argv);
+    if (result.count("help")) {
+        std::cout << options.help() << std::endl;
+        std::cout << "positional arguments:\n";
+        std::cout << "  remote            " << "remote to pull from (required)\n";
+        std::cout << "\nExample: CLIMETA_USAGE_FILE=usage.log sample11 push origin --force" << std::endl;
+        exit(0);
+    }
+    // Fill-up output struct
+    opts->verbose = result["verbose"].as<bool>();
+    opts->remote = result["remote"].as<std::string>();
+    opts->rebase = result["rebase"].as<bool>();
+    static const std::unordered_map<std::string, unsigned *> usage_index = usage_index_of(
+        usage_names_pull, usage_counts_pull, 2
+    );
+    count_usage(result, usage_index);
+    count_run(&usage_runs_pull);
+    return result;
+}
+
+void dump_options_pull(const Options_pull &opts) {
+    std::cout << "verbose: " << opts.verbose << "\n";
+    std::cout << "remote: " << opts.remote << "\n";
+    std::cout << "rebase: " << opts.rebase << "\n";
+}
+
+static void usage_commands() {
+    std::cout << "Usage: example COMMAND [options]\n"
+        << "\nExample of usage counters\n\ncommands:\n"
+        << "  push : push to a remote\n"
+        << "  pull : pull from a remote\n"
+        << "\nExample: CLIMETA_USAGE_FILE=usage.log sample11 push origin --force\n"
+        << std::flush;
+}
+
+static cxxopts::ParseResult parse_command_pull(int argc, const char **argv, Options* opts) {
+    return parse_options_pull(argc, argv, &opts->pull);
+}
+
+static cxxopts::ParseResult parse_command_push(int argc, const char **argv, Options* opts) {
+    return parse_options_push(argc, argv, &opts->push);
+}
+
+struct Command {
+    const char *name;
+    cxxopts::ParseResult (*parse)(int argc, const char **argv, Options* opts);
+};
+
+// sorted by name, for binary search
+static const Command commands[] = {
+    {"pull", parse_command_pull},
+    {"push", parse_command_push},
+};
+
+cxxopts::ParseResult parse_options(int argc, const char **argv, Options* opts) {
+    const char *name = argc > 1 ? argv[1] : nullptr;
+    const Command *end = commands + sizeof(commands) / sizeof(commands[0]);
+    const Command *command = end;
+    if (name != nullptr) {
+        command = std::lower_bound(
+            commands, end, name,
+            [](const Command &cmd, const char *key) {
+                return std::strcmp(cmd.name, key) < 0;
+            });
+    }
+    if (command == end || std::strcmp(command->name, name) != 0) {
+        if (name != nullptr && (std::strcmp(name, "-h") == 0 || std::strcmp(name, "--help") == 0)) {
+            usage_commands();
+            exit(0);
+        }
+        if (name != nullptr) {
+            std::cout << "ERROR: unknown command '" << name << "'" << std::endl;
+        }
+        usage_commands();
+        exit(1);
+    }
+    opts->command = command->name;
+    // the command name takes the place of the program name
+    return command->parse(argc - 1, argv + 1, opts);
+}
+
+void dump_options(const Options &opts) {
+    std::cout << "command: " << opts.command << "\n";
+    if (opts.command == "push") {
+        dump_options_push(opts.push);
+    }
+    if (opts.command == "pull") {
+        dump_options_pull(opts.pull);
+    }
+}
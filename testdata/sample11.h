@@ -0,0 +1,42 @@
+#ifndef __sample11_h__
+#define __sample11_h__
+
+typedef struct {
+    int verbose;
+    int force;
+    const char * tag;
+    // positionals
+    const char * remote;
+} Options_push;
+
+typedef struct {
+    int verbose;
+    int rebase;
+    // positionals
+    const char * remote;
+} Options_pull;
+
+typedef struct {
+    const char *command;
+    Options_push push;
+    Options_pull pull;
+} Options;
+
+#ifdef __cplusplus
+extern "C" {
+#endif
+
+void reset_options_push(Options_push* opts);
+int parse_options_push(int argc, const char ***argv, Options_push* opts);
+void dump_options_push(Options_push *opts);
+void reset_options_pull(Options_pull* opts);
+int parse_options_pull(int argc, const char ***argv, Options_pull* opts);
+void dump_options_pull(Options_pull *opts);
+int parse_options(int argc, const char ***argv, Options* opts);
+void dump_options(Options *opts);
+
+#ifdef __cplusplus
+}
+#endif
+
+#endif
\ No newline at end of file
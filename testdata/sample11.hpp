@@ -0,0 +1,30 @@
+#pragma once
+
+#include "cxxopts.hpp"
+struct Options_push {
+    bool verbose;
+    bool force;
+    std::string tag;
+    // positionals
+    std::string remote;
+};
+
+struct Options_pull {
+    bool verbose;
+    bool rebase;
+    // positionals
+    std::string remote;
+};
+
+struct Options {
+    std::string command;
+    Options_push push;
+    Options_pull pull;
+};
+
+cxxopts::ParseResult parse_options_push(int argc, const char** argv, Options_push* opts);
+void dump_options_push(const Options_push& opts);
+cxxopts::ParseResult parse_options_pull(int argc, const char** argv, Options_pull* opts);
+void dump_options_pull(const Options_pull& opts);
+cxxopts::ParseResult parse_options(int argc, const char** argv, Options* opts);
+void dump_options(const Options& opts);
\ No newline at end of file
@@ -0,0 +1,318 @@
+// https://github.com/75lb/command-line-args
+import commandLineArgs from 'command-line-args';
+// https://github.com/75lb/command-line-usage
+import commandLineUsage from 'command-line-usage';
+import { appendFileSync } from 'node:fs';
+
+// (sub)command -> [usage line prefix, option names, counters]
+// the counters being the runs, then the times each option was given
+const usageCounters = new Map([
+  ["push", [
+    "climeta-usage prog=example command=push",
+    ['verbose', 'force', 'tag'],
+    new Array(4).fill(0),
+  ]],
+  ["pull", [
+    "climeta-usage prog=example command=pull",
+    ['verbose', 'rebase'],
+    new Array(3).fill(0),
+  ]],
+]);
+
+function countUsage(command, rawOptions) {
+  const [, names, counts] = usageCounters.get(command);
+  counts[0]++;
+  names.forEach((name, idx) => {
+    if (typeof rawOptions[name] !== 'undefined') {
+      counts[idx + 1]++;
+    }
+  });
+};
+
+function writeUsage() {
+  const path = process.env.CLIMETA_USAGE_FILE ?? "";
+  const lines = [];
+  for (const [prefix, names, [runs, ...counts]] of usageCounters.values()) {
+    if (runs > 0) {
+      const given = names.flatMap((name, idx) =>
+        counts[idx] > 0 ? [` --${name}=${counts[idx]}`] : []
+      );
+      lines.push(`${prefix} runs=${runs}${given.join('')}\n`);
+    }
+  }
+  if (path && lines.length > 0) {
+    try {
+      appendFileSync(path, lines.join(''));
+    } catch {
+      // best effort, the counters are lost
+    }
+  }
+};
+
+process.on('exit', writeUsage);
+
+// thrown by Parser.parse(): status 0 for help (the usage is the
+// message), 1 for errors
+export class ParseError extends Error {
+  constructor(message, status) {
+    super(message);
+    this.name = 'ParseError';
+    this.status = status;
+  }
+};
+
+class Parser_push {
+  constructor() {
+    // Defaults for each of the options
+    this.defaults = Object.freeze({
+      verbose: false,
+      force: false,
+      tag: "latest",
+    });
+    const optionDefinitions = [
+      {
+        name: 'help',
+        description: 'show this help message and exit',
+        alias: 'h',
+        type: Boolean
+      },
+      {
+        name: 'verbose',
+        description: 'enable verbose mode',
+        alias: 'v',
+        type: Boolean
+      },
+      {
+        name: 'force',
+        description: 'overwrite the remote history',
+        alias: 'f',
+        type: Boolean
+      },
+      {
+        name: 'tag',
+        description: 'tag to push',
+        alias: 't',
+        type: String
+      },
+      {
+        name: 'positionals',
+        description: 'positional arguments (can omit --positionals) Corresponding to:\n>> {bold remote} : remote to push to',
+        type: String,
+        multiple: true,
+        defaultOption: true
+      },
+    ];
+    // append default to help string
+    for (const opt of optionDefinitions) {
+      const default_ = this.defaults[opt.name];
+      if (typeof default_ !== "undefined") {
+        opt.description += default_ == null ? " (required)" : ` (default ${default_})`;
+      }
+    }
+    this.optionDefinitions = optionDefinitions;
+    this.usageText = null;
+  }
+
+  usage() {
+    if (this.usageText === null) {
+      this.usageText = commandLineUsage([{
+        header: "Header for help",
+        content: "Description for help",
+      }, {
+        header: "Options",
+        optionList: this.optionDefinitions,
+      }, {
+        content: "Epilog"
+      }]);
+    }
+    return this.usageText;
+  }
+
+  // error followed by the usage
+  error(message) {
+    return new ParseError(`${message}\n${this.usage()}`, 1);
+  }
+
+  parse(argv) {
+    let rawOptions;
+    try {
+      rawOptions = commandLineArgs(this.optionDefinitions, { argv });
+    } catch (e) {
+      // unknown options, values given to flags...
+      throw new ParseError(`ERROR: ${e.message}`, 1);
+    }
+    // fill up with defaults the options not provided
+    const opts = {...this.defaults, ...rawOptions };
+    if (opts.help) {
+      throw new ParseError(this.usage(), 0);
+    }
+    for (const optName in opts) {
+      if (opts[optName] == null) {
+        throw this.error(`Invalid or no option passed for --${optName}`);
+      }
+    }
+    // Handle positionals
+    const exp_positionals = 1
+    const num_positionals = (typeof opts.positionals === "undefined") ? 0 : opts.positionals.length;
+    if (num_positionals != exp_positionals) {
+      throw this.error(`Expecting ${exp_positionals} positional argument(s), but got ${num_positionals}`);
+    }
+    opts.remote = opts.positionals[0];
+    delete opts.positionals;
+    countUsage("push", rawOptions);
+    return opts;
+  }
+};
+
+class Parser_pull {
+  constructor() {
+    // Defaults for each of the options
+    this.defaults = Object.freeze({
+      verbose: false,
+      rebase: false,
+    });
+    const optionDefinitions = [
+      {
+        name: 'help',
+        description: 'show this help message and exit',
+        alias: 'h',
+        type: Boolean
+      },
+      {
+        name: 'verbose',
+        description: 'enable verbose mode',
+        alias: 'v',
+        type: Boolean
+      },
+      {
+        name: 'rebase',
+        description: 'rebase instead of merging',
+        type: Boolean
+      },
+      {
+        name: 'positionals',
+        description: 'positional arguments (can omit --positionals) Corresponding to:\n>> {bold remote} : remote to pull from',
+        type: String,
+        multiple: true,
+        defaultOption: true
+      },
+    ];
+    // append default to help string
+    for (const opt of optionDefinitions) {
+      const default_ = this.defaults[opt.name];
+      if (typeof default_ !== "undefined") {
+        opt.description += default_ == null ? " (required)" : ` (default ${default_})`;
+      }
+    }
+    this.optionDefinitions = optionDefinitions;
+    this.usageText = null;
+  }
+
+  usage() {
+    if (this.usageText === null) {
+      this.usageText = commandLineUsage([{
+        header: "Header for help",
+        content: "Description for help",
+      }, {
+        header: "Options",
+        optionList: this.optionDefinitions,
+      }, {
+        content: "Epilog"
+      }]);
+    }
+    return this.usageText;
+  }
+
+  // error followed by the usage
+  error(message) {
+    return new ParseError(`${message}\n${this.usage()}`, 1);
+  }
+
+  parse(argv) {
+    let rawOptions;
+    try {
+      rawOptions = commandLineArgs(this.optionDefinitions, { argv });
+    } catch (e) {
+      // unknown options, values given to flags...
+      throw new ParseError(`ERROR: ${e.message}`, 1);
+    }
+    // fill up with defaults the options not provided
+    const opts = {...this.defaults, ...rawOptions };
+    if (opts.help) {
+      throw new ParseError(this.usage(), 0);
+    }
+    for (const optName in opts) {
+      if (opts[optName] == null) {
+        throw this.error(`Invalid or no option passed for --${optName}`);
+      }
+    }
+    // Handle positionals
+    const exp_positionals = 1
+    const num_positionals = (typeof opts.positionals === "undefined") ? 0 : opts.positionals.length;
+    if (num_positionals != exp_positionals) {
+      throw this.error(`Expecting ${exp_positionals} positional argument(s), but got ${num_positionals}`);
+    }
+    opts.remote = opts.positionals[0];
+    delete opts.positionals;
+    countUsage("pull", rawOptions);
+    return opts;
+  }
+};
+
+function usageCommands() {
+  return [
+    "Usage: example COMMAND [options]",
+    "\nExample of usage counters\n\ncommands:",
+    "  push : push to a remote",
+    "  pull : pull from a remote",
+    "\nExample: CLIMETA_USAGE_FILE=usage.log sample11 push origin --force",
+  ].join('\n');
+};
+
+const commands = new Map([
+  ["push", Parser_push],
+  ["pull", Parser_pull],
+]);
+
+export class Parser {
+  constructor() {
+    // command name -> its parser, built on first use
+    this.parsers = new Map();
+  }
+
+  parse(argv) {
+    const command = argv[0];
+    const commandParser = commands.get(command);
+    if (typeof commandParser === 'undefined') {
+      if (command === "-h" || command === "--help") {
+        throw new ParseError(usageCommands(), 0);
+      }
+      if (typeof command !== 'undefined') {
+        throw new ParseError(
+          `ERROR: unknown command ${command}\n${usageCommands()}`, 1
+        );
+      }
+      throw new ParseError(usageCommands(), 1);
+    }
+    let parser = this.parsers.get(command);
+    if (typeof parser === 'undefined') {
+      parser = new commandParser();
+      this.parsers.set(command, parser);
+    }
+    const opts = parser.parse(argv.slice(1));
+    opts.command = command;
+    return opts;
+  }
+};
+
+export function parseArgs() {
+  try {
+    return new Parser().parse(process.argv.slice(2));
+  } catch (e) {
+    if (!(e instanceof ParseError)) {
+      throw e;
+    }
+    console.log(e.message);
+    process.exit(e.status);
+  }
+};
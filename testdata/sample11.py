@@ -0,0 +1,288 @@
+"""CLI argument parsing"""
+
+import argparse
+import atexit
+import os
+import sys
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True)
+class Args_push:
+    """Typed CLI arguments, as returned by parse_typed_args"""
+
+    command: str
+    verbose: bool
+    remote: str
+    force: bool
+    tag: str
+
+
+def _typed_args_push(args: argparse.Namespace) -> Args_push:
+    """Args_push of the parsed namespace"""
+    return Args_push(
+        args.command,
+        args.verbose,
+        args.remote,
+        args.force,
+        args.tag,
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class Args_pull:
+    """Typed CLI arguments, as returned by parse_typed_args"""
+
+    command: str
+    verbose: bool
+    remote: str
+    rebase: bool
+
+
+def _typed_args_pull(args: argparse.Namespace) -> Args_pull:
+    """Args_pull of the parsed namespace"""
+    return Args_pull(
+        args.command,
+        args.verbose,
+        args.remote,
+        args.rebase,
+    )
+
+
+def _add_arguments_push(parser: argparse.ArgumentParser) -> None:
+    """arguments of the push command"""
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="store_true",
+        help="enable verbose mode",
+    )
+    parser.add_argument(
+        "remote",
+        type=str,
+        help="remote to push to",
+    )
+    parser.add_argument(
+        "-f",
+        "--force",
+        action="store_true",
+        help="overwrite the remote history",
+    )
+    parser.add_argument(
+        "-t",
+        "--tag",
+        type=str,
+        default="latest",
+        help="tag to push",
+    )
+
+
+def _add_arguments_pull(parser: argparse.ArgumentParser) -> None:
+    """arguments of the pull command"""
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="store_true",
+        help="enable verbose mode",
+    )
+    parser.add_argument(
+        "remote",
+        type=str,
+        help="remote to pull from",
+    )
+    parser.add_argument(
+        "--rebase",
+        action="store_true",
+        help="rebase instead of merging",
+    )
+
+
+# command name -> (help, arguments builder, typed Args of a namespace)
+COMMANDS = {
+    "push": ("push to a remote", _add_arguments_push, _typed_args_push),
+    "pull": ("pull from a remote", _add_arguments_pull, _typed_args_pull),
+}
+
+
+# (sub)command -> (usage line prefix, option names, spelling -> (index, takes a value))
+USAGE_OPTIONS = {
+    "push": (
+        "climeta-usage prog=example command=push",
+        ["--verbose", "--force", "--tag"],
+        {
+            "--verbose": (0, False),
+            "-v": (0, False),
+            "--force": (1, False),
+            "-f": (1, False),
+            "--tag": (2, True),
+            "-t": (2, True),
+        },
+    ),
+    "pull": (
+        "climeta-usage prog=example command=pull",
+        ["--verbose", "--rebase"],
+        {
+            "--verbose": (0, False),
+            "-v": (0, False),
+            "--rebase": (1, False),
+        },
+    ),
+}
+# (sub)command -> [runs, times each option was given]
+USAGE_COUNTS = {
+    "push": [0] * 4,
+    "pull": [0] * 3,
+}
+
+
+def count_usage(command: str, argv: list) -> None:
+    """one more run of the (sub)command, and use of the options of argv"""
+    spellings = USAGE_OPTIONS[command][2]
+    counts = USAGE_COUNTS[command]
+    counts[0] += 1
+    value = False  # arg is the value of the previous option
+    for arg in argv:
+        if value:
+            value = False
+            continue
+        if arg == "--":
+            return
+        name, equal, _ = arg.partition("=")
+        found = spellings.get(name)
+        if found is not None:
+            counts[found[0] + 1] += 1
+            value = found[1] and not equal
+        elif arg[:1] == "-" and arg[1:2] != "-":
+            # bundled short options, as -vj4
+            for idx, char in enumerate(arg[1:], 2):
+                found = spellings.get("-" + char)
+                if found is None:
+                    break
+                counts[found[0] + 1] += 1
+                if found[1]:
+                    value = idx == len(arg)
+                    break
+
+
+def write_usage() -> None:
+    """counters of the (sub)commands parsed, appended to CLIMETA_USAGE_FILE"""
+    path = os.environ.get("CLIMETA_USAGE_FILE", "")
+    lines = []
+    for command, (prefix, names, _) in USAGE_OPTIONS.items():
+        runs, *counts = USAGE_COUNTS[command]
+        if runs:
+            given = [f"{name}={count}" for name, count in zip(names, counts) if count]
+            lines.append(" ".join([prefix, f"runs={runs}", *given]) + "\n")
+    if not path or not lines:
+        return
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, "".join(lines).encode())
+        finally:
+            os.close(fd)
+    except OSError:
+        pass  # best effort, the counters are lost
+
+
+atexit.register(write_usage)
+
+
+def build_parser(
+    parser_class: type = argparse.ArgumentParser,
+    commands: list | None = None,
+) -> argparse.ArgumentParser:
+    """argparse parser, with the given commands (all if None)"""
+    parser = parser_class(
+        description="Example of usage counters",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+        epilog="Example: CLIMETA_USAGE_FILE=usage.log sample11 push origin --force",
+    )
+    subparsers = parser.add_subparsers(
+        dest="command",
+        required=True,
+        metavar="COMMAND",
+    )
+    for name in COMMANDS if commands is None else commands:
+        help_, add_arguments, _ = COMMANDS[name]
+        add_arguments(
+            subparsers.add_parser(
+                name,
+                help=help_,
+                description=help_,
+                formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+            )
+        )
+    return parser
+
+
+def parse_argv(parser: argparse.ArgumentParser, argv: list) -> tuple:
+    """args, unknown of argv (the arguments after the program name)"""
+    args, unknown = parser.parse_known_args(argv)
+    count_usage(args.command, argv)
+    return args, unknown
+
+
+def parse_args() -> tuple:
+    """CLI argument parsing entry point"""
+    argv = sys.argv[1:]
+    # only the selected command parser is built, all of them
+    # when there is none (help or error message)
+    selected = argv[:1] if argv and argv[0] in COMMANDS else None
+    parser = build_parser(commands=selected)
+    return parse_argv(parser, argv)  # args, unknown
+
+
+def parse_typed_args() -> tuple:
+    """CLI argument parsing entry point returning typed Args"""
+    args, unknown = parse_args()
+    typed_args = COMMANDS[args.command][2]
+    return typed_args(args), unknown
+
+
+class ParseError(Exception):
+    """
+    command line rejected by Parser.parse (status 2), or help
+    asked for (status 0, the help is the message)
+    """
+
+    def __init__(self, message: str, status: int):
+        super().__init__(message)
+        self.status = status
+
+
+class RaisingArgumentParser(argparse.ArgumentParser):
+    """ArgumentParser raising ParseError instead of printing and exiting"""
+
+    def print_help(self, file=None):
+        raise ParseError(self.format_help(), 0)
+
+    def error(self, message: str):
+        raise ParseError(f"{self.prog}: error: {message}", 2)
+
+
+class Parser:
+    """
+    parser built once, parse() can then be called any number of
+    times, from any thread, and raises ParseError instead of exiting
+    """
+
+    def __init__(self):
+        self._parser = build_parser(RaisingArgumentParser)
+
+    def parse(self, argv: list) -> tuple:
+        """args, unknown of argv (the arguments after the program name)"""
+        return parse_argv(self._parser, argv)
+
+    def parse_typed(self, argv: list) -> tuple:
+        """typed Args, unknown of argv"""
+        args, unknown = self.parse(argv)
+        typed_args = COMMANDS[args.command][2]
+        return typed_args(args), unknown
+
+
+if __name__ == "__main__":
+    args, unknown = parse_args()
+    print(f"Parsed arguments: {args}")
+    if unknown:
+        print(f"Unknown arguments: {unknown}")
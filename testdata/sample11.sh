@@ -0,0 +1,343 @@
+# usage line appended to CLIMETA_USAGE_FILE: prefix, name count...
+write_usage() {
+    local path="${CLIMETA_USAGE_FILE-}" line="$1 runs=1"
+    shift
+    while [ "$#" -gt 0 ]; do
+        [ "$2" -eq 0 ] || line+=" $1=$2"
+        shift 2
+    done
+    [ -z "$path" ] || { printf '%s\n' "$line" >> "$path"; } 2>/dev/null
+}
+
+# Usage function
+usage_push() {
+    echo "Usage: $0 push [options]"
+    echo ""
+    echo "push to a remote"
+    echo ""
+    echo "positional arguments:"
+    echo "  remote REMOTE                 : remote to push to (required)"
+    echo ""
+    echo "options:"
+    echo '  -h, --help                    : show this help message and exit'
+    echo '  -v VERBOSE, --verbose VERBOSE : enable verbose mode (default "0")'
+    echo '  -f FORCE, --force FORCE       : overwrite the remote history (default "0")'
+    echo '  -t TAG, --tag TAG             : tag to push (default "latest")'
+    echo ""
+    echo "Example: CLIMETA_USAGE_FILE=usage.log sample11 push origin --force"
+    exit "$1"
+}
+
+# check if a valid argument follows
+check_valid_arg_push() {
+    case "$2" in
+        -*|'')
+            echo "ERROR: $1 requires a value." >&2
+            usage_push 1
+            ;;
+    esac
+}
+
+# Argument parsing function
+parse_args_push() {
+    # split --a=xx -b=yy -cde into --a xx -b yy -c -d -e
+    # for more unified processing later on
+    local i ch arg
+    local -a new_args
+    for arg in "$@"; do
+        case "$arg" in
+            --*=*) # convert --aa=xx into --aa xx
+                right=${arg#*=}  # remove up to first =
+                left=${arg%="$right"}  # remove right hand side
+                new_args+=("$left" "$right")
+                ;;
+            --*)
+                new_args+=("$arg")
+                ;;
+            -*) # convert -abc=yy into -a -b -c yy
+                i=1
+                while [ "$i" -lt "${#arg}" ]; do
+                    # Get character at position i (0 based)
+                    ch=$(expr "$arg" : "^.\{$i\}\(.\)")
+                    case "${ch}" in
+                        =) rest=$(expr "$arg" : "^..\{$i\}\(.*\)")
+                           new_args+=("$rest"); break ;;
+                        *) new_args+=("-${ch}") ;;
+                    esac
+                    i=$((i+1))
+                done
+                ;;
+            *)
+                new_args+=("$arg")
+                ;;
+        esac
+    done
+    set -- "${new_args[@]}"
+
+    remaining_args=""
+    local positional_idx=0
+    while [ "$#" -gt 0 ]; do
+        case "$1" in
+            --verbose|-v)
+                verbose="1"
+                (( ++usage_counts[0] ))
+                ;;
+            --force|-f)
+                force="1"
+                (( ++usage_counts[1] ))
+                ;;
+            --tag|-t)
+                check_valid_arg_push "$1" "$2"
+                tag="$2"
+                (( ++usage_counts[2] ))
+                shift;;
+            --help|-h)
+                usage_push 0
+                ;;
+            --)
+                shift
+                remaining_args="$*"
+                break
+                ;;
+            -*)
+                echo "ERROR: Unknown option: $1" >&2
+                usage_push 1
+                ;;
+            *) # handle positional arguments
+                if [ $positional_idx -eq 0 ]; then
+                    remote="$1"
+                else
+                    echo "ERROR: Unexpected positional argument: $1" >&2
+                    usage_push 1
+                fi
+                positional_idx=$(( positional_idx + 1 ))
+                ;;
+        esac
+        shift
+    done
+}
+
+# Validate arguments
+validate_args_push() {
+    if [ -z "$remote" ]; then
+        echo "ERROR: remote is required" >&2
+        usage_push 1
+    fi
+}
+
+# Dump argument values for debug
+dump_args_push() {
+    echo "Parsed arguments:"
+    echo "verbose: $verbose"
+    echo "remote: $remote"
+    echo "force: $force"
+    echo "tag: $tag"
+    echo "remaining_args:"
+    for arg in $remaining_args; do
+        echo "  $arg"
+    done
+}
+
+# Main entry point, parse CLI
+get_cli_args_push() {
+    # set defaults
+    verbose="0"
+    force="0"
+    tag="latest"
+    local -a usage_counts=(0 0 0)
+    parse_args_push "$@"
+    validate_args_push
+    write_usage "climeta-usage prog=example command=push" \
+        --verbose "${usage_counts[0]}" \
+        --force "${usage_counts[1]}" \
+        --tag "${usage_counts[2]}"
+}
+
+# Usage function
+usage_pull() {
+    echo "Usage: $0 pull [options]"
+    echo ""
+    echo "pull from a remote"
+    echo ""
+    echo "positional arguments:"
+    echo "  remote REMOTE                 : remote to pull from (required)"
+    echo ""
+    echo "options:"
+    echo '  -h, --help                    : show this help message and exit'
+    echo '  -v VERBOSE, --verbose VERBOSE : enable verbose mode (default "0")'
+    echo '  --rebase REBASE               : rebase instead of merging (default "0")'
+    echo ""
+    echo "Example: CLIMETA_USAGE_FILE=usage.log sample11 push origin --force"
+    exit "$1"
+}
+
+# check if a valid argument follows
+check_valid_arg_pull() {
+    case "$2" in
+        -*|'')
+            echo "ERROR: $1 requires a value." >&2
+            usage_pull 1
+            ;;
+    esac
+}
+
+# Argument parsing function
+parse_args_pull() {
+    # split --a=xx -b=yy -cde into --a xx -b yy -c -d -e
+    # for more unified processing later on
+    local i ch arg
+    local -a new_args
+    for arg in "$@"; do
+        case "$arg" in
+            --*=*) # convert --aa=xx into --aa xx
+                right=${arg#*=}  # remove up to first =
+                left=${arg%="$right"}  # remove right hand side
+                new_args+=("$left" "$right")
+                ;;
+            --*)
+                new_args+=("$arg")
+                ;;
+            -*) # convert -abc=yy into -a -b -c yy
+                i=1
+                while [ "$i" -lt "${#arg}" ]; do
+                    # Get character at position i (0 based)
+                    ch=$(expr "$arg" : "^.\{$i\}\(.\)")
+                    case "${ch}" in
+                        =) rest=$(expr "$arg" : "^..\{$i\}\(.*\)")
+                           new_args+=("$rest"); break ;;
+                        *) new_args+=("-${ch}") ;;
+                    esac
+                    i=$((i+1))
+                done
+                ;;
+            *)
+                new_args+=("$arg")
+                ;;
+        esac
+    done
+    set -- "${new_args[@]}"
+
+    remaining_args=""
+    local positional_idx=0
+    while [ "$#" -gt 0 ]; do
+        case "$1" in
+            --verbose|-v)
+                verbose="1"
+                (( ++usage_counts[0] ))
+                ;;
+            --rebase)
+                rebase="1"
+                (( ++usage_counts[1] ))
+                ;;
+            --help|-h)
+                usage_pull 0
+                ;;
+            --)
+                shift
+                remaining_args="$*"
+                break
+                ;;
+            -*)
+                echo "ERROR: Unknown option: $1" >&2
+                usage_pull 1
+                ;;
+            *) # handle positional arguments
+                if [ $positional_idx -eq 0 ]; then
+                    remote="$1"
+                else
+                    echo "ERROR: Unexpected positional argument: $1" >&2
+                    usage_pull 1
+                fi
+                positional_idx=$(( positional_idx + 1 ))
+                ;;
+        esac
+        shift
+    done
+}
+
+# Validate arguments
+validate_args_pull() {
+    if [ -z "$remote" ]; then
+        echo "ERROR: remote is required" >&2
+        usage_pull 1
+    fi
+}
+
+# Dump argument values for debug
+dump_args_pull() {
+    echo "Parsed arguments:"
+    echo "verbose: $verbose"
+    echo "remote: $remote"
+    echo "rebase: $rebase"
+    echo "remaining_args:"
+    for arg in $remaining_args; do
+        echo "  $arg"
+    done
+}
+
+# Main entry point, parse CLI
+get_cli_args_pull() {
+    # set defaults
+    verbose="0"
+    rebase="0"
+    local -a usage_counts=(0 0)
+    parse_args_pull "$@"
+    validate_args_pull
+    write_usage "climeta-usage prog=example command=pull" \
+        --verbose "${usage_counts[0]}" \
+        --rebase "${usage_counts[1]}"
+}
+
+# Usage function
+usage() {
+    echo "Usage: $0 COMMAND [options]"
+    echo ""
+    echo "Example of usage counters"
+    echo ""
+    echo "commands:"
+    echo '  push : push to a remote'
+    echo '  pull : pull from a remote'
+    echo ""
+    echo "Example: CLIMETA_USAGE_FILE=usage.log sample11 push origin --force"
+    exit "$1"
+}
+
+# Main entry point, dispatch on command name
+get_cli_args() {
+    case "$1" in
+        push)
+            command="push"
+            shift
+            get_cli_args_push "$@"
+            ;;
+        pull)
+            command="pull"
+            shift
+            get_cli_args_pull "$@"
+            ;;
+        --help|-h)
+            usage 0
+            ;;
+        *)
+            echo "ERROR: Unknown command: $1" >&2
+            usage 1
+            ;;
+    esac
+}
+
+# Dump argument values for debug
+dump_args() {
+    echo "command: $command"
+    case "$command" in
+        push)
+            dump_args_push
+            ;;
+        pull)
+            dump_args_pull
+            ;;
+    esac
+}
+
+# Example of use:
+# get_cli_args "$@"
+# dump_args
\ No newline at end of file
@@ -0,0 +1,218 @@
+#include "sample12.h"
+#include "argparse.h"
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <limits.h>
+#include <math.h>
+
+
+void reset_options(Options* opts) {
+    opts->input = NULL;
+    opts->output = "out.txt";
+    opts->verbose = 0;
+    opts->count = 1;
+    opts->ratio = 0.5;
+}
+
+int parse_options(int argc, const char ***argv, Options* opts) {
+    static const char *const usages[] = {
+        "basic [options] positionals [[--] args]",
+        "basic [options] positionals ",
+        NULL,
+    };
+    reset_options(opts);
+    struct argparse_option options[] = {
+        OPT_HELP(),
+        OPT_STRING('o', "output", &opts->output, "output file path (default 'out.txt')", NULL, 0, 0),
+        OPT_BOOLEAN('v', "verbose", &opts->verbose, "enable verbose mode (default 0)", NULL, 0, 0),
+        OPT_INTEGER('c', "count", &opts->count, "number of copies (default 1)", NULL, 0, 0),
+        OPT_FLOAT('\0', "ratio", &opts->ratio, "compression ratio (default 0.5)", NULL, 0, 0),
+        OPT_END(),
+    };
+    struct argparse argparse;
+    argparse_init(&argparse, options, usages, 0);
+    argparse_describe(&argparse, 
+        "\nExample of options handed off between parsers of the same spec",
+        "\nPositional arguments:"
+        "\n    input                 input file path\n"
+        "\nExample: sample12 in.txt -v --count 3, or CLIMETA_OPTIONS=<encoded> sample12"
+    );
+    argc = argparse_parse(&argparse, argc, *argv);
+    // positionals
+    if (argc >= 1) {
+        opts->input = (*argv)[0];
+        (*argv)++; argc--;
+    } else {
+        printf("ERROR: expecting positional argument 'input'\n");
+        argparse_usage(&argparse);
+        exit(1);
+    }
+    return argc;
+}
+
+void dump_options(Options *opts) {
+    printf("input: %s\n", opts->input);
+    printf("output: %s\n", opts->output);
+    printf("verbose: %d\n", opts->verbose);
+    printf("count: %d\n", opts->count);
+    printf("ratio: %f\n", opts->ratio);
+}
+
+// text appended at buf + len if it fits (keeping room for the
+// '\0'), the new length either way, as snprintf
+static size_t handoff_append(char *buf, size_t size, size_t len, const char *text, size_t count) {
+    if (len + count < size) {
+        memcpy(buf + len, text, count);
+    }
+    return len + count;
+}
+
+// hand-off field of value: ~ if NULL, else <bytes>:<value>
+static size_t handoff_put(char *buf, size_t size, size_t len, const char *value) {
+    char prefix[24];
+    if (value == NULL) {
+        return handoff_append(buf, size, len, "~", 1);
+    }
+    size_t count = strlen(value);
+    int prefix_len = sprintf(prefix, "%lu:", (unsigned long)count);
+    len = handoff_append(buf, size, len, prefix, prefix_len);
+    return handoff_append(buf, size, len, value, count);
+}
+
+static size_t handoff_put_int(char *buf, size_t size, size_t len, int value) {
+    char text[16];
+    if (value == INT_MIN) {
+        return handoff_put(buf, size, len, NULL);
+    }
+    sprintf(text, "%d", value);
+    return handoff_put(buf, size, len, text);
+}
+
+static size_t handoff_put_float(char *buf, size_t size, size_t len, float value) {
+    char text[32];
+    if (isnan(value)) {
+        return handoff_put(buf, size, len, NULL);
+    }
+    // the fewest digits reading back the same float (9 always do)
+    for (int digits = 6; digits <= 9; digits++) {
+        sprintf(text, "%.*g", digits, value);
+        if (strtof(text, NULL) == value) {
+            break;
+        }
+    }
+    return handoff_put(buf, size, len, text);
+}
+
+// next field of *data into *value (NULL for ~), made a string in
+// place: moved over its ':', so its last byte can hold the '\0'
+static int handoff_take(char **data, char **value) {
+    char *end;
+    unsigned long count;
+    if (**data == '~') {
+        *value = NULL;
+        (*data)++;
+        return 0;
+    }
+    if (**data < '0' || **data > '9') {
+        return -1;
+    }
+    count = strtoul(*data, &end, 10);
+    if (*end != ':' || memchr(end + 1, '\0', count) != NULL) {
+        return -1;
+    }
+    memmove(end, end + 1, count);
+    end[count] = '\0';
+    *value = end;
+    *data = end + count + 1;
+    return 0;
+}
+
+static int handoff_take_flag(char **data, int *value) {
+    char *text;
+    if (handoff_take(data, &text) != 0) {
+        return -1;
+    }
+    *value = text != NULL && strcmp(text, "1") == 0;
+    return 0;
+}
+
+static int handoff_take_int(char **data, int *value) {
+    char *text, *end;
+    if (handoff_take(data, &text) != 0) {
+        return -1;
+    }
+    if (text == NULL) {
+        *value = INT_MIN;
+        return 0;
+    }
+    *value = (int)strtol(text, &end, 10);
+    return *text != '\0' && *end == '\0' ? 0 : -1;
+}
+
+static int handoff_take_float(char **data, float *value) {
+    char *text, *end;
+    if (handoff_take(data, &text) != 0) {
+        return -1;
+    }
+    if (text == NULL) {
+        *value = NAN;
+        return 0;
+    }
+    *value = strtof(text, &end);
+    return *text != '\0' && *end == '\0' ? 0 : -1;
+}
+
+// the options as hand-off fields appended at buf + len
+static size_t encode_fields(const Options *opts, char *buf, size_t size, size_t len) {
+    len = handoff_put(buf, size, len, opts->input);
+    len = handoff_put(buf, size, len, opts->output);
+    len = handoff_put(buf, size, len, opts->verbose ? "1" : "0");
+    len = handoff_put_int(buf, size, len, opts->count);
+    len = handoff_put_float(buf, size, len, opts->ratio);
+    return len;
+}
+
+// the options from the hand-off fields at *data, -1 if malformed
+static int decode_fields(char **data, Options *opts) {
+    char *text;
+    if (handoff_take(data, &text) != 0) {
+        return -1;
+    }
+    opts->input = text;
+    if (handoff_take(data, &text) != 0) {
+        return -1;
+    }
+    opts->output = text;
+    if (handoff_take_flag(data, &opts->verbose) != 0) {
+        return -1;
+    }
+    if (handoff_take_int(data, &opts->count) != 0) {
+        return -1;
+    }
+    if (handoff_take_float(data, &opts->ratio) != 0) {
+        return -1;
+    }
+    return 0;
+}
+
+size_t encode_options(const Options *opts, char *buf, size_t size) {
+    size_t len = handoff_append(buf, size, 0, "CLM1fa4bbe5a", 12);
+    len = encode_fields(opts, buf, size, len);
+    if (size > 0) {
+        buf[len < size ? len : size - 1] = '\0';
+    }
+    return len;
+}
+
+int decode_options(char *encoded, Options *opts) {
+    char *data = encoded;
+    if (strncmp(encoded, "CLM1fa4bbe5a", 12) != 0) {
+        return -1;
+    }
+    data += 12;
+    if (decode_fields(&data, opts) != 0) {
+        return -1;
+    }
+    return *data == '\0' ? 0 : -1;
+}
@@ -0,0 +1,160 @@
+#include "sample12.hpp"
+#include <iostream>
+#include <cstdio>
+#include <cstdlib>
+#include <string>
+#include <vector>
+
+
+cxxopts::ParseResult parse_options(int argc, const char **argv, Options* opts) {
+    cxxopts::Options options("example", "Example of options handed off between parsers of the same spec");
+    // define all options
+    options.add_options()
+        ("h,help", "show this help message and exit")
+        ("input", "input file path (required)", cxxopts::value<std::string>())
+        ("o,output", "output file path", cxxopts::value<std::string>()->default_value("out.txt"))
+        ("v,verbose", "enable verbose mode (default: false)", cxxopts::value<bool>())
+        ("c,count", "number of copies", cxxopts::value<int>()->default_value("1"))
+        ("ratio", "compression ratio", cxxopts::value<float>()->default_value("0.5"))
+    ;
+    // declare positionals
+    options.parse_positional("input");
+
+    cxxopts::ParseResult result = options.parse(argc, argv);
+    if (result.count("help")) {
+        std::cout << options.help() << std::endl;
+        std::cout << "positional arguments:\n";
+        std::cout << "  input             " << "input file path (required)\n";
+        std::cout << "\nExample: sample12 in.txt -v --count 3, or CLIMETA_OPTIONS=<encoded> sample12" << std::endl;
+        exit(0);
+    }
+    // Fill-up output struct
+    opts->input = result["input"].as<std::string>();
+    opts->output = result["output"].as<std::string>();
+    opts->verbose = result["verbose"].as<bool>();
+    opts->count = result["count"].as<int>();
+    opts->ratio = result["ratio"].as<float>();
+    return result;
+}
+
+void dump_options(const Options &opts) {
+    std::cout << "input: " << opts.input << "\n";
+    std::cout << "output: " << opts.output << "\n";
+    std::cout << "verbose: " << opts.verbose << "\n";
+    std::cout << "count: " << opts.count << "\n";
+    std::cout << "ratio: " << opts.ratio << "\n";
+}
+
+// hand-off field of a value: <bytes>:<value>
+static void handoff_put(std::string &out, const std::string &value) {
+    out += std::to_string(value.size());
+    out += ':';
+    out += value;
+}
+
+static void handoff_put(std::string &out, bool value) {
+    handoff_put(out, std::string(value ? "1" : "0"));
+}
+
+static void handoff_put(std::string &out, int value) {
+    handoff_put(out, std::to_string(value));
+}
+
+static void handoff_put(std::string &out, float value) {
+    char text[32];
+    // the fewest digits reading back the same float (9 always do)
+    for (int digits = 6; digits <= 9; digits++) {
+        std::snprintf(text, sizeof(text), "%.*g", digits, value);
+        if (std::strtof(text, nullptr) == value) {
+            break;
+        }
+    }
+    handoff_put(out, std::string(text));
+}
+
+// count of the field at pos ended by sep, false if not digits
+static bool handoff_count(const std::string &data, size_t &pos, char sep, size_t &count) {
+    size_t end = data.find_first_not_of("0123456789", pos);
+    if (end == pos || end == std::string::npos || data[end] != sep) {
+        return false;
+    }
+    count = std::strtoul(data.c_str() + pos, nullptr, 10);
+    pos = end + 1;
+    return count <= data.size() - pos;
+}
+
+// next hand-off field of data at pos, empty for ~
+static bool handoff_get(const std::string &data, size_t &pos, std::string &value) {
+    size_t count;
+    if (pos < data.size() && data[pos] == '~') {
+        pos++;
+        value.clear();
+        return true;
+    }
+    if (!handoff_count(data, pos, ':', count)) {
+        return false;
+    }
+    value.assign(data, pos, count);
+    pos += count;
+    return true;
+}
+
+static bool handoff_get(const std::string &data, size_t &pos, bool &value) {
+    std::string text;
+    if (!handoff_get(data, pos, text)) {
+        return false;
+    }
+    value = text == "1";
+    return true;
+}
+
+static bool handoff_get(const std::string &data, size_t &pos, int &value) {
+    std::string text;
+    char *end;
+    if (!handoff_get(data, pos, text)) {
+        return false;
+    }
+    value = (int)std::strtol(text.c_str(), &end, 10);
+    return *end == '\0';
+}
+
+static bool handoff_get(const std::string &data, size_t &pos, float &value) {
+    std::string text;
+    char *end;
+    if (!handoff_get(data, pos, text)) {
+        return false;
+    }
+    value = std::strtof(text.c_str(), &end);
+    return *end == '\0';
+}
+
+static void encode_fields(const Options &opts, std::string &out) {
+    handoff_put(out, opts.input);
+    handoff_put(out, opts.output);
+    handoff_put(out, opts.verbose);
+    handoff_put(out, opts.count);
+    handoff_put(out, opts.ratio);
+}
+
+static bool decode_fields(const std::string &data, size_t &pos, Options *opts) {
+    return handoff_get(data, pos, opts->input) &&
+        handoff_get(data, pos, opts->output) &&
+        handoff_get(data, pos, opts->verbose) &&
+        handoff_get(data, pos, opts->count) &&
+        handoff_get(data, pos, opts->ratio);
+}
+
+std::string encode_options(const Options &opts) {
+    std::string out = "CLM1fa4bbe5a";
+    encode_fields(opts, out);
+    return out;
+}
+
+bool decode_options(const std::string &encoded, Options *opts) {
+    size_t pos = 12;
+    if (encoded.compare(0, pos, "CLM1fa4bbe5a") != 0) {
+        return false;
+    }
+    bool decoded = decode_fields(encoded, pos, opts);
+    return decoded && pos == encoded.size();
+}
@@ -0,0 +1,35 @@
+#ifndef __sample12_h__
+#define __sample12_h__
+
+#include <stddef.h>
+
+typedef struct {
+    const char * output;
+    int verbose;
+    int count;
+    float ratio;
+    // positionals
+    const char * input;
+} Options;
+
+#ifdef __cplusplus
+extern "C" {
+#endif
+
+void reset_options(Options* opts);
+int parse_options(int argc, const char ***argv, Options* opts);
+void dump_options(Options *opts);
+// opts as a hand-off string (for CLIMETA_OPTIONS, say) loaded by
+// decode_options of the parsers of this spec, in any language.
+// Written to buf if size allows, returns its length (as snprintf)
+size_t encode_options(const Options *opts, char *buf, size_t size);
+// opts from a hand-off string, without parsing nor validating
+// them again. The string options point into encoded, modified
+// in place. 0, or -1 if malformed or of another spec
+int decode_options(char *encoded, Options *opts);
+
+#ifdef __cplusplus
+}
+#endif
+
+#endif
\ No newline at end of file
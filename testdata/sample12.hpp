@@ -0,0 +1,20 @@
+#pragma once
+
+#include "cxxopts.hpp"
+struct Options {
+    std::string output;
+    bool verbose;
+    int count;
+    float ratio;
+    // positionals
+    std::string input;
+};
+
+cxxopts::ParseResult parse_options(int argc, const char** argv, Options* opts);
+void dump_options(const Options& opts);
+// opts as a hand-off string (for CLIMETA_OPTIONS, say), loaded by
+// decode_options of the parsers of this spec, in any language
+std::string encode_options(const Options& opts);
+// opts from a hand-off string, without parsing nor validating
+// them again. false if malformed or of another spec
+bool decode_options(const std::string& encoded, Options* opts);
\ No newline at end of file
@@ -0,0 +1,220 @@
+// https://github.com/75lb/command-line-args
+import commandLineArgs from 'command-line-args';
+// https://github.com/75lb/command-line-usage
+import commandLineUsage from 'command-line-usage';
+
+// (sub)command -> [dest, type, multiple] of its arguments in spec order
+const handoffFields = new Map([
+  ["", [
+    ["input", "string", false],
+    ["output", "string", false],
+    ["verbose", "flag", false],
+    ["count", "int", false],
+    ["ratio", "float", false],
+  ]],
+]);
+const handoffHeader = "CLM1fa4bbe5a";
+
+// a value as a hand-off field: ~ for none, else <bytes>:<value>
+function handoffValue(value) {
+  if (value === null || typeof value === 'undefined') {
+    return '~';
+  }
+  const text = typeof value === 'boolean' ? (value ? '1' : '0') : String(value);
+  return `${Buffer.byteLength(text)}:${text}`;
+};
+
+// opts (as parsed) as a hand-off string (for CLIMETA_OPTIONS, say),
+// loaded by decode_options of the parsers of this spec, in any language
+export function encodeOptions(opts) {
+  const parts = [handoffHeader];
+  const command = "";
+  for (const [dest, , multiple] of handoffFields.get(command)) {
+    const value = opts[dest];
+    if (multiple && Array.isArray(value)) {
+      parts.push(`${value.length}*`, ...value.map(handoffValue));
+    } else {
+      parts.push(handoffValue(value));
+    }
+  }
+  return parts.join('');
+};
+
+// opts of a hand-off string, of any backend, without parsing nor
+// validating them again. Throws an Error if malformed or of another spec
+export function decodeOptions(encoded) {
+  if (!encoded.startsWith(handoffHeader)) {
+    throw new Error('not a hand-off encoding of this spec');
+  }
+  const data = Buffer.from(encoded);
+  let pos = handoffHeader.length;
+  const count = (separator) => {
+    const end = data.indexOf(separator, pos);
+    const digits = end < 0 ? '' : data.toString('latin1', pos, end);
+    if (!/^[0-9]+$/.test(digits)) {
+      throw new Error('malformed hand-off field');
+    }
+    pos = end + 1;
+    return Number(digits);
+  };
+  const take = (type) => {
+    if (data[pos] === 0x7e) {
+      // ~, no value
+      pos++;
+      return null;
+    }
+    const size = count(':');
+    if (pos + size > data.length) {
+      throw new Error('truncated hand-off encoding');
+    }
+    const text = data.toString('utf8', pos, pos + size);
+    pos += size;
+    if (type === 'flag') {
+      return text === '1';
+    }
+    return type === 'string' ? text : Number(text);
+  };
+  const opts = {};
+  const command = "";
+  for (const [dest, type, multiple] of handoffFields.get(command)) {
+    if (multiple && data[pos] !== 0x7e) {
+      opts[dest] = Array.from({ length: count('*') }, () => take(type));
+    } else {
+      opts[dest] = take(type);
+    }
+  }
+  if (pos !== data.length) {
+    throw new Error('trailing data after the hand-off fields');
+  }
+  return opts;
+};
+
+// thrown by Parser.parse(): status 0 for help (the usage is the
+// message), 1 for errors
+export class ParseError extends Error {
+  constructor(message, status) {
+    super(message);
+    this.name = 'ParseError';
+    this.status = status;
+  }
+};
+
+export class Parser {
+  constructor() {
+    // Defaults for each of the options
+    this.defaults = Object.freeze({
+      output: "out.txt",
+      verbose: false,
+      count: 1,
+      ratio: 0.5,
+    });
+    const optionDefinitions = [
+      {
+        name: 'help',
+        description: 'show this help message and exit',
+        alias: 'h',
+        type: Boolean
+      },
+      {
+        name: 'output',
+        description: 'output file path',
+        alias: 'o',
+        type: String
+      },
+      {
+        name: 'verbose',
+        description: 'enable verbose mode',
+        alias: 'v',
+        type: Boolean
+      },
+      {
+        name: 'count',
+        description: 'number of copies',
+        alias: 'c',
+        type: Number
+      },
+      {
+        name: 'ratio',
+        description: 'compression ratio',
+        type: Number
+      },
+      {
+        name: 'positionals',
+        description: 'positional arguments (can omit --positionals) Corresponding to:\n>> {bold input} : input file path',
+        type: String,
+        multiple: true,
+        defaultOption: true
+      },
+    ];
+    // append default to help string
+    for (const opt of optionDefinitions) {
+      const default_ = this.defaults[opt.name];
+      if (typeof default_ !== "undefined") {
+        opt.description += default_ == null ? " (required)" : ` (default ${default_})`;
+      }
+    }
+    this.optionDefinitions = optionDefinitions;
+    this.usageText = null;
+  }
+
+  usage() {
+    if (this.usageText === null) {
+      this.usageText = commandLineUsage([{
+        header: "Header for help",
+        content: "Description for help",
+      }, {
+        header: "Options",
+        optionList: this.optionDefinitions,
+      }, {
+        content: "Epilog"
+      }]);
+    }
+    return this.usageText;
+  }
+
+  // error followed by the usage
+  error(message) {
+    return new ParseError(`${message}\n${this.usage()}`, 1);
+  }
+
+  parse(argv) {
+    let rawOptions;
+    try {
+      rawOptions = commandLineArgs(this.optionDefinitions, { argv });
+    } catch (e) {
+      // unknown options, values given to flags...
+      throw new ParseError(`ERROR: ${e.message}`, 1);
+    }
+    // fill up with defaults the options not provided
+    const opts = {...this.defaults, ...rawOptions };
+    if (opts.help) {
+      throw new ParseError(this.usage(), 0);
+    }
+    for (const optName in opts) {
+      if (opts[optName] == null) {
+        throw this.error(`Invalid or no option passed for --${optName}`);
+      }
+    }
+    // Handle positionals
+    const exp_positionals = 1
+    const num_positionals = (typeof opts.positionals === "undefined") ? 0 : opts.positionals.length;
+    if (num_positionals != exp_positionals) {
+      throw this.error(`Expecting ${exp_positionals} positional argument(s), but got ${num_positionals}`);
+    }
+    opts.input = opts.positionals[0];
+    delete opts.positionals;
+    return opts;
+  }
+};
+
+export function parseArgs() {
+  try {
+    return new Parser().parse(process.argv.slice(2));
+  } catch (e) {
+    if (!(e instanceof ParseError)) {
+      throw e;
+    }
+    console.log(e.message);
+    process.exit(e.status);
+  }
+};
@@ -0,0 +1,227 @@
+"""CLI argument parsing"""
+
+import argparse
+import sys
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True)
+class Args:
+    """Typed CLI arguments, as returned by parse_typed_args"""
+
+    input: str
+    output: str
+    verbose: bool
+    count: int
+    ratio: float
+
+
+def _typed_args(args: argparse.Namespace) -> Args:
+    """Args of the parsed namespace"""
+    return Args(
+        args.input,
+        args.output,
+        args.verbose,
+        args.count,
+        args.ratio,
+    )
+
+
+# (sub)command -> (dest, type, multiple) of its arguments in spec
+# order, the type of files being their LazyFile parameters
+HANDOFF_FIELDS = {
+    "": [
+        ("input", "string", False),
+        ("output", "string", False),
+        ("verbose", "flag", False),
+        ("count", "int", False),
+        ("ratio", "float", False),
+    ],
+}
+HANDOFF_HEADER = "CLM1fa4bbe5a"
+
+
+def handoff_value(value) -> str:
+    """a value as a hand-off field: ~ for none, else <bytes>:<text>"""
+    if value is None:
+        return "~"
+    if isinstance(value, bool):
+        value = "1" if value else "0"
+    elif isinstance(value, float):
+        value = repr(value)
+    else:
+        value = str(value)
+    size = len(value.encode("utf-8", "surrogateescape"))
+    return f"{size}:{value}"
+
+
+def encode_options(args: argparse.Namespace) -> str:
+    """
+    args as a hand-off string (for CLIMETA_OPTIONS, say), loaded by
+    decode_options of the parsers of this spec, in any language
+    """
+    parts = [HANDOFF_HEADER]
+    command = ""
+    for dest, _, multiple in HANDOFF_FIELDS[command]:
+        value = getattr(args, dest)
+        if multiple and value is not None:
+            parts.append(f"{len(value)}*")
+            parts += [handoff_value(item) for item in value]
+        else:
+            parts.append(handoff_value(value))
+    return "".join(parts)
+
+
+def decode_options(encoded: str) -> argparse.Namespace:
+    """
+    args of an encode_options string, of any backend, without
+    parsing nor validating them again. ValueError if malformed or
+    of another spec
+    """
+    if not encoded.startswith(HANDOFF_HEADER):
+        raise ValueError("not a hand-off encoding of this spec")
+    data = encoded.encode("utf-8", "surrogateescape")
+    pos = len(HANDOFF_HEADER)
+
+    def take(type_):
+        nonlocal pos
+        if data[pos : pos + 1] == b"~":
+            pos += 1
+            return None
+        colon = data.index(b":", pos)
+        size = data[pos:colon]
+        if not size.isdigit():
+            raise ValueError("malformed hand-off field")
+        start, pos = colon + 1, colon + 1 + int(size)
+        if pos > len(data):
+            raise ValueError("truncated hand-off encoding")
+        text = data[start:pos].decode("utf-8", "surrogateescape")
+        if type_ == "flag":
+            return text == "1"
+        if type_ == "int":
+            return int(text)
+        if type_ == "float":
+            return float(text)
+        return text
+
+    args = argparse.Namespace()
+    command = ""
+    for dest, type_, multiple in HANDOFF_FIELDS[command]:
+        if multiple and data[pos : pos + 1] != b"~":
+            star = data.index(b"*", pos)
+            count, pos = int(data[pos:star]), star + 1
+            value = [take(type_) for _ in range(count)]
+        else:
+            value = take(type_)
+        setattr(args, dest, value)
+    if pos != len(data):
+        raise ValueError("trailing data after the hand-off fields")
+    return args
+
+
+def build_parser(
+    parser_class: type = argparse.ArgumentParser,
+) -> argparse.ArgumentParser:
+    """argparse parser of the program"""
+    parser = parser_class(
+        description="Example of options handed off between parsers of the same spec",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+        epilog="Example: sample12 in.txt -v --count 3, or CLIMETA_OPTIONS=<encoded> sample12",
+    )
+    parser.add_argument(
+        "input",
+        type=str,
+        help="input file path",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        default="out.txt",
+        help="output file path",
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="store_true",
+        help="enable verbose mode",
+    )
+    parser.add_argument(
+        "-c",
+        "--count",
+        type=int,
+        default=1,
+        help="number of copies",
+    )
+    parser.add_argument(
+        "--ratio",
+        type=float,
+        default=0.5,
+        help="compression ratio",
+    )
+    return parser
+
+
+def parse_argv(parser: argparse.ArgumentParser, argv: list) -> tuple:
+    """args, unknown of argv (the arguments after the program name)"""
+    return parser.parse_known_args(argv)
+
+
+def parse_args() -> tuple:
+    """CLI argument parsing entry point"""
+    argv = sys.argv[1:]
+    parser = build_parser()
+    return parse_argv(parser, argv)  # args, unknown
+
+
+def parse_typed_args() -> tuple:
+    """CLI argument parsing entry point returning typed Args"""
+    args, unknown = parse_args()
+    return _typed_args(args), unknown
+
+
+class ParseError(Exception):
+    """
+    command line rejected by Parser.parse (status 2), or help
+    asked for (status 0, the help is the message)
+    """
+
+    def __init__(self, message: str, status: int):
+        super().__init__(message)
+        self.status = status
+
+
+class RaisingArgumentParser(argparse.ArgumentParser):
+    """ArgumentParser raising ParseError instead of printing and exiting"""
+
+    def print_help(self, file=None):
+        raise ParseError(self.format_help(), 0)
+
+    def error(self, message: str):
+        raise ParseError(f"{self.prog}: error: {message}", 2)
+
+
+class Parser:
+    """
+    parser built once, parse() can then be called any number of
+    times, from any thread, and raises ParseError instead of exiting
+    """
+
+    def __init__(self):
+        self._parser = build_parser(RaisingArgumentParser)
+
+    def parse(self, argv: list) -> tuple:
+        """args, unknown of argv (the arguments after the program name)"""
+        return parse_argv(self._parser, argv)
+
+    def parse_typed(self, argv: list) -> tuple:
+        """typed Args, unknown of argv"""
+        args, unknown = self.parse(argv)
+        return _typed_args(args), unknown
+
+
+if __name__ == "__main__":
+    args, unknown = parse_args()
+    print(f"Parsed arguments: {args}")
+    if unknown:
+        print(f"Unknown arguments: {unknown}")
@@ -0,0 +1,259 @@
+# hand-off field of $1 appended to $encoded: <bytes>:<value>
+handoff_put() {
+    local LC_ALL=C
+    encoded+="${#1}:$1"
+}
+
+# multiple value of $1 (space separated) appended to $encoded
+handoff_put_items() {
+    local -a items
+    local item
+    read -ra items <<< "$1"
+    encoded+="${#items[@]}*"
+    for item in "${items[@]}"; do
+        handoff_put "$item"
+    done
+}
+
+# next hand-off field of $data into $field, 1 if malformed
+handoff_take() {
+    local LC_ALL=C size skip
+    if [[ "$data" == "~"* ]]; then
+        field=""
+        data=${data:1}
+        return 0
+    fi
+    size=${data%%:*}
+    if [[ -z "$size" || "$size" == *[!0-9]* || "$size" == "$data" ]]; then
+        return 1
+    fi
+    skip=$(( ${#size} + 1 ))
+    size=$(( 10#$size ))
+    if [ $(( ${#data} - skip )) -lt $size ]; then
+        return 1
+    fi
+    field=${data:skip:size}
+    data=${data:skip+size}
+}
+
+# next multiple hand-off value of $data into $field, space separated
+handoff_take_items() {
+    local count=${data%%"*"*} items=""
+    if [[ "$data" == "~"* ]]; then
+        handoff_take
+        return
+    fi
+    if [[ -z "$count" || "$count" == *[!0-9]* || "$count" == "$data" ]]; then
+        return 1
+    fi
+    data=${data:${#count}+1}
+    for (( count = 10#$count; count > 0; count-- )); do
+        handoff_take || return 1
+        items+="${items:+ }$field"
+    done
+    field="$items"
+}
+
+# $data past its header, 1 (and an error) if not one of the spec
+handoff_check() {
+    if [[ "$data" != "CLM1fa4bbe5a"* ]]; then
+        echo "ERROR: not a hand-off encoding of this spec" >&2
+        return 1
+    fi
+    data=${data:12}
+}
+
+# Usage function
+usage() {
+    echo "Usage: $0 [options]"
+    echo ""
+    echo "Example of options handed off between parsers of the same spec"
+    echo ""
+    echo "positional arguments:"
+    echo "  input INPUT                   : input file path (required)"
+    echo ""
+    echo "options:"
+    echo '  -h, --help                    : show this help message and exit'
+    echo '  -o OUTPUT, --output OUTPUT    : output file path (default "out.txt")'
+    echo '  -v VERBOSE, --verbose VERBOSE : enable verbose mode (default "0")'
+    echo '  -c COUNT, --count COUNT       : number of copies (default "1")'
+    echo '  --ratio RATIO                 : compression ratio (default "0.5")'
+    echo ""
+    echo "Example: sample12 in.txt -v --count 3, or CLIMETA_OPTIONS=<encoded> sample12"
+    exit "$1"
+}
+
+# check if a valid argument follows
+check_valid_arg() {
+    case "$2" in
+        -*|'')
+            echo "ERROR: $1 requires a value." >&2
+            usage 1
+            ;;
+    esac
+}
+
+# Argument parsing function
+parse_args() {
+    # split --a=xx -b=yy -cde into --a xx -b yy -c -d -e
+    # for more unified processing later on
+    local i ch arg
+    local -a new_args
+    for arg in "$@"; do
+        case "$arg" in
+            --*=*) # convert --aa=xx into --aa xx
+                right=${arg#*=}  # remove up to first =
+                left=${arg%="$right"}  # remove right hand side
+                new_args+=("$left" "$right")
+                ;;
+            --*)
+                new_args+=("$arg")
+                ;;
+            -*) # convert -abc=yy into -a -b -c yy
+                i=1
+                while [ "$i" -lt "${#arg}" ]; do
+                    # Get character at position i (0 based)
+                    ch=$(expr "$arg" : "^.\{$i\}\(.\)")
+                    case "${ch}" in
+                        =) rest=$(expr "$arg" : "^..\{$i\}\(.*\)")
+                           new_args+=("$rest"); break ;;
+                        *) new_args+=("-${ch}") ;;
+                    esac
+                    i=$((i+1))
+                done
+                ;;
+            *)
+                new_args+=("$arg")
+                ;;
+        esac
+    done
+    set -- "${new_args[@]}"
+
+    remaining_args=""
+    local positional_idx=0
+    while [ "$#" -gt 0 ]; do
+        case "$1" in
+            --output|-o)
+                check_valid_arg "$1" "$2"
+                output="$2"
+                shift;;
+            --verbose|-v)
+                verbose="1"
+                ;;
+            --count|-c)
+                check_valid_arg "$1" "$2"
+                count="$2"
+                shift;;
+            --ratio)
+                check_valid_arg "$1" "$2"
+                ratio="$2"
+                shift;;
+            --help|-h)
+                usage 0
+                ;;
+            --)
+                shift
+                remaining_args="$*"
+                break
+                ;;
+            -*)
+                echo "ERROR: Unknown option: $1" >&2
+                usage 1
+                ;;
+            *) # handle positional arguments
+                if [ $positional_idx -eq 0 ]; then
+                    input="$1"
+                else
+                    echo "ERROR: Unexpected positional argument: $1" >&2
+                    usage 1
+                fi
+                positional_idx=$(( positional_idx + 1 ))
+                ;;
+        esac
+        shift
+    done
+}
+
+# Validate arguments
+validate_args() {
+    if [ -z "$input" ]; then
+        echo "ERROR: input is required" >&2
+        usage 1
+    fi
+}
+
+# Dump argument values for debug
+dump_args() {
+    echo "Parsed arguments:"
+    echo "input: $input"
+    echo "output: $output"
+    echo "verbose: $verbose"
+    echo "count: $count"
+    echo "ratio: $ratio"
+    echo "remaining_args:"
+    for arg in $remaining_args; do
+        echo "  $arg"
+    done
+}
+
+# the arguments as hand-off fields, appended to $encoded
+encode_fields() {
+    handoff_put "$input"
+    handoff_put "$output"
+    handoff_put "$verbose"
+    handoff_put "$count"
+    handoff_put "$ratio"
+}
+
+# the arguments from the hand-off fields of $data, 1 if malformed
+decode_fields() {
+    handoff_take || return 1
+    input="$field"
+    handoff_take || return 1
+    output="$field"
+    handoff_take || return 1
+    verbose="$field"
+    handoff_take || return 1
+    count="$field"
+    handoff_take || return 1
+    ratio="$field"
+}
+
+# Main entry point, parse CLI
+get_cli_args() {
+    # set defaults
+    output="out.txt"
+    verbose="0"
+    count="1"
+    ratio="0.5"
+    parse_args "$@"
+    validate_args
+}
+
+# parsed arguments as a hand-off string, stored in the variable
+# named $1 (printed if none), for decode_options of any backend
+encode_args() {
+    local encoded="CLM1fa4bbe5a"
+    encode_fields
+    if [ -n "$1" ]; then
+        printf -v "$1" '%s' "$encoded"
+    else
+        printf '%s\n' "$encoded"
+    fi
+}
+
+# arguments of a hand-off string ($1), as get_cli_args would set
+# them but without parsing nor validating them again
+decode_args() {
+    local data="$1" field
+    handoff_check || return 1
+    decode_fields || data=x
+    if [ -n "$data" ]; then
+        echo "ERROR: malformed hand-off encoding" >&2
+        return 1
+    fi
+}
+
+# Example of use:
+# get_cli_args "$@"
+# dump_args
\ No newline at end of file
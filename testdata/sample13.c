@@ -0,0 +1,122 @@
+#include "sample13.h"
+#include "argparse.h"
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <limits.h>
+#include <math.h>
+#include <time.h>
+
+
+#ifdef CLIMETA_NO_TRACE
+#define trace_destination() ((const char *)NULL)
+#else
+static const char* trace_destination(void) {
+    const char *destination = getenv("CLIMETA_TRACE");
+    return destination != NULL && *destination != '\0' ? destination : NULL;
+}
+
+#endif
+
+static double trace_now_us(void) {
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return ts.tv_sec * 1e6 + ts.tv_nsec / 1e3;
+}
+
+// CLIMETA_TRACE line to stderr (1/stderr) or appended to a file,
+// marks: start, parsed, validated, choices checked
+static void trace_line(const char *destination, const char *command, int tokens, const double *marks) {
+    FILE *out = stderr;
+    if (strcmp(destination, "1") != 0 && strcmp(destination, "stderr") != 0) {
+        out = fopen(destination, "a");
+        if (out == NULL) {
+            return;
+        }
+    }
+    fprintf(out, "climeta-trace prog=example");
+    if (command != NULL) {
+        fprintf(out, " command=%s", command);
+    }
+    fprintf(out, " tokens=%d parse_us=%.1f validate_us=%.1f choices_us=%.1f total_us=%.1f\n", tokens, marks[1] - marks[0], marks[2] - marks[1], marks[3] - marks[2], marks[3] - marks[0]);
+    if (out != stderr) {
+        fclose(out);
+    }
+}
+
+void reset_options(Options* opts) {
+    opts->input = NULL;
+    opts->format = "text";
+    opts->limit = 10;
+}
+
+static int set_includes(const char* words[], const char* test_word) {
+    while (*words != NULL) {
+        if (strcmp(*words++, test_word) == 0) {
+            return 1;
+        }
+    }
+    return 0;
+}
+
+int parse_options(int argc, const char ***argv, Options* opts) {
+    static const char *const usages[] = {
+        "basic [options] positionals [[--] args]",
+        "basic [options] positionals ",
+        NULL,
+    };
+    const char *trace = trace_destination();
+    const int trace_tokens = argc - 1;
+    double trace_marks[4] = {0};
+    if (trace != NULL) {
+        trace_marks[0] = trace_now_us();
+    }
+    reset_options(opts);
+    struct argparse_option options[] = {
+        OPT_HELP(),
+        OPT_STRING('f', "format", &opts->format, "output format (default 'text')", NULL, 0, 0),
+        OPT_INTEGER('\0', "limit", &opts->limit, "number of rows to show (default 10)", NULL, 0, 0),
+        OPT_END(),
+    };
+    struct argparse argparse;
+    argparse_init(&argparse, options, usages, 0);
+    argparse_describe(&argparse, 
+        "\nExample of parse time tracing",
+        "\nPositional arguments:"
+        "\n    input                 input file path\n"
+        "\nExample: CLIMETA_TRACE=1 sample13 data.csv --format json"
+    );
+    argc = argparse_parse(&argparse, argc, *argv);
+    if (trace != NULL) {
+        trace_marks[1] = trace_now_us();
+    }
+    // positionals
+    if (argc >= 1) {
+        opts->input = (*argv)[0];
+        (*argv)++; argc--;
+    } else {
+        printf("ERROR: expecting positional argument 'input'\n");
+        argparse_usage(&argparse);
+        exit(1);
+    }
+    if (trace != NULL) {
+        trace_marks[2] = trace_now_us();
+    }
+    // check choices
+    const char *format_valid[] = {"json", "text", NULL};
+    if (!set_includes(format_valid, opts->format)) {
+        printf("ERROR: 'format' must be one of 'json', 'text'\n");
+        exit(1);
+    }
+    if (trace != NULL) {
+        trace_marks[3] = trace_now_us();
+        trace_line(trace, NULL, trace_tokens, trace_marks);
+    }
+    return argc;
+}
+
+void dump_options(Options *opts) {
+    printf("input: %s\n", opts->input);
+    printf("format: %s\n", opts->format);
+    printf("limit: %d\n", opts->limit);
+}
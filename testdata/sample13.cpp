@@ -0,0 +1,99 @@
+#include "sample13.hpp"
+#include <iostream>
+#include <set>
+#include <chrono>
+#include <cstdlib>
+#include <cstring>
+#include <fstream>
+#include <iomanip>
+#include <sstream>
+
+
+#ifdef CLIMETA_NO_TRACE
+#define trace_destination() ((const char *)nullptr)
+#else
+static const char* trace_destination() {
+    const char *destination = std::getenv("CLIMETA_TRACE");
+    return destination != nullptr && *destination != '\0' ? destination : nullptr;
+}
+
+#endif
+
+static double trace_now_us() {
+    using namespace std::chrono;
+    return duration<double, std::micro>(steady_clock::now().time_since_epoch()).count();
+}
+
+// CLIMETA_TRACE line to stderr (1/stderr) or appended to a file,
+// marks: start, parsed, validated, choices checked
+static void trace_line(const char *destination, const char *command, int tokens, const double *marks) {
+    std::ostringstream line;
+    line << "climeta-trace prog=example";
+    if (command != nullptr) {
+        line << " command=" << command;
+    }
+    line << " tokens=" << tokens << std::fixed << std::setprecision(1)
+        << " parse_us=" << marks[1] - marks[0]
+        << " validate_us=" << marks[2] - marks[1]
+        << " choices_us=" << marks[3] - marks[2]
+        << " total_us=" << marks[3] - marks[0] << "\n";
+    if (std::strcmp(destination, "1") == 0 || std::strcmp(destination, "stderr") == 0) {
+        std::cerr << line.str() << std::flush;
+        return;
+    }
+    std::ofstream(destination, std::ios::app) << line.str();
+}
+
+cxxopts::ParseResult parse_options(int argc, const char **argv, Options* opts) {
+    const char *trace = trace_destination();
+    double trace_marks[4] = {0};
+    if (trace != nullptr) {
+        trace_marks[0] = trace_now_us();
+    }
+    cxxopts::Options options("example", "Example of parse time tracing");
+    // define all options
+    options.add_options()
+        ("h,help", "show this help message and exit")
+        ("input", "input file path (required)", cxxopts::value<std::string>())
+        ("f,format", "output format", cxxopts::value<std::string>()->default_value("text"))
+        ("limit", "number of rows to show", cxxopts::value<int>()->default_value("10"))
+    ;
+    // declare positionals
+    options.parse_positional("input");
+
+    cxxopts::ParseResult result = options.parse(argc, argv);
+    if (trace != nullptr) {
+        trace_marks[1] = trace_now_us();
+    }
+    if (result.count("help")) {
+        std::cout << options.help() << std::endl;
+        std::cout << "positional arguments:\n";
+        std::cout << "  input             " << "input file path (required)\n";
+        std::cout << "\nExample: CLIMETA_TRACE=1 sample13 data.csv --format json" << std::endl;
+        exit(0);
+    }
+    // Fill-up output struct
+    opts->input = result["input"].as<std::string>();
+    opts->format = result["format"].as<std::string>();
+    opts->limit = result["limit"].as<int>();
+    if (trace != nullptr) {
+        trace_marks[2] = trace_now_us();
+    }
+    // check choices
+    std::set<std::string> format_valid{"json", "text"};
+    if (format_valid.find(opts->format) == format_valid.end()) {
+        std::cout << "ERROR: 'format' must be one of 'json', 'text'" << std::endl;
+        exit(1);
+    }
+    if (trace != nullptr) {
+        trace_marks[3] = trace_now_us();
+        trace_line(trace, nullptr, argc - 1, trace_marks);
+    }
+    return result;
+}
+
+void dump_options(const Options &opts) {
+    std::cout << "input: " << opts.input << "\n";
+    std::cout << "format: " << opts.format << "\n";
+    std::cout << "limit: " << opts.limit << "\n";
+}
@@ -0,0 +1,23 @@
+#ifndef __sample13_h__
+#define __sample13_h__
+
+typedef struct {
+    const char * format;
+    int limit;
+    // positionals
+    const char * input;
+} Options;
+
+#ifdef __cplusplus
+extern "C" {
+#endif
+
+void reset_options(Options* opts);
+int parse_options(int argc, const char ***argv, Options* opts);
+void dump_options(Options *opts);
+
+#ifdef __cplusplus
+}
+#endif
+
+#endif
\ No newline at end of file
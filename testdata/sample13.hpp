@@ -0,0 +1,12 @@
+#pragma once
+
+#include "cxxopts.hpp"
+struct Options {
+    std::string format;
+    int limit;
+    // positionals
+    std::string input;
+};
+
+cxxopts::ParseResult parse_options(int argc, const char** argv, Options* opts);
+void dump_options(const Options& opts);
\ No newline at end of file
@@ -0,0 +1,157 @@
+// https://github.com/75lb/command-line-args
+import commandLineArgs from 'command-line-args';
+// https://github.com/75lb/command-line-usage
+import commandLineUsage from 'command-line-usage';
+import { appendFileSync } from 'node:fs';
+
+function traceLine(destination, fields) {
+  const line = `climeta-trace prog=example ${fields}\n`;
+  if (destination === "1" || destination === "stderr") {
+    process.stderr.write(line);
+    return;
+  }
+  appendFileSync(destination, line);
+};
+
+// thrown by Parser.parse(): status 0 for help (the usage is the
+// message), 1 for errors
+export class ParseError extends Error {
+  constructor(message, status) {
+    super(message);
+    this.name = 'ParseError';
+    this.status = status;
+  }
+};
+
+export class Parser {
+  constructor() {
+    this.trace = process.env.CLIMETA_TRACE;
+    const traceStart = this.trace ? performance.now() : 0;
+    // Defaults for each of the options
+    this.defaults = Object.freeze({
+      format: "text",
+      limit: 10,
+    });
+    const optionDefinitions = [
+      {
+        name: 'help',
+        description: 'show this help message and exit',
+        alias: 'h',
+        type: Boolean
+      },
+      {
+        name: 'format',
+        description: 'output format',
+        alias: 'f',
+        type: String
+      },
+      {
+        name: 'limit',
+        description: 'number of rows to show',
+        type: Number
+      },
+      {
+        name: 'positionals',
+        description: 'positional arguments (can omit --positionals) Corresponding to:\n>> {bold input} : input file path',
+        type: String,
+        multiple: true,
+        defaultOption: true
+      },
+    ];
+    // append default to help string
+    for (const opt of optionDefinitions) {
+      const default_ = this.defaults[opt.name];
+      if (typeof default_ !== "undefined") {
+        opt.description += default_ == null ? " (required)" : ` (default ${default_})`;
+      }
+    }
+    this.optionDefinitions = optionDefinitions;
+    // valid values of the choices options
+    this.format_valid = Object.freeze(["json", "text"]);
+    this.usageText = null;
+    this.traceSetupMs = this.trace ? performance.now() - traceStart : 0;
+  }
+
+  usage() {
+    if (this.usageText === null) {
+      this.usageText = commandLineUsage([{
+        header: "Header for help",
+        content: "Description for help",
+      }, {
+        header: "Options",
+        optionList: this.optionDefinitions,
+      }, {
+        content: "Epilog"
+      }]);
+    }
+    return this.usageText;
+  }
+
+  // error followed by the usage
+  error(message) {
+    return new ParseError(`${message}\n${this.usage()}`, 1);
+  }
+
+  parse(argv) {
+    const trace = this.trace;
+    const traceStart = trace ? performance.now() : 0;
+    let rawOptions;
+    try {
+      rawOptions = commandLineArgs(this.optionDefinitions, { argv });
+    } catch (e) {
+      // unknown options, values given to flags...
+      throw new ParseError(`ERROR: ${e.message}`, 1);
+    }
+    const traceParsed = trace ? performance.now() : 0;
+    // fill up with defaults the options not provided
+    const opts = {...this.defaults, ...rawOptions };
+    if (opts.help) {
+      throw new ParseError(this.usage(), 0);
+    }
+    for (const optName in opts) {
+      if (opts[optName] == null) {
+        throw this.error(`Invalid or no option passed for --${optName}`);
+      }
+    }
+    // Handle positionals
+    const exp_positionals = 1
+    const num_positionals = (typeof opts.positionals === "undefined") ? 0 : opts.positionals.length;
+    if (num_positionals != exp_positionals) {
+      throw this.error(`Expecting ${exp_positionals} positional argument(s), but got ${num_positionals}`);
+    }
+    opts.input = opts.positionals[0];
+    delete opts.positionals;
+    const traceValidated = trace ? performance.now() : 0;
+    // check choices
+    if (!this.format_valid.includes(opts.format)) {
+      throw new ParseError(
+        `ERROR: 'format' must be one of ${this.format_valid.join(', ')}`, 1
+      );
+    }
+    if (trace) {
+      const traceEnd = performance.now();
+      traceLine(trace, [
+        `tokens=${argv.length}`,
+        `setup_us=${((this.traceSetupMs) * 1000).toFixed(1)}`,
+        `parse_us=${((traceParsed - traceStart) * 1000).toFixed(1)}`,
+        `validate_us=${((traceValidated - traceParsed) * 1000).toFixed(1)}`,
+        `choices_us=${((traceEnd - traceValidated) * 1000).toFixed(1)}`,
+        `total_us=${((this.traceSetupMs + traceEnd - traceStart) * 1000).toFixed(1)}`,
+      ].join(' '));
+      this.traceSetupMs = 0;
+    }
+    return opts;
+  }
+};
+
+export function parseArgs() {
+  try {
+    return new Parser().parse(process.argv.slice(2));
+  } catch (e) {
+    if (!(e instanceof ParseError)) {
+      throw e;
+    }
+    console.log(e.message);
+    process.exit(e.status);
+  }
+};
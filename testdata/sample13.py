@@ -0,0 +1,146 @@
+"""CLI argument parsing"""
+
+import argparse
+import os
+import sys
+import time
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True)
+class Args:
+    """Typed CLI arguments, as returned by parse_typed_args"""
+
+    input: str
+    format: str
+    limit: int
+
+
+def _typed_args(args: argparse.Namespace) -> Args:
+    """Args of the parsed namespace"""
+    return Args(
+        args.input,
+        args.format,
+        args.limit,
+    )
+
+
+def trace_line(destination: str, fields: str) -> None:
+    """CLIMETA_TRACE line to stderr (1/stderr) or appended to a file"""
+    line = "climeta-trace prog=example " + fields
+    if destination in ["1", "stderr"]:
+        print(line, file=sys.stderr)
+    else:
+        with open(destination, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def build_parser(
+    parser_class: type = argparse.ArgumentParser,
+) -> argparse.ArgumentParser:
+    """argparse parser of the program"""
+    parser = parser_class(
+        description="Example of parse time tracing",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+        epilog="Example: CLIMETA_TRACE=1 sample13 data.csv --format json",
+    )
+    parser.add_argument(
+        "input",
+        type=str,
+        help="input file path",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        type=str,
+        default="text",
+        choices=['json', 'text'],
+        help="output format",
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=10,
+        help="number of rows to show",
+    )
+    return parser
+
+
+def parse_argv(parser: argparse.ArgumentParser, argv: list) -> tuple:
+    """args, unknown of argv (the arguments after the program name)"""
+    return parser.parse_known_args(argv)
+
+
+def parse_args() -> tuple:
+    """CLI argument parsing entry point"""
+    argv = sys.argv[1:]
+    trace = os.environ.get("CLIMETA_TRACE")
+    if trace:
+        start = time.perf_counter()
+    parser = build_parser()
+    if not trace:
+        return parse_argv(parser, argv)  # args, unknown
+    built = time.perf_counter()
+    args, unknown = parse_argv(parser, argv)
+    done = time.perf_counter()
+    trace_line(
+        trace,
+        f"tokens={len(sys.argv) - 1} "
+        f"setup_us={(built - start) * 1e6:.1f} "
+        f"parse_us={(done - built) * 1e6:.1f} "
+        f"total_us={(done - start) * 1e6:.1f}",
+    )
+    return args, unknown
+
+
+def parse_typed_args() -> tuple:
+    """CLI argument parsing entry point returning typed Args"""
+    args, unknown = parse_args()
+    return _typed_args(args), unknown
+
+
+class ParseError(Exception):
+    """
+    command line rejected by Parser.parse (status 2), or help
+    asked for (status 0, the help is the message)
+    """
+
+    def __init__(self, message: str, status: int):
+        super().__init__(message)
+        self.status = status
+
+
+class RaisingArgumentParser(argparse.ArgumentParser):
+    """ArgumentParser raising ParseError instead of printing and exiting"""
+
+    def print_help(self, file=None):
+        raise ParseError(self.format_help(), 0)
+
+    def error(self, message: str):
+        raise ParseError(f"{self.prog}: error: {message}", 2)
+
+
+class Parser:
+    """
+    parser built once, parse() can then be called any number of
+    times, from any thread, and raises ParseError instead of exiting
+    """
+
+    def __init__(self):
+        self._parser = build_parser(RaisingArgumentParser)
+
+    def parse(self, argv: list) -> tuple:
+        """args, unknown of argv (the arguments after the program name)"""
+        return parse_argv(self._parser, argv)
+
+    def parse_typed(self, argv: list) -> tuple:
+        """typed Args, unknown of argv"""
+        args, unknown = self.parse(argv)
+        return _typed_args(args), unknown
+
+
+if __name__ == "__main__":
+    args, unknown = parse_args()
+    print(f"Parsed arguments: {args}")
+    if unknown:
+        print(f"Unknown arguments: {unknown}")
@@ -0,0 +1,162 @@
+# CLIMETA_TRACE line to stderr (1/stderr) or appended to a file
+trace_line() {
+    case "$CLIMETA_TRACE" in
+        1|stderr)
+            echo "climeta-trace prog=example $1" >&2
+            ;;
+        *)
+            echo "climeta-trace prog=example $1" >> "$CLIMETA_TRACE"
+            ;;
+    esac
+}
+
+# Usage function
+usage() {
+    echo "Usage: $0 [options]"
+    echo ""
+    echo "Example of parse time tracing"
+    echo ""
+    echo "positional arguments:"
+    echo "  input INPUT                : input file path (required)"
+    echo ""
+    echo "options:"
+    echo '  -h, --help                 : show this help message and exit'
+    echo '  -f FORMAT, --format FORMAT : output format (default "text")'
+    echo '  --limit LIMIT              : number of rows to show (default "10")'
+    echo ""
+    echo "Example: CLIMETA_TRACE=1 sample13 data.csv --format json"
+    exit "$1"
+}
+
+# check if a valid argument follows
+check_valid_arg() {
+    case "$2" in
+        -*|'')
+            echo "ERROR: $1 requires a value." >&2
+            usage 1
+            ;;
+    esac
+}
+
+# Argument parsing function
+parse_args() {
+    # split --a=xx -b=yy -cde into --a xx -b yy -c -d -e
+    # for more unified processing later on
+    local i ch arg
+    local -a new_args
+    for arg in "$@"; do
+        case "$arg" in
+            --*=*) # convert --aa=xx into --aa xx
+                right=${arg#*=}  # remove up to first =
+                left=${arg%="$right"}  # remove right hand side
+                new_args+=("$left" "$right")
+                ;;
+            --*)
+                new_args+=("$arg")
+                ;;
+            -*) # convert -abc=yy into -a -b -c yy
+                i=1
+                while [ "$i" -lt "${#arg}" ]; do
+                    # Get character at position i (0 based)
+                    ch=$(expr "$arg" : "^.\{$i\}\(.\)")
+                    case "${ch}" in
+                        =) rest=$(expr "$arg" : "^..\{$i\}\(.*\)")
+                           new_args+=("$rest"); break ;;
+                        *) new_args+=("-${ch}") ;;
+                    esac
+                    i=$((i+1))
+                done
+                ;;
+            *)
+                new_args+=("$arg")
+                ;;
+        esac
+    done
+    set -- "${new_args[@]}"
+
+    remaining_args=""
+    local positional_idx=0
+    while [ "$#" -gt 0 ]; do
+        case "$1" in
+            --format|-f)
+                check_valid_arg "$1" "$2"
+                format="$2"
+                shift;;
+            --limit)
+                check_valid_arg "$1" "$2"
+                limit="$2"
+                shift;;
+            --help|-h)
+                usage 0
+                ;;
+            --)
+                shift
+                remaining_args="$*"
+                break
+                ;;
+            -*)
+                echo "ERROR: Unknown option: $1" >&2
+                usage 1
+                ;;
+            *) # handle positional arguments
+                if [ $positional_idx -eq 0 ]; then
+                    input="$1"
+                else
+                    echo "ERROR: Unexpected positional argument: $1" >&2
+                    usage 1
+                fi
+                positional_idx=$(( positional_idx + 1 ))
+                ;;
+        esac
+        shift
+    done
+}
+
+# Validate arguments
+validate_args() {
+    if [ -z "$input" ]; then
+        echo "ERROR: input is required" >&2
+        usage 1
+    fi
+    local match
+    match=$(expr "|json|text|" : ".*|$format|")
+    if [ "$match" -eq 0 ]; then
+        echo "ERROR: --format must be one of: json, text (got '$format')" >&2
+        usage 1
+    fi
+}
+
+# Dump argument values for debug
+dump_args() {
+    echo "Parsed arguments:"
+    echo "input: $input"
+    echo "format: $format"
+    echo "limit: $limit"
+    echo "remaining_args:"
+    for arg in $remaining_args; do
+        echo "  $arg"
+    done
+}
+
+# Main entry point, parse CLI
+get_cli_args() {
+    # set defaults
+    format="text"
+    limit="10"
+    if [ -n "$CLIMETA_TRACE" ]; then
+        local trace_start trace_parsed trace_done
+        trace_start="${EPOCHREALTIME//[.,]/}"
+        parse_args "$@"
+        trace_parsed="${EPOCHREALTIME//[.,]/}"
+        validate_args
+        trace_done="${EPOCHREALTIME//[.,]/}"
+        trace_line "tokens=$# parse_us=$(( ${trace_parsed:-0} - ${trace_start:-0} )) validate_us=$(( ${trace_done:-0} - ${trace_parsed:-0} )) total_us=$(( ${trace_done:-0} - ${trace_start:-0} ))"
+        return
+    fi
+    parse_args "$@"
+    validate_args
+}
+
+# Example of use:
+# get_cli_args "$@"
+# dump_args
\ No newline at end of file
@@ -0,0 +1,317 @@
+#include "sample14.h"
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <limits.h>
+#include <math.h>
+#include <errno.h>
+#include <stdarg.h>
+#include <stddef.h>
+
+
+typedef struct {
+    const char *prefix;
+    const char *option;  // NULL when ambiguous
+    const char *message;
+} Abbreviation;
+
+typedef struct {
+    const char *name;
+    size_t len;
+} AbbreviationKey;
+
+static int compare_abbreviation(const void *key, const void *abbreviation) {
+    const AbbreviationKey *k = (const AbbreviationKey *)key;
+    const char *prefix = ((const Abbreviation *)abbreviation)->prefix;
+    int cmp = strncmp(k->name, prefix, k->len);
+    if (cmp != 0) {
+        return cmp;
+    }
+    return prefix[k->len] == '\0' ? 0 : -1;
+}
+
+typedef struct {
+    const char *name;  // --long name, or positional name
+    char short_name;  // '\0' when there is none
+    char type;  // 'b' flag, 's' string, 'i' int, 'f' float
+    int flag_value;  // stored when a flag is given
+    size_t offset;  // of the field in the Options struct
+    const char *const *choices;  // NULL terminated, or NULL
+    const char *choices_text;
+    int (*choice_index)(const char *value);  // choices_file, or NULL
+} OptionSpec;
+
+static int fail(char *error, size_t error_size, int status, const char *format, ...) {
+    if (error != NULL && error_size > 0) {
+        va_list args;
+        va_start(args, format);
+        vsnprintf(error, error_size, format, args);
+        va_end(args);
+    }
+    return status;
+}
+
+static int compare_option(const void *key, const void *option) {
+    const AbbreviationKey *k = (const AbbreviationKey *)key;
+    const char *name = ((const OptionSpec *)option)->name;
+    int cmp = strncmp(k->name, name, k->len);
+    if (cmp != 0) {
+        return cmp;
+    }
+    return name[k->len] == '\0' ? 0 : -1;
+}
+
+// convert and store the value of an option (NULL for flags)
+static int store_option(const OptionSpec *option, const char *value, void *opts, char *error, size_t error_size) {
+    char *field = (char *)opts + option->offset;
+    char *end;
+    if (option->type == 'b') {
+        *(int *)field = option->flag_value;
+        return 0;
+    }
+    if (option->type == 's') {
+        if (option->choices != NULL && option->choice_index == NULL) {
+            const char *const *choice = option->choices;
+            while (*choice != NULL && strcmp(*choice, value) != 0) {
+                choice++;
+            }
+            if (*choice == NULL) {
+                return fail(
+                    error, error_size, CLIMETA_INVALID_CHOICE,
+                    "'%s' must be one of %s",
+                    option->name, option->choices_text
+                );
+            }
+        }
+        *(const char **)field = value;
+        return 0;
+    }
+    errno = 0;
+    if (option->type == 'i') {
+        long number = strtol(value, &end, 0);
+        if (end == value || *end != '\0' || errno != 0 || number < INT_MIN || number > INT_MAX) {
+            return fail(
+                error, error_size, CLIMETA_INVALID_VALUE,
+                "'%s' expects an integer, got '%s'",
+                option->name, value
+            );
+        }
+        *(int *)field = (int)number;
+        return 0;
+    }
+    float number = strtof(value, &end);
+    if (end == value || *end != '\0' || errno != 0) {
+        return fail(
+            error, error_size, CLIMETA_INVALID_VALUE,
+            "'%s' expects a number, got '%s'",
+            option->name, value
+        );
+    }
+    *(float *)field = number;
+    return 0;
+}
+
+// value of option from the rest of the token (possibly empty,
+// as in --output=) or when rest is NULL from the next one
+static int take_value(const OptionSpec *option, const char *rest, int argc, const char **argv, int *i, void *opts, char *error, size_t error_size) {
+    if (rest == NULL) {
+        if (*i + 1 >= argc) {
+            return fail(
+                error, error_size, CLIMETA_MISSING_VALUE,
+                "'%s' expects a value", option->name
+            );
+        }
+        rest = argv[++*i];
+    }
+    return store_option(option, rest, opts, error, error_size);
+}
+
+// parse argv[1..argc) against the options of a table sorted by
+// name. The other arguments are moved to the front of argv,
+// returns how many or a negative CLIMETA_* status
+static int parse_table(int argc, const char **argv, void *opts, const OptionSpec *options, size_t count, const Abbreviation *abbreviations, size_t abbreviations_count, const char *usage, char *error, size_t error_size) {
+    int rest = 0;
+    for (int i = 1; i < argc; i++) {
+        const char *arg = argv[i];
+        const OptionSpec *option = NULL;
+        int status;
+        if (arg[0] != '-' || arg[1] == '\0') {
+            argv[rest++] = arg;
+            continue;
+        }
+        if (strcmp(arg, "--") == 0) {
+            while (++i < argc) {
+                argv[rest++] = argv[i];
+            }
+            break;
+        }
+        if (strcmp(arg, "--help") == 0) {
+            return fail(error, error_size, CLIMETA_HELP, "%s", usage);
+        }
+        if (arg[1] == '-') {
+            const char *equal = strchr(arg, '=');
+            AbbreviationKey key;
+            key.name = arg;
+            key.len = equal ? (size_t)(equal - arg) : strlen(arg);
+            option = bsearch(&key, options, count, sizeof(options[0]), compare_option);
+            if (option == NULL && abbreviations != NULL) {
+                const Abbreviation *found = bsearch(
+                    &key, abbreviations, abbreviations_count,
+                    sizeof(abbreviations[0]), compare_abbreviation
+                );
+                if (found != NULL && found->option == NULL) {
+                    return fail(
+                        error, error_size, CLIMETA_AMBIGUOUS_OPTION,
+                        "%s", found->message
+                    );
+                }
+                if (found != NULL && strcmp(found->option, "--help") == 0) {
+                    return fail(
+                        error, error_size, CLIMETA_HELP, "%s", usage
+                    );
+                }
+                if (found != NULL) {
+                    AbbreviationKey full;
+                    full.name = found->option;
+                    full.len = strlen(found->option);
+                    option = bsearch(&full, options, count, sizeof(options[0]), compare_option);
+                }
+            }
+            if (option == NULL) {
+                return fail(
+                    error, error_size, CLIMETA_UNKNOWN_OPTION,
+                    "unknown option '%.*s'", (int)key.len, arg
+                );
+            }
+            if (option->type != 'b') {
+                status = take_value(
+                    option, equal ? equal + 1 : NULL,
+                    argc, argv, &i, opts, error, error_size
+                );
+                if (status < 0) {
+                    return status;
+                }
+                continue;
+            }
+            if (equal != NULL) {
+                return fail(
+                    error, error_size, CLIMETA_INVALID_VALUE,
+                    "'%s' takes no value", option->name
+                );
+            }
+            store_option(option, NULL, opts, error, error_size);
+            continue;
+        }
+        // shorts, bundled flags (-vq) and values (-i1, -i 1)
+        for (const char *p = arg + 1; *p != '\0'; p++) {
+            if (*p == 'h') {
+                return fail(error, error_size, CLIMETA_HELP, "%s", usage);
+            }
+            option = NULL;
+            for (size_t j = 0; j < count && option == NULL; j++) {
+                if (options[j].short_name == *p) {
+                    option = &options[j];
+                }
+            }
+            if (option == NULL) {
+                return fail(
+                    error, error_size, CLIMETA_UNKNOWN_OPTION,
+                    "unknown option '-%c'", *p
+                );
+            }
+            if (option->type != 'b') {
+                status = take_value(
+                    option, p[1] != '\0' ? p + 1 : NULL,
+                    argc, argv, &i, opts, error, error_size
+                );
+                if (status < 0) {
+                    return status;
+                }
+                break;
+            }
+            store_option(option, NULL, opts, error, error_size);
+        }
+    }
+    return rest;
+}
+
+void reset_options(Options* opts) {
+    opts->input = NULL;
+    opts->output = NULL;
+    opts->verbose = 0;
+    opts->level = 1;
+    opts->mode = "fast";
+}
+
+static const char usage[] =
+    "Usage: example [options] input\n"
+    "\n"
+    "Example of a reentrant parser returning status codes\n"
+    "\n"
+    "Positional arguments:\n"
+    "    input                 input file path\n"
+    "\n"
+    "Options:\n"
+    "    -h, --help            show this help message and exit\n"
+    "    -o, --output OUTPUT   output file path (required)\n"
+    "    -v, --verbose         enable verbose mode (default 0)\n"
+    "    -l, --level LEVEL     compression level (default 1)\n"
+    "    --mode MODE           compression mode (default 'fast')\n"
+    "\n"
+    "Example: sample14 input.txt --output out.txt --level 3\n"
+;
+
+static const char *const mode_choices[] = {"fast", "slow", NULL};
+// sorted by name, for bsearch
+static const OptionSpec options[] = {
+    {"--level", 'l', 'i', 1, offsetof(Options, level), NULL, NULL, NULL},
+    {"--mode", '\0', 's', 1, offsetof(Options, mode), mode_choices, "'fast', 'slow'", NULL},
+    {"--output", 'o', 's', 1, offsetof(Options, output), NULL, NULL, NULL},
+    {"--verbose", 'v', 'b', 1, offsetof(Options, verbose), NULL, NULL, NULL},
+};
+static const OptionSpec positionals[] = {
+    {"input", '\0', 's', 1, offsetof(Options, input), NULL, NULL, NULL},
+};
+
+int parse_options(int argc, const char ***argv, Options* opts, char *error, size_t error_size) {
+    reset_options(opts);
+    argc = parse_table(
+        argc, *argv, opts, options, sizeof(options) / sizeof(options[0]),
+        NULL, 0,
+        usage, error, error_size
+    );
+    if (argc < 0) {
+        return argc;
+    }
+    // positionals
+    int status;
+    if (argc < 1) {
+        return fail(
+            error, error_size, CLIMETA_MISSING_ARGUMENT,
+            "expecting positional argument 'input'"
+        );
+    }
+    status = store_option(
+        &positionals[0], (*argv)[0],
+        opts, error, error_size
+    );
+    if (status < 0) {
+        return status;
+    }
+    (*argv)++; argc--;
+    if (opts->output == NULL) {
+        return fail(
+            error, error_size, CLIMETA_MISSING_ARGUMENT,
+            "expecting required argument '--output'"
+        );
+    }
+    return argc;
+}
+
+void dump_options(Options *opts) {
+    printf("input: %s\n", opts->input);
+    printf("output: %s\n", opts->output);
+    printf("verbose: %d\n", opts->verbose);
+    printf("level: %d\n", opts->level);
+    printf("mode: %s\n", opts->mode);
+}
@@ -0,0 +1,81 @@
+#include "sample14.hpp"
+#include <iostream>
+#include <set>
+#include <cstdio>
+#include <sstream>
+#include <string>
+
+
+static int fail(char *error, size_t error_size, int status, const std::string &message) {
+    if (error != nullptr && error_size > 0) {
+        std::snprintf(error, error_size, "%s", message.c_str());
+    }
+    return status;
+}
+
+static int parse_error(const cxxopts::exceptions::exception &e, char *error, size_t error_size) {
+    int status = CLIMETA_PARSE_ERROR;
+    if (dynamic_cast<const cxxopts::exceptions::no_such_option *>(&e) != nullptr) {
+        status = CLIMETA_UNKNOWN_OPTION;
+    } else if (dynamic_cast<const cxxopts::exceptions::missing_argument *>(&e) != nullptr) {
+        status = CLIMETA_MISSING_VALUE;
+    } else if (dynamic_cast<const cxxopts::exceptions::option_requires_argument *>(&e) != nullptr) {
+        status = CLIMETA_MISSING_VALUE;
+    } else if (dynamic_cast<const cxxopts::exceptions::incorrect_argument_type *>(&e) != nullptr) {
+        status = CLIMETA_INVALID_VALUE;
+    } else if (dynamic_cast<const cxxopts::exceptions::gratuitous_argument_for_option *>(&e) != nullptr) {
+        status = CLIMETA_INVALID_VALUE;
+    } else if (dynamic_cast<const cxxopts::exceptions::option_has_no_value *>(&e) != nullptr) {
+        status = CLIMETA_MISSING_ARGUMENT;
+    }
+    return fail(error, error_size, status, e.what());
+}
+
+int parse_options(int argc, const char **argv, Options* opts, char *error, size_t error_size) {
+    try {
+        cxxopts::Options options("example", "Example of a reentrant parser returning status codes");
+        // define all options
+        options.add_options()
+            ("h,help", "show this help message and exit")
+            ("input", "input file path (required)", cxxopts::value<std::string>())
+            ("o,output", "output file path (required)", cxxopts::value<std::string>())
+            ("v,verbose", "enable verbose mode (default: false)", cxxopts::value<bool>())
+            ("l,level", "compression level", cxxopts::value<int>()->default_value("1"))
+            ("mode", "compression mode", cxxopts::value<std::string>()->default_value("fast"))
+        ;
+        // declare positionals
+        options.parse_positional("input");
+
+        cxxopts::ParseResult result = options.parse(argc, argv);
+        if (result.count("help")) {
+            std::ostringstream help;
+            help << options.help() << std::endl;
+            help << "positional arguments:\n";
+            help << "  input             " << "input file path (required)\n";
+            help << "\nExample: sample14 input.txt --output out.txt --level 3" << std::endl;
+            return fail(error, error_size, CLIMETA_HELP, help.str());
+        }
+        // Fill-up output struct
+        opts->input = result["input"].as<std::string>();
+        opts->output = result["output"].as<std::string>();
+        opts->verbose = result["verbose"].as<bool>();
+        opts->level = result["level"].as<int>();
+        opts->mode = result["mode"].as<std::string>();
+        // check choices
+        std::set<std::string> mode_valid{"fast", "slow"};
+        if (mode_valid.find(opts->mode) == mode_valid.end()) {
+            return fail(error, error_size, CLIMETA_INVALID_CHOICE, "'mode' must be one of 'fast', 'slow'");
+        }
+        return 0;
+    } catch (const cxxopts::exceptions::exception &e) {
+        return parse_error(e, error, error_size);
+    }
+}
+
+void dump_options(const Options &opts) {
+    std::cout << "input: " << opts.input << "\n";
+    std::cout << "output: " << opts.output << "\n";
+    std::cout << "verbose: " << opts.verbose << "\n";
+    std::cout << "level: " << opts.level << "\n";
+    std::cout << "mode: " << opts.mode << "\n";
+}
@@ -0,0 +1,30 @@
+#pragma once
+
+#include "cxxopts.hpp"
+struct Options {
+    std::string output;
+    bool verbose;
+    int level;
+    std::string mode;
+    // positionals
+    std::string input;
+};
+
+#ifndef CLIMETA_STATUS_CODES
+#define CLIMETA_STATUS_CODES
+// negative parse_options results, the error buffer holds the message
+enum {
+    CLIMETA_HELP = -1,  // -h/--help given, the error buffer holds the usage
+    CLIMETA_UNKNOWN_OPTION = -2,
+    CLIMETA_MISSING_VALUE = -3,
+    CLIMETA_INVALID_VALUE = -4,
+    CLIMETA_MISSING_ARGUMENT = -5,  // a positional or required option
+    CLIMETA_INVALID_CHOICE = -6,
+    CLIMETA_AMBIGUOUS_OPTION = -7,
+    CLIMETA_UNKNOWN_COMMAND = -8,
+    CLIMETA_PARSE_ERROR = -9,  // any other error (C++)
+};
+#endif
+
+int parse_options(int argc, const char** argv, Options* opts, char *error, size_t error_size);
+void dump_options(const Options& opts);
\ No newline at end of file
@@ -0,0 +1,170 @@
+#include "sample4.h"
+#include "argparse.h"
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <limits.h>
+#include <math.h>
+
+
+void reset_options_build(Options_build* opts) {
+    opts->verbose = 0;
+    opts->target = NULL;
+    opts->jobs = 1;
+    opts->mode = "release";
+}
+
+static int set_includes(const char* words[], const char* test_word) {
+    while (*words != NULL) {
+        if (strcmp(*words++, test_word) == 0) {
+            return 1;
+        }
+    }
+    return 0;
+}
+
+int parse_options_build(int argc, const char ***argv, Options_build* opts) {
+    static const char *const usages[] = {
+        "basic [options] positionals [[--] args]",
+        "basic [options] positionals ",
+        NULL,
+    };
+    reset_options_build(opts);
+    struct argparse_option options[] = {
+        OPT_HELP(),
+        OPT_BOOLEAN('v', "verbose", &opts->verbose, "enable verbose mode (default 0)", NULL, 0, 0),
+        OPT_INTEGER('j', "jobs", &opts->jobs, "number of parallel jobs (default 1)", NULL, 0, 0),
+        OPT_STRING('\0', "mode", &opts->mode, "build mode (default 'release')", NULL, 0, 0),
+        OPT_END(),
+    };
+    struct argparse argparse;
+    argparse_init(&argparse, options, usages, 0);
+    argparse_describe(&argparse, 
+        "\nbuild the given target",
+        "\nPositional arguments:"
+        "\n    target                target to build\n"
+        "\nExample: sample4 build --jobs 4 src"
+    );
+    argc = argparse_parse(&argparse, argc, *argv);
+    // positionals
+    if (argc >= 1) {
+        opts->target = (*argv)[0];
+        (*argv)++; argc--;
+    } else {
+        printf("ERROR: expecting positional argument 'target'\n");
+        argparse_usage(&argparse);
+        exit(1);
+    }
+    // check choices
+    const char *mode_valid[] = {"debug", "release", NULL};
+    if (!set_includes(mode_valid, opts->mode)) {
+        printf("ERROR: 'mode' must be one of 'debug', 'release'\n");
+        exit(1);
+    }
+    return argc;
+}
+
+void dump_options_build(Options_build *opts) {
+    printf("verbose: %d\n", opts->verbose);
+    printf("target: %s\n", opts->target);
+    printf("jobs: %d\n", opts->jobs);
+    printf("mode: %s\n", opts->mode);
+}
+
+void reset_options_clean(Options_clean* opts) {
+    opts->verbose = 0;
+    opts->all_ = 0;
+}
+
+int parse_options_clean(int argc, const char ***argv, Options_clean* opts) {
+    static const char *const usages[] = {
+        "basic [options] positionals [[--] args]",
+        "basic [options] positionals ",
+        NULL,
+    };
+    reset_options_clean(opts);
+    struct argparse_option options[] = {
+        OPT_HELP(),
+        OPT_BOOLEAN('v', "verbose", &opts->verbose, "enable verbose mode (default 0)", NULL, 0, 0),
+        OPT_BOOLEAN('\0', "all", &opts->all_, "also remove caches (default 0)", NULL, 0, 0),
+        OPT_END(),
+    };
+    struct argparse argparse;
+    argparse_init(&argparse, options, usages, 0);
+    argparse_describe(&argparse, 
+        "\nremove build outputs",
+        "\nExample: sample4 build --jobs 4 src"
+    );
+    argc = argparse_parse(&argparse, argc, *argv);
+    // positionals
+    return argc;
+}
+
+void dump_options_clean(Options_clean *opts) {
+    printf("verbose: %d\n", opts->verbose);
+    printf("all_: %d\n", opts->all_);
+}
+
+static void usage_commands(FILE *out) {
+    fprintf(out, "Usage: example COMMAND [options]\n");
+    fprintf(out, "\nExample CLI with subcommands\n\ncommands:\n");
+    fprintf(out, "  build : build the given target\n");
+    fprintf(out, "  clean : remove build outputs\n");
+    fprintf(out, "\nExample: sample4 build --jobs 4 src\n");
+}
+
+static int parse_command_build(int argc, const char ***argv, Options* opts) {
+    return parse_options_build(argc, argv, &opts->build);
+}
+
+static int parse_command_clean(int argc, const char ***argv, Options* opts) {
+    return parse_options_clean(argc, argv, &opts->clean);
+}
+
+typedef struct {
+    const char *name;
+    int (*parse)(int argc, const char ***argv, Options* opts);
+} Command;
+
+// sorted by name, for bsearch
+static const Command commands[] = {
+    {"build", parse_command_build},
+    {"clean", parse_command_clean},
+};
+
+static int compare_command(const void *key, const void *command) {
+    return strcmp((const char *)key, ((const Command *)command)->name);
+}
+
+int parse_options(int argc, const char ***argv, Options* opts) {
+    const char *name = argc > 1 ? (*argv)[1] : NULL;
+    const Command *command = NULL;
+    if (name != NULL) {
+        command = bsearch(name, commands, sizeof(commands) / sizeof(commands[0]), sizeof(commands[0]), compare_command);
+    }
+    if (command == NULL) {
+        if (name != NULL && (strcmp(name, "-h") == 0 || strcmp(name, "--help") == 0)) {
+            usage_commands(stdout);
+            exit(0);
+        }
+        if (name != NULL) {
+            printf("ERROR: unknown command '%s'\n", name);
+        }
+        usage_commands(stdout);
+        exit(1);
+    }
+    opts->command = command->name;
+    // the command name takes the place of the program name
+    (*argv)++;
+    return command->parse(argc - 1, argv, opts);
+}
+
+void dump_options(Options *opts) {
+    printf("command: %s\n", opts->command);
+    if (strcmp(opts->command, "build") == 0) {
+        dump_options_build(&opts->build);
+    }
+    if (strcmp(opts->command, "clean") == 0) {
+        dump_options_clean(&opts->clean);
+    }
+}
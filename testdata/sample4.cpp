@@ -0,0 +1,139 @@
+#include "sample4.hpp"
+#include <algorithm>
+#include <cstring>
+#include <iostream>
+#include <set>
+
+
+cxxopts::ParseResult parse_options_build(int argc, const char **argv, Options_build* opts) {
+    cxxopts::Options options("example build", "build the given target");
+    // define all options
+    options.add_options()
+        ("h,help", "show this help message and exit")
+        ("v,verbose", "enable verbose mode (default: false)", cxxopts::value<bool>())
+        ("target", "target to build (required)", cxxopts::value<std::string>())
+        ("j,jobs", "number of parallel jobs", cxxopts::value<int>()->default_value("1"))
+        ("mode", "build mode", cxxopts::value<std::string>()->default_value("release"))
+    ;
+    // declare positionals
+    options.parse_positional("target");
+
+    cxxopts::ParseResult result = options.parse(argc, argv);
+    if (result.count("help")) {
+        std::cout << options.help() << std::endl;
+        std::cout << "positional arguments:\n";
+        std::cout << "  target            " << "target to build (required)\n";
+        std::cout << "\nExample: sample4 build --jobs 4 src" << std::endl;
+        exit(0);
+    }
+    // Fill-up output struct
+    opts->verbose = result["verbose"].as<bool>();
+    opts->target = result["target"].as<std::string>();
+    opts->jobs = result["jobs"].as<int>();
+    opts->mode = result["mode"].as<std::string>();
+    // check choices
+    std::set<std::string> mode_valid{"debug", "release"};
+    if (mode_valid.find(opts->mode) == mode_valid.end()) {
+        std::cout << "ERROR: 'mode' must be one of 'debug', 'release'" << std::endl;
+        exit(1);
+    }
+    return result;
+}
+
+void dump_options_build(const Options_build &opts) {
+    std::cout << "verbose: " << opts.verbose << "\n";
+    std::cout << "target: " << opts.target << "\n";
+    std::cout << "jobs: " << opts.jobs << "\n";
+    std::cout << "mode: " << opts.mode << "\n";
+}
+
+cxxopts::ParseResult parse_options_clean(int argc, const char **argv, Options_clean* opts) {
+    cxxopts::Options options("example clean", "remove build outputs");
+    // define all options
+    options.add_options()
+        ("h,help", "show this help message and exit")
+        ("v,verbose", "enable verbose mode (default: false)", cxxopts::value<bool>())
+        ("all", "also remove caches (default: false)", cxxopts::value<bool>())
+    ;
+
+    cxxopts::ParseResult result = options.parse(argc, argv);
+    if (result.count("help")) {
+        std::cout << options.help() << std::endl;
+        std::cout << "\nExample: sample4 build --jobs 4 src" << std::endl;
+        exit(0);
+    }
+    // Fill-up output struct
+    opts->verbose = result["verbose"].as<bool>();
+    opts->all_ = result["all"].as<bool>();
+    return result;
+}
+
+void dump_options_clean(const Options_clean &opts) {
+    std::cout << "verbose: " << opts.verbose << "\n";
+    std::cout << "all_: " << opts.all_ << "\n";
+}
+
+static void usage_commands() {
+    std::cout << "Usage: example COMMAND [options]\n"
+        << "\nExample CLI with subcommands\n\ncommands:\n"
+        << "  build : build the given target\n"
+        << "  clean : remove build outputs\n"
+        << "\nExample: sample4 build --jobs 4 src\n"
+        << std::flush;
+}
+
+static cxxopts::ParseResult parse_command_build(int argc, const char **argv, Options* opts) {
+    return parse_options_build(argc, argv, &opts->build);
+}
+
+static cxxopts::ParseResult parse_command_clean(int argc, const char **argv, Options* opts) {
+    return parse_options_clean(argc, argv, &opts->clean);
+}
+
+struct Command {
+    const char *name;
+    cxxopts::ParseResult (*parse)(int argc, const char **argv, Options* opts);
+};
+
+// sorted by name, for binary search
+static const Command commands[] = {
+    {"build", parse_command_build},
+    {"clean", parse_command_clean},
+};
+
+cxxopts::ParseResult parse_options(int argc, const char **argv, Options* opts) {
+    const char *name = argc > 1 ? argv[1] : nullptr;
+    const Command *end = commands + sizeof(commands) / sizeof(commands[0]);
+    const Command *command = end;
+    if (name != nullptr) {
+        command = std::lower_bound(
+            commands, end, name,
+            [](const Command &cmd, const char *key) {
+                return std::strcmp(cmd.name, key) < 0;
+            });
+    }
+    if (command == end || std::strcmp(command->name, name) != 0) {
+        if (name != nullptr && (std::strcmp(name, "-h") == 0 || std::strcmp(name, "--help") == 0)) {
+            usage_commands();
+            exit(0);
+        }
+        if (name != nullptr) {
+            std::cout << "ERROR: unknown command '" << name << "'" << std::endl;
+        }
+        usage_commands();
+        exit(1);
+    }
+    opts->command = command->name;
+    // the command name takes the place of the program name
+    return command->parse(argc - 1, argv + 1, opts);
+}
+
+void dump_options(const Options &opts) {
+    std::cout << "command: " << opts.command << "\n";
+    if (opts.command == "build") {
+        dump_options_build(opts.build);
+    }
+    if (opts.command == "clean") {
+        dump_options_clean(opts.clean);
+    }
+}
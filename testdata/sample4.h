@@ -0,0 +1,41 @@
+#ifndef __sample4_h__
+#define __sample4_h__
+
+typedef struct {
+    int verbose;
+    int jobs;
+    const char * mode;
+    // positionals
+    const char * target;
+} Options_build;
+
+typedef struct {
+    int verbose;
+    int all_;
+    // positionals
+} Options_clean;
+
+typedef struct {
+    const char *command;
+    Options_build build;
+    Options_clean clean;
+} Options;
+
+#ifdef __cplusplus
+extern "C" {
+#endif
+
+void reset_options_build(Options_build* opts);
+int parse_options_build(int argc, const char ***argv, Options_build* opts);
+void dump_options_build(Options_build *opts);
+void reset_options_clean(Options_clean* opts);
+int parse_options_clean(int argc, const char ***argv, Options_clean* opts);
+void dump_options_clean(Options_clean *opts);
+int parse_options(int argc, const char ***argv, Options* opts);
+void dump_options(Options *opts);
+
+#ifdef __cplusplus
+}
+#endif
+
+#endif
\ No newline at end of file
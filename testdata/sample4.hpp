@@ -0,0 +1,29 @@
+#pragma once
+
+#include "cxxopts.hpp"
+struct Options_build {
+    bool verbose;
+    int jobs;
+    std::string mode;
+    // positionals
+    std::string target;
+};
+
+struct Options_clean {
+    bool verbose;
+    bool all_;
+    // positionals
+};
+
+struct Options {
+    std::string command;
+    Options_build build;
+    Options_clean clean;
+};
+
+cxxopts::ParseResult parse_options_build(int argc, const char** argv, Options_build* opts);
+void dump_options_build(const Options_build& opts);
+cxxopts::ParseResult parse_options_clean(int argc, const char** argv, Options_clean* opts);
+void dump_options_clean(const Options_clean& opts);
+cxxopts::ParseResult parse_options(int argc, const char** argv, Options* opts);
+void dump_options(const Options& opts);
\ No newline at end of file
@@ -0,0 +1,270 @@
+// https://github.com/75lb/command-line-args
+import commandLineArgs from 'command-line-args';
+// https://github.com/75lb/command-line-usage
+import commandLineUsage from 'command-line-usage';
+
+// thrown by Parser.parse(): status 0 for help (the usage is the
+// message), 1 for errors
+export class ParseError extends Error {
+  constructor(message, status) {
+    super(message);
+    this.name = 'ParseError';
+    this.status = status;
+  }
+};
+
+class Parser_build {
+  constructor() {
+    // Defaults for each of the options
+    this.defaults = Object.freeze({
+      verbose: false,
+      jobs: 1,
+      mode: "release",
+    });
+    const optionDefinitions = [
+      {
+        name: 'help',
+        description: 'show this help message and exit',
+        alias: 'h',
+        type: Boolean
+      },
+      {
+        name: 'verbose',
+        description: 'enable verbose mode',
+        alias: 'v',
+        type: Boolean
+      },
+      {
+        name: 'jobs',
+        description: 'number of parallel jobs',
+        alias: 'j',
+        type: Number
+      },
+      {
+        name: 'mode',
+        description: 'build mode',
+        type: String
+      },
+      {
+        name: 'positionals',
+        description: 'positional arguments (can omit --positionals) Corresponding to:\n>> {bold target} : target to build',
+        type: String,
+        multiple: true,
+        defaultOption: true
+      },
+    ];
+    // append default to help string
+    for (const opt of optionDefinitions) {
+      const default_ = this.defaults[opt.name];
+      if (typeof default_ !== "undefined") {
+        opt.description += default_ == null ? " (required)" : ` (default ${default_})`;
+      }
+    }
+    this.optionDefinitions = optionDefinitions;
+    // valid values of the choices options
+    this.mode_valid = Object.freeze(["debug", "release"]);
+    this.usageText = null;
+  }
+
+  usage() {
+    if (this.usageText === null) {
+      this.usageText = commandLineUsage([{
+        header: "Header for help",
+        content: "Description for help",
+      }, {
+        header: "Options",
+        optionList: this.optionDefinitions,
+      }, {
+        content: "Epilog"
+      }]);
+    }
+    return this.usageText;
+  }
+
+  // error followed by the usage
+  error(message) {
+    return new ParseError(`${message}\n${this.usage()}`, 1);
+  }
+
+  parse(argv) {
+    let rawOptions;
+    try {
+      rawOptions = commandLineArgs(this.optionDefinitions, { argv });
+    } catch (e) {
+      // unknown options, values given to flags...
+      throw new ParseError(`ERROR: ${e.message}`, 1);
+    }
+    // fill up with defaults the options not provided
+    const opts = {...this.defaults, ...rawOptions };
+    if (opts.help) {
+      throw new ParseError(this.usage(), 0);
+    }
+    for (const optName in opts) {
+      if (opts[optName] == null) {
+        throw this.error(`Invalid or no option passed for --${optName}`);
+      }
+    }
+    // Handle positionals
+    const exp_positionals = 1
+    const num_positionals = (typeof opts.positionals === "undefined") ? 0 : opts.positionals.length;
+    if (num_positionals != exp_positionals) {
+      throw this.error(`Expecting ${exp_positionals} positional argument(s), but got ${num_positionals}`);
+    }
+    opts.target = opts.positionals[0];
+    delete opts.positionals;
+    // check choices
+    if (!this.mode_valid.includes(opts.mode)) {
+      throw new ParseError(
+        `ERROR: 'mode' must be one of ${this.mode_valid.join(', ')}`, 1
+      );
+    }
+    return opts;
+  }
+};
+
+class Parser_clean {
+  constructor() {
+    // Defaults for each of the options
+    this.defaults = Object.freeze({
+      verbose: false,
+      all: false,
+    });
+    const optionDefinitions = [
+      {
+        name: 'help',
+        description: 'show this help message and exit',
+        alias: 'h',
+        type: Boolean
+      },
+      {
+        name: 'verbose',
+        description: 'enable verbose mode',
+        alias: 'v',
+        type: Boolean
+      },
+      {
+        name: 'all',
+        description: 'also remove caches',
+        type: Boolean
+      },
+    ];
+    // append default to help string
+    for (const opt of optionDefinitions) {
+      const default_ = this.defaults[opt.name];
+      if (typeof default_ !== "undefined") {
+        opt.description += default_ == null ? " (required)" : ` (default ${default_})`;
+      }
+    }
+    this.optionDefinitions = optionDefinitions;
+    this.usageText = null;
+  }
+
+  usage() {
+    if (this.usageText === null) {
+      this.usageText = commandLineUsage([{
+        header: "Header for help",
+        content: "Description for help",
+      }, {
+        header: "Options",
+        optionList: this.optionDefinitions,
+      }, {
+        content: "Epilog"
+      }]);
+    }
+    return this.usageText;
+  }
+
+  // error followed by the usage
+  error(message) {
+    return new ParseError(`${message}\n${this.usage()}`, 1);
+  }
+
+  parse(argv) {
+    let rawOptions;
+    try {
+      rawOptions = commandLineArgs(this.optionDefinitions, { argv });
+    } catch (e) {
+      // unknown options, values given to flags...
+      throw new ParseError(`ERROR: ${e.message}`, 1);
+    }
+    // fill up with defaults the options not provided
+    const opts = {...this.defaults, ...rawOptions };
+    if (opts.help) {
+      throw new ParseError(this.usage(), 0);
+    }
+    for (const optName in opts) {
+      if (opts[optName] == null) {
+        throw this.error(`Invalid or no option passed for --${optName}`);
+      }
+    }
+    // translate from external to internal name
+    opts.all_ = opts.all;
+    delete opts.all
+    // Handle positionals
+    const exp_positionals = 0
+    const num_positionals = (typeof opts.positionals === "undefined") ? 0 : opts.positionals.length;
+    if (num_positionals != exp_positionals) {
+      throw this.error(`Expecting ${exp_positionals} positional argument(s), but got ${num_positionals}`);
+    }
+    delete opts.positionals;
+    return opts;
+  }
+};
+
+function usageCommands() {
+  return [
+    "Usage: example COMMAND [options]",
+    "\nExample CLI with subcommands\n\ncommands:",
+    "  build : build the given target",
+    "  clean : remove build outputs",
+    "\nExample: sample4 build --jobs 4 src",
+  ].join('\n');
+};
+
+const commands = new Map([
+  ["build", Parser_build],
+  ["clean", Parser_clean],
+]);
+
+export class Parser {
+  constructor() {
+    // command name -> its parser, built on first use
+    this.parsers = new Map();
+  }
+
+  parse(argv) {
+    const command = argv[0];
+    const commandParser = commands.get(command);
+    if (typeof commandParser === 'undefined') {
+      if (command === "-h" || command === "--help") {
+        throw new ParseError(usageCommands(), 0);
+      }
+      if (typeof command !== 'undefined') {
+        throw new ParseError(
+          `ERROR: unknown command ${command}\n${usageCommands()}`, 1
+        );
+      }
+      throw new ParseError(usageCommands(), 1);
+    }
+    let parser = this.parsers.get(command);
+    if (typeof parser === 'undefined') {
+      parser = new commandParser();
+      this.parsers.set(command, parser);
+    }
+    const opts = parser.parse(argv.slice(1));
+    opts.command = command;
+    return opts;
+  }
+};
+
+export function parseArgs() {
+  try {
+    return new Parser().parse(process.argv.slice(2));
+  } catch (e) {
+    if (!(e instanceof ParseError)) {
+      throw e;
+    }
+    console.log(e.message);
+    process.exit(e.status);
+  }
+};
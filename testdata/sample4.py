@@ -0,0 +1,195 @@
+"""CLI argument parsing"""
+
+import argparse
+import sys
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True)
+class Args_build:
+    """Typed CLI arguments, as returned by parse_typed_args"""
+
+    command: str
+    verbose: bool
+    target: str
+    jobs: int
+    mode: str
+
+
+def _typed_args_build(args: argparse.Namespace) -> Args_build:
+    """Args_build of the parsed namespace"""
+    return Args_build(
+        args.command,
+        args.verbose,
+        args.target,
+        args.jobs,
+        args.mode,
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class Args_clean:
+    """Typed CLI arguments, as returned by parse_typed_args"""
+
+    command: str
+    verbose: bool
+    all_: bool
+
+
+def _typed_args_clean(args: argparse.Namespace) -> Args_clean:
+    """Args_clean of the parsed namespace"""
+    return Args_clean(
+        args.command,
+        args.verbose,
+        args.all_,
+    )
+
+
+def _add_arguments_build(parser: argparse.ArgumentParser) -> None:
+    """arguments of the build command"""
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="store_true",
+        help="enable verbose mode",
+    )
+    parser.add_argument(
+        "target",
+        type=str,
+        help="target to build",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of parallel jobs",
+    )
+    parser.add_argument(
+        "--mode",
+        type=str,
+        default="release",
+        choices=['debug', 'release'],
+        help="build mode",
+    )
+
+
+def _add_arguments_clean(parser: argparse.ArgumentParser) -> None:
+    """arguments of the clean command"""
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="store_true",
+        help="enable verbose mode",
+    )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        dest="all_",
+        help="also remove caches",
+    )
+
+
+# command name -> (help, arguments builder, typed Args of a namespace)
+COMMANDS = {
+    "build": ("build the given target", _add_arguments_build, _typed_args_build),
+    "clean": ("remove build outputs", _add_arguments_clean, _typed_args_clean),
+}
+
+
+def build_parser(
+    parser_class: type = argparse.ArgumentParser,
+    commands: list | None = None,
+) -> argparse.ArgumentParser:
+    """argparse parser, with the given commands (all if None)"""
+    parser = parser_class(
+        description="Example CLI with subcommands",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+        epilog="Example: sample4 build --jobs 4 src",
+    )
+    subparsers = parser.add_subparsers(
+        dest="command",
+        required=True,
+        metavar="COMMAND",
+    )
+    for name in COMMANDS if commands is None else commands:
+        help_, add_arguments, _ = COMMANDS[name]
+        add_arguments(
+            subparsers.add_parser(
+                name,
+                help=help_,
+                description=help_,
+                formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+            )
+        )
+    return parser
+
+
+def parse_argv(parser: argparse.ArgumentParser, argv: list) -> tuple:
+    """args, unknown of argv (the arguments after the program name)"""
+    return parser.parse_known_args(argv)
+
+
+def parse_args() -> tuple:
+    """CLI argument parsing entry point"""
+    argv = sys.argv[1:]
+    # only the selected command parser is built, all of them
+    # when there is none (help or error message)
+    selected = argv[:1] if argv and argv[0] in COMMANDS else None
+    parser = build_parser(commands=selected)
+    return parse_argv(parser, argv)  # args, unknown
+
+
+def parse_typed_args() -> tuple:
+    """CLI argument parsing entry point returning typed Args"""
+    args, unknown = parse_args()
+    typed_args = COMMANDS[args.command][2]
+    return typed_args(args), unknown
+
+
+class ParseError(Exception):
+    """
+    command line rejected by Parser.parse (status 2), or help
+    asked for (status 0, the help is the message)
+    """
+
+    def __init__(self, message: str, status: int):
+        super().__init__(message)
+        self.status = status
+
+
+class RaisingArgumentParser(argparse.ArgumentParser):
+    """ArgumentParser raising ParseError instead of printing and exiting"""
+
+    def print_help(self, file=None):
+        raise ParseError(self.format_help(), 0)
+
+    def error(self, message: str):
+        raise ParseError(f"{self.prog}: error: {message}", 2)
+
+
+class Parser:
+    """
+    parser built once, parse() can then be called any number of
+    times, from any thread, and raises ParseError instead of exiting
+    """
+
+    def __init__(self):
+        self._parser = build_parser(RaisingArgumentParser)
+
+    def parse(self, argv: list) -> tuple:
+        """args, unknown of argv (the arguments after the program name)"""
+        return parse_argv(self._parser, argv)
+
+    def parse_typed(self, argv: list) -> tuple:
+        """typed Args, unknown of argv"""
+        args, unknown = self.parse(argv)
+        typed_args = COMMANDS[args.command][2]
+        return typed_args(args), unknown
+
+
+if __name__ == "__main__":
+    args, unknown = parse_args()
+    print(f"Parsed arguments: {args}")
+    if unknown:
+        print(f"Unknown arguments: {unknown}")
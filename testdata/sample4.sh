@@ -0,0 +1,315 @@
+# Usage function
+usage_build() {
+    echo "Usage: $0 build [options]"
+    echo ""
+    echo "build the given target"
+    echo ""
+    echo "positional arguments:"
+    echo "  target TARGET                 : target to build (required)"
+    echo ""
+    echo "options:"
+    echo '  -h, --help                    : show this help message and exit'
+    echo '  -v VERBOSE, --verbose VERBOSE : enable verbose mode (default "0")'
+    echo '  -j JOBS, --jobs JOBS          : number of parallel jobs (default "1")'
+    echo '  --mode MODE                   : build mode (default "release")'
+    echo ""
+    echo "Example: sample4 build --jobs 4 src"
+    exit "$1"
+}
+
+# check if a valid argument follows
+check_valid_arg_build() {
+    case "$2" in
+        -*|'')
+            echo "ERROR: $1 requires a value." >&2
+            usage_build 1
+            ;;
+    esac
+}
+
+# Argument parsing function
+parse_args_build() {
+    # split --a=xx -b=yy -cde into --a xx -b yy -c -d -e
+    # for more unified processing later on
+    local i ch arg
+    local -a new_args
+    for arg in "$@"; do
+        case "$arg" in
+            --*=*) # convert --aa=xx into --aa xx
+                right=${arg#*=}  # remove up to first =
+                left=${arg%="$right"}  # remove right hand side
+                new_args+=("$left" "$right")
+                ;;
+            --*)
+                new_args+=("$arg")
+                ;;
+            -*) # convert -abc=yy into -a -b -c yy
+                i=1
+                while [ "$i" -lt "${#arg}" ]; do
+                    # Get character at position i (0 based)
+                    ch=$(expr "$arg" : "^.\{$i\}\(.\)")
+                    case "${ch}" in
+                        =) rest=$(expr "$arg" : "^..\{$i\}\(.*\)")
+                           new_args+=("$rest"); break ;;
+                        *) new_args+=("-${ch}") ;;
+                    esac
+                    i=$((i+1))
+                done
+                ;;
+            *)
+                new_args+=("$arg")
+                ;;
+        esac
+    done
+    set -- "${new_args[@]}"
+
+    remaining_args=""
+    local positional_idx=0
+    while [ "$#" -gt 0 ]; do
+        case "$1" in
+            --verbose|-v)
+                verbose="1"
+                ;;
+            --jobs|-j)
+                check_valid_arg_build "$1" "$2"
+                jobs="$2"
+                shift;;
+            --mode)
+                check_valid_arg_build "$1" "$2"
+                mode="$2"
+                shift;;
+            --help|-h)
+                usage_build 0
+                ;;
+            --)
+                shift
+                remaining_args="$*"
+                break
+                ;;
+            -*)
+                echo "ERROR: Unknown option: $1" >&2
+                usage_build 1
+                ;;
+            *) # handle positional arguments
+                if [ $positional_idx -eq 0 ]; then
+                    target="$1"
+                else
+                    echo "ERROR: Unexpected positional argument: $1" >&2
+                    usage_build 1
+                fi
+                positional_idx=$(( positional_idx + 1 ))
+                ;;
+        esac
+        shift
+    done
+}
+
+# Validate arguments
+validate_args_build() {
+    if [ -z "$target" ]; then
+        echo "ERROR: target is required" >&2
+        usage_build 1
+    fi
+    local match
+    match=$(expr "|debug|release|" : ".*|$mode|")
+    if [ "$match" -eq 0 ]; then
+        echo "ERROR: --mode must be one of: debug, release (got '$mode')" >&2
+        usage_build 1
+    fi
+}
+
+# Dump argument values for debug
+dump_args_build() {
+    echo "Parsed arguments:"
+    echo "verbose: $verbose"
+    echo "target: $target"
+    echo "jobs: $jobs"
+    echo "mode: $mode"
+    echo "remaining_args:"
+    for arg in $remaining_args; do
+        echo "  $arg"
+    done
+}
+
+# Main entry point, parse CLI
+get_cli_args_build() {
+    # set defaults
+    verbose="0"
+    jobs="1"
+    mode="release"
+    parse_args_build "$@"
+    validate_args_build
+}
+
+# Usage function
+usage_clean() {
+    echo "Usage: $0 clean [options]"
+    echo ""
+    echo "remove build outputs"
+    echo ""
+    echo "positional arguments:"
+    echo ""
+    echo "options:"
+    echo '  -h, --help                    : show this help message and exit'
+    echo '  -v VERBOSE, --verbose VERBOSE : enable verbose mode (default "0")'
+    echo '  --all ALL                     : also remove caches (default "0")'
+    echo ""
+    echo "Example: sample4 build --jobs 4 src"
+    exit "$1"
+}
+
+# check if a valid argument follows
+check_valid_arg_clean() {
+    case "$2" in
+        -*|'')
+            echo "ERROR: $1 requires a value." >&2
+            usage_clean 1
+            ;;
+    esac
+}
+
+# Argument parsing function
+parse_args_clean() {
+    # split --a=xx -b=yy -cde into --a xx -b yy -c -d -e
+    # for more unified processing later on
+    local i ch arg
+    local -a new_args
+    for arg in "$@"; do
+        case "$arg" in
+            --*=*) # convert --aa=xx into --aa xx
+                right=${arg#*=}  # remove up to first =
+                left=${arg%="$right"}  # remove right hand side
+                new_args+=("$left" "$right")
+                ;;
+            --*)
+                new_args+=("$arg")
+                ;;
+            -*) # convert -abc=yy into -a -b -c yy
+                i=1
+                while [ "$i" -lt "${#arg}" ]; do
+                    # Get character at position i (0 based)
+                    ch=$(expr "$arg" : "^.\{$i\}\(.\)")
+                    case "${ch}" in
+                        =) rest=$(expr "$arg" : "^..\{$i\}\(.*\)")
+                           new_args+=("$rest"); break ;;
+                        *) new_args+=("-${ch}") ;;
+                    esac
+                    i=$((i+1))
+                done
+                ;;
+            *)
+                new_args+=("$arg")
+                ;;
+        esac
+    done
+    set -- "${new_args[@]}"
+
+    remaining_args=""
+    local positional_idx=0
+    while [ "$#" -gt 0 ]; do
+        case "$1" in
+            --verbose|-v)
+                verbose="1"
+                ;;
+            --all)
+                all_="1"
+                ;;
+            --help|-h)
+                usage_clean 0
+                ;;
+            --)
+                shift
+                remaining_args="$*"
+                break
+                ;;
+            -*)
+                echo "ERROR: Unknown option: $1" >&2
+                usage_clean 1
+                ;;
+            *) # handle positional arguments
+                echo "ERROR: Unexpected positional argument: $1" >&2
+                usage_clean 1
+                ;;
+        esac
+        shift
+    done
+}
+
+# Validate arguments
+validate_args_clean() {
+    :  # nothing to validate
+}
+
+# Dump argument values for debug
+dump_args_clean() {
+    echo "Parsed arguments:"
+    echo "verbose: $verbose"
+    echo "all_: $all_"
+    echo "remaining_args:"
+    for arg in $remaining_args; do
+        echo "  $arg"
+    done
+}
+
+# Main entry point, parse CLI
+get_cli_args_clean() {
+    # set defaults
+    verbose="0"
+    all_="0"
+    parse_args_clean "$@"
+    validate_args_clean
+}
+
+# Usage function
+usage() {
+    echo "Usage: $0 COMMAND [options]"
+    echo ""
+    echo "Example CLI with subcommands"
+    echo ""
+    echo "commands:"
+    echo '  build : build the given target'
+    echo '  clean : remove build outputs'
+    echo ""
+    echo "Example: sample4 build --jobs 4 src"
+    exit "$1"
+}
+
+# Main entry point, dispatch on command name
+get_cli_args() {
+    case "$1" in
+        build)
+            command="build"
+            shift
+            get_cli_args_build "$@"
+            ;;
+        clean)
+            command="clean"
+            shift
+            get_cli_args_clean "$@"
+            ;;
+        --help|-h)
+            usage 0
+            ;;
+        *)
+            echo "ERROR: Unknown command: $1" >&2
+            usage 1
+            ;;
+    esac
+}
+
+# Dump argument values for debug
+dump_args() {
+    echo "command: $command"
+    case "$command" in
+        build)
+            dump_args_build
+            ;;
+        clean)
+            dump_args_clean
+            ;;
+    esac
+}
+
+# Example of use:
+# get_cli_args "$@"
+# dump_args
\ No newline at end of file
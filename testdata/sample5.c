@@ -0,0 +1,167 @@
+#include "sample5.h"
+#include "argparse.h"
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <limits.h>
+#include <math.h>
+
+
+typedef struct {
+    const char *prefix;
+    const char *option;  // NULL when ambiguous
+    const char *message;
+} Abbreviation;
+
+typedef struct {
+    const char *name;
+    size_t len;
+} AbbreviationKey;
+
+static int compare_abbreviation(const void *key, const void *abbreviation) {
+    const AbbreviationKey *k = (const AbbreviationKey *)key;
+    const char *prefix = ((const Abbreviation *)abbreviation)->prefix;
+    int cmp = strncmp(k->name, prefix, k->len);
+    if (cmp != 0) {
+        return cmp;
+    }
+    return prefix[k->len] == '\0' ? 0 : -1;
+}
+
+static int compare_valued(const void *key, const void *name) {
+    return strcmp((const char *)key, *(const char *const *)name);
+}
+
+// replace unique long option prefixes by the full option,
+// returns the entry of the first ambiguous prefix if any
+static const Abbreviation* expand_abbreviations(int argc, const char **argv, const Abbreviation *table, size_t size, const char *const *valued, size_t valued_size, const char *valued_shorts) {
+    for (int i = 1; i < argc; i++) {
+        const char *arg = argv[i];
+        if (strcmp(arg, "--") == 0) {
+            break;
+        }
+        if (arg[0] == '-' && arg[1] != '-' && arg[1] != '\0') {
+            // short options bundle, the first one taking a value
+            // ends it, with the next token if it is the last
+            for (const char *s = arg + 1; *s != '\0'; s++) {
+                if (strchr(valued_shorts, *s) != NULL) {
+                    i += s[1] == '\0';
+                    break;
+                }
+            }
+            continue;
+        }
+        if (strncmp(arg, "--", 2) != 0) {
+            continue;
+        }
+        const char *equal = strchr(arg, '=');
+        AbbreviationKey key;
+        key.name = arg;
+        key.len = equal ? (size_t)(equal - arg) : strlen(arg);
+        const Abbreviation *found = bsearch(&key, table, size, sizeof(table[0]), compare_abbreviation);
+        if (found != NULL && found->option == NULL) {
+            return found;
+        }
+        if (equal == NULL) {
+            if (found != NULL) {
+                argv[i] = found->option;
+            }
+            // the value of the option is the next token
+            i += bsearch(argv[i], valued, valued_size, sizeof(valued[0]), compare_valued) != NULL;
+            continue;
+        }
+        if (found == NULL) {
+            continue;
+        }
+        // --prefix=value, kept for the process lifetime
+        char *expanded = malloc(strlen(found->option) + strlen(equal) + 1);
+        if (expanded == NULL) {
+            printf("ERROR: out of memory\n");
+            exit(1);
+        }
+        strcpy(expanded, found->option);
+        strcat(expanded, equal);
+        argv[i] = expanded;
+    }
+    return NULL;
+}
+
+void reset_options(Options* opts) {
+    opts->verbose = 0;
+    opts->verify = 0;
+    opts->output = "out.txt";
+    opts->count = 1;
+}
+
+// sorted by prefix, for bsearch
+static const Abbreviation abbreviations[] = {
+    {"--c", "--count", NULL},
+    {"--co", "--count", NULL},
+    {"--cou", "--count", NULL},
+    {"--coun", "--count", NULL},
+    {"--h", "--help", NULL},
+    {"--he", "--help", NULL},
+    {"--hel", "--help", NULL},
+    {"--o", "--output", NULL},
+    {"--ou", "--output", NULL},
+    {"--out", "--output", NULL},
+    {"--outp", "--output", NULL},
+    {"--outpu", "--output", NULL},
+    {"--v", NULL, "ambiguous option: --v could match --verbose, --verify"},
+    {"--ve", NULL, "ambiguous option: --ve could match --verbose, --verify"},
+    {"--ver", NULL, "ambiguous option: --ver could match --verbose, --verify"},
+    {"--verb", "--verbose", NULL},
+    {"--verbo", "--verbose", NULL},
+    {"--verbos", "--verbose", NULL},
+    {"--veri", "--verify", NULL},
+    {"--verif", "--verify", NULL},
+};
+
+// options taking a value, sorted for bsearch (NULL terminated)
+static const char *const valued[] = {
+    "--count", "--output", NULL,
+};
+static const char valued_shorts[] = "o";
+
+int parse_options(int argc, const char ***argv, Options* opts) {
+    static const char *const usages[] = {
+        "basic [options] positionals [[--] args]",
+        "basic [options] positionals ",
+        NULL,
+    };
+    reset_options(opts);
+    struct argparse_option options[] = {
+        OPT_HELP(),
+        OPT_BOOLEAN('v', "verbose", &opts->verbose, "enable verbose mode (default 0)", NULL, 0, 0),
+        OPT_BOOLEAN('\0', "verify", &opts->verify, "verify the output (default 0)", NULL, 0, 0),
+        OPT_STRING('o', "output", &opts->output, "output file (default 'out.txt')", NULL, 0, 0),
+        OPT_INTEGER('\0', "count", &opts->count, "number of iterations (default 1)", NULL, 0, 0),
+        OPT_END(),
+    };
+    struct argparse argparse;
+    argparse_init(&argparse, options, usages, 0);
+    argparse_describe(&argparse, 
+        "\nExample of long option abbreviations",
+        "\nUnique prefixes are accepted, --ver is ambiguous"
+    );
+    const Abbreviation *ambiguous = expand_abbreviations(
+        argc, *argv, abbreviations, sizeof(abbreviations) / sizeof(abbreviations[0]),
+        valued, sizeof(valued) / sizeof(valued[0]) - 1,
+        valued_shorts
+    );
+    if (ambiguous != NULL) {
+        printf("ERROR: %s\n", ambiguous->message);
+        argparse_usage(&argparse);
+        exit(1);
+    }
+    argc = argparse_parse(&argparse, argc, *argv);
+    // positionals
+    return argc;
+}
+
+void dump_options(Options *opts) {
+    printf("verbose: %d\n", opts->verbose);
+    printf("verify: %d\n", opts->verify);
+    printf("output: %s\n", opts->output);
+    printf("count: %d\n", opts->count);
+}
@@ -0,0 +1,126 @@
+#include "sample5.hpp"
+#include <algorithm>
+#include <cstring>
+#include <iostream>
+#include <set>
+#include <string>
+#include <vector>
+
+
+struct Abbreviation {
+    const char *prefix;
+    const char *option;  // nullptr when ambiguous
+    const char *message;
+};
+
+// copy of argv with unique long option prefixes replaced by
+// the full option, exits on ambiguous prefixes
+static std::vector<std::string> expand_abbreviations(int argc, const char **argv, const Abbreviation *begin, const Abbreviation *end, const std::set<std::string> &valued, const char *valued_shorts) {
+    std::vector<std::string> expanded(argv, argv + argc);
+    for (int i = 1; i < argc; i++) {
+        std::string &arg = expanded[i];
+        if (arg == "--") {
+            break;
+        }
+        if (arg.size() > 1 && arg[0] == '-' && arg[1] != '-') {
+            // short options bundle, the first one taking a value
+            // ends it, with the next token if it is the last
+            size_t valued_at = arg.find_first_of(valued_shorts, 1);
+            i += valued_at == arg.size() - 1;
+            continue;
+        }
+        if (arg.compare(0, 2, "--") != 0) {
+            continue;
+        }
+        size_t equal = arg.find('=');
+        std::string name = arg.substr(0, equal);
+        // the value of an option without = is the next token
+        bool next_is_value = equal == std::string::npos;
+        const Abbreviation *found = std::lower_bound(
+            begin, end, name,
+            [](const Abbreviation &abbrev, const std::string &key) {
+                return std::strcmp(abbrev.prefix, key.c_str()) < 0;
+            });
+        if (found == end || name != found->prefix) {
+            i += next_is_value && valued.count(name);
+            continue;
+        }
+        if (found->option == nullptr) {
+            std::cout << "ERROR: " << found->message << std::endl;
+            exit(1);
+        }
+        arg.replace(0, equal, found->option);
+        i += next_is_value && valued.count(found->option);
+    }
+    return expanded;
+}
+
+// sorted by prefix, for binary search
+static const Abbreviation abbreviations[] = {
+    {"--c", "--count", nullptr},
+    {"--co", "--count", nullptr},
+    {"--cou", "--count", nullptr},
+    {"--coun", "--count", nullptr},
+    {"--h", "--help", nullptr},
+    {"--he", "--help", nullptr},
+    {"--hel", "--help", nullptr},
+    {"--o", "--output", nullptr},
+    {"--ou", "--output", nullptr},
+    {"--out", "--output", nullptr},
+    {"--outp", "--output", nullptr},
+    {"--outpu", "--output", nullptr},
+    {"--v", nullptr, "ambiguous option: --v could match --verbose, --verify"},
+    {"--ve", nullptr, "ambiguous option: --ve could match --verbose, --verify"},
+    {"--ver", nullptr, "ambiguous option: --ver could match --verbose, --verify"},
+    {"--verb", "--verbose", nullptr},
+    {"--verbo", "--verbose", nullptr},
+    {"--verbos", "--verbose", nullptr},
+    {"--veri", "--verify", nullptr},
+    {"--verif", "--verify", nullptr},
+};
+
+// options taking a value, their next token is not rewritten
+static const std::set<std::string> valued = {
+    "--count", "--output",
+};
+static const char valued_shorts[] = "o";
+
+cxxopts::ParseResult parse_options(int argc, const char **argv, Options* opts) {
+    cxxopts::Options options("sample5", "Example of long option abbreviations");
+    // define all options
+    options.add_options()
+        ("h,help", "show this help message and exit")
+        ("v,verbose", "enable verbose mode (default: false)", cxxopts::value<bool>())
+        ("verify", "verify the output (default: false)", cxxopts::value<bool>())
+        ("o,output", "output file", cxxopts::value<std::string>()->default_value("out.txt"))
+        ("count", "number of iterations", cxxopts::value<int>()->default_value("1"))
+    ;
+
+    std::vector<std::string> expanded = expand_abbreviations(
+        argc, argv, abbreviations, abbreviations + sizeof(abbreviations) / sizeof(abbreviations[0]),
+        valued, valued_shorts
+    );
+    std::vector<const char *> expanded_argv;
+    for (const auto& arg : expanded) {
+        expanded_argv.push_back(arg.c_str());
+    }
+    cxxopts::ParseResult result = options.parse(argc, expanded_argv.data());
+    if (result.count("help")) {
+        std::cout << options.help() << std::endl;
+        std::cout << "\nUnique prefixes are accepted, --ver is ambiguous" << std::endl;
+        exit(0);
+    }
+    // Fill-up output struct
+    opts->verbose = result["verbose"].as<bool>();
+    opts->verify = result["verify"].as<bool>();
+    opts->output = result["output"].as<std::string>();
+    opts->count = result["count"].as<int>();
+    return result;
+}
+
+void dump_options(const Options &opts) {
+    std::cout << "verbose: " << opts.verbose << "\n";
+    std::cout << "verify: " << opts.verify << "\n";
+    std::cout << "output: " << opts.output << "\n";
+    std::cout << "count: " << opts.count << "\n";
+}
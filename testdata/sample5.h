@@ -0,0 +1,24 @@
+#ifndef __sample5_h__
+#define __sample5_h__
+
+typedef struct {
+    int verbose;
+    int verify;
+    const char * output;
+    int count;
+    // positionals
+} Options;
+
+#ifdef __cplusplus
+extern "C" {
+#endif
+
+void reset_options(Options* opts);
+int parse_options(int argc, const char ***argv, Options* opts);
+void dump_options(Options *opts);
+
+#ifdef __cplusplus
+}
+#endif
+
+#endif
\ No newline at end of file
@@ -0,0 +1,195 @@
+// https://github.com/75lb/command-line-args
+import commandLineArgs from 'command-line-args';
+// https://github.com/75lb/command-line-usage
+import commandLineUsage from 'command-line-usage';
+
+// thrown by Parser.parse(): status 0 for help (the usage is the
+// message), 1 for errors
+export class ParseError extends Error {
+  constructor(message, status) {
+    super(message);
+    this.name = 'ParseError';
+    this.status = status;
+  }
+};
+
+// unique prefix -> long option
+const abbreviations = new Map([
+  ["--c", "--count"],
+  ["--co", "--count"],
+  ["--cou", "--count"],
+  ["--coun", "--count"],
+  ["--h", "--help"],
+  ["--he", "--help"],
+  ["--hel", "--help"],
+  ["--o", "--output"],
+  ["--ou", "--output"],
+  ["--out", "--output"],
+  ["--outp", "--output"],
+  ["--outpu", "--output"],
+  ["--verb", "--verbose"],
+  ["--verbo", "--verbose"],
+  ["--verbos", "--verbose"],
+  ["--veri", "--verify"],
+  ["--verif", "--verify"],
+]);
+// ambiguous prefix -> error message
+const ambiguousAbbreviations = new Map([
+  ["--v", "ambiguous option: --v could match --verbose, --verify"],
+  ["--ve", "ambiguous option: --ve could match --verbose, --verify"],
+  ["--ver", "ambiguous option: --ver could match --verbose, --verify"],
+]);
+// options taking a value, their next token is not rewritten
+const valued = new Set([
+  "--count",
+  "--output",
+]);
+const valuedShorts = "o";
+
+function expandAbbreviations(argv, abbreviations, ambiguous, valued, valuedShorts) {
+  const expanded = [...argv];
+  for (let i = 0; i < expanded.length; i++) {
+    const arg = expanded[i];
+    if (arg === "--") {
+      break;
+    }
+    if (arg.length > 1 && arg[0] === "-" && arg[1] !== "-") {
+      // short options bundle, the first one taking a value
+      // ends it, with the next token if it is the last
+      const valuedAt = [...arg].findIndex((letter, at) => at > 0 && valuedShorts.includes(letter));
+      if (valuedAt === arg.length - 1) {
+        i++;
+      }
+      continue;
+    }
+    const equal = arg.indexOf("=");
+    const name = equal < 0 ? arg : arg.slice(0, equal);
+    if (ambiguous.has(name)) {
+      throw new ParseError(`ERROR: ${ambiguous.get(name)}`, 1);
+    }
+    const option = abbreviations.get(name);
+    if (typeof option !== 'undefined') {
+      expanded[i] = option + arg.slice(name.length);
+    }
+    // the value of an option without = is the next token
+    if (equal < 0 && valued.has(option ?? name)) {
+      i++;
+    }
+  }
+  return expanded;
+};
+
+export class Parser {
+  constructor() {
+    // Defaults for each of the options
+    this.defaults = Object.freeze({
+      verbose: false,
+      verify: false,
+      output: "out.txt",
+      count: 1,
+    });
+    const optionDefinitions = [
+      {
+        name: 'help',
+        description: 'show this help message and exit',
+        alias: 'h',
+        type: Boolean
+      },
+      {
+        name: 'verbose',
+        description: 'enable verbose mode',
+        alias: 'v',
+        type: Boolean
+      },
+      {
+        name: 'verify',
+        description: 'verify the output',
+        type: Boolean
+      },
+      {
+        name: 'output',
+        description: 'output file',
+        alias: 'o',
+        type: String
+      },
+      {
+        name: 'count',
+        description: 'number of iterations',
+        type: Number
+      },
+    ];
+    // append default to help string
+    for (const opt of optionDefinitions) {
+      const default_ = this.defaults[opt.name];
+      if (typeof default_ !== "undefined") {
+        opt.description += default_ == null ? " (required)" : ` (default ${default_})`;
+      }
+    }
+    this.optionDefinitions = optionDefinitions;
+    this.usageText = null;
+  }
+
+  usage() {
+    if (this.usageText === null) {
+      this.usageText = commandLineUsage([{
+        header: "Header for help",
+        content: "Description for help",
+      }, {
+        header: "Options",
+        optionList: this.optionDefinitions,
+      }, {
+        content: "Epilog"
+      }]);
+    }
+    return this.usageText;
+  }
+
+  // error followed by the usage
+  error(message) {
+    return new ParseError(`${message}\n${this.usage()}`, 1);
+  }
+
+  parse(argv) {
+    argv = expandAbbreviations(
+      argv, abbreviations, ambiguousAbbreviations,
+      valued, valuedShorts
+    );
+    let rawOptions;
+    try {
+      rawOptions = commandLineArgs(this.optionDefinitions, { argv });
+    } catch (e) {
+      // unknown options, values given to flags...
+      throw new ParseError(`ERROR: ${e.message}`, 1);
+    }
+    // fill up with defaults the options not provided
+    const opts = {...this.defaults, ...rawOptions };
+    if (opts.help) {
+      throw new ParseError(this.usage(), 0);
+    }
+    for (const optName in opts) {
+      if (opts[optName] == null) {
+        throw this.error(`Invalid or no option passed for --${optName}`);
+      }
+    }
+    // Handle positionals
+    const exp_positionals = 0
+    const num_positionals = (typeof opts.positionals === "undefined") ? 0 : opts.positionals.length;
+    if (num_positionals != exp_positionals) {
+      throw this.error(`Expecting ${exp_positionals} positional argument(s), but got ${num_positionals}`);
+    }
+    delete opts.positionals;
+    return opts;
+  }
+};
+
+export function parseArgs() {
+  try {
+    return new Parser().parse(process.argv.slice(2));
+  } catch (e) {
+    if (!(e instanceof ParseError)) {
+      throw e;
+    }
+    console.log(e.message);
+    process.exit(e.status);
+  }
+};
@@ -0,0 +1,176 @@
+"""CLI argument parsing"""
+
+import argparse
+import sys
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True)
+class Args:
+    """Typed CLI arguments, as returned by parse_typed_args"""
+
+    verbose: bool
+    verify: bool
+    output: str
+    count: int
+
+
+def _typed_args(args: argparse.Namespace) -> Args:
+    """Args of the parsed namespace"""
+    return Args(
+        args.verbose,
+        args.verify,
+        args.output,
+        args.count,
+    )
+
+
+# unique prefix -> long option
+ABBREVIATIONS = {
+    "--c": "--count",
+    "--co": "--count",
+    "--cou": "--count",
+    "--coun": "--count",
+    "--h": "--help",
+    "--he": "--help",
+    "--hel": "--help",
+    "--o": "--output",
+    "--ou": "--output",
+    "--out": "--output",
+    "--outp": "--output",
+    "--outpu": "--output",
+    "--verb": "--verbose",
+    "--verbo": "--verbose",
+    "--verbos": "--verbose",
+    "--veri": "--verify",
+    "--verif": "--verify",
+}
+# ambiguous prefix -> error message
+AMBIGUOUS_ABBREVIATIONS = {
+    "--v": "ambiguous option: --v could match --verbose, --verify",
+    "--ve": "ambiguous option: --ve could match --verbose, --verify",
+    "--ver": "ambiguous option: --ver could match --verbose, --verify",
+}
+
+
+def expand_abbreviations(
+    parser: argparse.ArgumentParser,
+    argv: list,
+    abbreviations: dict,
+    ambiguous: dict,
+) -> list:
+    """replace unique long option prefixes by the full option"""
+    expanded = []
+    for idx, arg in enumerate(argv):
+        if arg == "--":
+            return expanded + argv[idx:]
+        name, equal, value = arg.partition("=")
+        if name in ambiguous:
+            parser.error(ambiguous[name])
+        expanded.append(abbreviations.get(name, name) + equal + value)
+    return expanded
+
+
+def build_parser(
+    parser_class: type = argparse.ArgumentParser,
+) -> argparse.ArgumentParser:
+    """argparse parser of the program"""
+    parser = parser_class(
+        description="Example of long option abbreviations",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+        epilog="Unique prefixes are accepted, --ver is ambiguous",
+        allow_abbrev=False,
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="store_true",
+        help="enable verbose mode",
+    )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="verify the output",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        default="out.txt",
+        help="output file",
+    )
+    parser.add_argument(
+        "--count",
+        type=int,
+        default=1,
+        help="number of iterations",
+    )
+    return parser
+
+
+def parse_argv(parser: argparse.ArgumentParser, argv: list) -> tuple:
+    """args, unknown of argv (the arguments after the program name)"""
+    argv = expand_abbreviations(
+        parser, argv, ABBREVIATIONS, AMBIGUOUS_ABBREVIATIONS
+    )
+    return parser.parse_known_args(argv)
+
+
+def parse_args() -> tuple:
+    """CLI argument parsing entry point"""
+    argv = sys.argv[1:]
+    parser = build_parser()
+    return parse_argv(parser, argv)  # args, unknown
+
+
+def parse_typed_args() -> tuple:
+    """CLI argument parsing entry point returning typed Args"""
+    args, unknown = parse_args()
+    return _typed_args(args), unknown
+
+
+class ParseError(Exception):
+    """
+    command line rejected by Parser.parse (status 2), or help
+    asked for (status 0, the help is the message)
+    """
+
+    def __init__(self, message: str, status: int):
+        super().__init__(message)
+        self.status = status
+
+
+class RaisingArgumentParser(argparse.ArgumentParser):
+    """ArgumentParser raising ParseError instead of printing and exiting"""
+
+    def print_help(self, file=None):
+        raise ParseError(self.format_help(), 0)
+
+    def error(self, message: str):
+        raise ParseError(f"{self.prog}: error: {message}", 2)
+
+
+class Parser:
+    """
+    parser built once, parse() can then be called any number of
+    times, from any thread, and raises ParseError instead of exiting
+    """
+
+    def __init__(self):
+        self._parser = build_parser(RaisingArgumentParser)
+
+    def parse(self, argv: list) -> tuple:
+        """args, unknown of argv (the arguments after the program name)"""
+        return parse_argv(self._parser, argv)
+
+    def parse_typed(self, argv: list) -> tuple:
+        """typed Args, unknown of argv"""
+        args, unknown = self.parse(argv)
+        return _typed_args(args), unknown
+
+
+if __name__ == "__main__":
+    args, unknown = parse_args()
+    print(f"Parsed arguments: {args}")
+    if unknown:
+        print(f"Unknown arguments: {unknown}")
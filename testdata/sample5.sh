@@ -0,0 +1,171 @@
+# Usage function
+usage() {
+    echo "Usage: $0 [options]"
+    echo ""
+    echo "Example of long option abbreviations"
+    echo ""
+    echo "positional arguments:"
+    echo ""
+    echo "options:"
+    echo '  -h, --help                    : show this help message and exit'
+    echo '  -v VERBOSE, --verbose VERBOSE : enable verbose mode (default "0")'
+    echo '  --verify VERIFY               : verify the output (default "0")'
+    echo '  -o OUTPUT, --output OUTPUT    : output file (default "out.txt")'
+    echo '  --count COUNT                 : number of iterations (default "1")'
+    echo ""
+    echo "Unique prefixes are accepted, --ver is ambiguous"
+    exit "$1"
+}
+
+# check if a valid argument follows
+check_valid_arg() {
+    case "$2" in
+        -*|'')
+            echo "ERROR: $1 requires a value." >&2
+            usage 1
+            ;;
+    esac
+}
+
+# Argument parsing function
+parse_args() {
+    # split --a=xx -b=yy -cde into --a xx -b yy -c -d -e
+    # for more unified processing later on
+    local i ch arg
+    local -a new_args
+    local expand_abbrev=1
+    for arg in "$@"; do
+        if [ "$expand_abbrev" -eq 1 ]; then
+            case "${arg%%=*}" in
+                --)
+                    expand_abbrev=0
+                    ;;
+                --c|--co|--cou|--coun)
+                    arg="--count${arg#"${arg%%=*}"}"
+                    ;;
+                --h|--he|--hel)
+                    arg="--help${arg#"${arg%%=*}"}"
+                    ;;
+                --o|--ou|--out|--outp|--outpu)
+                    arg="--output${arg#"${arg%%=*}"}"
+                    ;;
+                --verb|--verbo|--verbos)
+                    arg="--verbose${arg#"${arg%%=*}"}"
+                    ;;
+                --veri|--verif)
+                    arg="--verify${arg#"${arg%%=*}"}"
+                    ;;
+                --v)
+                    echo "ERROR: ambiguous option: --v could match --verbose, --verify" >&2
+                    usage 1
+                    ;;
+                --ve)
+                    echo "ERROR: ambiguous option: --ve could match --verbose, --verify" >&2
+                    usage 1
+                    ;;
+                --ver)
+                    echo "ERROR: ambiguous option: --ver could match --verbose, --verify" >&2
+                    usage 1
+                    ;;
+            esac
+        fi
+        case "$arg" in
+            --*=*) # convert --aa=xx into --aa xx
+                right=${arg#*=}  # remove up to first =
+                left=${arg%="$right"}  # remove right hand side
+                new_args+=("$left" "$right")
+                ;;
+            --*)
+                new_args+=("$arg")
+                ;;
+            -*) # convert -abc=yy into -a -b -c yy
+                i=1
+                while [ "$i" -lt "${#arg}" ]; do
+                    # Get character at position i (0 based)
+                    ch=$(expr "$arg" : "^.\{$i\}\(.\)")
+                    case "${ch}" in
+                        =) rest=$(expr "$arg" : "^..\{$i\}\(.*\)")
+                           new_args+=("$rest"); break ;;
+                        *) new_args+=("-${ch}") ;;
+                    esac
+                    i=$((i+1))
+                done
+                ;;
+            *)
+                new_args+=("$arg")
+                ;;
+        esac
+    done
+    set -- "${new_args[@]}"
+
+    remaining_args=""
+    local positional_idx=0
+    while [ "$#" -gt 0 ]; do
+        case "$1" in
+            --verbose|-v)
+                verbose="1"
+                ;;
+            --verify)
+                verify="1"
+                ;;
+            --output|-o)
+                check_valid_arg "$1" "$2"
+                output="$2"
+                shift;;
+            --count)
+                check_valid_arg "$1" "$2"
+                count="$2"
+                shift;;
+            --help|-h)
+                usage 0
+                ;;
+            --)
+                shift
+                remaining_args="$*"
+                break
+                ;;
+            -*)
+                echo "ERROR: Unknown option: $1" >&2
+                usage 1
+                ;;
+            *) # handle positional arguments
+                echo "ERROR: Unexpected positional argument: $1" >&2
+                usage 1
+                ;;
+        esac
+        shift
+    done
+}
+
+# Validate arguments
+validate_args() {
+    :  # nothing to validate
+}
+
+# Dump argument values for debug
+dump_args() {
+    echo "Parsed arguments:"
+    echo "verbose: $verbose"
+    echo "verify: $verify"
+    echo "output: $output"
+    echo "count: $count"
+    echo "remaining_args:"
+    for arg in $remaining_args; do
+        echo "  $arg"
+    done
+}
+
+# Main entry point, parse CLI
+get_cli_args() {
+    # set defaults
+    verbose="0"
+    verify="0"
+    output="out.txt"
+    count="1"
+    parse_args "$@"
+    validate_args
+}
+
+# Example of use:
+# get_cli_args "$@"
+# dump_args
\ No newline at end of file
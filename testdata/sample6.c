@@ -0,0 +1,75 @@
+#include "sample6.h"
+#include "argparse.h"
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <limits.h>
+#include <math.h>
+
+
+void reset_options(Options* opts) {
+    opts->verbose = 0;
+    opts->input = NULL;
+    opts->loglevel = "info";
+    opts->logfile = "-";
+    opts->simulate = 0;
+}
+
+static int set_includes(const char* words[], const char* test_word) {
+    while (*words != NULL) {
+        if (strcmp(*words++, test_word) == 0) {
+            return 1;
+        }
+    }
+    return 0;
+}
+
+int parse_options(int argc, const char ***argv, Options* opts) {
+    static const char *const usages[] = {
+        "basic [options] positionals [[--] args]",
+        "basic [options] positionals ",
+        NULL,
+    };
+    reset_options(opts);
+    struct argparse_option options[] = {
+        OPT_HELP(),
+        OPT_BOOLEAN('v', "verbose", &opts->verbose, "enable verbose mode (default 0)", NULL, 0, 0),
+        OPT_STRING('\0', "loglevel", &opts->loglevel, "logging level (default 'info')", NULL, 0, 0),
+        OPT_STRING('\0', "logfile", &opts->logfile, "file to log to (default '-')", NULL, 0, 0),
+        OPT_BOOLEAN('\0', "simulate", &opts->simulate, "only show what would be done (default 0)", NULL, 0, 0),
+        OPT_END(),
+    };
+    struct argparse argparse;
+    argparse_init(&argparse, options, usages, 0);
+    argparse_describe(&argparse, 
+        "\nExample of spec includes and argument groups",
+        "\nPositional arguments:"
+        "\n    input                 input file\n"
+        "\nExample: sample6 input.txt --loglevel debug"
+    );
+    argc = argparse_parse(&argparse, argc, *argv);
+    // positionals
+    if (argc >= 1) {
+        opts->input = (*argv)[0];
+        (*argv)++; argc--;
+    } else {
+        printf("ERROR: expecting positional argument 'input'\n");
+        argparse_usage(&argparse);
+        exit(1);
+    }
+    // check choices
+    const char *loglevel_valid[] = {"debug", "info", "warning", "error", NULL};
+    if (!set_includes(loglevel_valid, opts->loglevel)) {
+        printf("ERROR: 'loglevel' must be one of 'debug', 'info', 'warning', 'error'\n");
+        exit(1);
+    }
+    return argc;
+}
+
+void dump_options(Options *opts) {
+    printf("verbose: %d\n", opts->verbose);
+    printf("input: %s\n", opts->input);
+    printf("loglevel: %s\n", opts->loglevel);
+    printf("logfile: %s\n", opts->logfile);
+    printf("simulate: %d\n", opts->simulate);
+}
@@ -0,0 +1,49 @@
+#include "sample6.hpp"
+#include <iostream>
+#include <set>
+
+
+cxxopts::ParseResult parse_options(int argc, const char **argv, Options* opts) {
+    cxxopts::Options options("sample6", "Example of spec includes and argument groups");
+    // define all options
+    options.add_options()
+        ("h,help", "show this help message and exit")
+        ("v,verbose", "enable verbose mode (default: false)", cxxopts::value<bool>())
+        ("input", "input file (required)", cxxopts::value<std::string>())
+        ("loglevel", "logging level", cxxopts::value<std::string>()->default_value("info"))
+        ("logfile", "file to log to", cxxopts::value<std::string>()->default_value("-"))
+        ("simulate", "only show what would be done (default: false)", cxxopts::value<bool>())
+    ;
+    // declare positionals
+    options.parse_positional("input");
+
+    cxxopts::ParseResult result = options.parse(argc, argv);
+    if (result.count("help")) {
+        std::cout << options.help() << std::endl;
+        std::cout << "positional arguments:\n";
+        std::cout << "  input             " << "input file (required)\n";
+        std::cout << "\nExample: sample6 input.txt --loglevel debug" << std::endl;
+        exit(0);
+    }
+    // Fill-up output struct
+    opts->verbose = result["verbose"].as<bool>();
+    opts->input = result["input"].as<std::string>();
+    opts->loglevel = result["loglevel"].as<std::string>();
+    opts->logfile = result["logfile"].as<std::string>();
+    opts->simulate = result["simulate"].as<bool>();
+    // check choices
+    std::set<std::string> loglevel_valid{"debug", "info", "warning", "error"};
+    if (loglevel_valid.find(opts->loglevel) == loglevel_valid.end()) {
+        std::cout << "ERROR: 'loglevel' must be one of 'debug', 'info', 'warning', 'error'" << std::endl;
+        exit(1);
+    }
+    return result;
+}
+
+void dump_options(const Options &opts) {
+    std::cout << "verbose: " << opts.verbose << "\n";
+    std::cout << "input: " << opts.input << "\n";
+    std::cout << "loglevel: " << opts.loglevel << "\n";
+    std::cout << "logfile: " << opts.logfile << "\n";
+    std::cout << "simulate: " << opts.simulate << "\n";
+}
@@ -0,0 +1,25 @@
+#ifndef __sample6_h__
+#define __sample6_h__
+
+typedef struct {
+    int verbose;
+    const char * loglevel;
+    const char * logfile;
+    int simulate;
+    // positionals
+    const char * input;
+} Options;
+
+#ifdef __cplusplus
+extern "C" {
+#endif
+
+void reset_options(Options* opts);
+int parse_options(int argc, const char ***argv, Options* opts);
+void dump_options(Options *opts);
+
+#ifdef __cplusplus
+}
+#endif
+
+#endif
\ No newline at end of file
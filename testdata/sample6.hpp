@@ -0,0 +1,14 @@
+#pragma once
+
+#include "cxxopts.hpp"
+struct Options {
+    bool verbose;
+    std::string loglevel;
+    std::string logfile;
+    bool simulate;
+    // positionals
+    std::string input;
+};
+
+cxxopts::ParseResult parse_options(int argc, const char** argv, Options* opts);
+void dump_options(const Options& opts);
\ No newline at end of file
@@ -0,0 +1,152 @@
+# Usage function
+usage() {
+    echo "Usage: $0 [options]"
+    echo ""
+    echo "Example of spec includes and argument groups"
+    echo ""
+    echo "positional arguments:"
+    echo "  input INPUT                   : input file (required)"
+    echo ""
+    echo "options:"
+    echo '  -h, --help                    : show this help message and exit'
+    echo '  -v VERBOSE, --verbose VERBOSE : enable verbose mode (default "0")'
+    echo '  --loglevel LOGLEVEL           : logging level (default "info")'
+    echo '  --logfile LOGFILE             : file to log to (default "-")'
+    echo '  --simulate SIMULATE           : only show what would be done (default "0")'
+    echo ""
+    echo "Example: sample6 input.txt --loglevel debug"
+    exit "$1"
+}
+
+# check if a valid argument follows
+check_valid_arg() {
+    case "$2" in
+        -*|'')
+            echo "ERROR: $1 requires a value." >&2
+            usage 1
+            ;;
+    esac
+}
+
+# Argument parsing function
+parse_args() {
+    # split --a=xx -b=yy -cde into --a xx -b yy -c -d -e
+    # for more unified processing later on
+    local i ch arg
+    local -a new_args
+    for arg in "$@"; do
+        case "$arg" in
+            --*=*) # convert --aa=xx into --aa xx
+                right=${arg#*=}  # remove up to first =
+                left=${arg%="$right"}  # remove right hand side
+                new_args+=("$left" "$right")
+                ;;
+            --*)
+                new_args+=("$arg")
+                ;;
+            -*) # convert -abc=yy into -a -b -c yy
+                i=1
+                while [ "$i" -lt "${#arg}" ]; do
+                    # Get character at position i (0 based)
+                    ch=$(expr "$arg" : "^.\{$i\}\(.\)")
+                    case "${ch}" in
+                        =) rest=$(expr "$arg" : "^..\{$i\}\(.*\)")
+                           new_args+=("$rest"); break ;;
+                        *) new_args+=("-${ch}") ;;
+                    esac
+                    i=$((i+1))
+                done
+                ;;
+            *)
+                new_args+=("$arg")
+                ;;
+        esac
+    done
+    set -- "${new_args[@]}"
+
+    remaining_args=""
+    local positional_idx=0
+    while [ "$#" -gt 0 ]; do
+        case "$1" in
+            --verbose|-v)
+                verbose="1"
+                ;;
+            --loglevel)
+                check_valid_arg "$1" "$2"
+                loglevel="$2"
+                shift;;
+            --logfile)
+                check_valid_arg "$1" "$2"
+                logfile="$2"
+                shift;;
+            --simulate)
+                simulate="1"
+                ;;
+            --help|-h)
+                usage 0
+                ;;
+            --)
+                shift
+                remaining_args="$*"
+                break
+                ;;
+            -*)
+                echo "ERROR: Unknown option: $1" >&2
+                usage 1
+                ;;
+            *) # handle positional arguments
+                if [ $positional_idx -eq 0 ]; then
+                    input="$1"
+                else
+                    echo "ERROR: Unexpected positional argument: $1" >&2
+                    usage 1
+                fi
+                positional_idx=$(( positional_idx + 1 ))
+                ;;
+        esac
+        shift
+    done
+}
+
+# Validate arguments
+validate_args() {
+    if [ -z "$input" ]; then
+        echo "ERROR: input is required" >&2
+        usage 1
+    fi
+    local match
+    match=$(expr "|debug|info|warning|error|" : ".*|$loglevel|")
+    if [ "$match" -eq 0 ]; then
+        echo "ERROR: --loglevel must be one of: debug, info, warning, error (got '$loglevel')" >&2
+        usage 1
+    fi
+}
+
+# Dump argument values for debug
+dump_args() {
+    echo "Parsed arguments:"
+    echo "verbose: $verbose"
+    echo "input: $input"
+    echo "loglevel: $loglevel"
+    echo "logfile: $logfile"
+    echo "simulate: $simulate"
+    echo "remaining_args:"
+    for arg in $remaining_args; do
+        echo "  $arg"
+    done
+}
+
+# Main entry point, parse CLI
+get_cli_args() {
+    # set defaults
+    verbose="0"
+    loglevel="info"
+    logfile="-"
+    simulate="0"
+    parse_args "$@"
+    validate_args
+}
+
+# Example of use:
+# get_cli_args "$@"
+# dump_args
\ No newline at end of file
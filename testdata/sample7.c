@@ -0,0 +1,343 @@
+#include "sample7.h"
+#include "argparse.h"
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <limits.h>
+#include <math.h>
+#include <stdint.h>
+
+
+// seeded and finalized FNV-1a, as the perfect hashes were built with
+static uint32_t choice_hash(uint32_t seed, const char *value) {
+    uint32_t hash = 0x811c9dc5u ^ seed;
+    while (*value != '\0') {
+        hash = (hash ^ (unsigned char)*value++) * 0x1000193u;
+    }
+    hash ^= hash >> 16;
+    hash *= 0x85ebca6bu;
+    hash ^= hash >> 13;
+    hash *= 0xc2b2ae35u;
+    return hash ^ (hash >> 16);
+}
+
+// choice closest to value, NULL if none is within len / 3 edits
+static const char* nearest_choice(const char *const *choices, const char *value) {
+    size_t row[64];
+    size_t len = strlen(value), i, j;
+    const char *nearest = NULL;
+    size_t nearest_distance = len / 3 + 1;
+    if (len > 63) {
+        len = 63;
+    }
+    for (; *choices != NULL; choices++) {
+        const char *choice = *choices;
+        size_t choice_len = strlen(choice);
+        if (choice_len > 63) {
+            choice_len = 63;
+        }
+        for (j = 0; j <= len; j++) {
+            row[j] = j;
+        }
+        for (i = 1; i <= choice_len; i++) {
+            size_t diagonal = row[0];
+            row[0] = i;
+            for (j = 1; j <= len; j++) {
+                size_t above = row[j];
+                size_t cost = diagonal + (choice[i - 1] != value[j - 1]);
+                if (above + 1 < cost) {
+                    cost = above + 1;
+                }
+                if (row[j - 1] + 1 < cost) {
+                    cost = row[j - 1] + 1;
+                }
+                row[j] = cost;
+                diagonal = above;
+            }
+        }
+        if (row[len] < nearest_distance) {
+            nearest = choice;
+            nearest_distance = row[len];
+        }
+    }
+    return nearest;
+}
+
+void reset_options(Options* opts) {
+    opts->timezone = "UTC";
+    opts->verbose = 0;
+    opts->event = NULL;
+}
+
+// --timezone choices from timezones.txt
+static const char *const timezone_choices[] = {
+    "Asia/Almaty", "Asia/Taipei", "America/St_Barthelemy",
+    "America/Manaus", "Antarctica/DumontDUrville", "Etc/GMT-5",
+    "Etc/GMT+1", "Etc/GMT", "Brazil/East", "Etc/GMT0", "Europe/San_Marino",
+    "ROK", "Africa/Djibouti", "America/Belize", "Pacific/Chatham",
+    "America/Guadeloupe", "Asia/Qostanay", "Etc/GMT-0", "Asia/Sakhalin",
+    "Asia/Oral", "America/Argentina/Tucuman", "Europe/Kaliningrad",
+    "America/Santa_Isabel", "Australia/Lord_Howe", "Europe/Busingen",
+    "Atlantic/Stanley", "America/Buenos_Aires", "Canada/Pacific",
+    "Atlantic/St_Helena", "America/Phoenix", "America/Halifax", "ROC",
+    "Asia/Kabul", "Europe/Budapest", "Africa/Ouagadougou", "Asia/Amman",
+    "America/Argentina/San_Juan", "America/Guatemala", "America/Resolute",
+    "Etc/GMT+9", "Pacific/Samoa", "Asia/Tbilisi", "America/Denver",
+    "America/Indiana/Indianapolis", "Europe/Luxembourg", "America/Cancun",
+    "Europe/Vatican", "PRC", "Africa/Dakar", "Turkey", "Africa/Accra",
+    "America/Puerto_Rico", "Asia/Tashkent", "Africa/Ndjamena",
+    "Asia/Irkutsk", "Africa/Conakry", "CET", "Pacific/Gambier",
+    "Asia/Tehran", "America/Port-au-Prince", "Antarctica/Davis",
+    "Antarctica/Vostok", "Asia/Singapore", "Kwajalein",
+    "Asia/Novokuznetsk", "America/Ojinaga", "Europe/Zagreb",
+    "Antarctica/Syowa", "Pacific/Enderbury", "America/Kentucky/Louisville",
+    "Asia/Ulaanbaatar", "Etc/GMT+5", "Asia/Manila", "UCT",
+    "Asia/Chongqing", "Asia/Makassar", "Pacific/Port_Moresby",
+    "Canada/Newfoundland", "Asia/Ashkhabad", "Iceland", "America/Edmonton",
+    "America/Sitka", "America/Regina", "America/Indiana/Winamac", "EET",
+    "America/Cordoba", "Europe/Gibraltar", "Asia/Aqtobe", "Pacific/Efate",
+    "Africa/Lubumbashi", "Asia/Dili", "America/Yellowknife",
+    "America/North_Dakota/New_Salem", "Pacific/Kiritimati",
+    "America/Maceio", "America/Nassau", "Asia/Dushanbe", "Africa/Cairo",
+    "US/Hawaii", "America/Kentucky/Monticello", "Europe/Chisinau",
+    "Africa/Bangui", "Pacific/Kwajalein", "Indian/Kerguelen",
+    "Europe/Samara", "Australia/NSW", "Europe/Prague", "Asia/Chita",
+    "America/Mazatlan", "America/Dominica", "America/Toronto",
+    "America/Havana", "Asia/Kamchatka", "WET",
+    "America/Argentina/San_Luis", "Africa/Freetown", "America/Jujuy",
+    "Mexico/BajaSur", "Indian/Christmas", "Asia/Bahrain", "Asia/Aqtau",
+    "Etc/Greenwich", "Australia/Melbourne", "Australia/Eucla",
+    "Australia/Broken_Hill", "Antarctica/Mawson", "US/Pacific",
+    "Antarctica/Rothera", "Asia/Yekaterinburg", "Africa/Lome", "GB-Eire",
+    "Antarctica/McMurdo", "America/Punta_Arenas", "Indian/Comoro",
+    "America/Porto_Velho", "Asia/Tel_Aviv", "America/Tortola",
+    "America/Blanc-Sablon", "Pacific/Fakaofo", "America/Argentina/Cordoba",
+    "America/Yakutat", "Europe/Tirane", "America/North_Dakota/Center",
+    "Africa/Bissau", "America/Lima", "Asia/Istanbul", "GB",
+    "Europe/Madrid", "America/El_Salvador", "America/Aruba",
+    "America/Argentina/Jujuy", "America/Fortaleza", "Europe/Zurich",
+    "Pacific/Chuuk", "Antarctica/Troll", "Indian/Reunion", "America/Nome",
+    "America/Eirunepe", "Asia/Phnom_Penh", "America/Panama",
+    "Europe/Dublin", "Asia/Ashgabat", "Etc/GMT+10", "Indian/Maldives",
+    "Asia/Choibalsan", "Asia/Karachi", "Etc/GMT-14", "America/Tegucigalpa",
+    "America/Fort_Nelson", "Africa/Asmera", "Asia/Kuwait", "Europe/Lisbon",
+    "Asia/Urumqi", "Cuba", "Etc/GMT-12", "America/Guayaquil",
+    "Asia/Bangkok", "Europe/Simferopol", "Australia/West",
+    "America/Louisville", "Asia/Chungking", "America/Detroit",
+    "Pacific/Marquesas", "America/Scoresbysund", "America/Nuuk",
+    "America/Coyhaique", "Pacific/Kanton", "MST", "Europe/Belfast",
+    "America/Rio_Branco", "Asia/Pyongyang", "America/St_Vincent",
+    "America/Tijuana", "Africa/Malabo", "America/Metlakatla",
+    "America/Inuvik", "America/Argentina/Rio_Gallegos",
+    "America/Port_of_Spain", "Pacific/Palau", "US/Arizona",
+    "America/Barbados", "Europe/Brussels", "US/Alaska", "EST5EDT",
+    "Asia/Novosibirsk", "Antarctica/South_Pole", "Asia/Shanghai",
+    "Asia/Kuala_Lumpur", "Africa/Gaborone", "Asia/Pontianak",
+    "Asia/Magadan", "Pacific/Wake", "Indian/Mayotte", "America/Thule",
+    "America/Kralendijk", "America/Argentina/Buenos_Aires",
+    "Atlantic/Reykjavik", "Europe/Ljubljana", "America/St_Lucia",
+    "America/Indiana/Knox", "HST", "Atlantic/Madeira", "Europe/Belgrade",
+    "America/Indiana/Marengo", "Africa/Nairobi", "Pacific/Guadalcanal",
+    "Pacific/Rarotonga", "Etc/UCT", "Asia/Macau", "GMT+0",
+    "America/Danmarkshavn", "Africa/Tunis", "Europe/Kyiv",
+    "America/Boa_Vista", "Asia/Ujung_Pandang", "America/Menominee",
+    "Pacific/Funafuti", "Europe/Amsterdam", "Australia/Tasmania",
+    "America/Moncton", "Etc/Zulu", "America/Argentina/ComodRivadavia",
+    "Asia/Tokyo", "America/St_Johns", "Asia/Kashgar", "America/Whitehorse",
+    "Europe/Helsinki", "Asia/Macao", "Pacific/Truk", "America/Rainy_River",
+    "Pacific/Norfolk", "MET", "Asia/Saigon", "Africa/Brazzaville",
+    "Etc/GMT+2", "Europe/Bucharest", "Asia/Jayapura", "Brazil/DeNoronha",
+    "Europe/London", "Africa/Blantyre", "Asia/Yangon", "America/Guyana",
+    "America/Cuiaba", "America/Bogota", "Australia/LHI",
+    "Pacific/Pitcairn", "Asia/Thimphu", "Singapore", "Indian/Antananarivo",
+    "Europe/Podgorica", "America/Pangnirtung", "Australia/Perth",
+    "Atlantic/Azores", "America/Virgin", "Etc/GMT-7", "Etc/GMT-10",
+    "Mexico/BajaNorte", "localtime", "America/Paramaribo", "Etc/GMT+3",
+    "Africa/Niamey", "Europe/Rome", "CST6CDT", "Europe/Monaco",
+    "US/Aleutian", "Africa/Porto-Novo", "Australia/Victoria",
+    "Asia/Muscat", "Europe/Ulyanovsk", "Europe/Guernsey",
+    "America/Grenada", "Africa/Kigali", "Atlantic/Canary",
+    "Atlantic/Faroe", "Asia/Ust-Nera", "Pacific/Pago_Pago",
+    "Europe/Sarajevo", "Pacific/Tahiti", "Pacific/Apia",
+    "US/Indiana-Starke", "America/Los_Angeles", "America/Atka", "Poland",
+    "Australia/Lindeman", "Australia/Currie", "America/Ensenada",
+    "Asia/Yakutsk", "Etc/GMT-9", "Africa/Maseru", "America/Montevideo",
+    "GMT", "America/St_Thomas", "Africa/Douala", "America/Winnipeg",
+    "America/Indiana/Vevay", "America/Managua", "US/Mountain",
+    "Africa/Kampala", "Australia/South", "Europe/Berlin",
+    "Pacific/Auckland", "America/Cambridge_Bay", "America/Santo_Domingo",
+    "Canada/Atlantic", "Australia/Brisbane", "America/Belem", "Etc/GMT-1",
+    "Europe/Vaduz", "Africa/Sao_Tome", "Australia/Hobart",
+    "Europe/Uzhgorod", "America/Nipigon", "Asia/Thimbu", "Asia/Brunei",
+    "Africa/Abidjan", "Pacific/Easter", "America/Rosario",
+    "Europe/Andorra", "Asia/Barnaul", "America/Jamaica",
+    "Europe/Volgograd", "America/Glace_Bay", "Atlantic/Jan_Mayen",
+    "Pacific/Tongatapu", "America/Indianapolis", "Etc/GMT+8", "Etc/GMT-8",
+    "Etc/GMT-11", "America/North_Dakota/Beulah", "Hongkong",
+    "Atlantic/South_Georgia", "Europe/Moscow", "Africa/Asmara", "PST8PDT",
+    "Europe/Paris", "Africa/Mogadishu", "Zulu", "America/Atikokan",
+    "America/Noronha", "Asia/Baku", "Africa/Monrovia", "Pacific/Guam",
+    "Etc/GMT+4", "Africa/Bamako", "America/Argentina/Ushuaia", "Etc/UTC",
+    "Africa/Dar_es_Salaam", "Asia/Damascus", "America/Chihuahua",
+    "Africa/Johannesburg", "Asia/Hovd", "America/Antigua",
+    "America/Bahia_Banderas", "Pacific/Fiji", "Asia/Samarkand",
+    "America/Goose_Bay", "Europe/Minsk", "Europe/Copenhagen",
+    "Europe/Vienna", "Asia/Khandyga", "America/Montserrat",
+    "Canada/Central", "Africa/Nouakchott", "Asia/Rangoon", "Asia/Gaza",
+    "Africa/Addis_Ababa", "Jamaica", "America/Campo_Grande", "Greenwich",
+    "Australia/North", "Asia/Seoul", "America/Matamoros", "Asia/Kathmandu",
+    "Etc/GMT+12", "America/Curacao", "Asia/Kolkata", "Pacific/Nauru",
+    "America/Vancouver", "Australia/Adelaide", "Brazil/Acre",
+    "Australia/Sydney", "Africa/Mbabane", "America/Recife", "Asia/Dubai",
+    "America/Miquelon", "Etc/GMT-6", "America/Shiprock", "Africa/Lusaka",
+    "America/Mexico_City", "America/Argentina/Mendoza", "Asia/Hong_Kong",
+    "America/Cayman", "Asia/Beirut", "Pacific/Noumea", "Asia/Famagusta",
+    "America/Juneau", "Africa/Lagos", "America/Santarem", "Etc/GMT+0",
+    "Indian/Cocos", "America/Indiana/Tell_City", "Pacific/Wallis",
+    "America/Marigot", "Europe/Tiraspol", "America/Lower_Princes", "GMT-0",
+    "Asia/Vientiane", "Asia/Dacca", "GMT0", "Etc/GMT+6",
+    "America/Thunder_Bay", "America/Dawson", "America/Anchorage",
+    "America/Adak", "America/Anguilla", "Asia/Krasnoyarsk",
+    "Canada/Eastern", "Europe/Oslo", "Pacific/Bougainville",
+    "Europe/Isle_of_Man", "Europe/Jersey", "America/Sao_Paulo",
+    "Etc/Universal", "America/Godthab", "America/Argentina/La_Rioja",
+    "Atlantic/Cape_Verde", "Asia/Tomsk", "US/East-Indiana",
+    "Pacific/Majuro", "Australia/Canberra", "Europe/Bratislava",
+    "Europe/Stockholm", "Europe/Malta", "Europe/Kirov", "NZ",
+    "Asia/Srednekolymsk", "America/Mendoza", "Iran", "Africa/Maputo",
+    "America/Montreal", "Etc/GMT+7", "America/Bahia",
+    "Arctic/Longyearbyen", "America/Rankin_Inlet", "Asia/Nicosia",
+    "Asia/Aden", "Japan", "MST7MDT", "US/Samoa", "America/Swift_Current",
+    "America/Asuncion", "Etc/GMT+11", "Africa/Banjul", "Pacific/Ponape",
+    "Etc/GMT-13", "Asia/Harbin", "America/Merida",
+    "America/Indiana/Petersburg", "Australia/Yancowinna",
+    "Antarctica/Palmer", "Asia/Kuching", "Pacific/Niue", "Libya",
+    "Asia/Riyadh", "America/Araguaina", "US/Eastern", "Universal",
+    "US/Michigan", "Asia/Bishkek", "Asia/Baghdad", "Pacific/Honolulu",
+    "Canada/Yukon", "Pacific/Johnston", "Israel", "America/Fort_Wayne",
+    "Pacific/Tarawa", "Pacific/Midway", "Canada/Saskatchewan",
+    "Europe/Saratov", "Europe/Astrakhan", "Africa/El_Aaiun",
+    "Atlantic/Faeroe", "America/Caracas", "Pacific/Saipan",
+    "America/New_York", "Asia/Katmandu", "Indian/Mahe", "America/Knox_IN",
+    "Atlantic/Bermuda", "America/Cayenne", "Europe/Nicosia", "Brazil/West",
+    "Africa/Luanda", "America/Indiana/Vincennes", "Chile/Continental",
+    "America/Coral_Harbour", "Europe/Vilnius", "Asia/Yerevan", "Factory",
+    "Europe/Mariehamn", "America/Iqaluit", "Africa/Kinshasa",
+    "Africa/Bujumbura", "America/Argentina/Catamarca", "Asia/Qatar",
+    "Africa/Juba", "Asia/Ho_Chi_Minh", "Asia/Ulan_Bator", "America/La_Paz",
+    "Africa/Libreville", "Europe/Riga", "Indian/Mauritius",
+    "America/Santiago", "Asia/Atyrau", "Africa/Timbuktu", "Etc/GMT-2",
+    "Chile/EasterIsland", "Africa/Casablanca", "America/Costa_Rica",
+    "America/Monterrey", "Etc/GMT-3", "America/Hermosillo", "Asia/Anadyr",
+    "Etc/GMT-4", "Antarctica/Macquarie", "Pacific/Yap",
+    "America/Argentina/Salta", "Canada/Mountain", "Australia/Queensland",
+    "Europe/Tallinn", "Africa/Khartoum", "Africa/Harare", "Asia/Colombo",
+    "America/Grand_Turk", "Europe/Zaporozhye", "America/Porto_Acre",
+    "America/Chicago", "Mexico/General", "Asia/Calcutta",
+    "America/Dawson_Creek", "Australia/Darwin", "W-SU", "Asia/Hebron",
+    "Australia/ACT", "Antarctica/Casey", "Asia/Jerusalem",
+    "Africa/Algiers", "Pacific/Galapagos", "Europe/Istanbul", "Asia/Dhaka",
+    "Asia/Jakarta", "Asia/Vladivostok", "Navajo", "Indian/Chagos",
+    "Europe/Athens", "America/Martinique", "America/Boise",
+    "Pacific/Kosrae", "Asia/Qyzylorda", "Asia/Omsk", "EST", "NZ-CHAT",
+    "America/Catamarca", "Portugal", "Pacific/Pohnpei", "UTC",
+    "Europe/Skopje", "America/Ciudad_Juarez", "Europe/Kiev",
+    "America/St_Kitts", "Africa/Tripoli", "Egypt", "Eire", "US/Central",
+    "Europe/Sofia", "Africa/Ceuta", "Africa/Windhoek", "America/Creston",
+    "Europe/Warsaw", NULL,
+};
+static const int timezone_choices_seeds[] = {
+    -2, 1, 0, 0, 0, -3, -6, -8, -9, 1, 0, -10, 0, 1, 0, -11, 2, 1, 0, 0, 3,
+    0, -13, 1, -15, 1, 0, -20, 0, 4, 0, -25, 1, 0, 0, 0, 0, 1, -28, -30, 0,
+    0, 0, -34, -38, 0, -40, -43, 0, -44, -49, 1, 1, 0, 1, 0, 0, 0, 0, 0, 0,
+    0, -50, 2, 0, -51, -52, -53, 0, 4, -55, 0, -57, 3, 0, 0, -58, 1, -59,
+    0, -61, 1, -62, 0, 2, 0, -64, -68, 1, 0, 0, 1, 0, 0, 2, 0, 0, 0, -71,
+    -73, -74, 0, -75, 0, 0, -78, 1, -80, -84, -87, -88, -89, 3, 0, -91,
+    -92, 0, 3, -94, 0, 0, 0, -95, -98, -102, 0, -103, -104, -107, 1, 2,
+    -108, -112, 0, 2, 3, 1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 2, -116, -117,
+    -120, 1, 2, 2, 0, -123, 0, -125, 2, 0, 1, -127, 0, 0, -128, 1, -131,
+    -136, 1, -137, 0, 0, 0, 3, 0, 1, 4, 0, 1, -139, 0, 1, 0, 2, -146, 1, 0,
+    -148, -150, 0, -152, -153, -155, 0, 0, 0, -156, 0, -158, 2, 0, -159,
+    -161, 1, 5, -164, 2, 5, -166, 1, -168, 1, 0, 0, -171, -172, 0, 0, -176,
+    0, 0, 1, 1, 1, -177, -178, -179, -180, 0, -182, -185, 3, -186, 0, 0,
+    -194, 0, -196, 0, -198, -200, 0, 0, 2, -201, 0, 1, 6, 1, 0, 0, -206,
+    -207, -209, 4, -212, 4, 0, 0, -216, 0, -217, 3, -219, -222, -224, 0, 5,
+    -225, 4, 3, 1, -227, -229, 0, -238, 4, 0, 0, 0, 0, 1, -240, -242, 0, 0,
+    3, -243, 0, 1, 1, -245, 0, -247, 1, -248, 0, -250, -254, 0, 0, 0, -255,
+    0, -260, 0, -263, 1, -264, -265, 3, -266, 1, 0, 5, -277, -279, -280, 3,
+    0, -281, -283, 2, 3, 0, 2, 0, -286, 0, 1, 0, -288, 0, 0, 1, -289, -293,
+    2, -294, -297, 1, -302, -303, 1, -306, 1, 0, -307, 0, -310, 1, 1, 0,
+    -313, 1, -314, 1, -316, 0, 0, 0, 0, -318, 0, -329, -330, -333, -338, 0,
+    -347, -348, -351, 0, -352, -359, 0, -360, 0, -362, 14, 0, 6, 3, 1,
+    -364, 4, 2, 4, -378, 0, -382, -383, 1, -386, 12, 0, -391, 2, -392, 1,
+    -399, -402, 2, 1, 7, 1, 3, 0, -404, 8, 0, -408, -409, -410, 0, 0, -414,
+    -415, 0, 0, -416, 3, -422, -423, 5, 0, -427, -435, -437, 0, 1, 0, 0,
+    -438, -439, 0, 2, 5, 0, 0, 0, 1, 0, -443, -449, 14, 0, 0, 1, 6, 0, 2,
+    0, 0, 0, -451, 0, 0, 6, 3, 0, -454, -455, -456, 7, -458, -463, -464,
+    -469, -472, 1, 0, 0, -478, 1, 0, 4, -480, 0, 16, 1, 5, 7, -482, 0,
+    -484, 0, 0, -486, 0, 0, -488, -490, 0, 1, -492, -495, 0, -497, 0, -498,
+    1, 0, 0, 6, 0, -506, 1, 0, 0, -509, 0, -516, 0, 3, -517, 0, -519, -521,
+    -523, -524, -527, 3, 0, -528, 7, 1, -534, 0, 0, 0, 0, 0, 0, 7, -535,
+    -537, -539, 0, 1, 3, 0, 0, -540, 4, 1, -541, -547, -549, 0, 0, 0, 9, 1,
+    -550, -558, 18, 0, -564, 2, -567, -570, 0, 2, -572, 0, 1, 0, -575,
+    -576, 0, 3, -578, 0, -580, 0, -583, 0, -584, 1, -585, -588, 1, 3, 3,
+    -589, 1, 0, -592, 0, 0, 0, -593, 1, -598, 4, 3, -599, 0,
+};
+
+static int timezone_choice_index(const char *value) {
+    const uint32_t buckets = sizeof(timezone_choices_seeds) / sizeof(timezone_choices_seeds[0]);
+    const uint32_t count = sizeof(timezone_choices) / sizeof(timezone_choices[0]) - 1;
+    int seed = timezone_choices_seeds[choice_hash(0, value) % buckets];
+    uint32_t slot = seed < 0 ? (uint32_t)(-seed - 1) : choice_hash((uint32_t)seed, value) % count;
+    return strcmp(timezone_choices[slot], value) == 0 ? (int)slot : -1;
+}
+
+int parse_options(int argc, const char ***argv, Options* opts) {
+    static const char *const usages[] = {
+        "basic [options] positionals [[--] args]",
+        "basic [options] positionals ",
+        NULL,
+    };
+    reset_options(opts);
+    struct argparse_option options[] = {
+        OPT_HELP(),
+        OPT_STRING('z', "timezone", &opts->timezone, "time zone of the dates shown (default 'UTC')", NULL, 0, 0),
+        OPT_BOOLEAN('v', "verbose", &opts->verbose, "verbose output (default 0)", NULL, 0, 0),
+        OPT_END(),
+    };
+    struct argparse argparse;
+    argparse_init(&argparse, options, usages, 0);
+    argparse_describe(&argparse, 
+        "\nExample of choices read from a file",
+        "\nPositional arguments:"
+        "\n    event                 event to schedule\n"
+        "\nExample: sample7 --timezone Europe/Paris standup"
+    );
+    argc = argparse_parse(&argparse, argc, *argv);
+    // positionals
+    if (argc >= 1) {
+        opts->event = (*argv)[0];
+        (*argv)++; argc--;
+    } else {
+        printf("ERROR: expecting positional argument 'event'\n");
+        argparse_usage(&argparse);
+        exit(1);
+    }
+    // check choices
+    if (timezone_choice_index(opts->timezone) < 0) {
+        const char *nearest = nearest_choice(timezone_choices, opts->timezone);
+        printf("ERROR: 'timezone': invalid choice '%s'", opts->timezone);
+        if (nearest != NULL) {
+            printf(" (did you mean '%s'?)", nearest);
+        }
+        printf("\n");
+        exit(1);
+    }
+    return argc;
+}
+
+void dump_options(Options *opts) {
+    printf("timezone: %s\n", opts->timezone);
+    printf("verbose: %d\n", opts->verbose);
+    printf("event: %s\n", opts->event);
+}
@@ -0,0 +1,23 @@
+#ifndef __sample7_h__
+#define __sample7_h__
+
+typedef struct {
+    const char * timezone;
+    int verbose;
+    // positionals
+    const char * event;
+} Options;
+
+#ifdef __cplusplus
+extern "C" {
+#endif
+
+void reset_options(Options* opts);
+int parse_options(int argc, const char ***argv, Options* opts);
+void dump_options(Options *opts);
+
+#ifdef __cplusplus
+}
+#endif
+
+#endif
\ No newline at end of file
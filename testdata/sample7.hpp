@@ -0,0 +1,12 @@
+#pragma once
+
+#include "cxxopts.hpp"
+struct Options {
+    std::string timezone;
+    bool verbose;
+    // positionals
+    std::string event;
+};
+
+cxxopts::ParseResult parse_options(int argc, const char** argv, Options* opts);
+void dump_options(const Options& opts);
\ No newline at end of file
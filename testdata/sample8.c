@@ -0,0 +1,133 @@
+#include "sample8.h"
+#include "argparse.h"
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <limits.h>
+#include <math.h>
+#include <stdint.h>
+
+
+// seeded and finalized FNV-1a, as the perfect hashes were built with
+static uint32_t choice_hash(uint32_t seed, const char *value) {
+    uint32_t hash = 0x811c9dc5u ^ seed;
+    while (*value != '\0') {
+        hash = (hash ^ (unsigned char)*value++) * 0x1000193u;
+    }
+    hash ^= hash >> 16;
+    hash *= 0x85ebca6bu;
+    hash ^= hash >> 13;
+    hash *= 0xc2b2ae35u;
+    return hash ^ (hash >> 16);
+}
+
+// choice closest to value, NULL if none is within len / 3 edits
+static const char* nearest_choice(const char *const *choices, const char *value) {
+    size_t row[64];
+    size_t len = strlen(value), i, j;
+    const char *nearest = NULL;
+    size_t nearest_distance = len / 3 + 1;
+    if (len > 63) {
+        len = 63;
+    }
+    for (; *choices != NULL; choices++) {
+        const char *choice = *choices;
+        size_t choice_len = strlen(choice);
+        if (choice_len > 63) {
+            choice_len = 63;
+        }
+        for (j = 0; j <= len; j++) {
+            row[j] = j;
+        }
+        for (i = 1; i <= choice_len; i++) {
+            size_t diagonal = row[0];
+            row[0] = i;
+            for (j = 1; j <= len; j++) {
+                size_t above = row[j];
+                size_t cost = diagonal + (choice[i - 1] != value[j - 1]);
+                if (above + 1 < cost) {
+                    cost = above + 1;
+                }
+                if (row[j - 1] + 1 < cost) {
+                    cost = row[j - 1] + 1;
+                }
+                row[j] = cost;
+                diagonal = above;
+            }
+        }
+        if (row[len] < nearest_distance) {
+            nearest = choice;
+            nearest_distance = row[len];
+        }
+    }
+    return nearest;
+}
+
+void reset_options(Options* opts) {
+    opts->stage = "dev";
+    opts->app = NULL;
+}
+
+// --stage choices from stages.txt
+static const char *const stage_choices[] = {
+    "prod", "dev", NULL,
+};
+static const int stage_choices_seeds[] = {
+    -1, -2,
+};
+
+static int stage_choice_index(const char *value) {
+    const uint32_t buckets = sizeof(stage_choices_seeds) / sizeof(stage_choices_seeds[0]);
+    const uint32_t count = sizeof(stage_choices) / sizeof(stage_choices[0]) - 1;
+    int seed = stage_choices_seeds[choice_hash(0, value) % buckets];
+    uint32_t slot = seed < 0 ? (uint32_t)(-seed - 1) : choice_hash((uint32_t)seed, value) % count;
+    return strcmp(stage_choices[slot], value) == 0 ? (int)slot : -1;
+}
+
+int parse_options(int argc, const char ***argv, Options* opts) {
+    static const char *const usages[] = {
+        "basic [options] positionals [[--] args]",
+        "basic [options] positionals ",
+        NULL,
+    };
+    reset_options(opts);
+    struct argparse_option options[] = {
+        OPT_HELP(),
+        OPT_STRING('s', "stage", &opts->stage, "stage to deploy to (default 'dev')", NULL, 0, 0),
+        OPT_END(),
+    };
+    struct argparse argparse;
+    argparse_init(&argparse, options, usages, 0);
+    argparse_describe(&argparse, 
+        "\nExample of a choices file of two values",
+        "\nPositional arguments:"
+        "\n    app                   application to deploy\n"
+        "\nExample: sample8 --stage prod app"
+    );
+    argc = argparse_parse(&argparse, argc, *argv);
+    // positionals
+    if (argc >= 1) {
+        opts->app = (*argv)[0];
+        (*argv)++; argc--;
+    } else {
+        printf("ERROR: expecting positional argument 'app'\n");
+        argparse_usage(&argparse);
+        exit(1);
+    }
+    // check choices
+    if (stage_choice_index(opts->stage) < 0) {
+        const char *nearest = nearest_choice(stage_choices, opts->stage);
+        printf("ERROR: 'stage': invalid choice '%s'", opts->stage);
+        if (nearest != NULL) {
+            printf(" (did you mean '%s'?)", nearest);
+        }
+        printf("\n");
+        exit(1);
+    }
+    return argc;
+}
+
+void dump_options(Options *opts) {
+    printf("stage: %s\n", opts->stage);
+    printf("app: %s\n", opts->app);
+}
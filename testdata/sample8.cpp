@@ -0,0 +1,83 @@
+#include "sample8.hpp"
+#include <iostream>
+#include <string>
+#include <unordered_set>
+#include <vector>
+
+
+// choice closest to value, empty if none is within len / 3 edits
+static std::string nearest_choice(const std::unordered_set<std::string> &choices, const std::string &value) {
+    std::string nearest;
+    size_t nearest_distance = value.size() / 3 + 1;
+    std::vector<size_t> row(value.size() + 1);
+    for (const std::string &choice : choices) {
+        for (size_t j = 0; j < row.size(); j++) {
+            row[j] = j;
+        }
+        for (size_t i = 1; i <= choice.size(); i++) {
+            size_t diagonal = row[0];
+            row[0] = i;
+            for (size_t j = 1; j < row.size(); j++) {
+                size_t above = row[j];
+                size_t cost = diagonal + (choice[i - 1] != value[j - 1]);
+                if (above + 1 < cost) {
+                    cost = above + 1;
+                }
+                if (row[j - 1] + 1 < cost) {
+                    cost = row[j - 1] + 1;
+                }
+                row[j] = cost;
+                diagonal = above;
+            }
+        }
+        size_t distance = row[value.size()];
+        // the set is unordered, ties go to the smallest choice
+        if (distance < nearest_distance || (!nearest.empty() && distance == nearest_distance && choice < nearest)) {
+            nearest = choice;
+            nearest_distance = distance;
+        }
+    }
+    return nearest;
+}
+
+cxxopts::ParseResult parse_options(int argc, const char **argv, Options* opts) {
+    cxxopts::Options options("example", "Example of a choices file of two values");
+    // define all options
+    options.add_options()
+        ("h,help", "show this help message and exit")
+        ("s,stage", "stage to deploy to", cxxopts::value<std::string>()->default_value("dev"))
+        ("app", "application to deploy (required)", cxxopts::value<std::string>())
+    ;
+    // declare positionals
+    options.parse_positional("app");
+
+    cxxopts::ParseResult result = options.parse(argc, argv);
+    if (result.count("help")) {
+        std::cout << options.help() << std::endl;
+        std::cout << "positional arguments:\n";
+        std::cout << "  app               " << "application to deploy (required)\n";
+        std::cout << "\nExample: sample8 --stage prod app" << std::endl;
+        exit(0);
+    }
+    // Fill-up output struct
+    opts->stage = result["stage"].as<std::string>();
+    opts->app = result["app"].as<std::string>();
+    // check choices
+    // from stages.txt
+    static const std::unordered_set<std::string> stage_valid{
+        "dev", "prod",
+    };
+    if (stage_valid.count(opts->stage) == 0) {
+        const std::string nearest = nearest_choice(stage_valid, opts->stage);
+        const std::string message = "'stage': invalid choice '" + opts->stage + "'" +
+            (nearest.empty() ? "" : " (did you mean '" + nearest + "'?)");
+        std::cout << "ERROR: " << message << std::endl;
+        exit(1);
+    }
+    return result;
+}
+
+void dump_options(const Options &opts) {
+    std::cout << "stage: " << opts.stage << "\n";
+    std::cout << "app: " << opts.app << "\n";
+}
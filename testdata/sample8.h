@@ -0,0 +1,22 @@
+#ifndef __sample8_h__
+#define __sample8_h__
+
+typedef struct {
+    const char * stage;
+    // positionals
+    const char * app;
+} Options;
+
+#ifdef __cplusplus
+extern "C" {
+#endif
+
+void reset_options(Options* opts);
+int parse_options(int argc, const char ***argv, Options* opts);
+void dump_options(Options *opts);
+
+#ifdef __cplusplus
+}
+#endif
+
+#endif
\ No newline at end of file
@@ -0,0 +1,11 @@
+#pragma once
+
+#include "cxxopts.hpp"
+struct Options {
+    std::string stage;
+    // positionals
+    std::string app;
+};
+
+cxxopts::ParseResult parse_options(int argc, const char** argv, Options* opts);
+void dump_options(const Options& opts);
\ No newline at end of file
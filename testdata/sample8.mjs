@@ -0,0 +1,155 @@
+// https://github.com/75lb/command-line-args
+import commandLineArgs from 'command-line-args';
+// https://github.com/75lb/command-line-usage
+import commandLineUsage from 'command-line-usage';
+
+// thrown by Parser.parse(): status 0 for help (the usage is the
+// message), 1 for errors
+export class ParseError extends Error {
+  constructor(message, status) {
+    super(message);
+    this.name = 'ParseError';
+    this.status = status;
+  }
+};
+
+// choice closest to value, null if none is within length / 3 edits
+function nearestChoice(choices, value) {
+  let nearest = null;
+  let nearestDistance = Math.floor(value.length / 3) + 1;
+  const row = new Array(value.length + 1);
+  for (const choice of choices) {
+    for (let j = 0; j <= value.length; j++) {
+      row[j] = j;
+    }
+    for (let i = 1; i <= choice.length; i++) {
+      let diagonal = row[0];
+      row[0] = i;
+      for (let j = 1; j <= value.length; j++) {
+        const above = row[j];
+        row[j] = Math.min(above + 1, row[j - 1] + 1, diagonal + (choice[i - 1] === value[j - 1] ? 0 : 1));
+        diagonal = above;
+      }
+    }
+    if (row[value.length] < nearestDistance) {
+      nearest = choice;
+      nearestDistance = row[value.length];
+    }
+  }
+  return nearest;
+};
+
+// --stage choices from stages.txt
+const stage_choices = new Set([
+  "dev", "prod",
+]);
+
+export class Parser {
+  constructor() {
+    // Defaults for each of the options
+    this.defaults = Object.freeze({
+      stage: "dev",
+    });
+    const optionDefinitions = [
+      {
+        name: 'help',
+        description: 'show this help message and exit',
+        alias: 'h',
+        type: Boolean
+      },
+      {
+        name: 'stage',
+        description: 'stage to deploy to',
+        alias: 's',
+        type: String
+      },
+      {
+        name: 'positionals',
+        description: 'positional arguments (can omit --positionals) Corresponding to:\n>> {bold app} : application to deploy',
+        type: String,
+        multiple: true,
+        defaultOption: true
+      },
+    ];
+    // append default to help string
+    for (const opt of optionDefinitions) {
+      const default_ = this.defaults[opt.name];
+      if (typeof default_ !== "undefined") {
+        opt.description += default_ == null ? " (required)" : ` (default ${default_})`;
+      }
+    }
+    this.optionDefinitions = optionDefinitions;
+    // valid values of the choices options
+    this.stage_valid = stage_choices;
+    this.usageText = null;
+  }
+
+  usage() {
+    if (this.usageText === null) {
+      this.usageText = commandLineUsage([{
+        header: "Header for help",
+        content: "Description for help",
+      }, {
+        header: "Options",
+        optionList: this.optionDefinitions,
+      }, {
+        content: "Epilog"
+      }]);
+    }
+    return this.usageText;
+  }
+
+  // error followed by the usage
+  error(message) {
+    return new ParseError(`${message}\n${this.usage()}`, 1);
+  }
+
+  parse(argv) {
+    let rawOptions;
+    try {
+      rawOptions = commandLineArgs(this.optionDefinitions, { argv });
+    } catch (e) {
+      // unknown options, values given to flags...
+      throw new ParseError(`ERROR: ${e.message}`, 1);
+    }
+    // fill up with defaults the options not provided
+    const opts = {...this.defaults, ...rawOptions };
+    if (opts.help) {
+      throw new ParseError(this.usage(), 0);
+    }
+    for (const optName in opts) {
+      if (opts[optName] == null) {
+        throw this.error(`Invalid or no option passed for --${optName}`);
+      }
+    }
+    // Handle positionals
+    const exp_positionals = 1
+    const num_positionals = (typeof opts.positionals === "undefined") ? 0 : opts.positionals.length;
+    if (num_positionals != exp_positionals) {
+      throw this.error(`Expecting ${exp_positionals} positional argument(s), but got ${num_positionals}`);
+    }
+    opts.app = opts.positionals[0];
+    delete opts.positionals;
+    // check choices
+    if (!this.stage_valid.has(opts.stage)) {
+      const nearest = nearestChoice(this.stage_valid, opts.stage);
+      throw new ParseError(
+        `ERROR: 'stage': invalid choice '${opts.stage}'` +
+        (nearest === null ? '' : ` (did you mean '${nearest}'?)`), 1
+      );
+    }
+    return opts;
+  }
+};
+
+export function parseArgs() {
+  try {
+    return new Parser().parse(process.argv.slice(2));
+  } catch (e) {
+    if (!(e instanceof ParseError)) {
+      throw e;
+    }
+    console.log(e.message);
+    process.exit(e.status);
+  }
+};
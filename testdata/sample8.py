@@ -0,0 +1,150 @@
+"""CLI argument parsing"""
+
+import argparse
+import difflib
+import sys
+from dataclasses import dataclass
+
+
+class ChoiceSet:
+    """
+    large set of choices: hashed membership test, and errors suggesting
+    the nearest choice instead of listing all of them
+    """
+
+    __slots__ = ("values",)
+
+    def __init__(self, values):
+        self.values = frozenset(values)
+
+    def nearest(self, value: str):
+        """closest choice to an invalid value, or None"""
+        matches = difflib.get_close_matches(value, self.values, n=1)
+        return matches[0] if matches else None
+
+    def argument(self, type_=str):
+        """argparse type callable accepting only the choices"""
+
+        def parse(value: str):
+            if value not in self.values:
+                nearest = self.nearest(value)
+                hint = f" (did you mean {nearest!r}?)" if nearest else ""
+                raise argparse.ArgumentTypeError(
+                    f"invalid choice: {value!r}{hint}"
+                )
+            return type_(value)
+
+        parse.__name__ = "choice"  # named in argparse invalid value errors
+        return parse
+
+
+STAGES_CHOICES = ChoiceSet(
+    (
+        "dev", "prod",
+    )
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Args:
+    """Typed CLI arguments, as returned by parse_typed_args"""
+
+    stage: str
+    app: str
+
+
+def _typed_args(args: argparse.Namespace) -> Args:
+    """Args of the parsed namespace"""
+    return Args(
+        args.stage,
+        args.app,
+    )
+
+
+def build_parser(
+    parser_class: type = argparse.ArgumentParser,
+) -> argparse.ArgumentParser:
+    """argparse parser of the program"""
+    parser = parser_class(
+        description="Example of a choices file of two values",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+        epilog="Example: sample8 --stage prod app",
+    )
+    parser.add_argument(
+        "-s",
+        "--stage",
+        type=STAGES_CHOICES.argument(str),
+        default="dev",
+        help="stage to deploy to",
+    )
+    parser.add_argument(
+        "app",
+        type=str,
+        help="application to deploy",
+    )
+    return parser
+
+
+def parse_argv(parser: argparse.ArgumentParser, argv: list) -> tuple:
+    """args, unknown of argv (the arguments after the program name)"""
+    return parser.parse_known_args(argv)
+
+
+def parse_args() -> tuple:
+    """CLI argument parsing entry point"""
+    argv = sys.argv[1:]
+    parser = build_parser()
+    return parse_argv(parser, argv)  # args, unknown
+
+
+def parse_typed_args() -> tuple:
+    """CLI argument parsing entry point returning typed Args"""
+    args, unknown = parse_args()
+    return _typed_args(args), unknown
+
+
+class ParseError(Exception):
+    """
+    command line rejected by Parser.parse (status 2), or help
+    asked for (status 0, the help is the message)
+    """
+
+    def __init__(self, message: str, status: int):
+        super().__init__(message)
+        self.status = status
+
+
+class RaisingArgumentParser(argparse.ArgumentParser):
+    """ArgumentParser raising ParseError instead of printing and exiting"""
+
+    def print_help(self, file=None):
+        raise ParseError(self.format_help(), 0)
+
+    def error(self, message: str):
+        raise ParseError(f"{self.prog}: error: {message}", 2)
+
+
+class Parser:
+    """
+    parser built once, parse() can then be called any number of
+    times, from any thread, and raises ParseError instead of exiting
+    """
+
+    def __init__(self):
+        self._parser = build_parser(RaisingArgumentParser)
+
+    def parse(self, argv: list) -> tuple:
+        """args, unknown of argv (the arguments after the program name)"""
+        return parse_argv(self._parser, argv)
+
+    def parse_typed(self, argv: list) -> tuple:
+        """typed Args, unknown of argv"""
+        args, unknown = self.parse(argv)
+        return _typed_args(args), unknown
+
+
+if __name__ == "__main__":
+    args, unknown = parse_args()
+    print(f"Parsed arguments: {args}")
+    if unknown:
+        print(f"Unknown arguments: {unknown}")
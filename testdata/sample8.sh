@@ -0,0 +1,156 @@
+# ' (did you mean ...?)' for the key of the associative array
+# named $1 sharing the longest prefix (over half) with $2
+nearest_choice() {
+    local -n choices_ref=$1
+    local choice nearest="" len best=$(( ${#2} / 2 + 1 ))
+    for choice in "${!choices_ref[@]}"; do
+        len=0
+        while [[ $len -lt ${#choice} && "${choice:len:1}" == "${2:len:1}" ]]; do
+            len=$((len + 1))
+        done
+        # the array is unordered, ties go to the smallest choice
+        if (( len > best )) || [[ $len -eq $best && ( -z "$nearest" || "$choice" < "$nearest" ) ]]; then
+            nearest="$choice"
+            best=$len
+        fi
+    done
+    if [ -n "$nearest" ]; then
+        echo " (did you mean '$nearest'?)"
+    fi
+}
+
+# --stage choices from stages.txt
+declare -gA stage_choices=(
+    ['dev']=1 ['prod']=1
+)
+# Usage function
+usage() {
+    echo "Usage: $0 [options]"
+    echo ""
+    echo "Example of a choices file of two values"
+    echo ""
+    echo "positional arguments:"
+    echo "  app APP                 : application to deploy (required)"
+    echo ""
+    echo "options:"
+    echo '  -h, --help              : show this help message and exit'
+    echo '  -s STAGE, --stage STAGE : stage to deploy to (default "dev")'
+    echo ""
+    echo "Example: sample8 --stage prod app"
+    exit "$1"
+}
+
+# check if a valid argument follows
+check_valid_arg() {
+    case "$2" in
+        -*|'')
+            echo "ERROR: $1 requires a value." >&2
+            usage 1
+            ;;
+    esac
+}
+
+# Argument parsing function
+parse_args() {
+    # split --a=xx -b=yy -cde into --a xx -b yy -c -d -e
+    # for more unified processing later on
+    local i ch arg
+    local -a new_args
+    for arg in "$@"; do
+        case "$arg" in
+            --*=*) # convert --aa=xx into --aa xx
+                right=${arg#*=}  # remove up to first =
+                left=${arg%="$right"}  # remove right hand side
+                new_args+=("$left" "$right")
+                ;;
+            --*)
+                new_args+=("$arg")
+                ;;
+            -*) # convert -abc=yy into -a -b -c yy
+                i=1
+                while [ "$i" -lt "${#arg}" ]; do
+                    # Get character at position i (0 based)
+                    ch=$(expr "$arg" : "^.\{$i\}\(.\)")
+                    case "${ch}" in
+                        =) rest=$(expr "$arg" : "^..\{$i\}\(.*\)")
+                           new_args+=("$rest"); break ;;
+                        *) new_args+=("-${ch}") ;;
+                    esac
+                    i=$((i+1))
+                done
+                ;;
+            *)
+                new_args+=("$arg")
+                ;;
+        esac
+    done
+    set -- "${new_args[@]}"
+
+    remaining_args=""
+    local positional_idx=0
+    while [ "$#" -gt 0 ]; do
+        case "$1" in
+            --stage|-s)
+                check_valid_arg "$1" "$2"
+                stage="$2"
+                shift;;
+            --help|-h)
+                usage 0
+                ;;
+            --)
+                shift
+                remaining_args="$*"
+                break
+                ;;
+            -*)
+                echo "ERROR: Unknown option: $1" >&2
+                usage 1
+                ;;
+            *) # handle positional arguments
+                if [ $positional_idx -eq 0 ]; then
+                    app="$1"
+                else
+                    echo "ERROR: Unexpected positional argument: $1" >&2
+                    usage 1
+                fi
+                positional_idx=$(( positional_idx + 1 ))
+                ;;
+        esac
+        shift
+    done
+}
+
+# Validate arguments
+validate_args() {
+    if [[ -z "$stage" || -z "${stage_choices[$stage]+x}" ]]; then
+        echo "ERROR: --stage: invalid choice '$stage'$(nearest_choice stage_choices "$stage")" >&2
+        usage 1
+    fi
+    if [ -z "$app" ]; then
+        echo "ERROR: app is required" >&2
+        usage 1
+    fi
+}
+
+# Dump argument values for debug
+dump_args() {
+    echo "Parsed arguments:"
+    echo "stage: $stage"
+    echo "app: $app"
+    echo "remaining_args:"
+    for arg in $remaining_args; do
+        echo "  $arg"
+    done
+}
+
+# Main entry point, parse CLI
+get_cli_args() {
+    # set defaults
+    stage="dev"
+    parse_args "$@"
+    validate_args
+}
+
+# Example of use:
+# get_cli_args "$@"
+# dump_args
\ No newline at end of file
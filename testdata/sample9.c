@@ -0,0 +1,57 @@
+#include "sample9.h"
+#include "argparse.h"
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <limits.h>
+#include <math.h>
+
+
+void reset_options(Options* opts) {
+    opts->input = NULL;
+    opts->output = "-";
+    opts->log = "sample9.log";
+    opts->words = "stages.txt";
+}
+
+int parse_options(int argc, const char ***argv, Options* opts) {
+    static const char *const usages[] = {
+        "basic [options] positionals [[--] args]",
+        "basic [options] positionals ",
+        NULL,
+    };
+    reset_options(opts);
+    struct argparse_option options[] = {
+        OPT_HELP(),
+        OPT_STRING('o', "output", &opts->output, "file to write, - for stdout (default '-')", NULL, 0, 0),
+        OPT_STRING('\0', "log", &opts->log, "file to append the log to (default 'sample9.log')", NULL, 0, 0),
+        OPT_STRING('\0', "words", &opts->words, "word list, mapped instead of read (default 'stages.txt')", NULL, 0, 0),
+        OPT_END(),
+    };
+    struct argparse argparse;
+    argparse_init(&argparse, options, usages, 0);
+    argparse_describe(&argparse, 
+        "\nExample of file arguments, opened on first use in python",
+        "\nPositional arguments:"
+        "\n    input                 file to read, - for stdin\n"
+        "\nExample: sample9 stages.txt --output copy.txt"
+    );
+    argc = argparse_parse(&argparse, argc, *argv);
+    // positionals
+    if (argc >= 1) {
+        opts->input = (*argv)[0];
+        (*argv)++; argc--;
+    } else {
+        printf("ERROR: expecting positional argument 'input'\n");
+        argparse_usage(&argparse);
+        exit(1);
+    }
+    return argc;
+}
+
+void dump_options(Options *opts) {
+    printf("input: %s\n", opts->input);
+    printf("output: %s\n", opts->output);
+    printf("log: %s\n", opts->log);
+    printf("words: %s\n", opts->words);
+}
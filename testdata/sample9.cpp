@@ -0,0 +1,39 @@
+#include "sample9.hpp"
+#include <iostream>
+
+
+cxxopts::ParseResult parse_options(int argc, const char **argv, Options* opts) {
+    cxxopts::Options options("example", "Example of file arguments, opened on first use in python");
+    // define all options
+    options.add_options()
+        ("h,help", "show this help message and exit")
+        ("input", "file to read, - for stdin (required)", cxxopts::value<std::string>())
+        ("o,output", "file to write, - for stdout", cxxopts::value<std::string>()->default_value("-"))
+        ("log", "file to append the log to", cxxopts::value<std::string>()->default_value("sample9.log"))
+        ("words", "word list, mapped instead of read", cxxopts::value<std::string>()->default_value("stages.txt"))
+    ;
+    // declare positionals
+    options.parse_positional("input");
+
+    cxxopts::ParseResult result = options.parse(argc, argv);
+    if (result.count("help")) {
+        std::cout << options.help() << std::endl;
+        std::cout << "positional arguments:\n";
+        std::cout << "  input             " << "file to read, - for stdin (required)\n";
+        std::cout << "\nExample: sample9 stages.txt --output copy.txt" << std::endl;
+        exit(0);
+    }
+    // Fill-up output struct
+    opts->input = result["input"].as<std::string>();
+    opts->output = result["output"].as<std::string>();
+    opts->log = result["log"].as<std::string>();
+    opts->words = result["words"].as<std::string>();
+    return result;
+}
+
+void dump_options(const Options &opts) {
+    std::cout << "input: " << opts.input << "\n";
+    std::cout << "output: " << opts.output << "\n";
+    std::cout << "log: " << opts.log << "\n";
+    std::cout << "words: " << opts.words << "\n";
+}
@@ -0,0 +1,13 @@
+#pragma once
+
+#include "cxxopts.hpp"
+struct Options {
+    std::string output;
+    std::string log;
+    std::string words;
+    // positionals
+    std::string input;
+};
+
+cxxopts::ParseResult parse_options(int argc, const char** argv, Options* opts);
+void dump_options(const Options& opts);
\ No newline at end of file
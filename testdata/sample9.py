@@ -0,0 +1,240 @@
+"""CLI argument parsing"""
+
+import argparse
+import io
+import mmap
+import os
+import sys
+from dataclasses import dataclass
+
+
+class LazyFile:
+    """
+    file argument, checked when parsed but only opened on first access to
+    file (or to view, a zero-copy memoryview of a read-only mmap)
+    """
+
+    __slots__ = ("path", "kind", "mode", "use_mmap", "_file", "_view")
+
+    def __init__(self, path: str, kind: str, mode: str, use_mmap: bool):
+        self.path = path
+        self.kind = kind
+        self.mode = mode
+        self.use_mmap = use_mmap
+        self._file = None
+        self._view = None
+
+    @classmethod
+    def argument(cls, kind: str, mode: str, use_mmap: bool):
+        """argparse type callable of an infile/outfile argument"""
+
+        def parse(path: str) -> "LazyFile":
+            if path == "-":
+                if use_mmap:
+                    raise argparse.ArgumentTypeError("can't mmap stdin")
+            elif kind == "infile" and not os.path.isfile(path):
+                raise argparse.ArgumentTypeError(
+                    f"can't open '{path}': no such file"
+                )
+            elif kind == "outfile":
+                directory = os.path.dirname(path) or "."
+                if not os.path.isdir(directory):
+                    raise argparse.ArgumentTypeError(
+                        f"can't create '{path}': no such directory"
+                    )
+            return cls(path, kind, mode, use_mmap)
+
+        parse.__name__ = kind  # named in argparse invalid value errors
+        return parse
+
+    @property
+    def opened(self) -> bool:
+        """whether the file was accessed (so opened) already"""
+        return self._file is not None
+
+    @property
+    def file(self):
+        """file object (mmap object for mmap arguments), opened on first use"""
+        if self._file is None:
+            if self.path == "-":
+                std = sys.stdin if self.kind == "infile" else sys.stdout
+                self._file = std.buffer if "b" in self.mode else std
+            elif self.use_mmap:
+                with open(self.path, "rb") as f:
+                    if os.fstat(f.fileno()).st_size == 0:
+                        # empty files can't be mapped
+                        self._file = io.BytesIO()
+                    else:
+                        self._file = mmap.mmap(
+                            f.fileno(), 0, access=mmap.ACCESS_READ
+                        )
+            else:
+                encoding = None if "b" in self.mode else "utf-8"
+                # pylint: disable=consider-using-with
+                self._file = open(self.path, self.mode, encoding=encoding)
+        return self._file
+
+    @property
+    def view(self) -> memoryview:
+        """read-only memoryview of the whole file contents, no copies made"""
+        if not self.use_mmap:
+            raise TypeError(f"{self.path}: view needs an mmap argument")
+        if self._view is None:
+            empty = isinstance(self.file, io.BytesIO)
+            self._view = memoryview(b"" if empty else self.file)
+        return self._view
+
+    def close(self) -> None:
+        """close the file if it was opened (std streams are left open)"""
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._file is not None and self.path != "-":
+            self._file.close()
+        self._file = None
+
+    def __enter__(self):
+        return self.file
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __getattr__(self, name: str):
+        # read(), write(), seek()... of the underlying file. Private and
+        # special names (as looked up by copy, pickle...) don't open it
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.file, name)
+
+    def __iter__(self):
+        return iter(self.file)
+
+    def __fspath__(self) -> str:
+        return self.path
+
+    def __str__(self) -> str:
+        return self.path
+
+    def __repr__(self) -> str:
+        return f"{self.kind}({self.path!r})"
+
+
+@dataclass(frozen=True, slots=True)
+class Args:
+    """Typed CLI arguments, as returned by parse_typed_args"""
+
+    input: LazyFile
+    output: LazyFile
+    log: LazyFile
+    words: LazyFile
+
+
+def _typed_args(args: argparse.Namespace) -> Args:
+    """Args of the parsed namespace"""
+    return Args(
+        args.input,
+        args.output,
+        args.log,
+        args.words,
+    )
+
+
+def build_parser(
+    parser_class: type = argparse.ArgumentParser,
+) -> argparse.ArgumentParser:
+    """argparse parser of the program"""
+    parser = parser_class(
+        description="Example of file arguments, opened on first use in python",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+        epilog="Example: sample9 stages.txt --output copy.txt",
+    )
+    parser.add_argument(
+        "input",
+        type=LazyFile.argument("infile", "r", False),
+        help="file to read, - for stdin",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=LazyFile.argument("outfile", "w", False),
+        default=LazyFile("-", "outfile", "w", False),
+        help="file to write, - for stdout",
+    )
+    parser.add_argument(
+        "--log",
+        type=LazyFile.argument("outfile", "a", False),
+        default=LazyFile("sample9.log", "outfile", "a", False),
+        help="file to append the log to",
+    )
+    parser.add_argument(
+        "--words",
+        type=LazyFile.argument("infile", "r", True),
+        default=LazyFile("stages.txt", "infile", "r", True),
+        help="word list, mapped instead of read",
+    )
+    return parser
+
+
+def parse_argv(parser: argparse.ArgumentParser, argv: list) -> tuple:
+    """args, unknown of argv (the arguments after the program name)"""
+    return parser.parse_known_args(argv)
+
+
+def parse_args() -> tuple:
+    """CLI argument parsing entry point"""
+    argv = sys.argv[1:]
+    parser = build_parser()
+    return parse_argv(parser, argv)  # args, unknown
+
+
+def parse_typed_args() -> tuple:
+    """CLI argument parsing entry point returning typed Args"""
+    args, unknown = parse_args()
+    return _typed_args(args), unknown
+
+
+class ParseError(Exception):
+    """
+    command line rejected by Parser.parse (status 2), or help
+    asked for (status 0, the help is the message)
+    """
+
+    def __init__(self, message: str, status: int):
+        super().__init__(message)
+        self.status = status
+
+
+class RaisingArgumentParser(argparse.ArgumentParser):
+    """ArgumentParser raising ParseError instead of printing and exiting"""
+
+    def print_help(self, file=None):
+        raise ParseError(self.format_help(), 0)
+
+    def error(self, message: str):
+        raise ParseError(f"{self.prog}: error: {message}", 2)
+
+
+class Parser:
+    """
+    parser built once, parse() can then be called any number of
+    times, from any thread, and raises ParseError instead of exiting
+    """
+
+    def __init__(self):
+        self._parser = build_parser(RaisingArgumentParser)
+
+    def parse(self, argv: list) -> tuple:
+        """args, unknown of argv (the arguments after the program name)"""
+        return parse_argv(self._parser, argv)
+
+    def parse_typed(self, argv: list) -> tuple:
+        """typed Args, unknown of argv"""
+        args, unknown = self.parse(argv)
+        return _typed_args(args), unknown
+
+
+if __name__ == "__main__":
+    args, unknown = parse_args()
+    print(f"Parsed arguments: {args}")
+    if unknown:
+        print(f"Unknown arguments: {unknown}")
@@ -1,268 +1,277 @@
-let argumentCounter = 0;
+// The arguments live in an ArgumentModel (model.js). Only the ones in view,
+// plus a few around them, have a form in the DOM: rows are absolutely
+// positioned over a spacer as tall as the whole list, and created/dropped
+// as the list scrolls, so specs with hundreds of arguments stay responsive.
 
-function addArgument(argument = {}) {
-    argumentCounter++;
+const model = new ArgumentModel();
 
-    const container = document.getElementById('argumentsContainer');
-    const argumentDiv = document.createElement('div');
-    argumentDiv.className = 'argument';
-    argumentDiv.id = `argument_${argumentCounter}`;
+const ROW_GAP = 20;                 // vertical space between rows, in px
+const DEFAULT_ROW_HEIGHT = 420;     // until a rendered row can be measured
+let rowHeight = 0;                  // row height + gap, measured once
+const renderedRows = new Map();     // argument id -> row div
+
+function escapeAttr(value) {
+    return String(value).replace(/&/g, '&amp;').replace(/"/g, '&quot;').replace(/</g, '&lt;');
+}
 
-    const {
-        name = '', short = '', type = 'string',
-            default: defaultValue = '', metavar = '', dest = '', multiple = false, required = false, help = '', choices = ''
-    } = argument;
+function choicesHTML(choices) {
+    return choices.map(c => `<option value="${escapeAttr(c)}">${escapeAttr(c)}</option>`).join('');
+}
 
-    argumentDiv.innerHTML = `
-        <button type="button" class="close-btn tooltip" onclick="removeArgument(${argumentCounter})">
+function groupHTML(id, arg) {
+    return `
+        <button type="button" class="close-btn tooltip" onclick="removeArgument(${id})">
             ×
             <span class="tooltip-text">Remove argument</span>
         </button>
         <div class="tooltip">
-            <label for="argName_${argumentCounter}">Name:</label>
-            <input type="text" id="argName_${argumentCounter}" value="${name}" class="name-option" required 
-                   oninput="handleNameChange(${argumentCounter})">
+            <label for="argGroup_${id}">Group:</label>
+            <input type="text" id="argGroup_${id}" data-field="group" value="${escapeAttr(arg.group)}" class="name-option" required
+                   oninput="updateField(${id}, this)">
+            <span class="tooltip-text">All the arguments of this group, defined in the spec or its includes.</span>
+        </div>
+    `;
+}
+
+function argumentHTML(id, arg) {
+    if (arg.group !== undefined) {
+        return groupHTML(id, arg);
+    }
+    const type = arg.type;
+    return `
+        <button type="button" class="close-btn tooltip" onclick="removeArgument(${id})">
+            ×
+            <span class="tooltip-text">Remove argument</span>
+        </button>
+        <div class="tooltip">
+            <label for="argName_${id}">Name:</label>
+            <input type="text" id="argName_${id}" data-field="name" value="${escapeAttr(arg.name)}" class="name-option" required
+                   oninput="updateField(${id}, this)">
             <span class="tooltip-text">Should be preceded by '--' for a long option. No prefix for positionals.</span>
         </div>
         <div class="tooltip">
-            <label for="argShort_${argumentCounter}">Short (optional):</label>
-            <input type="text" id="argShort_${argumentCounter}" value="${short}" ${name.startsWith('--') ? '' : 'disabled'} class="short-option">
+            <label for="argShort_${id}">Short (optional):</label>
+            <input type="text" id="argShort_${id}" data-field="short" value="${escapeAttr(arg.short)}" class="short-option"
+                   oninput="updateField(${id}, this)">
             <span class="tooltip-text">Optional. Precede by '-'.</span>
         </div>
         <div class="type">
-          <label for="argType_${argumentCounter}">Type:</label>
-          <select id="argType_${argumentCounter}" onchange="handleTypeChange(${argumentCounter})">
+          <label for="argType_${id}">Type:</label>
+          <select id="argType_${id}" data-field="type" onchange="updateField(${id}, this)">
               <option value="string" ${type === 'string' ? 'selected' : ''}>string</option>
               <option value="flag" ${type === 'flag' ? 'selected' : ''}>flag</option>
               <option value="int" ${type === 'int' ? 'selected' : ''}>int</option>
               <option value="float" ${type === 'float' ? 'selected' : ''}>float</option>
+              <option value="infile" ${type === 'infile' ? 'selected' : ''}>infile</option>
+              <option value="outfile" ${type === 'outfile' ? 'selected' : ''}>outfile</option>
           </select>
         </div>
         <div class="tooltip">
-            <label for="argDefault_${argumentCounter}">Default (optional):</label>
-            <input type="text" id="argDefault_${argumentCounter}" value="${defaultValue}" placeholder="Enter a default value" ${type === 'flag' ? 'placeholder="true/false only"' : ''} class="default-option">
+            <label for="argDefault_${id}">Default (optional):</label>
+            <input type="text" id="argDefault_${id}" data-field="default" value="${escapeAttr(arg.default)}" class="default-option"
+                   oninput="updateField(${id}, this)">
             <span class="tooltip-text">Enter a default value if applicable.</span>
         </div>
         <div class="tooltip">
-            <label for="argMetavar_${argumentCounter}">Metavar (optional):</label>
-            <input type="text" id="argMetavar_${argumentCounter}" value="${metavar}" class="grey-placeholder metavar-option" placeholder="uses name if empty">
+            <label for="argMetavar_${id}">Metavar (optional):</label>
+            <input type="text" id="argMetavar_${id}" data-field="metavar" value="${escapeAttr(arg.metavar)}" class="grey-placeholder metavar-option" placeholder="uses name if empty"
+                   oninput="updateField(${id}, this)">
             <span class="tooltip-text">Displayed in help messages.</span>
         </div>
         <div class="tooltip">
-            <label for="argDest_${argumentCounter}">Dest (optional):</label>
-            <input type="text" id="argDest_${argumentCounter}" value="${dest}" class="grey-placeholder dest-option" placeholder="uses name if empty">
+            <label for="argDest_${id}">Dest (optional):</label>
+            <input type="text" id="argDest_${id}" data-field="dest" value="${escapeAttr(arg.dest)}" class="grey-placeholder dest-option" placeholder="uses name if empty"
+                   oninput="updateField(${id}, this)">
             <span class="tooltip-text">Variable name to store the value.</span>
         </div>
         <div class="tooltip">
-            <label for="argHelp_${argumentCounter}">Help:</label>
-            <input type="text" class="wider-text" id="argHelp_${argumentCounter}" value="${help}" placeholder="required help" required>
+            <label for="argHelp_${id}">Help:</label>
+            <input type="text" class="wider-text" id="argHelp_${id}" data-field="help" value="${escapeAttr(arg.help)}" placeholder="required help" required
+                   oninput="updateField(${id}, this)">
         </div>
         <div class="multiple">
-          <label for="argMultiple_${argumentCounter}">Multiple:</label>
-          <input type="checkbox" id="argMultiple_${argumentCounter}" ${multiple ? 'checked' : ''}>
+          <label for="argMultiple_${id}">Multiple:</label>
+          <input type="checkbox" id="argMultiple_${id}" data-field="multiple" onchange="updateField(${id}, this)" ${arg.multiple ? 'checked' : ''}>
         </div>
         <div class="required">
-          <label for="argRequired${argumentCounter}">Required:</label>
-          <input type="checkbox" id="argRequired_${argumentCounter}" onchange="handleRequiredChange(${argumentCounter})" ${required ? 'checked' : ''}>
+          <label for="argRequired_${id}">Required:</label>
+          <input type="checkbox" id="argRequired_${id}" data-field="required" onchange="updateField(${id}, this)" ${arg.required ? 'checked' : ''}>
         </div>
         <div class="choices-row tooltip">
-            <label for="argChoices_${argumentCounter}">Choices (optional):</label>
+            <label for="argChoices_${id}">Choices (optional):</label>
             <div class="choices-container">
-                <select id="argChoices_${argumentCounter}" class="choices-select">
-                    ${choices.split(',').filter(c => c.trim()).map(c => 
-                        `<option value="${c.trim()}">${c.trim()}</option>`
-                    ).join('')}
+                <select id="argChoices_${id}" class="choices-select">
+                    ${choicesHTML(arg.choices)}
                 </select>
-                <input type="text" class="choices-input" id="newChoice_${argumentCounter}" 
+                <input type="text" class="choices-input" id="newChoice_${id}"
                        placeholder="Add new choice">
-                <button class="choices-add-btn" onclick="addNewChoice(${argumentCounter})">Add</button>
-                <button class="choices-remove-btn" onclick="removeSelectedChoice(${argumentCounter})" 
-                        ${!choices ? 'disabled' : ''}>Remove</button>
+                <button type="button" class="choices-add-btn" onclick="addNewChoice(${id})">Add</button>
+                <button type="button" class="choices-remove-btn" onclick="removeSelectedChoice(${id})">Remove</button>
             </div>
             <span class="tooltip-text">Add or remove valid choices for this argument.</span>
         </div>
     `;
-
-    container.appendChild(argumentDiv);
 }
 
-function handleNameChange(id) {
-    const nameField = document.getElementById(`argName_${id}`);
-    const shortField = document.getElementById(`argShort_${id}`);
-    const defaultField = document.getElementById(`argDefault_${id}`);
-    const requiredField = document.getElementById(`argRequired_${id}`);
+const DEFAULT_PLACEHOLDERS = {
+    flag: 'true/false only',
+    int: 'Enter an integer value',
+    float: 'Enter a float value',
+    string: 'Enter a default value',
+    infile: 'Enter a default path',
+    outfile: 'Enter a default path',
+};
+
+// bring a row in line with the model: values changed by the rules of
+// ArgumentModel.update, enabled fields and error marks of the last export
+function syncArgument(div, id) {
+    const arg = model.get(id);
+    const invalid = model.byId.get(id).invalid || [];
+    for (const field of div.querySelectorAll('[data-field]')) {
+        const name = field.dataset.field;
+        if (field !== document.activeElement) {
+            if (field.type === 'checkbox') {
+                field.checked = arg[name];
+            } else {
+                field.value = arg[name];
+            }
+        }
+        field.classList.toggle('error', invalid.includes(name));
+    }
+    if (arg.group !== undefined) {
+        return;
+    }
+
+    const positional = isPositionalName(arg.name);
+    const defaultField = div.querySelector('[data-field="default"]');
+    defaultField.disabled = positional || arg.required;
+    defaultField.placeholder = DEFAULT_PLACEHOLDERS[arg.type];
+    div.querySelector('[data-field="short"]').disabled = !arg.name.startsWith('--');
+    div.querySelector('[data-field="required"]').disabled = positional || arg.type === 'flag';
 
-    const name = nameField.value
-    if (name.startsWith('-') && !name.startsWith('--') && name != "-") {
-        nameField.value = '-' + name
+    const choices = div.querySelector('.choices-select');
+    if (choices.options.length !== arg.choices.length) {
+        choices.innerHTML = choicesHTML(arg.choices);
     }
+    div.querySelector('.choices-remove-btn').disabled = arg.choices.length === 0;
+}
+
+function createRow(id) {
+    const div = document.createElement('div');
+    div.className = 'argument';
+    div.id = `argument_${id}`;
+    div.innerHTML = argumentHTML(id, model.get(id));
+    syncArgument(div, id);
+    document.getElementById('argumentsSpacer').appendChild(div);
+    renderedRows.set(id, div);
+    return div;
+}
 
-    const isPositional = nameField.value != "" && !nameField.value.startsWith('--');
+function dropRow(id) {
+    renderedRows.get(id).remove();
+    renderedRows.delete(id);
+}
 
-    // Enable or disable default based on whether it's positional or not
-    if (isPositional) {
-      defaultField.value = "";
+// create the rows entering the view, drop the ones that left it
+function renderRows() {
+    const container = document.getElementById('argumentsContainer');
+    if (rowHeight === 0 && model.length > 0) {
+        const id = model.rows[0].id;
+        const div = renderedRows.get(id) || createRow(id);
+        rowHeight = (div.offsetHeight || DEFAULT_ROW_HEIGHT) + ROW_GAP;
+    }
+    document.getElementById('argumentsSpacer').style.height = `${model.length * rowHeight}px`;
+
+    const { first, last } = visibleRange(
+        container.scrollTop, container.clientHeight, rowHeight || DEFAULT_ROW_HEIGHT, model.length);
+    const visible = new Set();
+    for (let idx = first; idx < last; idx++) {
+        const id = model.rows[idx].id;
+        visible.add(id);
+        const div = renderedRows.get(id) || createRow(id);
+        div.style.top = `${idx * rowHeight}px`;
+    }
+    for (const id of [...renderedRows.keys()]) {
+        if (!visible.has(id)) {
+            dropRow(id);
+        }
     }
-    defaultField.disabled = isPositional;
-    requiredField.disabled = isPositional;
-    requiredField.checked = isPositional;
-    shortField.disabled = isPositional;
 }
 
-function handleRequiredChange(id) {
-    const required = document.getElementById(`argRequired_${id}`);
-    const defaultField = document.getElementById(`argDefault_${id}`);
-    if (required.checked) {
-      defaultField.disabled = true;
-      defaultField.value = "";
-    } else {
-      defaultField.disabled = false;
+let renderPending = false;
+
+function scheduleRender() {
+    if (!renderPending) {
+        renderPending = true;
+        requestAnimationFrame(() => {
+            renderPending = false;
+            renderRows();
+        });
     }
 }
 
-function handleTypeChange(id) {
-    const typeField = document.getElementById(`argType_${id}`);
-    const defaultField = document.getElementById(`argDefault_${id}`);
-    const required = document.getElementById(`argRequired_${id}`);
-    const type = typeField.value;
-
-    if (type === "flag") {
-        defaultField.disabled = false;
-        defaultField.value = "false";
-        defaultField.placeholder = "true/false only";
-        required.checked = false;
-        required.disabled = true;
-    } else {
-        required.disabled = false;
-        if (type === "int") {
-            defaultField.disabled = false;
-            defaultField.value = "";
-            defaultField.placeholder = "Enter an integer value";
-        } else if (type === "float") {
-            defaultField.disabled = false;
-            defaultField.value = "";
-            defaultField.placeholder = "Enter a float value";
-        } else {
-            defaultField.disabled = false;
-            defaultField.value = "";
-            defaultField.placeholder = "Enter a default value";
-        }
+function scrollToArgument(id) {
+    const idx = model.rows.findIndex(row => row.id === id);
+    document.getElementById('argumentsContainer').scrollTop = idx * rowHeight;
+    renderRows();
+}
+
+function addArgument(argument) {
+    const id = model.add(argument);
+    renderRows();
+    if (argument === undefined) {
+        // added from the button, show it
+        scrollToArgument(id);
     }
 }
 
 function removeArgument(id) {
-    const argumentDiv = document.getElementById(`argument_${id}`);
-    argumentDiv.remove();
+    model.remove(id);
+    dropRow(id);
+    renderRows();
+}
+
+function updateField(id, element) {
+    const value = element.type === 'checkbox' ? element.checked : element.value;
+    const changed = model.update(id, element.dataset.field, value);
+    if (changed || element.classList.contains('error')) {
+        syncArgument(renderedRows.get(id), id);
+    }
 }
 
+document.getElementById('argumentsContainer').addEventListener('scroll', scheduleRender);
+window.addEventListener('resize', () => {
+    rowHeight = 0;
+    scheduleRender();
+});
+
 document.getElementById('argumentForm').addEventListener('submit', function(e) {
     e.preventDefault();
     generateTOML();
 });
 
 function generateTOML() {
-    const programName = document.getElementById('programName').value;
-    const programDescription = document.getElementById('programDescription').value;
-    const programEpilog = document.getElementById('programEpilog').value;
-
-    let hasError = false;
-    let tomlContent = `[program]\nname = "${programName}"\ndescription = "${programDescription}"\n`;
-    if (programEpilog) {
-        tomlContent += `epilog = "${programEpilog}"\n`;
+    const program = {
+        ...programExtra,
+        name: document.getElementById('programName').value,
+        description: document.getElementById('programDescription').value,
+        epilog: document.getElementById('programEpilog').value,
+    };
+
+    // only the arguments edited since the last export get serialized
+    const { toml, errors } = model.toTOML(program);
+    for (const [id, div] of renderedRows) {
+        syncArgument(div, id);
     }
-    tomlContent += `\n`;
-
-    const argumentsContainer = document.getElementById('argumentsContainer');
-    const argumentDivs = argumentsContainer.querySelectorAll('.argument');
-    argumentDivs.forEach(div => {
-        const id = div.id.split('_')[1];
-        const nameField = document.getElementById(`argName_${id}`);
-        const typeField = document.getElementById(`argType_${id}`);
-        const helpField = document.getElementById(`argHelp_${id}`);
-        const defaultField = document.getElementById(`argDefault_${id}`);
-
-        const name = nameField.value;
-        const type = typeField.value;
-        const help = helpField.value;
-        const short = document.getElementById(`argShort_${id}`).value;
-        const defaultValue = defaultField.value;
-        const metavar = document.getElementById(`argMetavar_${id}`).value;
-        const dest = document.getElementById(`argDest_${id}`).value;
-        const multiple = document.getElementById(`argMultiple_${id}`).checked;
-        const required = document.getElementById(`argRequired_${id}`).checked;
-        const choicesSelect = document.getElementById(`argChoices_${id}`);
-        const choices = Array.from(choicesSelect.options).map(opt => opt.value).join(',');
-
-        // Validate mandatory fields
-        if (!name || !type || !help) {
-            hasError = true;
-            if (!name) nameField.classList.add('error');
-            if (!type) typeField.classList.add('error');
-            if (!help) helpField.classList.add('error');
-            return;
-        } else {
-            nameField.classList.remove('error');
-            typeField.classList.remove('error');
-            helpField.classList.remove('error');
-        }
 
-        // Validate type-specific defaults
-        if (type === "flag" && defaultValue !== "true" && defaultValue !== "false") {
-            hasError = true;
-            defaultField.classList.add('error');
-            return;
-        }
-        if (type === "flag" && !name.startsWith('--')) {
-            // flags must be -- options
-            hasError = true;
-            defaultField.classList.add('error');
-            return;
-        }
-        if (type === "int" && defaultValue && isNaN(parseInt(defaultValue))) {
-            hasError = true;
-            defaultField.classList.add('error');
-            return;
-        } 
-        if (type === "float" && defaultValue && isNaN(parseFloat(defaultValue))) {
-            hasError = true;
-            defaultField.classList.add('error');
-            return;
-        }
-        defaultField.classList.remove('error');
-
-        tomlContent += `[[arguments]]\nname = "${name}"\n`;
-        if (short) {
-            tomlContent += `short = "${short}"\n`;
-        }
-        tomlContent += `type = "${type}"\n`;
-        if (defaultValue) {
-            tomlContent += `default = "${defaultValue}"\n`;
-        }
-        if (metavar) {
-            tomlContent += `metavar = "${metavar}"\n`;
-        }
-        if (dest) {
-            tomlContent += `dest = "${dest}"\n`;
-        }
-        if (multiple) {
-            tomlContent += `multiple = "true"\n`;
-        }
-        if (required) {
-            tomlContent += `required = "true"\n`;
-        }
-        if (choices) {
-            tomlContent += `choices = "${choices}"\n`;
-        }
-        tomlContent += `help = "${help}"\n\n`;
-    });
-
-    if (hasError) {
+    if (errors.length > 0) {
+        scrollToArgument(errors[0]);
         alert("Please fix the highlighted errors.");
         return;
     }
 
     // Create a download link for the generated TOML file
-    const blob = new Blob([tomlContent], {
+    const blob = new Blob([toml], {
         type: 'text/plain'
     });
     const link = document.getElementById('downloadLink');
@@ -293,65 +302,108 @@ function importTOMLFile() {
     }
 }
 
-function parseTOML(content) {
-    const lines = content.split('\n');
-    let currentArg = null;
-    let programInfo = {};
-    let argumentsList = [];
-
-    lines.forEach(line => {
-        line = line.trim();
-        if (line.startsWith('[program]')) {
-            currentArg = null;
-        } else if (line.startsWith('[[arguments]]')) {
-            if (currentArg) {
-                argumentsList.push(currentArg);
-            }
-            currentArg = {};
-        } else if (line) {
-            const [key, value] = line.split('=').map(s => s.trim().replace(/^"|"$/g, ''));
-            if (currentArg) {
-                currentArg[key] = value;
-            } else {
-                programInfo[key] = value;
-            }
-        }
-    });
+// keys of [program] the form has no field for, exported back
+let programExtra = {};
+let importWorker = null;
 
-    if (currentArg) {
-        argumentsList.push(currentArg);
+function clearArguments() {
+    for (const id of [...renderedRows.keys()]) {
+        dropRow(id);
     }
+    model.clear();
+    document.getElementById('argumentsContainer').scrollTop = 0;
+}
 
-    document.getElementById('programName').value = programInfo.name || '';
-    document.getElementById('programDescription').value = programInfo.description || '';
-    document.getElementById('programEpilog').value = programInfo.epilog || '';
+function addImportedArguments(batch) {
+    batch.forEach(arg => model.add(arg));
+    scheduleRender();
+}
 
-    document.getElementById('argumentsContainer').innerHTML = '';
+function importDone(spec) {
+    const { name = '', description = '', epilog = '', ...extra } = spec.program;
+    document.getElementById('programName').value = name;
+    document.getElementById('programDescription').value = description;
+    document.getElementById('programEpilog').value = epilog;
+    programExtra = extra;
+    model.preamble = spec.preamble;
+    model.trailer = spec.trailer;
+    renderRows();
+}
+
+function importFailed(message) {
+    clearArguments();
+    renderRows();
+    alert(`Invalid TOML file: ${message}`);
+}
+
+// parse on the main thread, when workers are not available (file:// pages)
+function parseTOMLHere(content) {
+    clearArguments();
+    try {
+        importDone(parseSpecTOML(content, addImportedArguments));
+    } catch (err) {
+        importFailed(err.message);
+    }
+}
 
-    argumentsList.forEach(arg => addArgument(arg));
+// the arguments are parsed in a worker and added as they arrive
+function parseTOML(content) {
+    if (importWorker !== null) {
+        importWorker.terminate();
+    }
+    clearArguments();
+    try {
+        importWorker = new Worker('web_toml/toml_worker.js');
+    } catch (err) {
+        importWorker = null;
+        parseTOMLHere(content);
+        return;
+    }
+    const worker = importWorker;
+    let received = false;
+    worker.onmessage = function(e) {
+        const message = e.data;
+        if (message.type === 'arguments') {
+            received = true;
+            addImportedArguments(message.batch);
+            return;
+        }
+        worker.terminate();
+        importWorker = null;
+        if (message.type === 'done') {
+            importDone(message.spec);
+        } else {
+            importFailed(message.message);
+        }
+    };
+    worker.onerror = function(e) {
+        e.preventDefault();
+        worker.terminate();
+        importWorker = null;
+        if (!received) {
+            parseTOMLHere(content);
+        } else {
+            importFailed(e.message);
+        }
+    };
+    worker.postMessage(content);
 }
 
 function addNewChoice(id) {
-    const dropdown = document.getElementById(`argChoices_${id}`);
     const newChoiceInput = document.getElementById(`newChoice_${id}`);
     const newChoice = newChoiceInput.value.trim();
-    const removeBtn = dropdown.parentElement.querySelector('.choices-remove-btn');
+    const choices = model.get(id).choices;
 
     if (newChoice) {
         // Check if the choice already exists
-        const existingOptions = Array.from(dropdown.options).map(option => option.value);
-        if (!existingOptions.includes(newChoice)) {
-            const newOption = document.createElement('option');
-            newOption.value = newChoice;
-            newOption.textContent = newChoice;
-            dropdown.appendChild(newOption);
-            
+        if (!choices.includes(newChoice)) {
+            model.update(id, 'choices', [...choices, newChoice]);
+            const div = renderedRows.get(id);
+            syncArgument(div, id);
             newChoiceInput.value = '';
-            removeBtn.disabled = false;
 
-            if (dropdown.options.length > 0) {
-                dropdown.selectedIndex = dropdown.options.length - 1;
-            }
+            const dropdown = div.querySelector('.choices-select');
+            dropdown.selectedIndex = dropdown.options.length - 1;
         } else {
             alert('This choice already exists.');
         }
@@ -359,23 +411,17 @@ function addNewChoice(id) {
 }
 
 function removeSelectedChoice(id) {
-    const dropdown = document.getElementById(`argChoices_${id}`);
-    const removeBtn = dropdown.parentElement.querySelector('.choices-remove-btn');
+    const div = renderedRows.get(id);
+    const dropdown = div.querySelector('.choices-select');
     const currentSelectedIndex = dropdown.selectedIndex;
-    
+
     if (currentSelectedIndex !== -1) {
-        dropdown.remove(currentSelectedIndex);
-        
+        const choices = model.get(id).choices.filter((_, idx) => idx !== currentSelectedIndex);
+        model.update(id, 'choices', choices);
+        syncArgument(div, id);
+
         if (dropdown.options.length > 0) {
-            if (currentSelectedIndex < dropdown.options.length) {
-                dropdown.selectedIndex = currentSelectedIndex;
-            } else {
-                dropdown.selectedIndex = dropdown.options.length - 1;
-            }
-        }
-        
-        if (dropdown.options.length === 0) {
-            removeBtn.disabled = true;
+            dropdown.selectedIndex = Math.min(currentSelectedIndex, dropdown.options.length - 1);
         }
     }
 }
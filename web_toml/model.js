@@ -0,0 +1,252 @@
+// In-memory model of the arguments edited by the page. The DOM only shows
+// a window of it (see index.js), and the TOML of each argument is cached
+// until the argument changes, so exporting re-serializes the edited ones.
+// Imported sections the page doesn't edit (include, [[commands]],
+// [[groups.*]]...) are kept as text and exported unchanged.
+
+const ARGUMENT_DEFAULTS = {
+    name: '', short: '', type: 'string', default: '', metavar: '', dest: '',
+    multiple: false, required: false, help: '', choices: [],
+};
+
+function isPositionalName(name) {
+    return name !== '' && !name.startsWith('--');
+}
+
+// fields given as strings (imported TOML) to the types the model holds
+function normalizeArgument(values) {
+    const arg = { ...ARGUMENT_DEFAULTS, ...values };
+    for (const field of ['multiple', 'required']) {
+        arg[field] = arg[field] === true || arg[field] === 'true';
+    }
+    if (arg.type === 'flag' && arg.default === '') {
+        // flags default to false when the spec doesn't say
+        arg.default = 'false';
+    }
+    if (typeof arg.choices === 'string') {
+        arg.choices = arg.choices.split(',').map(c => c.trim()).filter(c => c);
+    } else {
+        arg.choices = [...arg.choices];
+    }
+    return arg;
+}
+
+// names of the fields of an argument with an invalid value
+function validateArgument(arg) {
+    const invalid = [];
+    if (arg.group !== undefined) {
+        return arg.group ? invalid : ['group'];
+    }
+    for (const field of ['name', 'type', 'help']) {
+        if (!arg[field]) {
+            invalid.push(field);
+        }
+    }
+    if (invalid.length > 0) {
+        return invalid;
+    }
+    const value = arg.default;
+    if (arg.type === 'flag' && value !== 'true' && value !== 'false') {
+        invalid.push('default');
+    } else if (arg.type === 'flag' && !arg.name.startsWith('--')) {
+        // flags must be -- options
+        invalid.push('default');
+    } else if (arg.type === 'int' && value && isNaN(parseInt(value))) {
+        invalid.push('default');
+    } else if (arg.type === 'float' && value && isNaN(parseFloat(value))) {
+        invalid.push('default');
+    }
+    return invalid;
+}
+
+const TOML_ESCAPES = { '"': '\\"', '\\': '\\\\', '\n': '\\n', '\t': '\\t', '\r': '\\r' };
+
+function tomlString(value) {
+    return '"' + String(value).replace(/["\\\n\t\r]/g, c => TOML_ESCAPES[c]) + '"';
+}
+
+function tomlKey(key) {
+    return /^[A-Za-z0-9_-]+$/.test(key) ? key : tomlString(key);
+}
+
+function tomlValue(value) {
+    if (typeof value === 'string') {
+        return tomlString(value);
+    }
+    if (Array.isArray(value)) {
+        return `[${value.map(tomlValue).join(', ')}]`;
+    }
+    if (typeof value === 'object') {
+        const items = Object.entries(value).map(([key, item]) => `${tomlKey(key)} = ${tomlValue(item)}`);
+        return `{ ${items.join(', ')} }`;
+    }
+    return String(value);
+}
+
+const ARGUMENT_KEYS = new Set([...Object.keys(ARGUMENT_DEFAULTS), 'group']);
+const PROGRAM_KEYS = new Set(['name', 'description', 'epilog']);
+
+// keys the form doesn't edit, exported as they were imported
+function extraTOML(object, known) {
+    let toml = '';
+    for (const key in object) {
+        const value = object[key];
+        if (!known.has(key) && value !== undefined) {
+            toml += `${tomlKey(key)} = ${tomlValue(value)}\n`;
+        }
+    }
+    return toml;
+}
+
+function argumentTOML(arg) {
+    if (arg.group !== undefined) {
+        return `[[arguments]]\ngroup = ${tomlString(arg.group)}\n\n`;
+    }
+    let toml = `[[arguments]]\nname = ${tomlString(arg.name)}\n`;
+    if (arg.short) {
+        toml += `short = ${tomlString(arg.short)}\n`;
+    }
+    toml += `type = ${tomlString(arg.type)}\n`;
+    if (arg.default) {
+        toml += `default = ${tomlString(arg.default)}\n`;
+    }
+    if (arg.metavar) {
+        toml += `metavar = ${tomlString(arg.metavar)}\n`;
+    }
+    if (arg.dest) {
+        toml += `dest = ${tomlString(arg.dest)}\n`;
+    }
+    if (arg.multiple) {
+        toml += `multiple = "true"\n`;
+    }
+    if (arg.required) {
+        toml += `required = "true"\n`;
+    }
+    if (arg.choices.length > 0) {
+        toml += `choices = ${tomlString(arg.choices.join(','))}\n`;
+    }
+    toml += extraTOML(arg, ARGUMENT_KEYS);
+    toml += `help = ${tomlString(arg.help)}\n\n`;
+    return toml;
+}
+
+function programTOML(program) {
+    let toml = `[program]\nname = ${tomlString(program.name)}\ndescription = ${tomlString(program.description)}\n`;
+    if (program.epilog) {
+        toml += `epilog = ${tomlString(program.epilog)}\n`;
+    }
+    toml += extraTOML(program, PROGRAM_KEYS);
+    return toml + `\n`;
+}
+
+// first/last (exclusive) row index to render for a scroll position of a
+// list of count rows of rowHeight pixels, plus overscan rows on each side
+function visibleRange(scrollTop, viewportHeight, rowHeight, count, overscan = 2) {
+    const first = Math.max(0, Math.floor(scrollTop / rowHeight) - overscan);
+    const last = Math.min(count, Math.ceil((scrollTop + viewportHeight) / rowHeight) + overscan);
+    return { first, last: Math.max(first, last) };
+}
+
+class ArgumentModel {
+    constructor() {
+        this.rows = [];          // {id, arg, toml, invalid}, in spec order
+        this.byId = new Map();   // id -> row
+        this.nextId = 1;
+        this.preamble = '';      // imported text before [program]
+        this.trailer = '';       // imported sections after the arguments
+    }
+
+    get length() {
+        return this.rows.length;
+    }
+
+    clear() {
+        this.rows = [];
+        this.byId.clear();
+        this.preamble = '';
+        this.trailer = '';
+    }
+
+    add(values = {}) {
+        const row = { id: this.nextId++, arg: normalizeArgument(values), toml: null, invalid: null };
+        this.rows.push(row);
+        this.byId.set(row.id, row);
+        return row.id;
+    }
+
+    remove(id) {
+        const row = this.byId.get(id);
+        if (row) {
+            this.byId.delete(id);
+            this.rows.splice(this.rows.indexOf(row), 1);
+        }
+    }
+
+    get(id) {
+        return this.byId.get(id).arg;
+    }
+
+    // set a field, applying the same rules as the form (positionals are
+    // required and have no default, flags default to false...). Returns
+    // whether other fields changed too
+    update(id, field, value) {
+        const row = this.byId.get(id);
+        const arg = row.arg;
+        const before = { ...arg };
+        arg[field] = value;
+
+        if (field === 'name') {
+            if (value.startsWith('-') && !value.startsWith('--') && value !== '-') {
+                arg.name = '-' + value;
+            }
+            arg.required = isPositionalName(arg.name);
+            if (arg.required) {
+                arg.default = '';
+                arg.short = '';
+            }
+        } else if (field === 'required' && value) {
+            arg.default = '';
+        } else if (field === 'type') {
+            arg.default = value === 'flag' ? 'false' : '';
+            if (value === 'flag') {
+                arg.required = false;
+            }
+        }
+
+        // dirty: serialized and validated again on the next export
+        row.toml = null;
+        row.invalid = null;
+        return arg[field] !== value || Object.keys(arg).some(key => key !== field && arg[key] !== before[key]);
+    }
+
+    invalidFields(id) {
+        const row = this.byId.get(id);
+        if (row.invalid === null) {
+            row.invalid = validateArgument(row.arg);
+        }
+        return row.invalid;
+    }
+
+    // TOML of the whole spec, only the arguments changed since the last
+    // call are serialized again. errors lists the ids of invalid arguments
+    toTOML(program) {
+        const chunks = [this.preamble, programTOML(program)];
+        const errors = [];
+        for (const row of this.rows) {
+            if (this.invalidFields(row.id).length > 0) {
+                errors.push(row.id);
+                continue;
+            }
+            if (row.toml === null) {
+                row.toml = argumentTOML(row.arg);
+            }
+            chunks.push(row.toml);
+        }
+        chunks.push(this.trailer);
+        return { toml: chunks.join(''), errors };
+    }
+}
+
+if (typeof module !== 'undefined') {
+    module.exports = { ArgumentModel, visibleRange, isPositionalName };
+}
@@ -0,0 +1,424 @@
+// TOML parser for the subset of TOML used by climeta specs: tables, arrays
+// of tables, dotted/quoted keys, basic/literal (multi-line) strings,
+// integers, floats, booleans, arrays and inline tables, with comments
+// anywhere a newline can go. Runs in the import worker (toml_worker.js)
+// and in node.
+//
+// parseSpecTOML() streams the [[arguments]] tables to a callback in
+// batches as they are parsed, and keeps the sections the editor doesn't
+// model (top level keys such as include, [[commands]], [[groups.*]]) as
+// raw text so exporting writes them back unchanged.
+
+const BARE_KEY_RE = /[A-Za-z0-9_-]/;
+const NUMBER_RE = /^[+-]?(?:0x[0-9A-Fa-f_]+|0o[0-7_]+|0b[01_]+|(?:\d[\d_]*)(?:\.\d[\d_]*)?(?:[eE][+-]?\d[\d_]*)?|inf|nan)/;
+const PLAIN_RE = /[^"\\\n]*/y;
+const ESCAPES = { b: '\b', t: '\t', n: '\n', f: '\f', r: '\r', '"': '"', '\\': '\\' };
+
+class TOMLError extends Error {
+    constructor(message, line) {
+        super(`line ${line}: ${message}`);
+        this.line = line;
+    }
+}
+
+class TOMLParser {
+    constructor(text) {
+        this.text = text;
+        this.pos = 0;
+    }
+
+    line() {
+        let line = 1;
+        for (let i = 0; i < this.pos && i < this.text.length; i++) {
+            if (this.text[i] === '\n') {
+                line++;
+            }
+        }
+        return line;
+    }
+
+    error(message) {
+        return new TOMLError(message, this.line());
+    }
+
+    peek(offset = 0) {
+        return this.text[this.pos + offset];
+    }
+
+    startsWith(token) {
+        return this.text.startsWith(token, this.pos);
+    }
+
+    expect(token) {
+        if (!this.startsWith(token)) {
+            throw this.error(`expected '${token}'`);
+        }
+        this.pos += token.length;
+    }
+
+    skipSpaces() {
+        while (this.peek() === ' ' || this.peek() === '\t') {
+            this.pos++;
+        }
+    }
+
+    skipComment() {
+        if (this.peek() === '#') {
+            while (this.pos < this.text.length && this.peek() !== '\n') {
+                this.pos++;
+            }
+        }
+    }
+
+    // spaces, comments and newlines between statements/array items
+    skipBlank() {
+        for (;;) {
+            this.skipSpaces();
+            this.skipComment();
+            if (this.peek() === '\n') {
+                this.pos++;
+            } else if (this.startsWith('\r\n')) {
+                this.pos += 2;
+            } else {
+                return;
+            }
+        }
+    }
+
+    // only spaces and a comment allowed up to the end of the line
+    endOfLine() {
+        this.skipSpaces();
+        this.skipComment();
+        if (this.pos < this.text.length && this.peek() !== '\n' && !this.startsWith('\r\n')) {
+            throw this.error(`unexpected '${this.peek()}'`);
+        }
+    }
+
+    key() {
+        const c = this.peek();
+        if (c === '"') {
+            return this.basicString();
+        }
+        if (c === "'") {
+            return this.literalString();
+        }
+        const start = this.pos;
+        while (this.pos < this.text.length && BARE_KEY_RE.test(this.peek())) {
+            this.pos++;
+        }
+        if (start === this.pos) {
+            throw this.error('expected a key');
+        }
+        return this.text.slice(start, this.pos);
+    }
+
+    dottedKey() {
+        const keys = [this.key()];
+        for (;;) {
+            this.skipSpaces();
+            if (this.peek() !== '.') {
+                return keys;
+            }
+            this.pos++;
+            this.skipSpaces();
+            keys.push(this.key());
+        }
+    }
+
+    escape() {
+        const c = this.peek();
+        this.pos++;
+        if (c in ESCAPES) {
+            return ESCAPES[c];
+        }
+        if (c === 'u' || c === 'U') {
+            const size = c === 'u' ? 4 : 8;
+            const hex = this.text.slice(this.pos, this.pos + size);
+            if (!/^[0-9A-Fa-f]+$/.test(hex) || hex.length !== size) {
+                throw this.error('invalid unicode escape');
+            }
+            this.pos += size;
+            return String.fromCodePoint(parseInt(hex, 16));
+        }
+        throw this.error(`invalid escape '\\${c}'`);
+    }
+
+    basicString() {
+        this.expect('"');
+        let value = '';
+        for (;;) {
+            // plain characters in one go
+            PLAIN_RE.lastIndex = this.pos;
+            const plain = PLAIN_RE.exec(this.text)[0];
+            value += plain;
+            this.pos += plain.length;
+            const c = this.peek();
+            if (c === undefined || c === '\n') {
+                throw this.error('unterminated string');
+            }
+            this.pos++;
+            if (c === '"') {
+                return value;
+            }
+            value += c === '\\' ? this.escape() : c;
+        }
+    }
+
+    literalString() {
+        this.expect("'");
+        const end = this.text.indexOf("'", this.pos);
+        const newline = this.text.indexOf('\n', this.pos);
+        if (end < 0 || (newline >= 0 && newline < end)) {
+            throw this.error('unterminated string');
+        }
+        const value = this.text.slice(this.pos, end);
+        this.pos = end + 1;
+        return value;
+    }
+
+    multilineString(quote) {
+        this.expect(quote.repeat(3));
+        // a newline right after the opening quotes is trimmed
+        if (this.startsWith('\r\n')) {
+            this.pos += 2;
+        } else if (this.peek() === '\n') {
+            this.pos++;
+        }
+        let value = '';
+        for (;;) {
+            if (this.pos >= this.text.length) {
+                throw this.error('unterminated string');
+            }
+            if (this.startsWith(quote.repeat(3))) {
+                // up to two quotes right before the closing ones belong to the string
+                let extra = 0;
+                while (extra < 2 && this.peek(3 + extra) === quote) {
+                    extra++;
+                }
+                value += quote.repeat(extra);
+                this.pos += 3 + extra;
+                return value;
+            }
+            const c = this.peek();
+            this.pos++;
+            if (c === '\\' && quote === '"') {
+                if (/^[ \t]*\r?\n/.test(this.text.slice(this.pos, this.pos + 64))) {
+                    // line ending backslash: trim whitespace up to the next text
+                    while (/\s/.test(this.peek())) {
+                        this.pos++;
+                    }
+                } else {
+                    value += this.escape();
+                }
+            } else {
+                value += c;
+            }
+        }
+    }
+
+    array() {
+        this.expect('[');
+        const items = [];
+        for (;;) {
+            this.skipBlank();
+            if (this.peek() === ']') {
+                this.pos++;
+                return items;
+            }
+            items.push(this.value());
+            this.skipBlank();
+            if (this.peek() === ',') {
+                this.pos++;
+            } else if (this.peek() !== ']') {
+                throw this.error("expected ',' or ']' in array");
+            }
+        }
+    }
+
+    inlineTable() {
+        this.expect('{');
+        const table = {};
+        this.skipSpaces();
+        if (this.peek() === '}') {
+            this.pos++;
+            return table;
+        }
+        for (;;) {
+            this.skipSpaces();
+            this.keyValue(table);
+            this.skipSpaces();
+            if (this.peek() === '}') {
+                this.pos++;
+                return table;
+            }
+            this.expect(',');
+        }
+    }
+
+    value() {
+        if (this.startsWith('"""')) {
+            return this.multilineString('"');
+        }
+        if (this.startsWith("'''")) {
+            return this.multilineString("'");
+        }
+        const c = this.peek();
+        if (c === '"') {
+            return this.basicString();
+        }
+        if (c === "'") {
+            return this.literalString();
+        }
+        if (c === '[') {
+            return this.array();
+        }
+        if (c === '{') {
+            return this.inlineTable();
+        }
+        for (const [token, value] of [['true', true], ['false', false]]) {
+            if (this.startsWith(token) && !BARE_KEY_RE.test(this.peek(token.length) || '')) {
+                this.pos += token.length;
+                return value;
+            }
+        }
+        const match = NUMBER_RE.exec(this.text.slice(this.pos, this.pos + 64));
+        if (match) {
+            this.pos += match[0].length;
+            const number = match[0].replace(/_/g, '');
+            if (/^[+-]?0[xob]/.test(number)) {
+                const sign = number.startsWith('-') ? -1 : 1;
+                return sign * Number(number.replace(/^[+-]/, ''));
+            }
+            if (/inf$/.test(number)) {
+                return number.startsWith('-') ? -Infinity : Infinity;
+            }
+            return Number(number);
+        }
+        throw this.error('invalid value');
+    }
+
+    // key = value into table, creating the tables of dotted keys
+    keyValue(table) {
+        const keys = this.dottedKey();
+        this.skipSpaces();
+        this.expect('=');
+        this.skipSpaces();
+        const value = this.value();
+        let target = table;
+        for (const key of keys.slice(0, -1)) {
+            if (!(key in target)) {
+                target[key] = {};
+            }
+            target = target[key];
+            if (typeof target !== 'object' || Array.isArray(target)) {
+                throw this.error(`'${key}' is not a table`);
+            }
+        }
+        const last = keys[keys.length - 1];
+        if (last in target) {
+            throw this.error(`duplicate key '${keys.join('.')}'`);
+        }
+        target[last] = value;
+    }
+
+    // [table] or [[array.of.tables]] header, returns {path, isArray}
+    header() {
+        const isArray = this.startsWith('[[');
+        this.expect(isArray ? '[[' : '[');
+        this.skipSpaces();
+        const path = this.dottedKey();
+        this.skipSpaces();
+        this.expect(isArray ? ']]' : ']');
+        this.endOfLine();
+        return { path, isArray };
+    }
+
+    // calls onStatement(header, table, start, end) for the top level key
+    // values (header null) and for each table, with its source span
+    parse(onStatement) {
+        let header = null;
+        let table = {};
+        let start = 0;
+        for (;;) {
+            this.skipBlank();
+            const atEnd = this.pos >= this.text.length;
+            if (atEnd || this.peek() === '[') {
+                onStatement(header, table, start, this.pos);
+                if (atEnd) {
+                    return;
+                }
+                start = this.pos;
+                header = this.header();
+                table = {};
+            } else {
+                this.keyValue(table);
+                this.endOfLine();
+            }
+        }
+    }
+}
+
+// generic TOML document as nested objects (as tomllib.loads)
+function parseTOMLDocument(text) {
+    const root = {};
+    new TOMLParser(text).parse((header, table) => {
+        if (header === null) {
+            Object.assign(root, table);
+            return;
+        }
+        let target = root;
+        const path = header.path;
+        for (const key of path.slice(0, -1)) {
+            if (!(key in target)) {
+                target[key] = {};
+            }
+            target = target[key];
+            if (Array.isArray(target)) {
+                target = target[target.length - 1];
+            }
+        }
+        const last = path[path.length - 1];
+        if (header.isArray) {
+            if (!(last in target)) {
+                target[last] = [];
+            }
+            target[last].push(table);
+        } else {
+            target[last] = { ...(target[last] || {}), ...table };
+        }
+    });
+    return root;
+}
+
+// climeta spec: {program, preamble, trailer}, arguments are streamed to
+// onArguments in batches of batchSize
+function parseSpecTOML(text, onArguments, batchSize = 200) {
+    const spec = { program: {}, preamble: '', trailer: '' };
+    let batch = [];
+    new TOMLParser(text).parse((header, table, start, end) => {
+        const source = text.slice(start, end);
+        if (header === null) {
+            spec.preamble = source;
+        } else if (header.path.join('.') === 'program' && !header.isArray) {
+            spec.program = table;
+        } else if (header.path.join('.') === 'arguments' && header.isArray) {
+            batch.push(table);
+            if (batch.length >= batchSize) {
+                onArguments(batch);
+                batch = [];
+            }
+        } else if (header.path[0] === 'program' || header.path[0] === 'arguments') {
+            throw new TOMLError(`unsupported table [${header.path.join('.')}]`, text.slice(0, start).split('\n').length);
+        } else {
+            spec.trailer += source;
+        }
+    });
+    if (batch.length > 0) {
+        onArguments(batch);
+    }
+    return spec;
+}
+
+if (typeof module !== 'undefined') {
+    module.exports = { TOMLError, parseTOMLDocument, parseSpecTOML };
+}
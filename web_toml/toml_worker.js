@@ -0,0 +1,16 @@
+// Parses an imported spec off the main thread: posts the [[arguments]] in
+// batches as they are parsed, so the page renders them progressively,
+// then the rest of the spec (see parseSpecTOML in toml_parser.js)
+
+importScripts('toml_parser.js');
+
+const BATCH_SIZE = 200;
+
+onmessage = function(e) {
+    try {
+        const spec = parseSpecTOML(e.data, batch => postMessage({ type: 'arguments', batch }), BATCH_SIZE);
+        postMessage({ type: 'done', spec });
+    } catch (err) {
+        postMessage({ type: 'error', message: err.message });
+    }
+};